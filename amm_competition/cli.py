@@ -3,15 +3,24 @@
 import argparse
 import faulthandler
 import sys
+import time
 from pathlib import Path
 
+import numpy as np
+
 # Dump Python traceback on segfault (e.g. in pyrevm/amm_sim_rs native code)
 faulthandler.enable()
 
-from amm_competition.competition.match import MatchRunner, HyperparameterVariance
+from amm_competition.competition.match import BatchProgress, MatchRunner, HyperparameterVariance
 from amm_competition.evm.adapter import EVMStrategyAdapter
-from amm_competition.evm.baseline import load_vanilla_strategy
+from amm_competition.evm.baseline import (
+    VANILLA_FEE_BPS,
+    get_vanilla_bytecode_and_abi,
+    load_vanilla_strategy,
+)
 from amm_competition.evm.compiler import SolidityCompiler
+from amm_competition.evm.probe import fee_surface
+from amm_competition.evm.profiler import build_report
 from amm_competition.evm.validator import SolidityValidator
 import amm_sim_rs
 
@@ -21,6 +30,7 @@ from amm_competition.competition.config import (
     baseline_nominal_retail_rate,
     baseline_nominal_retail_size,
     baseline_nominal_sigma,
+    build_base_config,
     resolve_n_workers,
 )
 
@@ -126,16 +136,60 @@ def run_match_command(args: argparse.Namespace) -> int:
         config=config,
         n_workers=resolve_n_workers(),
         variance=variance,
+        backend=args.backend,
+        timings=args.timings,
     )
-    result = runner.run_match(user_strategy, default_strategy)
+    started = time.perf_counter()
+    # Live progress only on a terminal, so logs stay one line per message
+    result = runner.run_match(
+        user_strategy,
+        default_strategy,
+        progress=print_progress if sys.stdout.isatty() else None,
+    )
+    elapsed = time.perf_counter() - started
+    if sys.stdout.isatty():
+        print()
 
     # Display score (only the user's strategy Edge)
     avg_edge = result.total_edge_a / n_simulations
     print(f"\n{strategy_name} Edge: {avg_edge:.2f}")
 
+    # Where the edge came from, per simulation
+    breakdown = result.edge_breakdown.get("submission")
+    if breakdown is not None:
+        print(f"  arbitrage {breakdown.arb_edge / n_simulations:.2f}, "
+              f"retail {breakdown.retail_edge / n_simulations:.2f}")
+        print(f"  retail share {breakdown.retail_share:.1%}, "
+              f"fee charged {breakdown.effective_fee * 1e4:.1f} bps")
+
+    if args.timings and result.timings is not None:
+        print_timings(result.timings, elapsed)
+
     return 0
 
 
+def print_progress(progress: BatchProgress) -> None:
+    """Rewrite the progress line of a running match."""
+    eta = f"{progress.eta:.0f}s" if progress.eta != float("inf") else "?"
+    print(f"\r  {progress.completed}/{progress.total} simulations, "
+          f"edge {progress.mean_edge:.2f}, "
+          f"{progress.rate:.1f} sims/s, ETA {eta}   ", end="", flush=True)
+
+
+def print_timings(timings: "amm_sim_rs.PhaseTimings", elapsed: float) -> None:
+    """Print the engine's per-phase breakdown of a batch."""
+    engine_seconds = timings.total_ns * 1e-9 or 1.0
+    print(f"\n{timings.simulations} simulations in {elapsed:.2f}s "
+          f"({timings.simulations / elapsed:.1f} sims/s)")
+    print("Engine time per phase (summed over workers):")
+    print(f"  {'phase':<14}{'seconds':>10}{'share':>8}{'calls':>14}{'ns/call':>10}")
+    for phase, seconds, calls in timings.phases():
+        per_call = seconds * 1e9 / calls if calls else 0.0
+        print(f"  {phase:<14}{seconds:>10.3f}{seconds / engine_seconds:>8.1%}"
+              f"{calls:>14}{per_call:>10.0f}")
+    print(f"  {'total':<14}{engine_seconds:>10.3f}")
+
+
 def validate_command(args: argparse.Namespace) -> int:
     """Validate a Solidity strategy file without running it."""
     strategy_path = Path(args.strategy)
@@ -185,6 +239,131 @@ def validate_command(args: argparse.Namespace) -> int:
         return 1
 
 
+def profile_command(args: argparse.Namespace) -> int:
+    """Profile a strategy's afterSwap by opcode and source line."""
+    strategy_path = Path(args.strategy)
+    if not strategy_path.exists():
+        print(f"Error: Strategy file not found: {strategy_path}")
+        return 1
+
+    source_code = strategy_path.read_text()
+
+    print("Validating strategy...")
+    validator = SolidityValidator()
+    validation = validator.validate(source_code)
+    if not validation.valid:
+        print("Validation failed:")
+        for error in validation.errors:
+            print(f"  - {error}")
+        return 1
+
+    print("Compiling strategy...")
+    compiler = SolidityCompiler()
+    compilation = compiler.compile(source_code)
+    if not compilation.success:
+        print("Compilation failed:")
+        for error in (compilation.errors or []):
+            print(f"  - {error}")
+        return 1
+
+    configs = []
+    for seed in range(args.simulations):
+        config = build_base_config(seed=seed)
+        config.n_steps = args.steps
+        configs.append(config)
+
+    print(f"Profiling {args.simulations} simulations of {args.steps} steps...", flush=True)
+    vanilla_bytecode, _ = get_vanilla_bytecode_and_abi()
+    profile = amm_sim_rs.profile(
+        list(compilation.bytecode),
+        list(vanilla_bytecode),
+        configs,
+        baseline_fee_bps=VANILLA_FEE_BPS,
+    )
+    report = build_report(profile, compilation)
+
+    print(f"\n{report.name}: {report.calls} afterSwap calls, "
+          f"{report.gas_per_call:.0f} gas/call (incl. 21000 intrinsic)")
+    print(f"SLOAD/call: {report.sloads_per_call:.1f} (max {report.sload_max})  "
+          f"SSTORE/call: {report.sstores_per_call:.1f} (max {report.sstore_max})")
+
+    executed_gas = sum(gas for _, _, gas in report.opcodes) or 1
+
+    print("\nTop opcodes by gas:")
+    print(f"  {'opcode':<14}{'count':>12}{'gas':>14}{'share':>8}")
+    for op, count, gas in report.opcodes[:args.top]:
+        print(f"  {op:<14}{count:>12}{gas:>14}{gas / executed_gas:>8.1%}")
+
+    print("\nHot source lines by gas:")
+    print(f"  {'location':<28}{'instrs':>12}{'gas':>14}{'share':>8}  source")
+    for cost in report.lines[:args.top]:
+        print(f"  {cost.label:<28}{cost.executions:>12}{cost.gas:>14}"
+              f"{cost.gas / executed_gas:>8.1%}  {cost.text[:60]}")
+    if report.unmapped_gas:
+        print(f"  {'<compiler-generated>':<28}{'':>12}{report.unmapped_gas:>14}"
+              f"{report.unmapped_gas / executed_gas:>8.1%}")
+
+    if args.folded:
+        Path(args.folded).write_text(report.to_folded())
+        print(f"\nFolded stacks written to {args.folded}")
+
+    return 0
+
+
+def probe_command(args: argparse.Namespace) -> int:
+    """Print the fees a strategy quotes after hypothetical trades of each size."""
+    strategy_path = Path(args.strategy)
+    if not strategy_path.exists():
+        print(f"Error: Strategy file not found: {strategy_path}")
+        return 1
+
+    source_code = strategy_path.read_text()
+
+    validator = SolidityValidator()
+    validation = validator.validate(source_code)
+    if not validation.valid:
+        print("Validation failed:")
+        for error in validation.errors:
+            print(f"  - {error}")
+        return 1
+
+    compiler = SolidityCompiler()
+    compilation = compiler.compile(source_code)
+    if not compilation.success:
+        print("Compilation failed:")
+        for error in (compilation.errors or []):
+            print(f"  - {error}")
+        return 1
+
+    if not 0 < args.min_size < args.max_size:
+        print("Error: need 0 < --min-size < --max-size")
+        return 1
+    sizes = np.geomspace(args.min_size, args.max_size, args.points)
+
+    surface = fee_surface(
+        compilation.bytecode,
+        BASELINE_SETTINGS.initial_x,
+        BASELINE_SETTINGS.initial_y,
+        sizes,
+        backend=args.backend,
+        n_workers=resolve_n_workers(),
+    )
+
+    print(f"\nFees (bps) quoted after one trade against the initial reserves "
+          f"({BASELINE_SETTINGS.initial_x:g} X / {BASELINE_SETTINGS.initial_y:g} Y)")
+    print(f"  {'size (Y)':>10}  {'AMM buys X':^21}  {'AMM sells X':^21}")
+    print(f"  {'':>10}  {'bid':>10} {'ask':>10}  {'bid':>10} {'ask':>10}")
+    for i, size in enumerate(surface.sizes):
+        fees = (surface.buy_bid[i], surface.buy_ask[i], surface.sell_bid[i], surface.sell_ask[i])
+        print(f"  {size:>10.3f}  " + "  ".join(
+            f"{fees[j] * 1e4:>10.2f} {fees[j + 1] * 1e4:>10.2f}" for j in (0, 2)
+        ))
+    if surface.failures:
+        print(f"\n{surface.failures} probe(s) failed (shown as nan)")
+
+    return 0
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="AMM Design Competition - Simulate and score your strategy",
@@ -193,7 +372,10 @@ def main() -> int:
 Examples:
   amm-match run my_strategy.sol
   amm-match run my_strategy.sol --simulations 1000 --steps 1000
+  amm-match run my_strategy.sol --timings
   amm-match validate my_strategy.sol
+  amm-match profile my_strategy.sol --folded profile.folded
+  amm-match probe my_strategy.sol --min-size 1 --max-size 200
         """,
     )
 
@@ -256,6 +438,20 @@ Examples:
         default=None,
         help="Lognormal sigma for retail sizes (defaults to shared baseline config)",
     )
+    run_parser.add_argument(
+        "--backend",
+        choices=["revm", "direct", "compiled"],
+        default="revm",
+        help=(
+            "EVM execution backend; 'direct' skips revm's transaction pipeline, "
+            "'compiled' also runs strategy bytecode as native code (same results)"
+        ),
+    )
+    run_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print time spent per simulation phase and simulations per second",
+    )
     run_parser.set_defaults(func=run_match_command)
 
     # Validate command
@@ -265,6 +461,67 @@ Examples:
     validate_parser.add_argument("strategy", help="Path to Solidity strategy file (.sol)")
     validate_parser.set_defaults(func=validate_command)
 
+    # Profile command
+    profile_parser = subparsers.add_parser(
+        "profile", help="Profile afterSwap gas by opcode and source line"
+    )
+    profile_parser.add_argument("strategy", help="Path to Solidity strategy file (.sol)")
+    profile_parser.add_argument(
+        "--simulations",
+        type=int,
+        default=3,
+        help="Number of simulations to profile (default: 3)",
+    )
+    profile_parser.add_argument(
+        "--steps",
+        type=int,
+        default=2000,
+        help="Steps per simulation (default: 2000)",
+    )
+    profile_parser.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="Rows to show in each table (default: 15)",
+    )
+    profile_parser.add_argument(
+        "--folded",
+        default=None,
+        help="Write folded stacks (flamegraph format, gas-weighted) to this path",
+    )
+    profile_parser.set_defaults(func=profile_command)
+
+    # Probe command
+    probe_parser = subparsers.add_parser(
+        "probe", help="Show the fees a strategy quotes after trades of each size"
+    )
+    probe_parser.add_argument("strategy", help="Path to Solidity strategy file (.sol)")
+    probe_parser.add_argument(
+        "--min-size",
+        type=float,
+        default=0.1,
+        help="Smallest trade size in Y (default: 0.1)",
+    )
+    probe_parser.add_argument(
+        "--max-size",
+        type=float,
+        default=1000.0,
+        help="Largest trade size in Y (default: 1000)",
+    )
+    probe_parser.add_argument(
+        "--points",
+        type=int,
+        default=13,
+        help="Number of log-spaced sizes (default: 13)",
+    )
+    probe_parser.add_argument(
+        "--backend",
+        choices=["revm", "direct", "compiled"],
+        default="revm",
+        help="EVM execution backend (default: revm)",
+    )
+    probe_parser.set_defaults(func=probe_command)
+
     args = parser.parse_args()
 
     if args.command is None:
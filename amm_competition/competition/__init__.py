@@ -1,8 +1,17 @@
 """Competition framework."""
 
-from amm_competition.competition.match import MatchRunner, MatchResult
+from amm_competition.competition.match import (
+    BatchProgress,
+    MarketResult,
+    MatchRunner,
+    MatchResult,
+    ScreeningResult,
+)
 
 __all__ = [
     "MatchRunner",
     "MatchResult",
+    "MarketResult",
+    "ScreeningResult",
+    "BatchProgress",
 ]
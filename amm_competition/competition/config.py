@@ -1,7 +1,6 @@
 """Shared configuration for baseline simulations and variance."""
 
 from dataclasses import dataclass
-import multiprocessing
 import os
 
 import amm_sim_rs
@@ -70,8 +69,12 @@ def baseline_nominal_retail_size() -> float:
 
 
 def resolve_n_workers() -> int:
-    """Resolve worker count from environment or CPU count."""
-    return int(os.environ.get("N_WORKERS", str(min(8, multiprocessing.cpu_count()))))
+    """Resolve worker count from the environment.
+
+    0 (the default) lets amm_sim_rs size its pool: every CPU available to
+    the process, respecting affinity and cgroup quotas.
+    """
+    return int(os.environ.get("N_WORKERS", "0"))
 
 
 def build_base_config(*, seed: int | None) -> amm_sim_rs.SimulationConfig:
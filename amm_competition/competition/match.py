@@ -1,12 +1,16 @@
 """Match runner for baseline vs submission simulations using Rust engine."""
 
+import math
+import statistics
+import time
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional
+from typing import Callable, Iterator, Optional, Sequence
 
 import amm_sim_rs
 
 from amm_competition.evm.adapter import EVMStrategyAdapter
+from amm_competition.evm.baseline import VANILLA_FEE_BPS, is_vanilla_bytecode
 
 
 @dataclass
@@ -25,16 +29,6 @@ class HyperparameterVariance:
     vary_gbm_sigma: bool
 
 
-@dataclass
-class LightweightStepResult:
-    """Minimal step data for charting."""
-    timestamp: int
-    fair_price: float
-    spot_prices: dict[str, float]
-    pnls: dict[str, float]
-    fees: dict[str, tuple[float, float]]
-
-
 @dataclass
 class LightweightSimResult:
     """Minimal simulation result for charting."""
@@ -44,10 +38,14 @@ class LightweightSimResult:
     edges: dict[str, Decimal]
     initial_fair_price: float
     initial_reserves: dict[str, tuple[float, float]]
-    steps: list[LightweightStepResult]
+    trace: "amm_sim_rs.StepTrace"
     arb_volume_y: dict[str, float]
     retail_volume_y: dict[str, float]
     average_fees: dict[str, tuple[float, float]]
+    strategy_stats: dict[str, "amm_sim_rs.StrategyStats"] = field(default_factory=dict)
+    edge_breakdown: dict[str, "amm_sim_rs.EdgeBreakdown"] = field(default_factory=dict)
+    # "exact" unless afterSwap calls were throttled for screening
+    fee_updates: str = "exact"
 
 
 @dataclass
@@ -58,11 +56,23 @@ class MatchResult:
     wins_a: int
     wins_b: int
     draws: int
+    # Decimal(str(...)) of the batch summary's compensated float totals.
+    # These are no longer exact sums of the per-simulation values, so they
+    # can differ from older releases in the last digits.
     total_pnl_a: Decimal
     total_pnl_b: Decimal
     total_edge_a: Decimal
     total_edge_b: Decimal
     simulation_results: list[LightweightSimResult] = field(default_factory=list)
+    # Summed over simulations, keyed "submission" (a) and "normalizer" (b)
+    edge_breakdown: dict[str, "amm_sim_rs.EdgeBreakdown"] = field(default_factory=dict)
+    timings: Optional["amm_sim_rs.PhaseTimings"] = None
+    # Edge of strategy_a in each simulation, by seed
+    edge_by_seed: dict[int, float] = field(default_factory=dict)
+    # Edge and PnL statistics (standard errors, quantiles, paired difference)
+    summary: Optional["amm_sim_rs.BatchSummary"] = None
+    # Set by run_forks; edge_by_seed is then keyed by continuation seed
+    fork_step: Optional[int] = None
 
     @property
     def winner(self) -> Optional[str]:
@@ -76,6 +86,109 @@ class MatchResult:
     def total_games(self) -> int:
         return self.wins_a + self.wins_b + self.draws
 
+    def paired_edge_diff(self, other: "MatchResult") -> tuple[float, float]:
+        """Mean and standard error of strategy_a's edge minus `other`'s, per seed.
+
+        Only seeds both matches ran are compared. Matches from `run_matches`
+        share every seed's market, so the difference is strategy against
+        strategy rather than market against market.
+        """
+        seeds = sorted(self.edge_by_seed.keys() & other.edge_by_seed.keys())
+        diffs = [self.edge_by_seed[seed] - other.edge_by_seed[seed] for seed in seeds]
+        mean = statistics.fmean(diffs) if diffs else math.nan
+        stderr = statistics.stdev(diffs) / math.sqrt(len(diffs)) if len(diffs) > 1 else math.nan
+        return mean, stderr
+
+
+@dataclass
+class MarketResult:
+    """Result of several strategies competing in one market.
+
+    Results are keyed by position: "submission_0", "submission_1", ... in
+    the order the strategies were given, then "normalizer".
+    """
+    strategy_names: dict[str, str]
+    wins: dict[str, int]
+    # Float totals from the batch summary, as in MatchResult
+    total_pnl: dict[str, Decimal]
+    total_edge: dict[str, Decimal]
+    simulation_results: list[LightweightSimResult] = field(default_factory=list)
+    edge_breakdown: dict[str, "amm_sim_rs.EdgeBreakdown"] = field(default_factory=dict)
+    timings: Optional["amm_sim_rs.PhaseTimings"] = None
+    summary: Optional["amm_sim_rs.BatchSummary"] = None
+
+    @property
+    def ranking(self) -> list[str]:
+        """Keys ordered by total edge, best first."""
+        return sorted(self.total_edge, key=self.total_edge.__getitem__, reverse=True)
+
+
+@dataclass
+class ScreeningResult:
+    """Approximate match result from a screening run, with its measured bias.
+
+    `match` comes from simulations with throttled afterSwap calls, so its
+    edges are approximate and not comparable to scored results. The first
+    simulations were also run exactly; `bias` is the mean per-simulation
+    difference (screening - exact) in strategy_a's edge over them.
+    """
+    match: MatchResult
+    fee_updates: str
+    calibration_seeds: list[int]
+    bias: float
+    bias_stderr: float
+
+    @property
+    def mean_edge(self) -> float:
+        """Screening mean edge of strategy_a per simulation."""
+        return float(self.match.total_edge_a) / self.match.total_games
+
+    @property
+    def corrected_edge(self) -> float:
+        """Mean edge of strategy_a per simulation with the bias removed."""
+        return self.mean_edge - self.bias
+
+
+@dataclass
+class BatchProgress:
+    """Progress of a running match, passed to `run_match`'s callback."""
+    completed: int
+    total: int
+    # Mean edge of strategy_a over the simulations completed so far
+    mean_edge: float
+    # Seconds since the batch started
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Simulations completed per second."""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float:
+        """Estimated seconds until the batch finishes."""
+        rate = self.rate
+        return (self.total - self.completed) / rate if rate > 0 else math.inf
+
+
+def _streamed_results(
+    stream: "amm_sim_rs.BatchStream",
+    progress: Optional[Callable[[BatchProgress], None]],
+) -> Iterator["amm_sim_rs.LightweightSimResult"]:
+    """Yield the results of a stream, reporting progress after each one."""
+    started = time.perf_counter()
+    for _, rust_result in stream:
+        yield rust_result
+        if progress is not None:
+            progress(
+                BatchProgress(
+                    completed=stream.completed,
+                    total=len(stream),
+                    mean_edge=stream.mean_edge("submission"),
+                    elapsed=time.perf_counter() - started,
+                )
+            )
+
 
 # Re-export SimulationConfig from Rust for compatibility
 SimulationConfig = amm_sim_rs.SimulationConfig
@@ -91,141 +204,400 @@ class MatchRunner:
         config: SimulationConfig,
         n_workers: int,
         variance: HyperparameterVariance,
+        native_normalizer: bool = True,
+        backend: str = "revm",
+        timings: bool = False,
     ):
         self.n_simulations = n_simulations
         self.base_config = config
         self.n_workers = n_workers
         self.variance = variance
-
-    def _build_configs(self) -> list[amm_sim_rs.SimulationConfig]:
+        # Answer a vanilla strategy_b natively instead of through the EVM
+        self.native_normalizer = native_normalizer
+        # "revm", "direct" (revm's interpreter without the tx pipeline) or
+        # "compiled" (direct, with strategy bytecode compiled to native code)
+        self.backend = backend
+        # Record per-phase wall time in the Rust engine
+        self.timings = timings
+
+    def _build_configs(self, capture: str = "full") -> list[amm_sim_rs.SimulationConfig]:
         """Build simulation configs with optional variance."""
+        return [self._build_config(i, capture) for i in range(self.n_simulations)]
+
+    def _build_config(self, seed: int, capture: str = "full") -> amm_sim_rs.SimulationConfig:
+        """Build the config of simulation `seed`, with its hyperparameter draw."""
         import numpy as np
 
-        configs = []
-        for i in range(self.n_simulations):
-            rng = np.random.default_rng(seed=i)
+        rng = np.random.default_rng(seed=seed)
 
-            retail_mean_size = (
-                rng.uniform(self.variance.retail_mean_size_min, self.variance.retail_mean_size_max)
-                if self.variance.vary_retail_mean_size
-                else self.base_config.retail_mean_size
-            )
-            retail_arrival_rate = (
-                rng.uniform(self.variance.retail_arrival_rate_min, self.variance.retail_arrival_rate_max)
-                if self.variance.vary_retail_arrival_rate
-                else self.base_config.retail_arrival_rate
-            )
-            gbm_sigma = (
-                rng.uniform(self.variance.gbm_sigma_min, self.variance.gbm_sigma_max)
-                if self.variance.vary_gbm_sigma
-                else self.base_config.gbm_sigma
-            )
+        retail_mean_size = (
+            rng.uniform(self.variance.retail_mean_size_min, self.variance.retail_mean_size_max)
+            if self.variance.vary_retail_mean_size
+            else self.base_config.retail_mean_size
+        )
+        retail_arrival_rate = (
+            rng.uniform(self.variance.retail_arrival_rate_min, self.variance.retail_arrival_rate_max)
+            if self.variance.vary_retail_arrival_rate
+            else self.base_config.retail_arrival_rate
+        )
+        gbm_sigma = (
+            rng.uniform(self.variance.gbm_sigma_min, self.variance.gbm_sigma_max)
+            if self.variance.vary_gbm_sigma
+            else self.base_config.gbm_sigma
+        )
 
-            cfg = amm_sim_rs.SimulationConfig(
-                n_steps=self.base_config.n_steps,
-                initial_price=self.base_config.initial_price,
-                initial_x=self.base_config.initial_x,
-                initial_y=self.base_config.initial_y,
-                gbm_mu=self.base_config.gbm_mu,
-                gbm_sigma=gbm_sigma,
-                gbm_dt=self.base_config.gbm_dt,
-                retail_arrival_rate=retail_arrival_rate,
-                retail_mean_size=retail_mean_size,
-                retail_size_sigma=self.base_config.retail_size_sigma,
-                retail_buy_prob=self.base_config.retail_buy_prob,
-                seed=i,
-            )
-            configs.append(cfg)
-        return configs
+        return amm_sim_rs.SimulationConfig(
+            n_steps=self.base_config.n_steps,
+            initial_price=self.base_config.initial_price,
+            initial_x=self.base_config.initial_x,
+            initial_y=self.base_config.initial_y,
+            gbm_mu=self.base_config.gbm_mu,
+            gbm_sigma=gbm_sigma,
+            gbm_dt=self.base_config.gbm_dt,
+            retail_arrival_rate=retail_arrival_rate,
+            retail_mean_size=retail_mean_size,
+            retail_size_sigma=self.base_config.retail_size_sigma,
+            retail_buy_prob=self.base_config.retail_buy_prob,
+            seed=seed,
+            capture=capture,
+            timings=self.timings,
+        )
+
+    def _baseline_fee_bps(self, strategy_b: EVMStrategyAdapter) -> Optional[int]:
+        """Fixed fee to answer strategy_b with natively, if it is the vanilla normalizer."""
+        # The vanilla normalizer always quotes a fixed fee, so skip the EVM for it
+        if self.native_normalizer and is_vanilla_bytecode(strategy_b._bytecode):
+            return VANILLA_FEE_BPS
+        return None
 
     def run_match(
         self,
         strategy_a: EVMStrategyAdapter,
         strategy_b: EVMStrategyAdapter,
         store_results: bool = False,
+        capture: Optional[str] = None,
+        progress: Optional[Callable[[BatchProgress], None]] = None,
     ) -> MatchResult:
-        """Run a complete match between two strategies."""
-        name_a = strategy_a.get_name()
-        name_b = strategy_b.get_name()
+        """Run a complete match between two strategies.
+
+        `capture` selects the steps kept per simulation ("full", "none",
+        "every:N" or "last:K"). By default every step is kept when
+        `store_results` is set and none otherwise.
+
+        Wins and totals come from the batch summary computed in Rust. Unless
+        results are stored or `progress` is given, no per-simulation results
+        are returned at all; otherwise they are streamed as they finish, so
+        only the stored ones are held in memory. `progress`, if given, is
+        called after each simulation.
+        """
+        if capture is None:
+            capture = "full" if store_results else "none"
 
         # Build configs
-        configs = self._build_configs()
+        configs = self._build_configs(capture)
 
         # Run simulations in Rust
-        batch_result = amm_sim_rs.run_batch(
+        if not store_results and progress is None:
+            batch_result = self._run_batch(strategy_a, strategy_b, configs, summary_only=True)
+            return self._match_result(strategy_a, strategy_b, batch_result)
+
+        stream = amm_sim_rs.stream_batch(
             list(strategy_a._bytecode),
             list(strategy_b._bytecode),
             configs,
             self.n_workers,
+            baseline_fee_bps=self._baseline_fee_bps(strategy_b),
+            backend=self.backend,
         )
-
-        # Process results
-        wins_a = 0
-        wins_b = 0
-        draws = 0
-        total_pnl_a = Decimal("0")
-        total_pnl_b = Decimal("0")
-        total_edge_a = Decimal("0")
-        total_edge_b = Decimal("0")
         simulation_results = []
+        for rust_result in _streamed_results(stream, progress):
+            if store_results:
+                simulation_results.append(self._sim_result(rust_result))
+        return self._match_result(strategy_a, strategy_b, stream, simulation_results)
 
-        for rust_result in batch_result.results:
-            # Get PnL values using fixed positional keys from Rust
-            pnl_a = rust_result.pnl.get("submission", 0.0)
-            pnl_b = rust_result.pnl.get("normalizer", 0.0)
-            edge_a = rust_result.edges.get("submission", 0.0)
-            edge_b = rust_result.edges.get("normalizer", 0.0)
-
-            total_pnl_a += Decimal(str(pnl_a))
-            total_pnl_b += Decimal(str(pnl_b))
-            total_edge_a += Decimal(str(edge_a))
-            total_edge_b += Decimal(str(edge_b))
-
-            if edge_a > edge_b:
-                wins_a += 1
-            elif edge_b > edge_a:
-                wins_b += 1
-            else:
-                draws += 1
+    def run_matches(
+        self,
+        strategies: Sequence[EVMStrategyAdapter],
+        strategy_b: EVMStrategyAdapter,
+        store_results: bool = False,
+        capture: Optional[str] = None,
+    ) -> list[MatchResult]:
+        """Run a match of each of `strategies` against `strategy_b` in one batch.
+
+        Every seed's market is drawn once and each strategy is run against
+        `strategy_b` on it, so the matches pair up by seed (see
+        `MatchResult.paired_edge_diff`). Each result is the one `run_match`
+        gives for that strategy; `store_results` and `capture` are as there.
+        """
+        if capture is None:
+            capture = "full" if store_results else "none"
+
+        batch_results = amm_sim_rs.run_batches(
+            [list(strategy._bytecode) for strategy in strategies],
+            list(strategy_b._bytecode),
+            self._build_configs(capture),
+            self.n_workers,
+            baseline_fee_bps=self._baseline_fee_bps(strategy_b),
+            backend=self.backend,
+            summary_only=not store_results,
+        )
+        return [
+            self._match_result(
+                strategy_a,
+                strategy_b,
+                batch_result,
+                [self._sim_result(r) for r in batch_result.results],
+            )
+            for strategy_a, batch_result in zip(strategies, batch_results)
+        ]
 
-            if store_results:
-                # Convert Rust result to Python dataclass
-                steps = [
-                    LightweightStepResult(
-                        timestamp=s.timestamp,
-                        fair_price=s.fair_price,
-                        spot_prices=s.spot_prices,
-                        pnls=s.pnls,
-                        fees=s.fees,
-                    )
-                    for s in rust_result.steps
-                ]
-
-                sim_result = LightweightSimResult(
-                    seed=rust_result.seed,
-                    strategies=rust_result.strategies,
-                    pnl={k: Decimal(str(v)) for k, v in rust_result.pnl.items()},
-                    edges={
-                        k: Decimal(str(v)) for k, v in rust_result.edges.items()
-                    },
-                    initial_fair_price=rust_result.initial_fair_price,
-                    initial_reserves=rust_result.initial_reserves,
-                    steps=steps,
-                    arb_volume_y=rust_result.arb_volume_y,
-                    retail_volume_y=rust_result.retail_volume_y,
-                    average_fees=rust_result.average_fees,
-                )
-                simulation_results.append(sim_result)
+    def screen(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        fee_updates: str = "per_step",
+        n_calibration: int = 10,
+    ) -> ScreeningResult:
+        """Estimate a match quickly with throttled afterSwap calls.
+
+        Runs all simulations with `fee_updates` ("every:N" or "per_step"),
+        then the first `n_calibration` of them exactly to measure how far
+        off the screening edge is. Meant for pruning candidate variants;
+        score the survivors with `run_match`.
+        """
+        configs = self._build_configs("none")
+        for config in configs:
+            config.fee_updates = fee_updates
+        screening = self._match_result(
+            strategy_a,
+            strategy_b,
+            self._run_batch(strategy_a, strategy_b, configs, summary_only=True),
+        )
+
+        seeds = list(range(min(n_calibration, self.n_simulations)))
+        exact = self._run_batch(
+            strategy_a,
+            strategy_b,
+            [self._build_config(seed, "none") for seed in seeds],
+            summary_only=True,
+        )
+        exact_edges = exact.summary.edge_by_seed("submission") if seeds else {}
+        diffs = [screening.edge_by_seed[seed] - exact_edges[seed] for seed in seeds]
+
+        return ScreeningResult(
+            match=screening,
+            fee_updates=fee_updates,
+            calibration_seeds=seeds,
+            bias=statistics.fmean(diffs) if diffs else math.nan,
+            bias_stderr=(
+                statistics.stdev(diffs) / math.sqrt(len(diffs)) if len(diffs) > 1 else math.nan
+            ),
+        )
+
+    def _run_batch(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        configs: list[amm_sim_rs.SimulationConfig],
+        summary_only: bool = False,
+    ) -> "amm_sim_rs.BatchSimulationResult":
+        """Run `configs` in the Rust engine with this runner's settings."""
+        return amm_sim_rs.run_batch(
+            list(strategy_a._bytecode),
+            list(strategy_b._bytecode),
+            configs,
+            self.n_workers,
+            baseline_fee_bps=self._baseline_fee_bps(strategy_b),
+            backend=self.backend,
+            summary_only=summary_only,
+        )
+
+    def replay(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        seed: int,
+        trace_level: str = "trades",
+    ) -> LightweightSimResult:
+        """Re-run simulation `seed` of `run_match` with full tracing.
+
+        The result is identical to that simulation's, plus every step and,
+        with trace_level="trades", every trade (`result.trace.trades()`).
+        """
+        rust_result = amm_sim_rs.replay(
+            list(strategy_a._bytecode),
+            list(strategy_b._bytecode),
+            self._build_config(seed, "full"),
+            trace_level=trace_level,
+            baseline_fee_bps=self._baseline_fee_bps(strategy_b),
+            backend=self.backend,
+        )
+        return self._sim_result(rust_result)
+
+    def rerun_extremes(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        result: MatchResult,
+        n: int = 5,
+        worst: bool = True,
+        trace_level: str = "trades",
+    ) -> list[LightweightSimResult]:
+        """Replay the `n` simulations of a `run_match` result with the lowest
+        (or, with worst=False, highest) edge for strategy_a, in that order.
+
+        Lets a bulk run keep no traces and still give full detail on its
+        outliers. Results of `run_forks` are rejected: their seeds are
+        continuation seeds, which `replay` would run as whole simulations.
+        """
+        if result.fork_step is not None:
+            raise ValueError("rerun_extremes cannot replay the continuations of run_forks")
+        seeds = sorted(
+            result.edge_by_seed, key=result.edge_by_seed.__getitem__, reverse=not worst
+        )[:n]
+        return [
+            self.replay(strategy_a, strategy_b, seed, trace_level=trace_level)
+            for seed in seeds
+        ]
+
+    def run_forks(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        fork_step: int,
+        seeds: Sequence[int],
+        seed: int = 0,
+        store_results: bool = False,
+        capture: Optional[str] = None,
+    ) -> MatchResult:
+        """Score alternative futures of one simulation.
+
+        Simulation `seed` runs once up to `fork_step`; it is then continued
+        once per entry of `seeds`, each with its own price path and retail
+        flow from that point on. Wins and totals count the continuations.
+        Seeds must be distinct, as results are keyed by seed.
+        """
+        if capture is None:
+            capture = "full" if store_results else "none"
+
+        batch_result = amm_sim_rs.run_forks(
+            list(strategy_a._bytecode),
+            list(strategy_b._bytecode),
+            self._build_config(seed, capture),
+            fork_step,
+            list(seeds),
+            self.n_workers,
+            baseline_fee_bps=self._baseline_fee_bps(strategy_b),
+            backend=self.backend,
+        )
+        simulation_results = (
+            [self._sim_result(r) for r in batch_result.results] if store_results else []
+        )
+        return self._match_result(
+            strategy_a, strategy_b, batch_result, simulation_results, fork_step=fork_step
+        )
+
+    def run_market(
+        self,
+        strategies: Sequence[EVMStrategyAdapter],
+        normalizer: EVMStrategyAdapter,
+        store_results: bool = False,
+        capture: Optional[str] = None,
+    ) -> MarketResult:
+        """Run all strategies and the normalizer in one market per simulation.
+
+        Retail flow is split across every AMM at once, so submissions compete
+        with each other as well as with the normalizer. A simulation is won
+        by the strategy with the highest edge; ties are won by nobody.
+        """
+        if capture is None:
+            capture = "full" if store_results else "none"
+
+        keys = [f"submission_{i}" for i in range(len(strategies))]
+        batch_result = amm_sim_rs.run_market(
+            [(key, list(strategy._bytecode)) for key, strategy in zip(keys, strategies)],
+            list(normalizer._bytecode),
+            self._build_configs(capture),
+            self.n_workers,
+            baseline_fee_bps=self._baseline_fee_bps(normalizer),
+            backend=self.backend,
+            summary_only=not store_results,
+        )
+
+        keys.append("normalizer")
+        names = [strategy.get_name() for strategy in strategies] + [normalizer.get_name()]
+        summary = batch_result.summary
+        wins = summary.wins
+        total_pnl = summary.total_pnl
+        total_edge = summary.total_edge
+
+        return MarketResult(
+            strategy_names=dict(zip(keys, names)),
+            wins={key: wins.get(key, 0) for key in keys},
+            total_pnl={key: Decimal(str(total_pnl.get(key, 0.0))) for key in keys},
+            total_edge={key: Decimal(str(total_edge.get(key, 0.0))) for key in keys},
+            simulation_results=[self._sim_result(r) for r in batch_result.results],
+            edge_breakdown=batch_result.edge_breakdown,
+            timings=batch_result.timings,
+            summary=summary,
+        )
+
+    def _match_result(
+        self,
+        strategy_a: EVMStrategyAdapter,
+        strategy_b: EVMStrategyAdapter,
+        batch: "amm_sim_rs.BatchSimulationResult | amm_sim_rs.BatchStream",
+        simulation_results: Sequence[LightweightSimResult] = (),
+        fork_step: Optional[int] = None,
+    ) -> MatchResult:
+        """Build a MatchResult from a finished batch or stream.
+
+        Wins and totals come from the batch's Rust-side summary, keyed
+        "submission" (a) and "normalizer" (b).
+        """
+        summary = batch.summary
+        wins = summary.wins
+        total_pnl = summary.total_pnl
+        total_edge = summary.total_edge
+        edge_by_seed = summary.edge_by_seed("submission") if summary.n_simulations else {}
 
         return MatchResult(
-            strategy_a=name_a,
-            strategy_b=name_b,
-            wins_a=wins_a,
-            wins_b=wins_b,
-            draws=draws,
-            total_pnl_a=total_pnl_a,
-            total_pnl_b=total_pnl_b,
-            total_edge_a=total_edge_a,
-            total_edge_b=total_edge_b,
-            simulation_results=simulation_results,
+            strategy_a=strategy_a.get_name(),
+            strategy_b=strategy_b.get_name(),
+            wins_a=wins.get("submission", 0),
+            wins_b=wins.get("normalizer", 0),
+            draws=summary.draws,
+            total_pnl_a=Decimal(str(total_pnl.get("submission", 0.0))),
+            total_pnl_b=Decimal(str(total_pnl.get("normalizer", 0.0))),
+            total_edge_a=Decimal(str(total_edge.get("submission", 0.0))),
+            total_edge_b=Decimal(str(total_edge.get("normalizer", 0.0))),
+            simulation_results=sorted(simulation_results, key=lambda result: result.seed),
+            edge_breakdown=batch.edge_breakdown,
+            timings=batch.timings,
+            edge_by_seed=dict(sorted(edge_by_seed.items())),
+            summary=summary,
+            fork_step=fork_step,
+        )
+
+    @staticmethod
+    def _sim_result(rust_result: "amm_sim_rs.LightweightSimResult") -> LightweightSimResult:
+        """Convert a Rust result to the Python dataclass.
+
+        The step trace is kept as-is and read through numpy.asarray on its
+        columns.
+        """
+        return LightweightSimResult(
+            seed=rust_result.seed,
+            strategies=rust_result.strategies,
+            pnl={k: Decimal(str(v)) for k, v in rust_result.pnl.items()},
+            edges={k: Decimal(str(v)) for k, v in rust_result.edges.items()},
+            initial_fair_price=rust_result.initial_fair_price,
+            initial_reserves=rust_result.initial_reserves,
+            trace=rust_result.trace,
+            arb_volume_y=rust_result.arb_volume_y,
+            retail_volume_y=rust_result.retail_volume_y,
+            average_fees=rust_result.average_fees,
+            strategy_stats=rust_result.strategy_stats,
+            edge_breakdown=rust_result.edge_breakdown,
+            fee_updates=rust_result.fee_updates,
         )
@@ -6,6 +6,9 @@ from typing import Optional, Tuple
 from amm_competition.evm.adapter import EVMStrategyAdapter
 from amm_competition.evm.compiler import SolidityCompiler
 
+# Fee charged on both sides by VanillaStrategy.sol, in basis points
+VANILLA_FEE_BPS = 30
+
 _CACHED_BYTECODE: Optional[bytes] = None
 _CACHED_ABI: Optional[list] = None
 
@@ -32,6 +35,23 @@ def get_vanilla_bytecode_and_abi() -> Tuple[bytes, list]:
     return _CACHED_BYTECODE, _CACHED_ABI
 
 
+def is_vanilla_bytecode(bytecode: bytes) -> bool:
+    """Check whether bytecode is the compiled VanillaStrategy.
+
+    The Rust engine can answer the normalizer natively with a fixed
+    VANILLA_FEE_BPS fee, but only when the bytecode really is the vanilla
+    strategy.
+
+    Args:
+        bytecode: Deployment bytecode to check.
+
+    Returns:
+        True if bytecode matches the compiled VanillaStrategy.sol.
+    """
+    vanilla_bytecode, _ = get_vanilla_bytecode_and_abi()
+    return bytes(bytecode) == vanilla_bytecode
+
+
 def load_vanilla_strategy() -> EVMStrategyAdapter:
     """Load the default 30bps strategy used as the normalizer AMM.
 
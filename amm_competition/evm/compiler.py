@@ -16,6 +16,10 @@ class CompilationResult:
     abi: Optional[list] = None
     errors: Optional[list[str]] = None
     warnings: Optional[list[str]] = None
+    # solc source map for deployed_bytecode (one entry per instruction)
+    deployed_source_map: Optional[str] = None
+    # Source id (as used in the source map) -> (file name, contents)
+    source_files: Optional[dict[int, tuple[str, str]]] = None
 
 
 class SolidityCompiler:
@@ -106,6 +110,7 @@ class SolidityCompiler:
                                 "abi",
                                 "evm.bytecode.object",
                                 "evm.deployedBytecode.object",
+                                "evm.deployedBytecode.sourceMap",
                                 "storageLayout",
                             ],
                         },
@@ -207,12 +212,20 @@ class SolidityCompiler:
                     warnings=warnings,
                 )
 
+            source_files = {
+                info["id"]: (name, sources[name]["content"])
+                for name, info in output.get("sources", {}).items()
+                if name in sources and "id" in info
+            }
+
             return CompilationResult(
                 success=True,
                 bytecode=creation_bytecode,
                 deployed_bytecode=deployed_bytecode or None,
                 abi=abi,
                 warnings=warnings,
+                deployed_source_map=evm.get("deployedBytecode", {}).get("sourceMap") or None,
+                source_files=source_files,
             )
 
         except solcx.exceptions.SolcError as e:
@@ -65,6 +65,8 @@ class EVMStrategyExecutor:
         self.abi = abi
         self.evm: Optional[EVM] = None
         self.deployed_address: Optional[str] = None
+        # Whether the last strategy call ran, i.e. whether evm.result belongs to it
+        self._call_executed = False
 
         # Pre-allocated calldata buffer for after_swap (reused across calls)
         self._trade_calldata = bytearray(196)
@@ -108,6 +110,38 @@ class EVMStrategyExecutor:
         """Convert a WAD value to Decimal."""
         return Decimal(value) / Decimal(self.WAD)
 
+    def _message_call(self, calldata: bytes, gas: int) -> bytes:
+        """Call the deployed strategy and return its output.
+
+        Raises RuntimeError if the call reverts, halts or cannot be executed.
+        """
+        self._call_executed = False
+        try:
+            output = self.evm.message_call(
+                caller=self.CALLER_ADDRESS,
+                to=self.deployed_address,
+                calldata=calldata,
+                value=0,
+                gas=gas,
+            )
+        except RuntimeError as e:
+            # pyrevm stores the result of reverted and halted calls before
+            # raising; other errors happen before execution and leave
+            # evm.result holding the previous transaction.
+            self._call_executed = str(e).startswith(("Revert", "Halt"))
+            raise
+        self._call_executed = True
+        return output
+
+    def _last_gas_used(self) -> int:
+        """Gas used by the last strategy call, as reported by revm.
+
+        Returns 0 if that call failed before execution.
+        """
+        if not self._call_executed:
+            return 0
+        return self.evm.result.gas_used
+
     def after_initialize(self, initial_x: Decimal, initial_y: Decimal) -> EVMExecutionResult:
         """Call the strategy's afterInitialize function.
 
@@ -129,20 +163,14 @@ class EVMStrategyExecutor:
 
         try:
             # Execute with gas limit
-            result = self.evm.message_call(
-                caller=self.CALLER_ADDRESS,
-                to=self.deployed_address,
-                calldata=calldata,
-                value=0,
-                gas=self.GAS_LIMIT_INIT,
-            )
+            result = self._message_call(calldata, self.GAS_LIMIT_INIT)
 
             # Decode return data: (uint256 bidFee, uint256 askFee)
             if len(result) < 64:
                 return EVMExecutionResult(
                     bid_fee=Decimal(0),
                     ask_fee=Decimal(0),
-                    gas_used=self.GAS_LIMIT_INIT,
+                    gas_used=self._last_gas_used(),
                     success=False,
                     error=f"Invalid return data length: {len(result)}",
                 )
@@ -150,14 +178,10 @@ class EVMStrategyExecutor:
             bid_fee_wad = self._decode_uint256(result, 0)
             ask_fee_wad = self._decode_uint256(result, 32)
 
-            # Calculate gas used (pyrevm doesn't directly report this,
-            # so we estimate based on successful execution)
-            gas_used = self.GAS_LIMIT_INIT // 2  # Rough estimate
-
             return EVMExecutionResult(
                 bid_fee=self._wad_to_decimal(bid_fee_wad),
                 ask_fee=self._wad_to_decimal(ask_fee_wad),
-                gas_used=gas_used,
+                gas_used=self._last_gas_used(),
                 success=True,
             )
 
@@ -165,7 +189,7 @@ class EVMStrategyExecutor:
             return EVMExecutionResult(
                 bid_fee=Decimal(0),
                 ask_fee=Decimal(0),
-                gas_used=self.GAS_LIMIT_INIT,
+                gas_used=self._last_gas_used(),
                 success=False,
                 error=str(e),
             )
@@ -208,13 +232,7 @@ class EVMStrategyExecutor:
         calldata[164:196] = val.to_bytes(32, 'big')
 
         try:
-            result = self.evm.message_call(
-                caller=self.CALLER_ADDRESS,
-                to=self.deployed_address,
-                calldata=bytes(calldata),
-                value=0,
-                gas=self.GAS_LIMIT_TRADE,
-            )
+            result = self._message_call(bytes(calldata), self.GAS_LIMIT_TRADE)
 
             if len(result) < 64:
                 raise RuntimeError(f"Invalid return data length: {len(result)}")
@@ -235,14 +253,14 @@ class EVMStrategyExecutor:
             return EVMExecutionResult(
                 bid_fee=Decimal(bid_wad) / _WAD_DECIMAL,
                 ask_fee=Decimal(ask_wad) / _WAD_DECIMAL,
-                gas_used=self.GAS_LIMIT_TRADE // 2,
+                gas_used=self._last_gas_used(),
                 success=True,
             )
         except Exception as e:
             return EVMExecutionResult(
                 bid_fee=Decimal(0),
                 ask_fee=Decimal(0),
-                gas_used=self.GAS_LIMIT_TRADE,
+                gas_used=self._last_gas_used(),
                 success=False,
                 error=str(e),
             )
@@ -0,0 +1,119 @@
+"""Probe a strategy's fee response to hypothetical trades."""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+import amm_sim_rs
+
+# (is_buy, amount_x, amount_y, timestamp, reserve_x, reserve_y), the
+# TradeInfo fields in the order amm_sim_rs.probe expects
+ProbeTrade = tuple[bool, float, float, int, float, float]
+
+
+def hypothetical_trade(
+    reserve_x: float,
+    reserve_y: float,
+    size_y: float,
+    is_buy: bool,
+    timestamp: int = 0,
+) -> ProbeTrade:
+    """Build a trade worth `size_y` of Y against constant-product reserves.
+
+    is_buy follows TradeInfo: True means the AMM buys X (the trader sells X
+    and receives `size_y` of Y). Fees are ignored, so the post-trade
+    reserves stay on the x * y = k curve.
+    """
+    k = reserve_x * reserve_y
+    if is_buy:
+        if size_y >= reserve_y:
+            raise ValueError(f"size_y {size_y} exceeds the Y reserve {reserve_y}")
+        new_y = reserve_y - size_y
+        new_x = k / new_y
+        return (True, new_x - reserve_x, size_y, timestamp, new_x, new_y)
+
+    new_y = reserve_y + size_y
+    new_x = k / new_y
+    return (False, reserve_x - new_x, size_y, timestamp, new_x, new_y)
+
+
+def probe(
+    bytecode: bytes,
+    initial_x: float,
+    initial_y: float,
+    trades: Sequence[ProbeTrade],
+    warmup: Optional[Sequence[ProbeTrade]] = None,
+    backend: str = "revm",
+    n_workers: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (bid, ask) fees the strategy quotes after each trade.
+
+    Every trade is evaluated from the same state: deployed, initialized
+    with (initial_x, initial_y), then fed the `warmup` trades. Failed calls
+    give NaN. Trades are spread over `n_workers` threads (0 = every CPU).
+    """
+    result = amm_sim_rs.probe(
+        list(bytecode),
+        initial_x,
+        initial_y,
+        list(trades),
+        warmup=list(warmup) if warmup else None,
+        n_workers=n_workers,
+        backend=backend,
+    )
+    return np.asarray(result.bid_fees), np.asarray(result.ask_fees)
+
+
+@dataclass
+class FeeSurface:
+    """Fees quoted after a buy and a sell of each size (all in WAD fractions)."""
+
+    sizes: np.ndarray
+    buy_bid: np.ndarray
+    buy_ask: np.ndarray
+    sell_bid: np.ndarray
+    sell_ask: np.ndarray
+
+    @property
+    def failures(self) -> int:
+        return int(
+            sum(np.isnan(fees).sum() for fees in (self.buy_bid, self.sell_bid))
+        )
+
+
+def fee_surface(
+    bytecode: bytes,
+    initial_x: float,
+    initial_y: float,
+    sizes: Sequence[float],
+    warmup: Optional[Sequence[ProbeTrade]] = None,
+    timestamp: int = 1,
+    backend: str = "revm",
+    n_workers: int = 0,
+) -> FeeSurface:
+    """Probe buys and sells of each size (in Y) against the initial reserves."""
+    sizes = np.asarray(sizes, dtype=float)
+    trades = [
+        hypothetical_trade(initial_x, initial_y, float(size), is_buy, timestamp)
+        for is_buy in (True, False)
+        for size in sizes
+    ]
+    bid, ask = probe(
+        bytecode,
+        initial_x,
+        initial_y,
+        trades,
+        warmup=warmup,
+        backend=backend,
+        n_workers=n_workers,
+    )
+
+    n = len(sizes)
+    return FeeSurface(
+        sizes=sizes,
+        buy_bid=bid[:n],
+        buy_ask=ask[:n],
+        sell_bid=bid[n:],
+        sell_ask=ask[n:],
+    )
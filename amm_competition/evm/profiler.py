@@ -0,0 +1,192 @@
+"""Map amm_sim_rs opcode profiles back to Solidity source lines."""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Optional
+
+import amm_sim_rs
+
+from amm_competition.evm.compiler import CompilationResult
+
+
+@dataclass(frozen=True)
+class SourceMapEntry:
+    """One decoded solc source map entry (one per instruction)."""
+
+    start: int
+    length: int
+    file_index: int
+    jump: str
+
+
+@dataclass
+class LineCost:
+    """Execution cost attributed to one source line."""
+
+    file: str
+    line: int
+    text: str
+    executions: int = 0
+    gas: int = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.file}:{self.line}"
+
+
+@dataclass
+class ProfileReport:
+    """Opcode and source-line profile of a strategy's afterSwap calls."""
+
+    name: str
+    calls: int
+    gas_total: int
+    opcodes: list[tuple[str, int, int]]
+    lines: list[LineCost]
+    sloads_per_call: float
+    sstores_per_call: float
+    sload_max: int
+    sstore_max: int
+    unmapped_gas: int = 0
+    # (frames, gas) pairs for flamegraph export
+    stacks: list[tuple[tuple[str, ...], int]] = field(default_factory=list)
+
+    @property
+    def gas_per_call(self) -> float:
+        return self.gas_total / self.calls if self.calls else 0.0
+
+    def to_folded(self) -> str:
+        """Render as folded stacks ("frame;frame weight"), loadable by
+        flamegraph.pl, inferno and speedscope. Weights are gas."""
+        lines = []
+        for frames, gas in self.stacks:
+            if gas > 0:
+                lines.append(";".join(f.replace(";", ",") for f in frames) + f" {gas}")
+        return "\n".join(lines) + "\n"
+
+
+def decode_source_map(source_map: str) -> list[SourceMapEntry]:
+    """Decode a compressed solc source map.
+
+    Entries are "s:l:f:j:m" separated by ";"; empty fields repeat the
+    previous entry's value.
+    """
+    entries: list[SourceMapEntry] = []
+    start, length, file_index, jump = 0, 0, -1, "-"
+    for item in source_map.split(";"):
+        fields = item.split(":")
+        if len(fields) > 0 and fields[0]:
+            start = int(fields[0])
+        if len(fields) > 1 and fields[1]:
+            length = int(fields[1])
+        if len(fields) > 2 and fields[2]:
+            file_index = int(fields[2])
+        if len(fields) > 3 and fields[3]:
+            jump = fields[3]
+        entries.append(SourceMapEntry(start, length, file_index, jump))
+    return entries
+
+
+def instruction_offsets(bytecode: bytes) -> dict[int, int]:
+    """Map each instruction's program counter to its instruction index."""
+    offsets: dict[int, int] = {}
+    pc = 0
+    index = 0
+    while pc < len(bytecode):
+        offsets[pc] = index
+        op = bytecode[pc]
+        # PUSH1..PUSH32 carry immediate bytes
+        pc += 1 + (op - 0x5F if 0x60 <= op <= 0x7F else 0)
+        index += 1
+    return offsets
+
+
+class SourceMapper:
+    """Resolve program counters of deployed bytecode to source lines."""
+
+    def __init__(
+        self,
+        deployed_bytecode: bytes,
+        source_map: str,
+        source_files: dict[int, tuple[str, str]],
+    ):
+        self._offsets = instruction_offsets(deployed_bytecode)
+        self._entries = decode_source_map(source_map)
+        self._files = source_files
+        self._line_starts = {
+            index: [0] + [i + 1 for i, ch in enumerate(content) if ch == "\n"]
+            for index, (_, content) in source_files.items()
+        }
+
+    def location(self, pc: int) -> Optional[tuple[str, int, str]]:
+        """Return (file, line, line text) for pc, or None if unmapped.
+
+        Compiler-generated code (file index -1 or a generated Yul source)
+        has no user-visible line.
+        """
+        index = self._offsets.get(pc)
+        if index is None or index >= len(self._entries):
+            return None
+        entry = self._entries[index]
+        if entry.file_index not in self._files:
+            return None
+
+        name, content = self._files[entry.file_index]
+        starts = self._line_starts[entry.file_index]
+        line_index = bisect_right(starts, entry.start) - 1
+        line_end = starts[line_index + 1] - 1 if line_index + 1 < len(starts) else len(content)
+        text = content[starts[line_index]:line_end].strip()
+        return name, line_index + 1, text
+
+
+def build_report(
+    profile: "amm_sim_rs.StrategyProfile",
+    compilation: CompilationResult,
+) -> ProfileReport:
+    """Combine a Rust opcode profile with the compiler's source map."""
+    opcodes = sorted(
+        (
+            (op, count, profile.opcode_gas.get(op, 0))
+            for op, count in profile.opcode_counts.items()
+        ),
+        key=lambda item: item[2],
+        reverse=True,
+    )
+
+    mapper = None
+    if compilation.deployed_bytecode and compilation.deployed_source_map:
+        mapper = SourceMapper(
+            compilation.deployed_bytecode,
+            compilation.deployed_source_map,
+            compilation.source_files or {},
+        )
+
+    lines: dict[tuple[str, int], LineCost] = {}
+    stacks: dict[tuple[str, ...], int] = {}
+    unmapped_gas = 0
+    for pc, executions, gas in profile.pc_counts:
+        location = mapper.location(pc) if mapper else None
+        if location is None:
+            unmapped_gas += gas
+            frames = (profile.name, "<compiler-generated>")
+        else:
+            file, line, text = location
+            cost = lines.setdefault((file, line), LineCost(file=file, line=line, text=text))
+            cost.executions += executions
+            cost.gas += gas
+            frames = (profile.name, file, f"{file}:{line} {text}")
+        stacks[frames] = stacks.get(frames, 0) + gas
+
+    return ProfileReport(
+        name=profile.name,
+        calls=profile.calls,
+        gas_total=profile.gas_total,
+        opcodes=opcodes,
+        lines=sorted(lines.values(), key=lambda cost: cost.gas, reverse=True),
+        sloads_per_call=profile.sloads_per_call,
+        sstores_per_call=profile.sstores_per_call,
+        sload_max=profile.sload_max,
+        sstore_max=profile.sstore_max,
+        unmapped_gas=unmapped_gas,
+        stacks=sorted(stacks.items(), key=lambda item: item[0]),
+    )
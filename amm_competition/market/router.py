@@ -26,7 +26,8 @@ class OrderRouter:
     the trader and creates fair competition between AMMs based on their fees.
 
     For constant product AMMs (xy=k), the optimal split can be computed
-    analytically rather than using numerical methods.
+    analytically rather than using numerical methods: in closed form for two
+    AMMs and by water-filling for more.
     """
 
     def compute_optimal_split_buy(
@@ -46,6 +47,8 @@ class OrderRouter:
         A_i = sqrt(x_i * γ_i * y_i), r = A_1/A_2
         Δy_1* = (r * (y_2 + γ_2 * Y) - y_1) / (γ_1 + r * γ_2)
 
+        For more AMMs, see `_water_fill`.
+
         Args:
             amms: List of AMMs to split across
             total_y: Total Y amount to spend
@@ -62,17 +65,14 @@ class OrderRouter:
         if len(amms) == 2:
             return self._split_buy_two_amms(amms[0], amms[1], total_y)
 
-        # For >2 AMMs, use iterative pairwise splitting
-        # (This is a simplification - true optimal would require solving simultaneously)
-        remaining = total_y
-        splits = []
-        for i, amm in enumerate(amms[:-1]):
-            # Split between this AMM and "the rest" (approximated by next AMM)
-            pair_split = self._split_buy_two_amms(amm, amms[i + 1], remaining)
-            splits.append(pair_split[0])
-            remaining = pair_split[1][1]
-        splits.append((amms[-1], remaining))
-        return splits
+        # For >2 AMMs, solve for all of them at once; Y is the input token
+        pools = []
+        for amm in amms:
+            x, y = float(amm.reserve_x), float(amm.reserve_y)
+            gamma = 1.0 - float(amm.current_fees.ask_fee)
+            pools.append((math.sqrt(x * gamma * y), y, gamma))
+        amounts = self._water_fill(pools, float(total_y))
+        return [(amm, Decimal(str(amount))) for amm, amount in zip(amms, amounts)]
 
     def _split_buy_two_amms(
         self, amm1: AMM, amm2: AMM, total_y: Decimal
@@ -134,6 +134,8 @@ class OrderRouter:
         B_i = sqrt(y_i * γ_i * x_i), r = B_1/B_2
         Δx_1* = (r * (x_2 + γ_2 * X) - x_1) / (γ_1 + r * γ_2)
 
+        For more AMMs, see `_water_fill`.
+
         Args:
             amms: List of AMMs to split across
             total_x: Total X amount to sell
@@ -150,15 +152,54 @@ class OrderRouter:
         if len(amms) == 2:
             return self._split_sell_two_amms(amms[0], amms[1], total_x)
 
-        # For >2 AMMs, use iterative pairwise splitting
-        remaining = total_x
-        splits = []
-        for i, amm in enumerate(amms[:-1]):
-            pair_split = self._split_sell_two_amms(amm, amms[i + 1], remaining)
-            splits.append(pair_split[0])
-            remaining = pair_split[1][1]
-        splits.append((amms[-1], remaining))
-        return splits
+        # For >2 AMMs, solve for all of them at once; X is the input token
+        pools = []
+        for amm in amms:
+            x, y = float(amm.reserve_x), float(amm.reserve_y)
+            gamma = 1.0 - float(amm.current_fees.bid_fee)
+            pools.append((math.sqrt(y * gamma * x), x, gamma))
+        amounts = self._water_fill(pools, float(total_x))
+        return [(amm, Decimal(str(amount))) for amm, amount in zip(amms, amounts)]
+
+    @staticmethod
+    def _water_fill(
+        pools: list[tuple[float, float, float]], total: float
+    ) -> list[float]:
+        """Split `total` across any number of AMMs at equal marginal prices.
+
+        Each AMM is given as (A_i, r_i, γ_i), with r_i its reserve of the
+        input token and A_i = sqrt(x_i * γ_i * y_i). Putting Δ_i into AMM i
+        leaves a marginal output of A_i² / (r_i + γ_i * Δ_i)², so equal
+        marginals mean r_i + γ_i * Δ_i = A_i * s for a common level s:
+        Δ_i = max(0, (A_i * s - r_i) / γ_i). AMMs join in increasing order of
+        r_i / A_i while the level stays above the next one's threshold.
+
+        Returns:
+            Amount per AMM, in input order, summing to `total`
+        """
+        candidates = sorted(
+            (i for i, (a, _, gamma) in enumerate(pools) if a > 0 and gamma > 0),
+            key=lambda i: pools[i][1] / pools[i][0],
+        )
+
+        # Water level s over the active prefix: Σ (A_i s - r_i) / γ_i = total
+        sum_r = sum_a = level = 0.0
+        active = 0
+        for i in candidates:
+            a, r, gamma = pools[i]
+            next_level = (total + sum_r + r / gamma) / (sum_a + a / gamma)
+            if next_level <= r / a:
+                break
+            sum_r += r / gamma
+            sum_a += a / gamma
+            level = next_level
+            active += 1
+
+        amounts = [0.0] * len(pools)
+        for i in candidates[:active]:
+            a, r, gamma = pools[i]
+            amounts[i] = max(0.0, (a * level - r) / gamma)
+        return amounts
 
     def _split_sell_two_amms(
         self, amm1: AMM, amm2: AMM, total_x: Decimal
@@ -0,0 +1,208 @@
+//! Benchmarks for the EVM strategy call path.
+//!
+//! Uses a counting global allocator to report heap allocations per
+//! `afterSwap` call alongside the timings. The strategy is a hand-assembled
+//! contract that returns (30 bps, 30 bps), so the numbers measure call
+//! overhead rather than strategy logic.
+//!
+//! `calldata_path` runs `EVMStrategy::after_swap` without the transaction:
+//! the calldata is encoded into the strategy's reused buffer, handed to the
+//! EVM and reclaimed, and a returned fee pair is decoded. It asserts that
+//! this path does not allocate; the full-call figures also include revm's
+//! own per-transaction allocations.
+
+use std::alloc::{GlobalAlloc, Layout, System};
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::Arc;
+
+use criterion::{black_box, criterion_group, criterion_main, Criterion};
+
+use revm::primitives::{Bytes, ExecutionResult, Output, SuccessReason};
+
+use amm_sim_rs::evm::{jit, DeployedStrategy, DirectStrategy, EVMStrategy};
+use amm_sim_rs::types::trade_info::TradeInfo;
+use amm_sim_rs::types::wad::Wad;
+
+struct CountingAllocator;
+
+static ALLOCATIONS: AtomicUsize = AtomicUsize::new(0);
+
+unsafe impl GlobalAlloc for CountingAllocator {
+    unsafe fn alloc(&self, layout: Layout) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        System.alloc(layout)
+    }
+
+    unsafe fn dealloc(&self, ptr: *mut u8, layout: Layout) {
+        System.dealloc(ptr, layout)
+    }
+
+    unsafe fn realloc(&self, ptr: *mut u8, layout: Layout, new_size: usize) -> *mut u8 {
+        ALLOCATIONS.fetch_add(1, Ordering::Relaxed);
+        System.realloc(ptr, layout, new_size)
+    }
+}
+
+#[global_allocator]
+static GLOBAL: CountingAllocator = CountingAllocator;
+
+/// Init code + runtime returning (30 bps, 30 bps) for any calldata.
+const CONSTANT_FEE_STRATEGY: [u8; 31] = [
+    0x60, 0x14, 0x80, 0x60, 0x0b, 0x60, 0x00, 0x39, 0x60, 0x00, 0xf3,
+    0x66, 0x0a, 0xa8, 0x7b, 0xee, 0x53, 0x80, 0x00, 0x80, 0x60, 0x00,
+    0x52, 0x60, 0x20, 0x52, 0x60, 0x40, 0x60, 0x00, 0xf3,
+];
+
+/// Return data of a call answering (30 bps, 30 bps).
+static FEE_PAIR_OUTPUT: [u8; 64] = fee_pair_output();
+
+const fn fee_pair_output() -> [u8; 64] {
+    let fee = 3_000_000_000_000_000u64.to_be_bytes();
+    let mut output = [0u8; 64];
+    let mut i = 0;
+    while i < 8 {
+        output[24 + i] = fee[i];
+        output[56 + i] = fee[i];
+        i += 1;
+    }
+    output
+}
+
+fn sample_trade() -> TradeInfo {
+    TradeInfo::new(
+        true,
+        Wad::from_f64(1.5),
+        Wad::from_f64(150.0),
+        100,
+        Wad::from_f64(101.5),
+        Wad::from_f64(9850.0),
+    )
+}
+
+/// Average heap allocations per invocation of `f`.
+fn allocations_per_call(iterations: usize, mut f: impl FnMut()) -> f64 {
+    let before = ALLOCATIONS.load(Ordering::Relaxed);
+    for _ in 0..iterations {
+        f();
+    }
+    let after = ALLOCATIONS.load(Ordering::Relaxed);
+    (after - before) as f64 / iterations as f64
+}
+
+fn benchmark_calldata_path(c: &mut Criterion) {
+    let trade = sample_trade();
+    let mut strategy =
+        EVMStrategy::new(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string())
+            .expect("deploy constant-fee strategy");
+
+    // Real calls first, so the buffer has been through revm and back
+    for _ in 0..10 {
+        strategy.after_swap(&trade).unwrap();
+    }
+
+    // What revm hands back for the strategy's answer; cloning it is free
+    let result = ExecutionResult::Success {
+        reason: SuccessReason::Return,
+        gas_used: 21_000,
+        gas_refunded: 0,
+        logs: Vec::new(),
+        output: Output::Call(Bytes::from_static(&FEE_PAIR_OUTPUT)),
+    };
+    let calldata_path = |strategy: &mut EVMStrategy| {
+        strategy.load_trade_calldata(black_box(&trade));
+        strategy.reclaim_trade_calldata();
+        strategy.finish_after_swap(result.clone()).unwrap()
+    };
+
+    let per_call = allocations_per_call(10_000, || {
+        black_box(calldata_path(&mut strategy));
+    });
+    println!("calldata_path: {:.2} allocations/call", per_call);
+    assert_eq!(per_call, 0.0, "the afterSwap calldata and return-data path allocates");
+
+    c.bench_function("calldata_path", |bench| bench.iter(|| calldata_path(&mut strategy)));
+}
+
+fn benchmark_evm_after_swap(c: &mut Criterion) {
+    let trade = sample_trade();
+    let mut strategy =
+        EVMStrategy::new(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string())
+            .expect("deploy constant-fee strategy");
+    strategy
+        .after_initialize(Wad::from_f64(100.0), Wad::from_f64(10000.0))
+        .expect("afterInitialize");
+
+    // Warm up so one-off buffer allocations are not counted
+    for _ in 0..10 {
+        strategy.after_swap(&trade).unwrap();
+    }
+
+    // Includes revm's own per-transaction allocations (frame stack, shared
+    // memory, state diff); calldata_path measures the strategy's share.
+    let per_call = allocations_per_call(10_000, || {
+        black_box(strategy.after_swap(&trade).unwrap());
+    });
+    println!("evm_after_swap: {:.2} allocations/call", per_call);
+
+    c.bench_function("evm_after_swap", |bench| {
+        bench.iter(|| strategy.after_swap(black_box(&trade)).unwrap())
+    });
+}
+
+fn benchmark_direct_after_swap(c: &mut Criterion) {
+    let trade = sample_trade();
+    let deployed =
+        DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string())
+            .expect("deploy constant-fee strategy");
+    let mut strategy = DirectStrategy::new(&deployed);
+    strategy
+        .after_initialize(Wad::from_f64(100.0), Wad::from_f64(10000.0))
+        .expect("afterInitialize");
+
+    for _ in 0..10 {
+        strategy.after_swap(&trade).unwrap();
+    }
+
+    let per_call = allocations_per_call(10_000, || {
+        black_box(strategy.after_swap(&trade).unwrap());
+    });
+    println!("direct_after_swap: {:.2} allocations/call", per_call);
+
+    c.bench_function("direct_after_swap", |bench| {
+        bench.iter(|| strategy.after_swap(black_box(&trade)).unwrap())
+    });
+}
+
+fn benchmark_compiled_after_swap(c: &mut Criterion) {
+    let trade = sample_trade();
+    let deployed =
+        DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string())
+            .expect("deploy constant-fee strategy");
+    let code = Arc::new(jit::compile(deployed.code()).expect("compile constant-fee strategy"));
+    let mut strategy = DirectStrategy::compiled(&deployed, &code);
+    strategy
+        .after_initialize(Wad::from_f64(100.0), Wad::from_f64(10000.0))
+        .expect("afterInitialize");
+
+    for _ in 0..10 {
+        strategy.after_swap(&trade).unwrap();
+    }
+
+    let per_call = allocations_per_call(10_000, || {
+        black_box(strategy.after_swap(&trade).unwrap());
+    });
+    println!("compiled_after_swap: {:.2} allocations/call", per_call);
+
+    c.bench_function("compiled_after_swap", |bench| {
+        bench.iter(|| strategy.after_swap(black_box(&trade)).unwrap())
+    });
+}
+
+criterion_group!(
+    benches,
+    benchmark_calldata_path,
+    benchmark_evm_after_swap,
+    benchmark_direct_after_swap,
+    benchmark_compiled_after_swap
+);
+criterion_main!(benches);
@@ -4,7 +4,11 @@
 //! into separate buckets rather than being reinvested into liquidity.
 //! This means fees count toward PnL but don't inflate the k constant.
 
-use crate::evm::EVMStrategy;
+use std::time::Instant;
+
+use crate::evm::{CallStats, Strategy, StrategyDB};
+use crate::types::config::FeeUpdates;
+use crate::types::result::StrategyStats;
 use crate::types::trade_info::TradeInfo;
 use crate::types::wad::Wad;
 
@@ -32,6 +36,25 @@ pub struct TradeResult {
     pub fee_amount: f64,
 }
 
+/// State of a `CFMM` between steps, used to fork simulations.
+#[derive(Debug, Clone)]
+pub struct AmmCheckpoint {
+    name: String,
+    reserve_x: f64,
+    reserve_y: f64,
+    current_fees: FeeQuote,
+    clamped_fees: u64,
+    accumulated_fees_x: f64,
+    accumulated_fees_y: f64,
+    /// afterSwap counters up to the checkpoint
+    stats: CallStats,
+    /// Strategy storage (None for strategies without EVM state)
+    storage: Option<StrategyDB>,
+    fee_updates: FeeUpdates,
+    trades_since_update: u32,
+    pending_trade: Option<TradeInfo>,
+}
+
 /// Constant Function Market Maker with dynamic fees.
 ///
 /// Implements x * y = k invariant with strategy-determined fees.
@@ -40,8 +63,8 @@ pub struct TradeResult {
 pub struct CFMM {
     /// Strategy name
     pub name: String,
-    /// EVM strategy for fee decisions
-    strategy: EVMStrategy,
+    /// Strategy for fee decisions
+    strategy: Strategy,
     /// Current X reserves
     reserve_x: f64,
     /// Current Y reserves
@@ -50,15 +73,31 @@ pub struct CFMM {
     current_fees: FeeQuote,
     /// Whether initialized
     initialized: bool,
+    /// Number of strategy fees that needed clamping
+    clamped_fees: u64,
     /// Accumulated fees in X (collected separately, not in reserves)
     accumulated_fees_x: f64,
     /// Accumulated fees in Y (collected separately, not in reserves)
     accumulated_fees_y: f64,
+    /// Time afterSwap calls (off unless phase timings are requested)
+    time_strategy: bool,
+    /// Wall time spent in afterSwap, in nanoseconds
+    strategy_ns: u64,
+    /// afterSwap calls made while timing
+    strategy_calls: u64,
+    /// afterSwap counters of the run this AMM was restored from
+    inherited_stats: Option<CallStats>,
+    /// When afterSwap is called (every trade unless screening)
+    fee_updates: FeeUpdates,
+    /// Trades since the last afterSwap call
+    trades_since_update: u32,
+    /// Last trade not yet passed to afterSwap
+    pending_trade: Option<TradeInfo>,
 }
 
 impl CFMM {
     /// Create a new CFMM with the given strategy and reserves.
-    pub fn new(strategy: EVMStrategy, reserve_x: f64, reserve_y: f64) -> Self {
+    pub fn new(strategy: Strategy, reserve_x: f64, reserve_y: f64) -> Self {
         let name = strategy.name().to_string();
         Self {
             name,
@@ -67,8 +106,62 @@ impl CFMM {
             reserve_y,
             current_fees: FeeQuote::symmetric(Wad::from_bps(30)),
             initialized: false,
+            clamped_fees: 0,
             accumulated_fees_x: 0.0,
             accumulated_fees_y: 0.0,
+            time_strategy: false,
+            strategy_ns: 0,
+            strategy_calls: 0,
+            inherited_stats: None,
+            fee_updates: FeeUpdates::Exact,
+            trades_since_update: 0,
+            pending_trade: None,
+        }
+    }
+
+    /// Recreate an AMM from a checkpoint.
+    ///
+    /// `strategy` must be a fresh instance of the checkpointed strategy; its
+    /// storage is restored from the checkpoint. The AMM counts as initialized.
+    pub fn from_checkpoint(mut strategy: Strategy, checkpoint: &AmmCheckpoint) -> Self {
+        if let Some(storage) = &checkpoint.storage {
+            strategy.restore(storage);
+        }
+        Self {
+            name: checkpoint.name.clone(),
+            strategy,
+            reserve_x: checkpoint.reserve_x,
+            reserve_y: checkpoint.reserve_y,
+            current_fees: checkpoint.current_fees,
+            initialized: true,
+            clamped_fees: checkpoint.clamped_fees,
+            accumulated_fees_x: checkpoint.accumulated_fees_x,
+            accumulated_fees_y: checkpoint.accumulated_fees_y,
+            time_strategy: false,
+            strategy_ns: 0,
+            strategy_calls: 0,
+            inherited_stats: Some(checkpoint.stats.clone()),
+            fee_updates: checkpoint.fee_updates,
+            trades_since_update: checkpoint.trades_since_update,
+            pending_trade: checkpoint.pending_trade,
+        }
+    }
+
+    /// Capture reserves, fees, counters and strategy storage.
+    pub fn checkpoint(&self) -> AmmCheckpoint {
+        AmmCheckpoint {
+            name: self.name.clone(),
+            reserve_x: self.reserve_x,
+            reserve_y: self.reserve_y,
+            current_fees: self.current_fees,
+            clamped_fees: self.clamped_fees,
+            accumulated_fees_x: self.accumulated_fees_x,
+            accumulated_fees_y: self.accumulated_fees_y,
+            stats: self.call_stats(),
+            storage: self.strategy.snapshot(),
+            fee_updates: self.fee_updates,
+            trades_since_update: self.trades_since_update,
+            pending_trade: self.pending_trade,
         }
     }
 
@@ -78,7 +171,7 @@ impl CFMM {
         let initial_y = Wad::from_f64(self.reserve_y);
 
         let (bid_fee, ask_fee) = self.strategy.after_initialize(initial_x, initial_y)?;
-        self.current_fees = FeeQuote::new(bid_fee.clamp_fee(), ask_fee.clamp_fee());
+        self.set_fees(bid_fee, ask_fee);
         self.initialized = true;
 
         Ok(())
@@ -289,21 +382,104 @@ impl CFMM {
         })
     }
 
-    /// Update fees from strategy after a trade.
+    /// Update fees from strategy after a trade, as `fee_updates` allows.
     fn update_fees(&mut self, trade_info: &TradeInfo) {
-        if let Ok((bid_fee, ask_fee)) = self.strategy.after_swap(trade_info) {
-            self.current_fees = FeeQuote::new(bid_fee.clamp_fee(), ask_fee.clamp_fee());
+        match self.fee_updates {
+            FeeUpdates::Exact => self.call_after_swap(trade_info),
+            FeeUpdates::Every(n) => {
+                self.trades_since_update += 1;
+                if self.trades_since_update >= n {
+                    self.trades_since_update = 0;
+                    self.pending_trade = None;
+                    self.call_after_swap(trade_info);
+                } else {
+                    self.pending_trade = Some(*trade_info);
+                }
+            }
+            FeeUpdates::PerStep => self.pending_trade = Some(*trade_info),
+        }
+    }
+
+    /// Set when afterSwap is called; anything but `Exact` is approximate.
+    pub fn set_fee_updates(&mut self, fee_updates: FeeUpdates) {
+        self.fee_updates = fee_updates;
+    }
+
+    /// Pass the last deferred trade, if any, to the strategy.
+    pub fn flush(&mut self) {
+        if let Some(trade_info) = self.pending_trade.take() {
+            self.trades_since_update = 0;
+            self.call_after_swap(&trade_info);
+        }
+    }
+
+    /// Call afterSwap and apply the returned fees.
+    fn call_after_swap(&mut self, trade_info: &TradeInfo) {
+        let start = self.time_strategy.then(Instant::now);
+        let result = self.strategy.after_swap(trade_info);
+        if let Some(start) = start {
+            self.strategy_ns += start.elapsed().as_nanos() as u64;
+            self.strategy_calls += 1;
+        }
+
+        if let Ok((bid_fee, ask_fee)) = result {
+            self.set_fees(bid_fee, ask_fee);
         }
         // On error, keep current fees
     }
 
+    /// Clamp strategy fees into the valid range and make them current.
+    #[inline]
+    fn set_fees(&mut self, bid_fee: Wad, ask_fee: Wad) {
+        let (bid, ask) = (bid_fee.clamp_fee(), ask_fee.clamp_fee());
+        self.clamped_fees += (bid != bid_fee) as u64 + (ask != ask_fee) as u64;
+        self.current_fees = FeeQuote::new(bid, ask);
+    }
+
+    /// Start timing afterSwap calls.
+    pub fn enable_strategy_timing(&mut self) {
+        self.time_strategy = true;
+    }
+
+    /// Wall time (ns) and number of afterSwap calls timed since the last reset.
+    pub fn strategy_time(&self) -> (u64, u64) {
+        (self.strategy_ns, self.strategy_calls)
+    }
+
+    /// Strategy execution counters since the last reset.
+    pub fn strategy_stats(&self) -> StrategyStats {
+        match &self.inherited_stats {
+            Some(_) => self.call_stats().summarize(self.clamped_fees),
+            None => self.strategy.stats().summarize(self.clamped_fees),
+        }
+    }
+
+    /// afterSwap counters, including those inherited from a checkpoint.
+    fn call_stats(&self) -> CallStats {
+        let mut stats = self.inherited_stats.clone().unwrap_or_default();
+        stats.merge(self.strategy.stats());
+        stats
+    }
+
     /// Reset the AMM for a new simulation.
+    ///
+    /// Leaves it as `new` would, apart from the name and fee update mode:
+    /// timing is switched off again and the strategy storage is restored to
+    /// its post-deploy state.
     pub fn reset(&mut self, reserve_x: f64, reserve_y: f64) -> Result<(), crate::evm::strategy::EVMError> {
         self.reserve_x = reserve_x;
         self.reserve_y = reserve_y;
+        self.current_fees = FeeQuote::symmetric(Wad::from_bps(30));
         self.accumulated_fees_x = 0.0;
         self.accumulated_fees_y = 0.0;
         self.initialized = false;
+        self.clamped_fees = 0;
+        self.time_strategy = false;
+        self.strategy_ns = 0;
+        self.strategy_calls = 0;
+        self.inherited_stats = None;
+        self.trades_since_update = 0;
+        self.pending_trade = None;
         self.strategy.reset()
     }
 }
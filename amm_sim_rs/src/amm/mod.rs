@@ -2,4 +2,4 @@
 
 pub mod cfmm;
 
-pub use cfmm::CFMM;
+pub use cfmm::{AmmCheckpoint, CFMM};
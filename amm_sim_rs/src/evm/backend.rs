@@ -0,0 +1,214 @@
+//! Strategy backends used by the simulation engine.
+
+use std::sync::Arc;
+
+use crate::evm::db::StrategyDB;
+use crate::evm::direct::{self, DirectStrategy};
+use crate::evm::jit::{self, CompiledCode};
+use crate::evm::native::FixedFeeStrategy;
+use crate::evm::profiler::ProfiledStrategy;
+use crate::evm::stats::CallStats;
+use crate::evm::strategy::{DeployedStrategy, EVMError, EVMStrategy};
+use crate::types::trade_info::TradeInfo;
+use crate::types::wad::Wad;
+
+/// How EVM bytecode strategies are executed.
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub enum ExecutionBackend {
+    /// revm's full transaction pipeline
+    #[default]
+    Revm,
+    /// revm's interpreter on a strategy-only host (`DirectStrategy`), with
+    /// `Revm` as the fallback for code it does not support
+    Direct,
+    /// Runtime code compiled to native code once per batch (`jit`), with
+    /// `Direct` for the calls it bails out of and `Revm` for code the
+    /// direct host does not support
+    Compiled,
+}
+
+impl ExecutionBackend {
+    /// Parse a backend name ("revm", "direct" or "compiled").
+    pub fn from_name(name: &str) -> Option<Self> {
+        match name {
+            "revm" => Some(ExecutionBackend::Revm),
+            "direct" => Some(ExecutionBackend::Direct),
+            "compiled" => Some(ExecutionBackend::Compiled),
+            _ => None,
+        }
+    }
+}
+
+/// A fee strategy, executed either as EVM bytecode or natively in Rust.
+pub enum Strategy {
+    /// Solidity strategy executed with revm
+    Evm(EVMStrategy),
+    /// Solidity strategy executed by revm's interpreter without the
+    /// transaction pipeline
+    Direct(DirectStrategy),
+    /// Constant fees answered without entering the EVM
+    FixedFee(FixedFeeStrategy),
+    /// Solidity strategy executed with the opcode profiler attached
+    Profiled(ProfiledStrategy),
+}
+
+impl Strategy {
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        match self {
+            Strategy::Evm(s) => s.name(),
+            Strategy::Direct(s) => s.name(),
+            Strategy::FixedFee(s) => s.name(),
+            Strategy::Profiled(s) => s.name(),
+        }
+    }
+
+    /// Initialize the strategy with starting reserves.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    pub fn after_initialize(&mut self, initial_x: Wad, initial_y: Wad) -> Result<(Wad, Wad), EVMError> {
+        match self {
+            Strategy::Evm(s) => s.after_initialize(initial_x, initial_y),
+            Strategy::Direct(s) => s.after_initialize(initial_x, initial_y),
+            Strategy::FixedFee(s) => s.after_initialize(initial_x, initial_y),
+            Strategy::Profiled(s) => s.after_initialize(initial_x, initial_y),
+        }
+    }
+
+    /// Handle a trade event and return updated fees.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    #[inline]
+    pub fn after_swap(&mut self, trade: &TradeInfo) -> Result<(Wad, Wad), EVMError> {
+        match self {
+            Strategy::Evm(s) => s.after_swap(trade),
+            Strategy::Direct(s) => s.after_swap(trade),
+            Strategy::FixedFee(s) => s.after_swap(trade),
+            Strategy::Profiled(s) => s.after_swap(trade),
+        }
+    }
+
+    /// Get the afterSwap counters since the last reset.
+    pub fn stats(&self) -> &CallStats {
+        match self {
+            Strategy::Evm(s) => s.stats(),
+            Strategy::Direct(s) => s.stats(),
+            Strategy::FixedFee(s) => s.stats(),
+            Strategy::Profiled(s) => s.stats(),
+        }
+    }
+
+    /// Copy of the current strategy storage (None for native strategies,
+    /// which have no state).
+    pub fn snapshot(&self) -> Option<StrategyDB> {
+        match self {
+            Strategy::Evm(s) => Some(s.snapshot()),
+            Strategy::Direct(s) => Some(s.snapshot()),
+            Strategy::FixedFee(_) => None,
+            Strategy::Profiled(s) => Some(s.snapshot()),
+        }
+    }
+
+    /// Restore storage captured by `snapshot()`; the stats are kept.
+    pub fn restore(&mut self, snapshot: &StrategyDB) {
+        match self {
+            Strategy::Evm(s) => s.restore(snapshot),
+            Strategy::Direct(s) => s.restore(snapshot),
+            Strategy::FixedFee(_) => {}
+            Strategy::Profiled(s) => s.restore(snapshot),
+        }
+    }
+
+    /// Reset the strategy for a new simulation.
+    pub fn reset(&mut self) -> Result<(), EVMError> {
+        match self {
+            Strategy::Evm(s) => s.reset(),
+            Strategy::Direct(s) => s.reset(),
+            Strategy::FixedFee(s) => s.reset(),
+            Strategy::Profiled(s) => s.reset(),
+        }
+    }
+}
+
+impl From<EVMStrategy> for Strategy {
+    fn from(strategy: EVMStrategy) -> Self {
+        Strategy::Evm(strategy)
+    }
+}
+
+impl From<DirectStrategy> for Strategy {
+    fn from(strategy: DirectStrategy) -> Self {
+        Strategy::Direct(strategy)
+    }
+}
+
+impl From<FixedFeeStrategy> for Strategy {
+    fn from(strategy: FixedFeeStrategy) -> Self {
+        Strategy::FixedFee(strategy)
+    }
+}
+
+impl From<ProfiledStrategy> for Strategy {
+    fn from(strategy: ProfiledStrategy) -> Self {
+        Strategy::Profiled(strategy)
+    }
+}
+
+/// Batch-level strategy prototype, shared by all workers.
+///
+/// Each simulation calls `instantiate()` to get its own fresh `Strategy`.
+#[derive(Clone)]
+pub enum StrategyTemplate {
+    /// Deployed EVM strategy snapshot
+    Evm(DeployedStrategy),
+    /// Deployed EVM strategy snapshot, run by `DirectStrategy`
+    Direct(DeployedStrategy),
+    /// Deployed EVM strategy snapshot and its compiled runtime code
+    Compiled(DeployedStrategy, Arc<CompiledCode>),
+    /// Native fixed-fee strategy
+    FixedFee(FixedFeeStrategy),
+}
+
+impl StrategyTemplate {
+    /// Template for a deployed EVM strategy on the requested backend.
+    ///
+    /// Falls back to `Evm` when the direct backend does not support the
+    /// code, and to `Direct` when the code cannot be compiled. Compiling
+    /// happens here, once per batch.
+    pub fn deployed(strategy: DeployedStrategy, backend: ExecutionBackend) -> Self {
+        match backend {
+            ExecutionBackend::Direct if direct::supports(strategy.code()) => {
+                StrategyTemplate::Direct(strategy)
+            }
+            ExecutionBackend::Compiled if direct::supports(strategy.code()) => {
+                match jit::compile(strategy.code()) {
+                    Ok(code) => StrategyTemplate::Compiled(strategy, Arc::new(code)),
+                    Err(_) => StrategyTemplate::Direct(strategy),
+                }
+            }
+            _ => StrategyTemplate::Evm(strategy),
+        }
+    }
+
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        match self {
+            StrategyTemplate::Evm(s) => s.name(),
+            StrategyTemplate::Direct(s) => s.name(),
+            StrategyTemplate::Compiled(s, _) => s.name(),
+            StrategyTemplate::FixedFee(s) => s.name(),
+        }
+    }
+
+    /// Create a fresh strategy for one simulation.
+    pub fn instantiate(&self) -> Strategy {
+        match self {
+            StrategyTemplate::Evm(s) => Strategy::Evm(s.instantiate()),
+            StrategyTemplate::Direct(s) => Strategy::Direct(DirectStrategy::new(s)),
+            StrategyTemplate::Compiled(s, code) => {
+                Strategy::Direct(DirectStrategy::compiled(s, code))
+            }
+            StrategyTemplate::FixedFee(s) => Strategy::FixedFee(s.clone()),
+        }
+    }
+}
@@ -0,0 +1,206 @@
+//! Strategy-only EVM database.
+//!
+//! A strategy is a single contract at a fixed address whose storage is the
+//! inherited `slots[0..31]` array (enforced by `SolidityCompiler`). Instead
+//! of a general `InMemoryDB` with account maps and a generic commit, the
+//! database holds just that account: the shared analyzed code and a fixed
+//! array of 32 slots. Snapshots and resets are a 1 KiB copy.
+
+use std::collections::HashMap;
+use std::convert::Infallible;
+use std::sync::Arc;
+
+use revm::{
+    primitives::{
+        keccak256, AccountInfo, Address, Bytecode, EvmState, ExecutionResult, ResultAndState,
+        B256, U256,
+    },
+    Database, Evm,
+};
+
+use crate::evm::strategy::{EVMError, StrategyCode, STRATEGY_ADDRESS};
+
+/// Number of storage slots a strategy may use (`AMMStrategyBase.slots`).
+pub const STRATEGY_SLOTS: usize = 32;
+
+/// Database holding only the strategy account.
+///
+/// Every other address (including the caller) reads as an empty account,
+/// so there is no caller balance or nonce to track: the zero gas price and
+/// unset tx nonce make revm's balance and nonce checks pass trivially.
+#[derive(Debug, Clone)]
+pub struct StrategyDB {
+    /// Analyzed runtime code of the strategy
+    code: Arc<StrategyCode>,
+    /// Storage slots 0..31
+    slots: [U256; STRATEGY_SLOTS],
+    /// Any other storage slot; empty for strategies that pass validation
+    overflow: HashMap<U256, U256>,
+}
+
+impl StrategyDB {
+    /// Create a database for `code` with zeroed storage.
+    pub fn new(code: Arc<StrategyCode>) -> Self {
+        Self {
+            code,
+            slots: [U256::ZERO; STRATEGY_SLOTS],
+            overflow: HashMap::new(),
+        }
+    }
+
+    /// Get the strategy code.
+    pub fn code(&self) -> &Arc<StrategyCode> {
+        &self.code
+    }
+
+    /// Get the storage slots 0..31.
+    pub fn slots(&self) -> &[U256; STRATEGY_SLOTS] {
+        &self.slots
+    }
+
+    /// Read one storage slot.
+    #[inline]
+    pub fn slot(&self, index: U256) -> U256 {
+        match slot_index(index) {
+            Some(i) => self.slots[i],
+            None => self.overflow.get(&index).copied().unwrap_or_default(),
+        }
+    }
+
+    /// Write one storage slot.
+    #[inline]
+    pub fn set_slot(&mut self, index: U256, value: U256) {
+        match slot_index(index) {
+            Some(i) => self.slots[i] = value,
+            None => {
+                self.overflow.insert(index, value);
+            }
+        }
+    }
+
+    /// Restore storage from a snapshot of the same strategy.
+    #[inline]
+    pub fn restore(&mut self, snapshot: &StrategyDB) {
+        self.slots = snapshot.slots;
+        if !self.overflow.is_empty() || !snapshot.overflow.is_empty() {
+            self.overflow.clone_from(&snapshot.overflow);
+        }
+    }
+
+    /// Write the strategy's changed storage slots from a transaction's state.
+    ///
+    /// Other accounts (the caller's nonce bump) are discarded.
+    #[inline]
+    pub fn apply(&mut self, state: &EvmState) {
+        let Some(account) = state.get(&STRATEGY_ADDRESS) else {
+            return;
+        };
+        for (index, slot) in account.storage.iter() {
+            if !slot.is_changed() {
+                continue;
+            }
+            self.set_slot(*index, slot.present_value);
+        }
+    }
+}
+
+/// Array index for a storage key in 0..32.
+#[inline]
+pub(crate) fn slot_index(index: U256) -> Option<usize> {
+    if index < U256::from(STRATEGY_SLOTS) {
+        Some(index.as_limbs()[0] as usize)
+    } else {
+        None
+    }
+}
+
+impl Database for StrategyDB {
+    type Error = Infallible;
+
+    fn basic(&mut self, address: Address) -> Result<Option<AccountInfo>, Self::Error> {
+        if address == STRATEGY_ADDRESS {
+            Ok(Some(self.code.account_info()))
+        } else {
+            Ok(None)
+        }
+    }
+
+    fn code_by_hash(&mut self, code_hash: B256) -> Result<Bytecode, Self::Error> {
+        if code_hash == self.code.code_hash() {
+            Ok(self.code.bytecode().clone())
+        } else {
+            Ok(Bytecode::default())
+        }
+    }
+
+    fn storage(&mut self, address: Address, index: U256) -> Result<U256, Self::Error> {
+        if address == STRATEGY_ADDRESS {
+            Ok(self.slot(index))
+        } else {
+            Ok(U256::ZERO)
+        }
+    }
+
+    fn block_hash(&mut self, number: u64) -> Result<B256, Self::Error> {
+        // Same pseudo-hash as revm's EmptyDB, which backed InMemoryDB before
+        Ok(keccak256(number.to_string().as_bytes()))
+    }
+}
+
+/// Run the configured transaction and apply its storage writes.
+///
+/// Replaces `transact_commit`: only the strategy's changed slots are written
+/// back, with no generic account commit.
+pub(crate) fn transact_strategy<EXT>(
+    evm: &mut Evm<'static, EXT, StrategyDB>,
+) -> Result<ExecutionResult, EVMError> {
+    let ResultAndState { result, state } = evm
+        .transact()
+        .map_err(|e| EVMError::ExecutionFailed(format!("{:?}", e)))?;
+    evm.db_mut().apply(&state);
+    Ok(result)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use revm::primitives::{Account, AccountStatus, Bytes, EvmStorageSlot};
+
+    fn empty_db() -> StrategyDB {
+        StrategyDB::new(Arc::new(StrategyCode::analyze(Bytes::new())))
+    }
+
+    #[test]
+    fn test_apply_and_restore() {
+        let mut db = empty_db();
+        let snapshot = db.clone();
+
+        let mut account = Account {
+            info: db.code.account_info(),
+            storage: Default::default(),
+            status: AccountStatus::Touched,
+        };
+        account.storage.insert(U256::from(3), EvmStorageSlot::new_changed(U256::ZERO, U256::from(7)));
+        account.storage.insert(U256::from(100), EvmStorageSlot::new_changed(U256::ZERO, U256::from(9)));
+        // Read but unchanged: must not be written
+        account.storage.insert(U256::from(4), EvmStorageSlot::new(U256::from(5)));
+        let mut state = EvmState::default();
+        state.insert(STRATEGY_ADDRESS, account);
+
+        db.apply(&state);
+        assert_eq!(db.storage(STRATEGY_ADDRESS, U256::from(3)).unwrap(), U256::from(7));
+        assert_eq!(db.storage(STRATEGY_ADDRESS, U256::from(100)).unwrap(), U256::from(9));
+        assert_eq!(db.storage(STRATEGY_ADDRESS, U256::from(4)).unwrap(), U256::ZERO);
+
+        db.restore(&snapshot);
+        assert_eq!(db.slots(), &[U256::ZERO; STRATEGY_SLOTS]);
+        assert_eq!(db.slot(U256::from(100)), U256::ZERO);
+    }
+
+    #[test]
+    fn test_other_accounts_are_empty() {
+        let mut db = empty_db();
+        assert!(db.basic(Address::ZERO).unwrap().is_none());
+        assert!(db.basic(STRATEGY_ADDRESS).unwrap().is_some());
+    }
+}
@@ -0,0 +1,665 @@
+//! Direct interpreter backend for strategy calls.
+//!
+//! `EVMStrategy` sends every call through revm's full transaction pipeline:
+//! handler validation, journal checkpoints, account loading, and a state
+//! diff that is then written back. A strategy call needs none of that. There
+//! is one contract, no value transfer, no sub-calls, and storage is limited
+//! to the strategy's own slots.
+//!
+//! `DirectStrategy` runs revm's bytecode interpreter directly against a
+//! `Host` that owns the `StrategyDB`. The instruction table is built at
+//! compile time. Opcode semantics and gas costs are revm's own. This module
+//! only reproduces what the transaction pipeline adds around the frame:
+//! - intrinsic gas, from revm's `validate_initial_tx_gas`
+//! - the final gas and EIP-3529 refund cap, with revm's `Gas` methods in the
+//!   order its mainnet handler applies them
+//! - EIP-2929 warm/cold storage access
+//! - rolling storage back when a call reverts or halts
+//!
+//! The tests run both backends on the same calls and compare the full
+//! results, refunds and out-of-gas halts included, so a revm upgrade that
+//! changes the handler shows up there.
+//!
+//! Some code touches other accounts or makes sub-calls. The direct host
+//! cannot serve those opcodes (the compiler rejects them in source anyway),
+//! so that code keeps running on `EVMStrategy`.
+//!
+//! With code compiled by `jit`, a `DirectStrategy` runs each call as native
+//! code first. The interpreter only runs the calls that the compiled code
+//! bails out of.
+
+use std::collections::HashMap;
+use std::sync::Arc;
+
+use bytes::BytesMut;
+use revm::{
+    interpreter::{
+        gas::validate_initial_tx_gas,
+        opcode::{self, make_instruction_table, InstructionTable},
+        AccountLoad, Contract, Eip7702CodeLoad, Gas, Host, Interpreter, InterpreterAction,
+        InterpreterResult, SStoreResult, SelfDestructResult, SharedMemory, StateLoad,
+        SuccessOrHalt,
+    },
+    primitives::{
+        keccak256, Address, Bytes, Env, ExecutionResult, LatestSpec, Log, Output, SpecId, TxKind,
+        B256, U256,
+    },
+};
+
+use crate::evm::db::{slot_index, StrategyDB};
+use crate::evm::jit::{CompiledCode, Frame};
+use crate::evm::stats::CallStats;
+use crate::evm::strategy::{
+    call_output, record_after_swap, DeployedStrategy, EVMError, StrategyCode, CALLER_ADDRESS,
+    GAS_LIMIT_INIT, GAS_LIMIT_TRADE, STRATEGY_ADDRESS,
+};
+use crate::types::trade_info::{decode_fee_pair, encode_after_initialize, TradeInfo};
+use crate::types::wad::Wad;
+
+/// Consecutive bail-outs after which an instance stops trying its compiled
+/// code (a strategy that always runs out of gas, say).
+const MAX_CONSECUTIVE_BAILS: u32 = 8;
+
+/// Spec of the instruction table. It must match `Evm::builder()`'s default
+/// so both backends charge the same gas.
+const SPEC_ID: SpecId = SpecId::LATEST;
+
+/// Instruction table for the direct host, built once at compile time.
+static INSTRUCTION_TABLE: InstructionTable<DirectHost> =
+    make_instruction_table::<DirectHost, LatestSpec>();
+
+/// Opcodes that reach other accounts or make sub-calls.
+///
+/// Same set as `SolidityCompiler.FORBIDDEN_OPCODES`.
+const UNSUPPORTED_OPCODES: [u8; 11] = [
+    opcode::BALANCE,
+    opcode::EXTCODESIZE,
+    opcode::EXTCODECOPY,
+    opcode::EXTCODEHASH,
+    opcode::CREATE,
+    opcode::CALL,
+    opcode::CALLCODE,
+    opcode::DELEGATECALL,
+    opcode::CREATE2,
+    opcode::STATICCALL,
+    opcode::SELFDESTRUCT,
+];
+
+/// Whether the direct backend can run this strategy code.
+///
+/// Scans the instructions the same way `SolidityCompiler` does: it skips
+/// PUSH immediates and the trailing CBOR metadata.
+pub fn supports(code: &StrategyCode) -> bool {
+    let bytecode = code.bytecode().original_byte_slice();
+
+    let mut code_len = bytecode.len();
+    if code_len >= 2 {
+        let metadata_len =
+            u16::from_be_bytes([bytecode[code_len - 2], bytecode[code_len - 1]]) as usize;
+        if metadata_len + 2 <= code_len {
+            code_len -= metadata_len + 2;
+        }
+    }
+
+    let mut i = 0;
+    while i < code_len {
+        let op = bytecode[i];
+        if UNSUPPORTED_OPCODES.contains(&op) {
+            return false;
+        }
+        // PUSH1..PUSH32 carry immediate bytes
+        i += if (opcode::PUSH1..=opcode::PUSH32).contains(&op) {
+            1 + (op - opcode::PUSH0) as usize
+        } else {
+            1
+        };
+    }
+    true
+}
+
+/// Interpreter host owning the strategy state.
+///
+/// It tracks the per-call state that revm's journal would otherwise keep:
+/// the storage at call start (EIP-2200 original values, used for rollback),
+/// the accessed slots (EIP-2929), and transient storage (EIP-1153).
+pub(crate) struct DirectHost {
+    env: Env,
+    /// Committed strategy storage (written in place during a call)
+    db: StrategyDB,
+    /// Storage at the start of the current call
+    call_start: StrategyDB,
+    /// Bitmask of slots 0..31 accessed in the current call
+    warm_slots: u32,
+    /// Other slots accessed in the current call
+    warm_overflow: Vec<U256>,
+    /// Transient storage of the current call
+    transient: HashMap<U256, U256>,
+}
+
+impl DirectHost {
+    fn new(db: StrategyDB) -> Self {
+        let mut env = Env::default();
+        env.tx.caller = CALLER_ADDRESS;
+        env.tx.transact_to = TxKind::Call(STRATEGY_ADDRESS);
+        env.tx.value = U256::ZERO;
+
+        Self {
+            env,
+            call_start: db.clone(),
+            db,
+            warm_slots: 0,
+            warm_overflow: Vec::new(),
+            transient: HashMap::new(),
+        }
+    }
+
+    /// Start a new call: snapshot storage and clear the access sets.
+    #[inline]
+    fn begin_call(&mut self) {
+        self.call_start.restore(&self.db);
+        self.warm_slots = 0;
+        self.warm_overflow.clear();
+        self.transient.clear();
+    }
+
+    /// Undo the storage writes of the current call.
+    #[inline]
+    fn rollback(&mut self) {
+        self.db.restore(&self.call_start);
+    }
+
+    /// Mark a slot accessed and return whether it was cold.
+    #[inline]
+    fn touch(&mut self, index: U256) -> bool {
+        match slot_index(index) {
+            Some(i) => {
+                let bit = 1u32 << i;
+                let cold = self.warm_slots & bit == 0;
+                self.warm_slots |= bit;
+                cold
+            }
+            None => {
+                if self.warm_overflow.contains(&index) {
+                    false
+                } else {
+                    self.warm_overflow.push(index);
+                    true
+                }
+            }
+        }
+    }
+
+    /// Turn the frame result into the transaction result revm would report.
+    ///
+    /// Same steps as revm's mainnet handler (`last_frame_return`, `refund`,
+    /// `output`): the whole limit is spent, success and revert get their
+    /// unused gas back, only success keeps its refund, and the refund is
+    /// capped by `Gas::set_final_refund` for `SPEC_ID`.
+    fn finish(&mut self, result: InterpreterResult, gas_limit: u64) -> Result<ExecutionResult, EVMError> {
+        let outcome = SuccessOrHalt::from(result.result);
+
+        let mut gas = Gas::new_spent(gas_limit);
+        match &outcome {
+            SuccessOrHalt::Success(_) => {
+                gas.erase_cost(result.gas.remaining());
+                gas.record_refund(result.gas.refunded());
+            }
+            SuccessOrHalt::Revert => gas.erase_cost(result.gas.remaining()),
+            _ => {}
+        }
+        gas.set_final_refund(SPEC_ID.is_enabled_in(SpecId::LONDON));
+        let gas_refunded = gas.refunded() as u64;
+        let gas_used = gas.spent() - gas_refunded;
+
+        match outcome {
+            SuccessOrHalt::Success(reason) => Ok(ExecutionResult::Success {
+                reason,
+                gas_used,
+                gas_refunded,
+                logs: Vec::new(),
+                output: Output::Call(result.output),
+            }),
+            SuccessOrHalt::Revert => {
+                self.rollback();
+                Ok(ExecutionResult::Revert {
+                    gas_used,
+                    output: result.output,
+                })
+            }
+            SuccessOrHalt::Halt(reason) => {
+                self.rollback();
+                Ok(ExecutionResult::Halt { reason, gas_used })
+            }
+            other => {
+                self.rollback();
+                Err(EVMError::ExecutionFailed(format!(
+                    "Unsupported operation in direct backend: {:?}",
+                    other
+                )))
+            }
+        }
+    }
+}
+
+impl Host for DirectHost {
+    fn env(&self) -> &Env {
+        &self.env
+    }
+
+    fn env_mut(&mut self) -> &mut Env {
+        &mut self.env
+    }
+
+    fn load_account_delegated(&mut self, _address: Address) -> Option<AccountLoad> {
+        None
+    }
+
+    fn block_hash(&mut self, number: u64) -> Option<B256> {
+        // Same pseudo-hash as StrategyDB
+        Some(keccak256(number.to_string().as_bytes()))
+    }
+
+    fn balance(&mut self, _address: Address) -> Option<StateLoad<U256>> {
+        // Only reachable through SELFBALANCE; the strategy holds no ether
+        Some(StateLoad::new(U256::ZERO, false))
+    }
+
+    fn code(&mut self, _address: Address) -> Option<Eip7702CodeLoad<Bytes>> {
+        None
+    }
+
+    fn code_hash(&mut self, _address: Address) -> Option<Eip7702CodeLoad<B256>> {
+        None
+    }
+
+    fn sload(&mut self, _address: Address, index: U256) -> Option<StateLoad<U256>> {
+        let is_cold = self.touch(index);
+        Some(StateLoad::new(self.db.slot(index), is_cold))
+    }
+
+    fn sstore(
+        &mut self,
+        _address: Address,
+        index: U256,
+        value: U256,
+    ) -> Option<StateLoad<SStoreResult>> {
+        let is_cold = self.touch(index);
+        let result = SStoreResult {
+            original_value: self.call_start.slot(index),
+            present_value: self.db.slot(index),
+            new_value: value,
+        };
+        self.db.set_slot(index, value);
+        Some(StateLoad::new(result, is_cold))
+    }
+
+    fn tload(&mut self, _address: Address, index: U256) -> U256 {
+        self.transient.get(&index).copied().unwrap_or_default()
+    }
+
+    fn tstore(&mut self, _address: Address, index: U256, value: U256) {
+        self.transient.insert(index, value);
+    }
+
+    fn log(&mut self, _log: Log) {}
+
+    fn selfdestruct(
+        &mut self,
+        _address: Address,
+        _target: Address,
+    ) -> Option<StateLoad<SelfDestructResult>> {
+        None
+    }
+}
+
+/// EVM strategy executed by revm's interpreter without the transaction
+/// pipeline.
+///
+/// Produces the same fees, storage and gas figures as `EVMStrategy` for any
+/// code `supports()` accepts, with or without compiled code.
+pub struct DirectStrategy {
+    name: String,
+    /// Strategy state right after deployment (for reset)
+    deployed: StrategyDB,
+    host: DirectHost,
+    /// Interpreter memory, reused across calls
+    memory: Option<SharedMemory>,
+    /// Execution state of the compiled code, if any
+    frame: Option<Box<Frame>>,
+    /// Compiled calls in a row that bailed out to the interpreter
+    bails: u32,
+    /// afterSwap calldata, reclaimed from the interpreter after every call
+    trade_calldata: Bytes,
+    stats: CallStats,
+}
+
+impl DirectStrategy {
+    /// Create an instance from a deployed snapshot.
+    pub fn new(deployed: &DeployedStrategy) -> Self {
+        Self {
+            name: deployed.name().to_string(),
+            deployed: deployed.state().clone(),
+            host: DirectHost::new(deployed.state().clone()),
+            memory: None,
+            frame: None,
+            bails: 0,
+            trade_calldata: Bytes::new(),
+            stats: CallStats::default(),
+        }
+    }
+
+    /// Create an instance that runs `code`, compiled from the deployed
+    /// runtime code.
+    pub fn compiled(deployed: &DeployedStrategy, code: &Arc<CompiledCode>) -> Self {
+        Self { frame: Some(Frame::new(Arc::clone(code))), ..Self::new(deployed) }
+    }
+
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        &self.name
+    }
+
+    /// Initialize the strategy with starting reserves.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    pub fn after_initialize(&mut self, initial_x: Wad, initial_y: Wad) -> Result<(Wad, Wad), EVMError> {
+        let calldata = encode_after_initialize(initial_x, initial_y);
+        let result = call_output(self.execute(Bytes::copy_from_slice(&calldata), GAS_LIMIT_INIT)?)?;
+
+        decode_fee_pair(&result)
+            .ok_or_else(|| EVMError::InvalidReturnData("Failed to decode fee pair".into()))
+    }
+
+    /// Handle a trade event and return updated fees.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    #[inline]
+    pub fn after_swap(&mut self, trade: &TradeInfo) -> Result<(Wad, Wad), EVMError> {
+        let mut buffer = BytesMut::from(std::mem::take(&mut self.trade_calldata).0);
+        buffer.resize(196, 0);
+        let calldata: &mut [u8; 196] = (&mut buffer[..]).try_into()
+            .expect("calldata buffer is 196 bytes");
+        trade.encode_calldata(calldata);
+
+        let result = self.execute(Bytes(buffer.freeze()), GAS_LIMIT_TRADE)?;
+        record_after_swap(&mut self.stats, result)
+    }
+
+    /// Get the afterSwap counters since the last reset.
+    pub fn stats(&self) -> &CallStats {
+        &self.stats
+    }
+
+    /// Reset the strategy for a new simulation.
+    pub fn reset(&mut self) -> Result<(), EVMError> {
+        self.host.db.restore(&self.deployed);
+        self.stats = CallStats::default();
+        Ok(())
+    }
+
+    /// Copy of the current strategy storage.
+    pub fn snapshot(&self) -> StrategyDB {
+        self.host.db.clone()
+    }
+
+    /// Restore storage captured by `snapshot()`; the stats are kept.
+    pub fn restore(&mut self, snapshot: &StrategyDB) {
+        self.host.db.restore(snapshot);
+    }
+
+    /// Run one call and apply its storage writes.
+    ///
+    /// Compiled code runs first; a call it bails out of is rolled back and
+    /// re-run on the interpreter.
+    fn execute(&mut self, calldata: Bytes, gas_limit: u64) -> Result<ExecutionResult, EVMError> {
+        let intrinsic = validate_initial_tx_gas(SPEC_ID, &calldata, false, &[], 0);
+        if intrinsic > gas_limit {
+            return Err(EVMError::ExecutionFailed(format!(
+                "Gas limit {} below intrinsic gas {}",
+                gas_limit, intrinsic
+            )));
+        }
+
+        self.host.begin_call();
+        if let Some(frame) = self.frame.as_mut() {
+            if let Some(result) = frame.run(&mut self.host, &calldata, gas_limit - intrinsic) {
+                self.bails = 0;
+                self.trade_calldata = calldata;
+                return self.host.finish(result, gas_limit);
+            }
+            self.host.rollback();
+            self.host.begin_call();
+            self.bails += 1;
+            if self.bails >= MAX_CONSECUTIVE_BAILS {
+                self.frame = None;
+            }
+        }
+
+        let code = self.deployed.code();
+        let contract = Contract::new(
+            calldata,
+            code.bytecode().clone(),
+            Some(code.code_hash()),
+            STRATEGY_ADDRESS,
+            None,
+            CALLER_ADDRESS,
+            U256::ZERO,
+        );
+        let mut interpreter = Interpreter::new(contract, gas_limit - intrinsic, false);
+
+        let mut memory = self.memory.take().unwrap_or_else(SharedMemory::new);
+        memory.new_context();
+        let action = interpreter.run(memory, &INSTRUCTION_TABLE, &mut self.host);
+        let mut memory = interpreter.take_memory();
+        memory.free_context();
+        self.memory = Some(memory);
+        self.trade_calldata = std::mem::take(&mut interpreter.contract.input);
+
+        match action {
+            InterpreterAction::Return { result } => self.host.finish(result, gas_limit),
+            _ => {
+                // Sub-calls and creates are excluded by supports()
+                self.host.rollback();
+                Err(EVMError::ExecutionFailed(
+                    "Unsupported operation in direct backend: sub-call".into(),
+                ))
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::evm::jit;
+    use crate::evm::test_contracts::{
+        CONSTANT_FEE_STRATEGY, COUNTER_STRATEGY, OPCODE_MIX_STRATEGY, REVERTING_STRATEGY,
+        TOGGLE_STRATEGY,
+    };
+    use crate::evm::Strategy;
+    use crate::simulation::engine::SimulationEngine;
+    use crate::types::config::SimulationConfig;
+
+    fn config(seed: u64) -> SimulationConfig {
+        SimulationConfig { n_steps: 200, gbm_sigma: 0.002, ..SimulationConfig::small(seed) }
+    }
+
+    fn trade() -> TradeInfo {
+        TradeInfo::new(
+            true,
+            Wad::from_f64(1.0),
+            Wad::from_f64(100.0),
+            1,
+            Wad::from_f64(101.0),
+            Wad::from_f64(9900.0),
+        )
+    }
+
+    /// Interpreter-only and compiled instances of a deployed strategy.
+    fn variants(deployed: &DeployedStrategy) -> [DirectStrategy; 2] {
+        let code = Arc::new(jit::compile(deployed.code()).unwrap());
+        [DirectStrategy::new(deployed), DirectStrategy::compiled(deployed, &code)]
+    }
+
+    #[test]
+    fn test_supports_rejects_calls() {
+        let deployed =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        assert!(supports(deployed.code()));
+
+        // CALL as an instruction is rejected, as PUSH data it is not
+        let call = StrategyCode::analyze(Bytes::from_static(&[0x60, 0x00, 0xf1]));
+        assert!(!supports(&call));
+        let pushed = StrategyCode::analyze(Bytes::from_static(&[0x60, 0xf1, 0x00]));
+        assert!(supports(&pushed));
+    }
+
+    #[test]
+    fn test_matches_revm_per_call() {
+        for bytecode in [&COUNTER_STRATEGY[..], &REVERTING_STRATEGY[..]] {
+            let deployed = DeployedStrategy::deploy(bytecode.to_vec(), "Test".to_string()).unwrap();
+            for mut direct in variants(&deployed) {
+                let mut revm = deployed.instantiate();
+                for _ in 0..5 {
+                    let expected = revm.after_swap(&trade()).map_err(|e| e.to_string());
+                    let actual = direct.after_swap(&trade()).map_err(|e| e.to_string());
+                    assert_eq!(actual, expected);
+                }
+                assert_eq!(direct.stats().summarize(0), revm.stats().summarize(0));
+                assert_eq!(direct.bails, 0);
+            }
+        }
+    }
+
+    #[test]
+    fn test_compiled_matches_revm_at_any_gas_limit() {
+        let deployed =
+            DeployedStrategy::deploy(OPCODE_MIX_STRATEGY.to_vec(), "Mix".to_string()).unwrap();
+        let [_, mut compiled] = variants(&deployed);
+        let mut revm = deployed.instantiate();
+        let mut calldata = [0u8; 196];
+        trade().encode_calldata(&mut calldata);
+
+        // Alternate calls set and clear slot 6; all of them run natively
+        let mut gas_used = Vec::new();
+        for _ in 0..4 {
+            let expected = revm.execute(&calldata, GAS_LIMIT_TRADE).unwrap();
+            let actual = compiled
+                .execute(Bytes::copy_from_slice(&calldata), GAS_LIMIT_TRADE)
+                .unwrap();
+            assert_eq!(actual, expected);
+            assert_eq!(compiled.host.db.slots(), revm.snapshot().slots());
+            gas_used.push(expected.gas_used());
+        }
+        assert_eq!(compiled.bails, 0);
+        assert!(gas_used[1] < gas_used[0]);
+
+        // With less gas the call halts somewhere inside; the compiled code
+        // bails out and the interpreter reports the exact halt. With the
+        // exact amount the compiled code finishes on its own.
+        let intrinsic = validate_initial_tx_gas(SPEC_ID, &calldata, false, &[], 0);
+        let needed = gas_used[0];
+        let limits = (intrinsic..needed).step_by(997).chain([needed - 1, needed]);
+        for gas_limit in limits {
+            let [_, mut compiled] = variants(&deployed);
+            let mut revm = deployed.instantiate();
+            let expected = revm.execute(&calldata, gas_limit).unwrap();
+            let actual = compiled
+                .execute(Bytes::copy_from_slice(&calldata), gas_limit)
+                .unwrap();
+
+            assert_eq!(actual, expected, "gas limit {}", gas_limit);
+            assert_eq!(compiled.host.db.slots(), revm.snapshot().slots());
+            assert_eq!(compiled.bails, u32::from(gas_limit < needed));
+        }
+    }
+
+    #[test]
+    fn test_gas_accounting_matches_revm() {
+        let deployed =
+            DeployedStrategy::deploy(TOGGLE_STRATEGY.to_vec(), "Toggle".to_string()).unwrap();
+
+        for mut direct in variants(&deployed) {
+            let mut revm = deployed.instantiate();
+
+            // Set then clear 1 slot (refund just under the cap) and 2 slots
+            // (capped), then 50 slots, which runs out of gas and rolls back
+            let mut refunds = Vec::new();
+            for n_slots in [1u8, 1, 2, 2, 50, 3, 3] {
+                let mut calldata = [0u8; 32];
+                calldata[31] = n_slots;
+                let expected = revm.execute(&calldata, GAS_LIMIT_TRADE).unwrap();
+                let actual = direct
+                    .execute(Bytes::copy_from_slice(&calldata), GAS_LIMIT_TRADE)
+                    .unwrap();
+
+                assert_eq!(actual, expected, "{} slots", n_slots);
+                assert_eq!(direct.host.db.slots(), revm.snapshot().slots());
+                refunds.push(match expected {
+                    ExecutionResult::Success { gas_used, gas_refunded, .. } => {
+                        Some((gas_used, gas_refunded))
+                    }
+                    ExecutionResult::Halt { gas_used, .. } => {
+                        assert_eq!(gas_used, GAS_LIMIT_TRADE);
+                        None
+                    }
+                    ExecutionResult::Revert { .. } => panic!("{} slots reverted", n_slots),
+                });
+            }
+
+            // Clearing one slot earns its full 4800; clearing two hits the cap
+            let (used, refunded) = refunds[1].unwrap();
+            assert_eq!(refunded, 4800);
+            assert!(refunded <= (used + refunded) / 5);
+            let (used, refunded) = refunds[3].unwrap();
+            assert!(refunded < 9600);
+            assert_eq!(refunded, (used + refunded) / 5);
+            assert!(refunds[4].is_none());
+            // Only the halting call bailed out; the calls after it ran natively
+            assert_eq!(direct.bails, 0);
+        }
+    }
+
+    #[test]
+    fn test_revert_rolls_back_storage() {
+        let deployed =
+            DeployedStrategy::deploy(REVERTING_STRATEGY.to_vec(), "Revert".to_string()).unwrap();
+        for mut direct in variants(&deployed) {
+            assert!(direct.after_swap(&trade()).is_err());
+            assert_eq!(direct.stats().summarize(0).reverts, 1);
+            assert_eq!(direct.host.db.slots(), deployed.state().slots());
+            assert_eq!(deployed.state().slots()[0], U256::from(4));
+        }
+    }
+
+    #[test]
+    fn test_full_simulations_match_revm() {
+        for bytecode in [
+            &CONSTANT_FEE_STRATEGY[..],
+            &COUNTER_STRATEGY[..],
+            &OPCODE_MIX_STRATEGY[..],
+        ] {
+            let deployed = DeployedStrategy::deploy(bytecode.to_vec(), "Test".to_string()).unwrap();
+            let baseline =
+                DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Base".to_string()).unwrap();
+
+            for seed in 0..3 {
+                let expected = SimulationEngine::new(config(seed))
+                    .run(deployed.instantiate().into(), baseline.instantiate().into())
+                    .unwrap();
+
+                let pairs = variants(&deployed).into_iter().zip(variants(&baseline));
+                for (submission, normalizer) in pairs {
+                    let actual = SimulationEngine::new(config(seed))
+                        .run(Strategy::from(submission), Strategy::from(normalizer))
+                        .unwrap();
+
+                    assert_eq!(actual.edges, expected.edges);
+                    assert_eq!(actual.pnl, expected.pnl);
+                    assert_eq!(actual.average_fees, expected.average_fees);
+                    assert_eq!(actual.strategy_stats, expected.strategy_stats);
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,1283 @@
+//! Native-code backend for strategy calls.
+//!
+//! `DirectStrategy` still interprets every opcode of every call. A batch
+//! calls the same `afterSwap` code millions of times. This module compiles
+//! the runtime bytecode to native code with cranelift, once per batch, and
+//! the compiled function is shared by every simulation.
+//!
+//! The compiler splits the code into basic blocks. Each block starts at a
+//! JUMPDEST, at the start of the code, or after a JUMPI. Per block, the
+//! generated code:
+//! - checks the stack bounds once, for the whole block
+//! - charges the block's static gas once
+//! - keeps stack offsets as constants
+//! - inlines PUSH, POP, DUP, SWAP and the bitwise opcodes
+//! - calls small Rust helpers for the other opcodes and dynamic gas:
+//!   memory expansion, copies, EXP, KECCAK256, SLOAD and SSTORE
+//!
+//! Jumps to a pushed constant branch straight to their block. Other jumps go
+//! through a table of the code's JUMPDESTs.
+//!
+//! Gas and storage follow revm exactly on every path that completes. Several
+//! cases leave the compiled code: out of gas, stack underflow or overflow,
+//! invalid jumps, oversized memory offsets, and opcodes it does not compile.
+//! Charging a block up front can make the compiled code stop a little earlier
+//! than revm would, but never later. When it stops, the host rolls the call
+//! back and re-runs it on revm's interpreter (`DirectStrategy`), which
+//! produces the exact halt. Code that the direct host cannot serve at all
+//! never gets here: it stays on `EVMStrategy`.
+
+use std::mem::{offset_of, ManuallyDrop};
+use std::ptr;
+use std::sync::Arc;
+
+use cranelift_codegen::entity::EntityRef;
+use cranelift_codegen::ir::{
+    condcodes::IntCC, types, AbiParam, Block, InstBuilder, MemFlags, SigRef, Signature, Type,
+    Value,
+};
+use cranelift_codegen::settings::{self, Configurable};
+use cranelift_frontend::{FunctionBuilder, FunctionBuilderContext, Switch, Variable};
+use cranelift_jit::{JITBuilder, JITModule};
+use cranelift_module::{default_libcall_names, Linkage, Module};
+use revm::{
+    interpreter::{opcode, Gas, Host, InstructionResult, InterpreterResult},
+    primitives::{keccak256, Bytes, KECCAK_EMPTY, U256},
+};
+
+use crate::evm::direct::DirectHost;
+use crate::evm::strategy::{StrategyCode, CALLER_ADDRESS, STRATEGY_ADDRESS};
+
+/// EVM stack limit.
+const STACK_LIMIT: usize = 1024;
+
+/// Gas left must exceed this for SSTORE (EIP-2200).
+const CALL_STIPEND: u64 = 2300;
+
+/// Exit codes of the compiled function.
+const EXIT_STOP: u32 = 0;
+const EXIT_RETURN: u32 = 1;
+const EXIT_REVERT: u32 = 2;
+const EXIT_BAIL: u32 = 3;
+
+/// Frame calldata outside of a call.
+const NO_CALLDATA: &[u8] = &[];
+
+/// Helper results: keep going, or leave the compiled code.
+const CONTINUE: u32 = 0;
+const BAIL: u32 = 1;
+
+/// Runtime helper called from compiled code: the frame, a pointer to the
+/// deepest operand on the stack (results are written from there), and an
+/// opcode-specific immediate.
+type Helper = unsafe extern "C" fn(*mut Frame, *mut U256, u64) -> u32;
+
+/// Entry point of a compiled strategy.
+type Entry = unsafe extern "C" fn(*mut Frame) -> u32;
+
+/// Strategy runtime code compiled to native code.
+///
+/// Immutable once built; shared by all workers of a batch.
+pub struct CompiledCode {
+    /// Owns the executable memory behind `entry`
+    module: ManuallyDrop<JITModule>,
+    entry: Entry,
+    /// Original runtime bytecode, for CODECOPY
+    code: Bytes,
+}
+
+// SAFETY: the module is only touched again when dropped, and the compiled
+// function keeps all of its state in the `Frame` it is called with.
+unsafe impl Send for CompiledCode {}
+unsafe impl Sync for CompiledCode {}
+
+impl Drop for CompiledCode {
+    fn drop(&mut self) {
+        // SAFETY: no `Frame` outlives the `Arc` that owns this code, so the
+        // function cannot be running or called again.
+        unsafe { ManuallyDrop::take(&mut self.module).free_memory() }
+    }
+}
+
+/// Per-instance execution state of compiled code.
+///
+/// The compiled function reads and writes `gas` and `stack` directly; the
+/// helpers own everything else.
+#[repr(C)]
+pub(crate) struct Frame {
+    /// Gas left in the call
+    gas: u64,
+    /// SSTORE refund counter; may go negative during a call
+    refund: i64,
+    /// Host of the current call (null outside `run`)
+    host: *mut DirectHost,
+    /// Calldata of the current call (empty outside `run`)
+    calldata: *const [u8],
+    /// Memory, reused across calls
+    memory: Vec<u8>,
+    /// Memory range returned by RETURN or REVERT
+    output: (usize, usize),
+    code: Arc<CompiledCode>,
+    stack: [U256; STACK_LIMIT],
+}
+
+// SAFETY: the raw pointers are only set for the duration of `run`.
+unsafe impl Send for Frame {}
+
+impl Frame {
+    /// Create the execution state for one strategy instance.
+    pub(crate) fn new(code: Arc<CompiledCode>) -> Box<Self> {
+        Box::new(Self {
+            gas: 0,
+            refund: 0,
+            host: ptr::null_mut(),
+            calldata: NO_CALLDATA,
+            memory: Vec::new(),
+            output: (0, 0),
+            code,
+            stack: [U256::ZERO; STACK_LIMIT],
+        })
+    }
+
+    /// Run one call with `gas_limit` gas (intrinsic gas already deducted).
+    ///
+    /// Returns the frame result revm's interpreter would return, or `None`
+    /// when the compiled code bailed out. Storage may then be partly
+    /// written; the caller rolls it back and re-runs the call.
+    pub(crate) fn run(
+        &mut self,
+        host: &mut DirectHost,
+        calldata: &[u8],
+        gas_limit: u64,
+    ) -> Option<InterpreterResult> {
+        self.gas = gas_limit;
+        self.refund = 0;
+        self.memory.clear();
+        self.output = (0, 0);
+        self.host = host;
+        self.calldata = calldata;
+
+        let entry = self.code.entry;
+        // SAFETY: `entry` was compiled for this frame layout, and host and
+        // calldata stay borrowed until it returns.
+        let exit = unsafe { entry(self) };
+
+        self.host = ptr::null_mut();
+        self.calldata = NO_CALLDATA;
+
+        let result = match exit {
+            EXIT_STOP => InstructionResult::Stop,
+            EXIT_RETURN => InstructionResult::Return,
+            EXIT_REVERT => InstructionResult::Revert,
+            _ => return None,
+        };
+        let (offset, len) = self.output;
+        let output = Bytes::copy_from_slice(&self.memory[offset..offset + len]);
+
+        let mut gas = Gas::new(gas_limit);
+        let charged = gas.record_cost(gas_limit - self.gas);
+        debug_assert!(charged);
+        gas.record_refund(self.refund);
+        Some(InterpreterResult::new(result, output, gas))
+    }
+}
+
+/// Compile strategy runtime code to native code.
+///
+/// Fails only when cranelift cannot target the host or rejects the
+/// generated function; callers then keep interpreting.
+pub fn compile(code: &StrategyCode) -> Result<CompiledCode, String> {
+    let bytecode = Bytes::copy_from_slice(code.bytecode().original_byte_slice());
+    let instructions = decode(&bytecode);
+    let blocks = basic_blocks(&instructions);
+
+    let mut flags = settings::builder();
+    flags.set("opt_level", "speed").map_err(|e| e.to_string())?;
+    let isa = cranelift_native::builder()
+        .map_err(|e| e.to_string())?
+        .finish(settings::Flags::new(flags))
+        .map_err(|e| e.to_string())?;
+    let mut module = JITModule::new(JITBuilder::with_isa(isa, default_libcall_names()));
+    let pointer = module.target_config().pointer_type();
+
+    let mut ctx = module.make_context();
+    ctx.func.signature.params.push(AbiParam::new(pointer));
+    ctx.func.signature.returns.push(AbiParam::new(types::I32));
+
+    let mut helper_sig = module.make_signature();
+    helper_sig.params.push(AbiParam::new(pointer));
+    helper_sig.params.push(AbiParam::new(pointer));
+    helper_sig.params.push(AbiParam::new(types::I64));
+    helper_sig.returns.push(AbiParam::new(types::I32));
+
+    let mut builder_ctx = FunctionBuilderContext::new();
+    let builder = FunctionBuilder::new(&mut ctx.func, &mut builder_ctx);
+    Codegen::new(builder, pointer, helper_sig, &instructions, &blocks, bytecode.len()).finish();
+
+    let id = module
+        .declare_function("strategy", Linkage::Local, &ctx.func.signature)
+        .map_err(|e| e.to_string())?;
+    module.define_function(id, &mut ctx).map_err(|e| e.to_string())?;
+    module.clear_context(&mut ctx);
+    module.finalize_definitions().map_err(|e| e.to_string())?;
+
+    // SAFETY: the function was declared with the `Entry` signature.
+    let entry =
+        unsafe { std::mem::transmute::<*const u8, Entry>(module.get_finalized_function(id)) };
+    Ok(CompiledCode { module: ManuallyDrop::new(module), entry, code: bytecode })
+}
+
+/// One decoded instruction.
+struct Instruction {
+    pc: usize,
+    op: u8,
+    /// PUSH immediate (zero-padded past the end of the code, like revm)
+    value: U256,
+}
+
+/// A straight-line run of instructions, entered only at the top.
+struct BasicBlock {
+    /// Instruction indices `start..end`
+    start: usize,
+    end: usize,
+    /// Static gas of the block's compiled instructions
+    gas: u64,
+    /// Stack items the block needs on entry
+    inputs: usize,
+    /// Highest stack growth within the block
+    growth: usize,
+}
+
+/// Static gas, stack inputs and stack outputs of an opcode the compiler
+/// handles. `None` for opcodes that leave the compiled code.
+///
+/// Gas beyond the static part (memory, copies, EXP, storage) is charged by
+/// the helpers.
+fn op_info(op: u8) -> Option<(u64, usize, usize)> {
+    Some(match op {
+        opcode::STOP => (0, 0, 0),
+        opcode::JUMPDEST => (1, 0, 0),
+        opcode::ADD | opcode::SUB => (3, 2, 1),
+        opcode::MUL | opcode::DIV | opcode::SDIV | opcode::MOD | opcode::SMOD
+        | opcode::SIGNEXTEND => (5, 2, 1),
+        opcode::ADDMOD | opcode::MULMOD => (8, 3, 1),
+        opcode::EXP => (10, 2, 1),
+        opcode::LT | opcode::GT | opcode::SLT | opcode::SGT | opcode::EQ | opcode::AND
+        | opcode::OR | opcode::XOR | opcode::BYTE | opcode::SHL | opcode::SHR
+        | opcode::SAR => (3, 2, 1),
+        opcode::ISZERO | opcode::NOT => (3, 1, 1),
+        opcode::KECCAK256 => (30, 2, 1),
+        opcode::ADDRESS | opcode::ORIGIN | opcode::CALLER | opcode::CALLVALUE
+        | opcode::CALLDATASIZE | opcode::CODESIZE | opcode::RETURNDATASIZE | opcode::COINBASE
+        | opcode::TIMESTAMP | opcode::NUMBER | opcode::GASLIMIT | opcode::CHAINID
+        | opcode::BASEFEE | opcode::PC | opcode::MSIZE | opcode::GAS | opcode::PUSH0 => {
+            (2, 0, 1)
+        }
+        opcode::SELFBALANCE => (5, 0, 1),
+        opcode::CALLDATALOAD | opcode::MLOAD => (3, 1, 1),
+        opcode::CALLDATACOPY | opcode::CODECOPY | opcode::MCOPY => (3, 3, 0),
+        opcode::POP => (2, 1, 0),
+        opcode::MSTORE | opcode::MSTORE8 => (3, 2, 0),
+        opcode::SLOAD => (0, 1, 1),
+        opcode::SSTORE => (0, 2, 0),
+        opcode::TLOAD => (100, 1, 1),
+        opcode::TSTORE => (100, 2, 0),
+        opcode::JUMP => (8, 1, 0),
+        opcode::JUMPI => (10, 2, 0),
+        opcode::PUSH1..=opcode::PUSH32 => (3, 0, 1),
+        opcode::DUP1..=opcode::DUP16 => {
+            let n = (op - opcode::DUP1) as usize + 1;
+            (3, n, n + 1)
+        }
+        opcode::SWAP1..=opcode::SWAP16 => {
+            let n = (op - opcode::SWAP1) as usize + 2;
+            (3, n, n)
+        }
+        opcode::LOG0..=opcode::LOG4 => {
+            let topics = (op - opcode::LOG0) as usize;
+            (375 * (topics as u64 + 1), topics + 2, 0)
+        }
+        opcode::RETURN | opcode::REVERT => (0, 2, 0),
+        _ => return None,
+    })
+}
+
+/// Whether control never continues to the next instruction.
+fn ends_block(op: u8) -> bool {
+    matches!(
+        op,
+        opcode::STOP | opcode::JUMP | opcode::JUMPI | opcode::RETURN | opcode::REVERT
+    ) || op_info(op).is_none()
+}
+
+/// Decode runtime code into instructions, skipping PUSH immediates.
+fn decode(code: &[u8]) -> Vec<Instruction> {
+    let mut instructions = Vec::new();
+    let mut pc = 0;
+    while pc < code.len() {
+        let op = code[pc];
+        let mut value = U256::ZERO;
+        let mut size = 1;
+        if (opcode::PUSH1..=opcode::PUSH32).contains(&op) {
+            let n = (op - opcode::PUSH0) as usize;
+            let available = code.len().min(pc + 1 + n) - (pc + 1);
+            let mut word = [0u8; 32];
+            word[32 - n..32 - n + available].copy_from_slice(&code[pc + 1..pc + 1 + available]);
+            value = U256::from_be_bytes(word);
+            size += n;
+        }
+        instructions.push(Instruction { pc, op, value });
+        pc += size;
+    }
+    instructions
+}
+
+/// Split instructions into basic blocks.
+///
+/// Instructions after a block-ending one that are not a JUMPDEST can never
+/// run and get no block.
+fn basic_blocks(instructions: &[Instruction]) -> Vec<BasicBlock> {
+    let mut leaders = vec![false; instructions.len() + 1];
+    leaders[0] = true;
+    for (i, instruction) in instructions.iter().enumerate() {
+        match instruction.op {
+            opcode::JUMPDEST => leaders[i] = true,
+            opcode::JUMPI => leaders[i + 1] = true,
+            _ => {}
+        }
+    }
+
+    let mut blocks = Vec::new();
+    let mut start = None;
+    for (i, instruction) in instructions.iter().enumerate() {
+        if leaders[i] {
+            if let Some(start) = start {
+                blocks.push(basic_block(instructions, start, i));
+            }
+            start = Some(i);
+        }
+        if let Some(first) = start {
+            if ends_block(instruction.op) {
+                blocks.push(basic_block(instructions, first, i + 1));
+                start = None;
+            }
+        }
+    }
+    if let Some(start) = start {
+        blocks.push(basic_block(instructions, start, instructions.len()));
+    }
+    blocks
+}
+
+fn basic_block(instructions: &[Instruction], start: usize, end: usize) -> BasicBlock {
+    let mut gas = 0;
+    let mut height = 0isize;
+    let mut inputs = 0isize;
+    let mut growth = 0isize;
+    for instruction in &instructions[start..end] {
+        if let Some((cost, pops, pushes)) = op_info(instruction.op) {
+            gas += cost;
+            inputs = inputs.max(pops as isize - height);
+            height += pushes as isize - pops as isize;
+            growth = growth.max(height);
+        }
+    }
+    BasicBlock { start, end, gas, inputs: inputs as usize, growth: growth as usize }
+}
+
+/// Cranelift code generator for one strategy.
+struct Codegen<'a> {
+    b: FunctionBuilder<'a>,
+    pointer: Type,
+    helper: SigRef,
+    instructions: &'a [Instruction],
+    blocks: &'a [BasicBlock],
+    code_len: usize,
+    /// Frame pointer (entry parameter)
+    frame: Value,
+    /// Address of the stack bottom
+    base: Value,
+    /// Address one past the stack top
+    top: Variable,
+    /// Destination of a dynamic jump
+    target: Variable,
+    /// Cranelift block of each basic block, by first instruction
+    entries: Vec<Option<Block>>,
+    /// Cranelift block of each JUMPDEST, by pc
+    jumpdests: Vec<(usize, Block)>,
+    bail: Block,
+    stop: Block,
+    dispatch: Option<Block>,
+}
+
+impl<'a> Codegen<'a> {
+    fn new(
+        mut b: FunctionBuilder<'a>,
+        pointer: Type,
+        helper: Signature,
+        instructions: &'a [Instruction],
+        blocks: &'a [BasicBlock],
+        code_len: usize,
+    ) -> Self {
+        let helper = b.import_signature(helper);
+        let top = Variable::new(0);
+        let target = Variable::new(1);
+        b.declare_var(top, pointer);
+        b.declare_var(target, types::I64);
+
+        let entry = b.create_block();
+        b.append_block_params_for_function_params(entry);
+        b.switch_to_block(entry);
+        let frame = b.block_params(entry)[0];
+        let base = b.ins().iadd_imm(frame, offset_of!(Frame, stack) as i64);
+        b.def_var(top, base);
+
+        let mut entries = vec![None; instructions.len() + 1];
+        let mut jumpdests = Vec::new();
+        for block in blocks {
+            let cl_block = b.create_block();
+            entries[block.start] = Some(cl_block);
+            let first = &instructions[block.start];
+            if first.op == opcode::JUMPDEST {
+                jumpdests.push((first.pc, cl_block));
+            }
+        }
+        let bail = b.create_block();
+        let stop = b.create_block();
+        let first = entries[0].unwrap_or(stop);
+        b.ins().jump(first, &[]);
+
+        Self {
+            b,
+            pointer,
+            helper,
+            instructions,
+            blocks,
+            code_len,
+            frame,
+            base,
+            top,
+            target,
+            entries,
+            jumpdests,
+            bail,
+            stop,
+            dispatch: None,
+        }
+    }
+
+    /// Emit every block and finalize the function.
+    fn finish(mut self) {
+        for block in self.blocks {
+            self.basic_block(block);
+        }
+
+        for (block, exit) in [(self.bail, EXIT_BAIL), (self.stop, EXIT_STOP)] {
+            self.b.switch_to_block(block);
+            self.exit(exit);
+        }
+        if let Some(dispatch) = self.dispatch {
+            self.b.switch_to_block(dispatch);
+            let target = self.b.use_var(self.target);
+            let mut switch = Switch::new();
+            for &(pc, block) in &self.jumpdests {
+                switch.set_entry(pc as u128, block);
+            }
+            switch.emit(&mut self.b, target, self.bail);
+        }
+
+        self.b.seal_all_blocks();
+        self.b.finalize();
+    }
+
+    fn basic_block(&mut self, block: &BasicBlock) {
+        let cl_block = self.entries[block.start].expect("every basic block has an entry");
+        self.b.switch_to_block(cl_block);
+        let top = self.b.use_var(self.top);
+
+        if block.growth > STACK_LIMIT {
+            self.b.ins().jump(self.bail, &[]);
+            return;
+        }
+        if block.inputs > 0 || block.growth > 0 {
+            let depth = self.b.ins().isub(top, self.base);
+            if block.inputs > 0 {
+                let underflow = self.b.ins().icmp_imm(
+                    IntCC::UnsignedLessThan,
+                    depth,
+                    (block.inputs * 32) as i64,
+                );
+                self.bail_if(underflow);
+            }
+            if block.growth > 0 {
+                let overflow = self.b.ins().icmp_imm(
+                    IntCC::UnsignedGreaterThan,
+                    depth,
+                    ((STACK_LIMIT - block.growth) * 32) as i64,
+                );
+                self.bail_if(overflow);
+            }
+        }
+        if block.gas > 0 {
+            let flags = MemFlags::trusted();
+            let gas_offset = offset_of!(Frame, gas) as i32;
+            let gas = self.b.ins().load(types::I64, flags, self.frame, gas_offset);
+            let short = self.b.ins().icmp_imm(IntCC::UnsignedLessThan, gas, block.gas as i64);
+            self.bail_if(short);
+            let left = self.b.ins().iadd_imm(gas, -(block.gas as i64));
+            self.b.ins().store(flags, left, self.frame, gas_offset);
+        }
+
+        // Stack offset of the top relative to `top`, and the value of the
+        // top item when the previous instruction pushed a constant
+        let mut off = 0i32;
+        let mut pushed: Option<U256> = None;
+        // Static gas charged on entry for instructions not yet reached
+        let mut ahead = block.gas;
+
+        let instructions = self.instructions;
+        for instruction in &instructions[block.start..block.end] {
+            let op = instruction.op;
+            let Some((gas, inputs, outputs)) = op_info(op) else {
+                self.b.ins().jump(self.bail, &[]);
+                return;
+            };
+            ahead -= gas;
+            // Offset of the deepest operand; results are written from there
+            let s = off - 32 * inputs as i32;
+
+            match op {
+                opcode::STOP => {
+                    self.exit(EXIT_STOP);
+                    return;
+                }
+                opcode::JUMPDEST => {}
+                opcode::PUSH0..=opcode::PUSH32 => self.store_const(top, s, instruction.value),
+                opcode::POP => {}
+                opcode::DUP1..=opcode::DUP16 => {
+                    let word = self.load_word(top, s);
+                    self.store_word(top, off, word);
+                }
+                opcode::SWAP1..=opcode::SWAP16 => {
+                    let a = self.load_word(top, off - 32);
+                    let b = self.load_word(top, s);
+                    self.store_word(top, s, a);
+                    self.store_word(top, off - 32, b);
+                }
+                opcode::AND | opcode::OR | opcode::XOR => {
+                    let a = self.load_word(top, s + 32);
+                    let b = self.load_word(top, s);
+                    let word = std::array::from_fn(|i| match op {
+                        opcode::AND => self.b.ins().band(a[i], b[i]),
+                        opcode::OR => self.b.ins().bor(a[i], b[i]),
+                        _ => self.b.ins().bxor(a[i], b[i]),
+                    });
+                    self.store_word(top, s, word);
+                }
+                opcode::NOT => {
+                    let a = self.load_word(top, s);
+                    let word = std::array::from_fn(|i| self.b.ins().bnot(a[i]));
+                    self.store_word(top, s, word);
+                }
+                opcode::ISZERO => {
+                    let a = self.load_word(top, s);
+                    let any = self.any(a);
+                    self.store_flag(top, s, any, IntCC::Equal);
+                }
+                opcode::EQ => {
+                    let a = self.load_word(top, s + 32);
+                    let b = self.load_word(top, s);
+                    let diff = std::array::from_fn(|i| self.b.ins().bxor(a[i], b[i]));
+                    let any = self.any(diff);
+                    self.store_flag(top, s, any, IntCC::Equal);
+                }
+                opcode::ADDRESS => {
+                    self.store_const(top, s, U256::from_be_slice(STRATEGY_ADDRESS.as_slice()))
+                }
+                opcode::CALLER | opcode::ORIGIN => {
+                    self.store_const(top, s, U256::from_be_slice(CALLER_ADDRESS.as_slice()))
+                }
+                // No value is sent, the strategy holds no ether and makes no
+                // sub-calls
+                opcode::CALLVALUE | opcode::SELFBALANCE | opcode::RETURNDATASIZE => {
+                    self.store_const(top, s, U256::ZERO)
+                }
+                opcode::CODESIZE => self.store_const(top, s, U256::from(self.code_len)),
+                opcode::PC => self.store_const(top, s, U256::from(instruction.pc)),
+                opcode::GAS => self.call(op_gas, top, s, ahead),
+                opcode::JUMP => {
+                    self.set_top(top, s);
+                    match pushed {
+                        Some(dest) => {
+                            let block = self.jumpdest(dest);
+                            self.b.ins().jump(block, &[]);
+                        }
+                        None => {
+                            let dest = self.load_word(top, s);
+                            self.dynamic_jump(dest);
+                        }
+                    }
+                    return;
+                }
+                opcode::JUMPI => {
+                    let dest = self.load_word(top, s + 32);
+                    let cond = self.load_word(top, s);
+                    let cond = self.any(cond);
+                    self.set_top(top, s);
+                    let next = self.entries[block.end].unwrap_or(self.stop);
+                    match pushed {
+                        Some(dest) => {
+                            let taken = self.jumpdest(dest);
+                            self.b.ins().brif(cond, taken, &[], next, &[]);
+                        }
+                        None => {
+                            let taken = self.b.create_block();
+                            self.b.ins().brif(cond, taken, &[], next, &[]);
+                            self.b.switch_to_block(taken);
+                            self.dynamic_jump(dest);
+                        }
+                    }
+                    return;
+                }
+                opcode::RETURN | opcode::REVERT => {
+                    self.call(op_return, top, s, 0);
+                    self.exit(if op == opcode::RETURN { EXIT_RETURN } else { EXIT_REVERT });
+                    return;
+                }
+                _ => {
+                    let helper = helper(op).expect("every compiled opcode has a helper");
+                    self.call(helper, top, s, op as u64);
+                }
+            }
+
+            off = s + 32 * outputs as i32;
+            pushed = (opcode::PUSH0..=opcode::PUSH32)
+                .contains(&op)
+                .then_some(instruction.value);
+        }
+
+        // Falls through to the next block, or off the end of the code
+        self.set_top(top, off);
+        let next = self.entries[block.end].unwrap_or(self.stop);
+        self.b.ins().jump(next, &[]);
+    }
+
+    /// Call `helper` on the operands at `s`; leaves the compiled code when it
+    /// bails.
+    fn call(&mut self, helper: Helper, top: Value, s: i32, imm: u64) {
+        let callee = self.b.ins().iconst(self.pointer, helper as usize as i64);
+        let operands = self.b.ins().iadd_imm(top, s as i64);
+        let imm = self.b.ins().iconst(types::I64, imm as i64);
+        let call = self
+            .b
+            .ins()
+            .call_indirect(self.helper, callee, &[self.frame, operands, imm]);
+        let status = self.b.inst_results(call)[0];
+        self.bail_if(status);
+    }
+
+    /// Leave the compiled code if `cond` is non-zero.
+    fn bail_if(&mut self, cond: Value) {
+        let next = self.b.create_block();
+        self.b.ins().brif(cond, self.bail, &[], next, &[]);
+        self.b.switch_to_block(next);
+    }
+
+    fn exit(&mut self, code: u32) {
+        let code = self.b.ins().iconst(types::I32, code as i64);
+        self.b.ins().return_(&[code]);
+    }
+
+    fn set_top(&mut self, top: Value, off: i32) {
+        let top = self.b.ins().iadd_imm(top, off as i64);
+        self.b.def_var(self.top, top);
+    }
+
+    /// Block of a constant jump destination; invalid ones bail.
+    fn jumpdest(&self, dest: U256) -> Block {
+        self.jumpdests
+            .iter()
+            .find(|&&(pc, _)| U256::from(pc) == dest)
+            .map_or(self.bail, |&(_, block)| block)
+    }
+
+    /// Jump through the JUMPDEST table.
+    fn dynamic_jump(&mut self, dest: [Value; 4]) {
+        let high = self.b.ins().bor(dest[1], dest[2]);
+        let high = self.b.ins().bor(high, dest[3]);
+        self.bail_if(high);
+        self.b.def_var(self.target, dest[0]);
+        let dispatch = match self.dispatch {
+            Some(block) => block,
+            None => *self.dispatch.insert(self.b.create_block()),
+        };
+        self.b.ins().jump(dispatch, &[]);
+    }
+
+    /// OR of the limbs: non-zero iff the word is.
+    fn any(&mut self, word: [Value; 4]) -> Value {
+        let low = self.b.ins().bor(word[0], word[1]);
+        let high = self.b.ins().bor(word[2], word[3]);
+        self.b.ins().bor(low, high)
+    }
+
+    /// Store 1 at `off` if `value` compares to zero with `cc`, else 0.
+    fn store_flag(&mut self, top: Value, off: i32, value: Value, cc: IntCC) {
+        let flag = self.b.ins().icmp_imm(cc, value, 0);
+        let flag = self.b.ins().uextend(types::I64, flag);
+        let zero = self.b.ins().iconst(types::I64, 0);
+        self.store_word(top, off, [flag, zero, zero, zero]);
+    }
+
+    fn load_word(&mut self, top: Value, off: i32) -> [Value; 4] {
+        std::array::from_fn(|i| {
+            self.b.ins().load(types::I64, MemFlags::trusted(), top, off + 8 * i as i32)
+        })
+    }
+
+    fn store_word(&mut self, top: Value, off: i32, word: [Value; 4]) {
+        for (i, limb) in word.into_iter().enumerate() {
+            self.b.ins().store(MemFlags::trusted(), limb, top, off + 8 * i as i32);
+        }
+    }
+
+    fn store_const(&mut self, top: Value, off: i32, value: U256) {
+        let word = value.into_limbs().map(|limb| self.b.ins().iconst(types::I64, limb as i64));
+        self.store_word(top, off, word);
+    }
+}
+
+/// Runtime helper of an opcode the compiled code does not inline.
+fn helper(op: u8) -> Option<Helper> {
+    Some(match op {
+        opcode::ADD => op_add,
+        opcode::MUL => op_mul,
+        opcode::SUB => op_sub,
+        opcode::DIV => op_div,
+        opcode::SDIV => op_sdiv,
+        opcode::MOD => op_mod,
+        opcode::SMOD => op_smod,
+        opcode::ADDMOD => op_addmod,
+        opcode::MULMOD => op_mulmod,
+        opcode::EXP => op_exp,
+        opcode::SIGNEXTEND => op_signextend,
+        opcode::LT => op_lt,
+        opcode::GT => op_gt,
+        opcode::SLT => op_slt,
+        opcode::SGT => op_sgt,
+        opcode::BYTE => op_byte,
+        opcode::SHL => op_shl,
+        opcode::SHR => op_shr,
+        opcode::SAR => op_sar,
+        opcode::KECCAK256 => op_keccak256,
+        opcode::CALLDATALOAD => op_calldataload,
+        opcode::CALLDATASIZE => op_calldatasize,
+        opcode::CALLDATACOPY | opcode::CODECOPY => op_copy,
+        opcode::COINBASE | opcode::TIMESTAMP | opcode::NUMBER | opcode::GASLIMIT
+        | opcode::CHAINID | opcode::BASEFEE => op_env,
+        opcode::MLOAD => op_mload,
+        opcode::MSTORE => op_mstore,
+        opcode::MSTORE8 => op_mstore8,
+        opcode::MCOPY => op_mcopy,
+        opcode::MSIZE => op_msize,
+        opcode::SLOAD => op_sload,
+        opcode::SSTORE => op_sstore,
+        opcode::TLOAD => op_tload,
+        opcode::TSTORE => op_tstore,
+        opcode::LOG0..=opcode::LOG4 => op_log,
+        _ => return None,
+    })
+}
+
+/// The frame and the stack index of the operands at `s`.
+///
+/// # Safety
+/// `s` must point into `frame.stack`.
+unsafe fn operands<'f>(frame: *mut Frame, s: *mut U256) -> (&'f mut Frame, usize) {
+    let frame = &mut *frame;
+    let index = (s as *const U256).offset_from(frame.stack.as_ptr()) as usize;
+    (frame, index)
+}
+
+/// Defines a helper for an opcode with two operands and no side effects.
+/// `a` is the top of the stack.
+macro_rules! binary_op {
+    ($name:ident, |$a:ident, $b:ident| $result:expr) => {
+        unsafe extern "C" fn $name(_frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+            let [out, top] = &mut *(s as *mut [U256; 2]);
+            let ($a, $b) = (*top, *out);
+            *out = $result;
+            CONTINUE
+        }
+    };
+}
+
+binary_op!(op_add, |a, b| a.wrapping_add(b));
+binary_op!(op_mul, |a, b| a.wrapping_mul(b));
+binary_op!(op_sub, |a, b| a.wrapping_sub(b));
+binary_op!(op_div, |a, b| a.checked_div(b).unwrap_or_default());
+binary_op!(op_mod, |a, b| a.checked_rem(b).unwrap_or_default());
+binary_op!(op_sdiv, |a, b| signed_div(a, b));
+binary_op!(op_smod, |a, b| signed_rem(a, b));
+binary_op!(op_signextend, |a, b| sign_extend(a, b));
+binary_op!(op_lt, |a, b| U256::from(a < b));
+binary_op!(op_gt, |a, b| U256::from(a > b));
+binary_op!(op_slt, |a, b| U256::from(signed_lt(a, b)));
+binary_op!(op_sgt, |a, b| U256::from(signed_lt(b, a)));
+binary_op!(op_byte, |a, b| match as_index(a, 32) {
+    Some(i) => U256::from(b.byte(31 - i)),
+    None => U256::ZERO,
+});
+binary_op!(op_shl, |a, b| as_index(a, 256).map_or(U256::ZERO, |shift| b << shift));
+binary_op!(op_shr, |a, b| as_index(a, 256).map_or(U256::ZERO, |shift| b >> shift));
+binary_op!(op_sar, |a, b| {
+    let negative = b.bit(255);
+    match as_index(a, 256) {
+        Some(shift) if negative => !(!b >> shift),
+        Some(shift) => b >> shift,
+        None if negative => U256::MAX,
+        None => U256::ZERO,
+    }
+});
+
+unsafe extern "C" fn op_addmod(_frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let [n, b, a] = &mut *(s as *mut [U256; 3]);
+    *n = a.add_mod(*b, *n);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_mulmod(_frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let [n, b, a] = &mut *(s as *mut [U256; 3]);
+    *n = a.mul_mod(*b, *n);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_exp(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let (base, exponent) = (frame.stack[i + 1], frame.stack[i]);
+    // 50 per byte of the exponent (EIP-160)
+    if !frame.charge(50 * exponent.bit_len().div_ceil(8) as u64) {
+        return BAIL;
+    }
+    frame.stack[i] = base.wrapping_pow(exponent);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_keccak256(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(len) = as_usize(frame.stack[i]) else { return BAIL };
+    if !frame.charge(6 * words(len)) {
+        return BAIL;
+    }
+    let hash = if len == 0 {
+        KECCAK_EMPTY
+    } else {
+        let Some(offset) = as_usize(frame.stack[i + 1]) else { return BAIL };
+        if !frame.expand(offset, len) {
+            return BAIL;
+        }
+        keccak256(&frame.memory[offset..offset + len])
+    };
+    frame.stack[i] = U256::from_be_bytes(hash.0);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_calldataload(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let calldata = &*frame.calldata;
+    let offset = as_usize(frame.stack[i]).unwrap_or(usize::MAX);
+    let mut word = [0u8; 32];
+    if offset < calldata.len() {
+        let count = 32.min(calldata.len() - offset);
+        word[..count].copy_from_slice(&calldata[offset..offset + count]);
+    }
+    frame.stack[i] = U256::from_be_bytes(word);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_calldatasize(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    frame.stack[i] = U256::from((*frame.calldata).len());
+    CONTINUE
+}
+
+/// CALLDATACOPY and CODECOPY; `imm` is the opcode.
+unsafe extern "C" fn op_copy(frame: *mut Frame, s: *mut U256, imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(len) = as_usize(frame.stack[i]) else { return BAIL };
+    if !frame.charge(3 * words(len)) {
+        return BAIL;
+    }
+    if len == 0 {
+        return CONTINUE;
+    }
+    let Some(memory_offset) = as_usize(frame.stack[i + 2]) else { return BAIL };
+    let data_offset = as_usize(frame.stack[i + 1]).unwrap_or(usize::MAX);
+    if !frame.expand(memory_offset, len) {
+        return BAIL;
+    }
+
+    let data: &[u8] = if imm == opcode::CALLDATACOPY as u64 {
+        &*frame.calldata
+    } else {
+        &frame.code.code
+    };
+    let target = &mut frame.memory[memory_offset..memory_offset + len];
+    // Bytes past the end of the data read as zero
+    let available = data.len().saturating_sub(data_offset).min(len);
+    if available > 0 {
+        target[..available].copy_from_slice(&data[data_offset..data_offset + available]);
+    }
+    target[available..].fill(0);
+    CONTINUE
+}
+
+/// Block and chain values of the environment; `imm` is the opcode.
+unsafe extern "C" fn op_env(frame: *mut Frame, s: *mut U256, imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let env = (*frame.host).env();
+    frame.stack[i] = match imm as u8 {
+        opcode::COINBASE => U256::from_be_slice(env.block.coinbase.as_slice()),
+        opcode::TIMESTAMP => env.block.timestamp,
+        opcode::NUMBER => env.block.number,
+        opcode::GASLIMIT => env.block.gas_limit,
+        opcode::CHAINID => U256::from(env.cfg.chain_id),
+        _ => env.block.basefee,
+    };
+    CONTINUE
+}
+
+unsafe extern "C" fn op_mload(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(offset) = as_usize(frame.stack[i]) else { return BAIL };
+    if !frame.expand(offset, 32) {
+        return BAIL;
+    }
+    let word: [u8; 32] = frame.memory[offset..offset + 32].try_into().expect("32-byte slice");
+    frame.stack[i] = U256::from_be_bytes(word);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_mstore(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(offset) = as_usize(frame.stack[i + 1]) else { return BAIL };
+    if !frame.expand(offset, 32) {
+        return BAIL;
+    }
+    frame.memory[offset..offset + 32].copy_from_slice(&frame.stack[i].to_be_bytes::<32>());
+    CONTINUE
+}
+
+unsafe extern "C" fn op_mstore8(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(offset) = as_usize(frame.stack[i + 1]) else { return BAIL };
+    if !frame.expand(offset, 1) {
+        return BAIL;
+    }
+    frame.memory[offset] = frame.stack[i].byte(0);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_mcopy(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(len) = as_usize(frame.stack[i]) else { return BAIL };
+    if !frame.charge(3 * words(len)) {
+        return BAIL;
+    }
+    if len == 0 {
+        return CONTINUE;
+    }
+    let (Some(target), Some(source)) = (as_usize(frame.stack[i + 2]), as_usize(frame.stack[i + 1]))
+    else {
+        return BAIL;
+    };
+    if !frame.expand(target.max(source), len) {
+        return BAIL;
+    }
+    frame.memory.copy_within(source..source + len, target);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_msize(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    frame.stack[i] = U256::from(frame.memory.len());
+    CONTINUE
+}
+
+/// GAS; `imm` is the static gas already charged for the rest of the block.
+unsafe extern "C" fn op_gas(frame: *mut Frame, s: *mut U256, imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    frame.stack[i] = U256::from(frame.gas + imm);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_sload(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(load) = (*frame.host).sload(STRATEGY_ADDRESS, frame.stack[i]) else { return BAIL };
+    // EIP-2929
+    if !frame.charge(if load.is_cold { 2100 } else { 100 }) {
+        return BAIL;
+    }
+    frame.stack[i] = load.data;
+    CONTINUE
+}
+
+unsafe extern "C" fn op_sstore(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    if frame.gas <= CALL_STIPEND {
+        return BAIL;
+    }
+    let (index, value) = (frame.stack[i + 1], frame.stack[i]);
+    let Some(store) = (*frame.host).sstore(STRATEGY_ADDRESS, index, value) else { return BAIL };
+    let (cost, refund) = sstore_gas(
+        store.data.original_value,
+        store.data.present_value,
+        store.data.new_value,
+        store.is_cold,
+    );
+    if !frame.charge(cost) {
+        return BAIL;
+    }
+    frame.refund += refund;
+    CONTINUE
+}
+
+unsafe extern "C" fn op_tload(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    frame.stack[i] = (*frame.host).tload(STRATEGY_ADDRESS, frame.stack[i]);
+    CONTINUE
+}
+
+unsafe extern "C" fn op_tstore(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    (*frame.host).tstore(STRATEGY_ADDRESS, frame.stack[i + 1], frame.stack[i]);
+    CONTINUE
+}
+
+/// LOG0..LOG4; `imm` is the opcode. Logs are not kept, as in `DirectHost`.
+unsafe extern "C" fn op_log(frame: *mut Frame, s: *mut U256, imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let topics = (imm - opcode::LOG0 as u64) as usize;
+    let Some(len) = as_usize(frame.stack[i + topics]) else { return BAIL };
+    if !frame.charge((len as u64).saturating_mul(8)) {
+        return BAIL;
+    }
+    if len > 0 {
+        let Some(offset) = as_usize(frame.stack[i + topics + 1]) else { return BAIL };
+        if !frame.expand(offset, len) {
+            return BAIL;
+        }
+    }
+    CONTINUE
+}
+
+/// RETURN and REVERT: expand memory and record the output range.
+unsafe extern "C" fn op_return(frame: *mut Frame, s: *mut U256, _imm: u64) -> u32 {
+    let (frame, i) = operands(frame, s);
+    let Some(len) = as_usize(frame.stack[i]) else { return BAIL };
+    if len > 0 {
+        let Some(offset) = as_usize(frame.stack[i + 1]) else { return BAIL };
+        if !frame.expand(offset, len) {
+            return BAIL;
+        }
+        frame.output = (offset, len);
+    }
+    CONTINUE
+}
+
+impl Frame {
+    /// Charge gas; false when not enough is left.
+    #[inline]
+    fn charge(&mut self, cost: u64) -> bool {
+        match self.gas.checked_sub(cost) {
+            Some(left) => {
+                self.gas = left;
+                true
+            }
+            None => false,
+        }
+    }
+
+    /// Grow memory to cover `offset..offset + len` and charge the expansion
+    /// (3 per word plus words² / 512, as in revm's `memory_gas`).
+    fn expand(&mut self, offset: usize, len: usize) -> bool {
+        let end = offset.saturating_add(len);
+        if end <= self.memory.len() {
+            return true;
+        }
+        let cost = |words: u64| {
+            words.saturating_mul(3).saturating_add(words.saturating_mul(words) / 512)
+        };
+        let new_words = words(end);
+        if !self.charge(cost(new_words) - cost(words(self.memory.len()))) {
+            return false;
+        }
+        self.memory.resize(new_words as usize * 32, 0);
+        true
+    }
+}
+
+/// Number of 32-byte words covering `len` bytes.
+fn words(len: usize) -> u64 {
+    (len as u64).saturating_add(31) / 32
+}
+
+/// The value as a usize, if it fits.
+fn as_usize(value: U256) -> Option<usize> {
+    let limbs = value.as_limbs();
+    if limbs[1] | limbs[2] | limbs[3] != 0 {
+        return None;
+    }
+    usize::try_from(limbs[0]).ok()
+}
+
+/// The value as an index below `limit`.
+fn as_index(value: U256, limit: usize) -> Option<usize> {
+    as_usize(value).filter(|&i| i < limit)
+}
+
+/// Two's-complement magnitude.
+fn magnitude(value: U256) -> U256 {
+    if value.bit(255) {
+        value.wrapping_neg()
+    } else {
+        value
+    }
+}
+
+/// SDIV: truncates toward zero; MIN / -1 wraps to MIN.
+fn signed_div(a: U256, b: U256) -> U256 {
+    if b.is_zero() {
+        return U256::ZERO;
+    }
+    let quotient = magnitude(a) / magnitude(b);
+    if a.bit(255) != b.bit(255) {
+        quotient.wrapping_neg()
+    } else {
+        quotient
+    }
+}
+
+/// SMOD: the result takes the sign of the dividend.
+fn signed_rem(a: U256, b: U256) -> U256 {
+    if b.is_zero() {
+        return U256::ZERO;
+    }
+    let remainder = magnitude(a) % magnitude(b);
+    if a.bit(255) {
+        remainder.wrapping_neg()
+    } else {
+        remainder
+    }
+}
+
+fn signed_lt(a: U256, b: U256) -> bool {
+    match (a.bit(255), b.bit(255)) {
+        (true, false) => true,
+        (false, true) => false,
+        _ => a < b,
+    }
+}
+
+/// SIGNEXTEND: extend `value` from byte `ext` (counted from the right).
+fn sign_extend(ext: U256, value: U256) -> U256 {
+    let Some(ext) = as_index(ext, 31) else { return value };
+    let bit = 8 * ext + 7;
+    let mask = (U256::from(1) << bit) - U256::from(1);
+    if value.bit(bit) {
+        value | !mask
+    } else {
+        value & mask
+    }
+}
+
+/// SSTORE cost and refund (EIP-2200 with EIP-2929 and EIP-3529), from the
+/// slot's value at call start, its current value, the new value, and
+/// whether the slot was cold.
+fn sstore_gas(original: U256, present: U256, new: U256, is_cold: bool) -> (u64, i64) {
+    const WARM_READ: u64 = 100;
+    const SET: u64 = 20_000;
+    const RESET: u64 = 5_000 - 2_100;
+    const CLEARS_SCHEDULE: i64 = 4_800;
+
+    let cost = if new == present {
+        WARM_READ
+    } else if original == present && original.is_zero() {
+        SET
+    } else if original == present {
+        RESET
+    } else {
+        WARM_READ
+    };
+    let cost = cost + if is_cold { 2_100 } else { 0 };
+
+    let refund = if new == present {
+        0
+    } else if original == present && new.is_zero() {
+        CLEARS_SCHEDULE
+    } else {
+        let mut refund = 0;
+        if !original.is_zero() {
+            if present.is_zero() {
+                refund -= CLEARS_SCHEDULE;
+            } else if new.is_zero() {
+                refund += CLEARS_SCHEDULE;
+            }
+        }
+        if original == new {
+            refund += (if original.is_zero() { SET } else { RESET } - WARM_READ) as i64;
+        }
+        refund
+    };
+    (cost, refund)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_blocks_split_at_jumps() {
+        // PUSH1 4 JUMP INVALID JUMPDEST PUSH1 1 PUSH1 9 JUMPI STOP
+        let code = [0x60, 0x04, 0x56, 0xfe, 0x5b, 0x60, 0x01, 0x60, 0x09, 0x57, 0x00];
+        let instructions = decode(&code);
+        let blocks = basic_blocks(&instructions);
+
+        // The INVALID after the first jump is unreachable and gets no block
+        let starts: Vec<usize> = blocks.iter().map(|b| instructions[b.start].pc).collect();
+        assert_eq!(starts, vec![0, 4, 10]);
+        assert_eq!((blocks[0].gas, blocks[0].inputs, blocks[0].growth), (11, 0, 1));
+        assert_eq!((blocks[1].gas, blocks[1].inputs, blocks[1].growth), (17, 0, 2));
+    }
+
+    #[test]
+    fn test_truncated_push_is_zero_padded() {
+        let instructions = decode(&[0x61, 0x12]);
+        assert_eq!(instructions.len(), 1);
+        assert_eq!(instructions[0].value, U256::from(0x1200));
+    }
+
+    #[test]
+    fn test_signed_arithmetic() {
+        let minus = |x: u64| U256::from(x).wrapping_neg();
+        assert_eq!(signed_div(minus(7), U256::from(2)), minus(3));
+        assert_eq!(signed_rem(minus(7), U256::from(2)), minus(1));
+        let min = U256::from(1) << 255;
+        assert_eq!(signed_div(min, minus(1)), min);
+        assert!(signed_lt(minus(1), U256::ZERO));
+        assert_eq!(sign_extend(U256::ZERO, U256::from(0xff)), U256::MAX);
+        assert_eq!(sign_extend(U256::ZERO, U256::from(0x17f)), U256::from(0x7f));
+    }
+
+    #[test]
+    fn test_sstore_gas() {
+        let (zero, one, two) = (U256::ZERO, U256::from(1), U256::from(2));
+        // Set a fresh slot, then clear it again in the same call
+        assert_eq!(sstore_gas(zero, zero, one, true), (22_100, 0));
+        assert_eq!(sstore_gas(zero, one, zero, false), (100, 19_900));
+        // Clear a stored slot, then restore it
+        assert_eq!(sstore_gas(one, one, zero, true), (5_000, 4_800));
+        assert_eq!(sstore_gas(one, zero, one, false), (100, -4_800 + 2_800));
+        assert_eq!(sstore_gas(one, two, two, false), (100, 0));
+    }
+}
@@ -1,5 +1,21 @@
-//! EVM execution module using revm.
+//! Strategy execution: EVM strategies via revm, plus native fast paths.
 
 pub mod strategy;
+pub mod db;
+pub mod native;
+pub mod backend;
+pub mod stats;
+pub mod profiler;
+pub mod direct;
+pub mod jit;
+#[cfg(test)]
+pub(crate) mod test_contracts;
 
-pub use strategy::EVMStrategy;
+pub use strategy::{DeployedStrategy, EVMStrategy, StrategyCode};
+pub use db::StrategyDB;
+pub use native::FixedFeeStrategy;
+pub use backend::{ExecutionBackend, Strategy, StrategyTemplate};
+pub use stats::{CallOutcome, CallStats};
+pub use profiler::{ProfileData, ProfiledStrategy};
+pub use direct::DirectStrategy;
+pub use jit::CompiledCode;
@@ -0,0 +1,95 @@
+//! Native (non-EVM) strategy implementations.
+
+use crate::evm::stats::{CallOutcome, CallStats};
+use crate::evm::strategy::EVMError;
+use crate::types::trade_info::TradeInfo;
+use crate::types::wad::Wad;
+
+/// Strategy that always quotes the same bid and ask fee.
+///
+/// Answers `afterInitialize`/`afterSwap` in Rust without entering the EVM.
+/// With 30 bps on both sides it is equivalent to `VanillaStrategy.sol`, the
+/// normalizer that runs alongside every submission.
+#[derive(Debug, Clone)]
+pub struct FixedFeeStrategy {
+    /// Strategy name
+    name: String,
+    /// Fee when AMM buys X
+    bid_fee: Wad,
+    /// Fee when AMM sells X
+    ask_fee: Wad,
+    /// afterSwap call counter (gas is always zero)
+    stats: CallStats,
+}
+
+impl FixedFeeStrategy {
+    /// Create a fixed-fee strategy.
+    pub fn new(name: String, bid_fee: Wad, ask_fee: Wad) -> Self {
+        Self { name, bid_fee, ask_fee, stats: CallStats::default() }
+    }
+
+    /// Create a strategy charging `fee` on both sides.
+    pub fn symmetric(name: String, fee: Wad) -> Self {
+        Self::new(name, fee, fee)
+    }
+
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        &self.name
+    }
+
+    /// Initialize the strategy with starting reserves.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    pub fn after_initialize(&mut self, _initial_x: Wad, _initial_y: Wad) -> Result<(Wad, Wad), EVMError> {
+        Ok((self.bid_fee, self.ask_fee))
+    }
+
+    /// Handle a trade event and return updated fees.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    #[inline]
+    pub fn after_swap(&mut self, _trade: &TradeInfo) -> Result<(Wad, Wad), EVMError> {
+        self.stats.record(0, CallOutcome::Success);
+        Ok((self.bid_fee, self.ask_fee))
+    }
+
+    /// Get the afterSwap counters since the last reset.
+    pub fn stats(&self) -> &CallStats {
+        &self.stats
+    }
+
+    /// Reset the strategy for a new simulation (only the counters change).
+    pub fn reset(&mut self) -> Result<(), EVMError> {
+        self.stats = CallStats::default();
+        Ok(())
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_fixed_fee_is_constant() {
+        let mut strategy = FixedFeeStrategy::symmetric("Vanilla_30bps".to_string(), Wad::from_bps(30));
+
+        let (bid, ask) = strategy
+            .after_initialize(Wad::from_f64(100.0), Wad::from_f64(10000.0))
+            .unwrap();
+        assert_eq!(bid, Wad::from_bps(30));
+        assert_eq!(ask, Wad::from_bps(30));
+
+        let trade = TradeInfo::new(
+            true,
+            Wad::from_f64(1.0),
+            Wad::from_f64(99.0),
+            1,
+            Wad::from_f64(101.0),
+            Wad::from_f64(9901.0),
+        );
+        for _ in 0..10 {
+            assert_eq!(strategy.after_swap(&trade).unwrap(), (Wad::from_bps(30), Wad::from_bps(30)));
+        }
+    }
+}
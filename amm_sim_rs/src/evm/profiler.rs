@@ -0,0 +1,356 @@
+//! Opcode-level profiling of strategy `afterSwap` calls.
+//!
+//! `ProfiledStrategy` runs a deployed strategy with a revm inspector attached
+//! and accumulates, across every `afterSwap` call it makes:
+//! - executed opcodes and the gas they charged
+//! - execution count and gas per program counter
+//! - SLOAD/SSTORE counts per call
+//!
+//! The inspector slows execution down considerably, so it is only used by the
+//! `profile` entry point, never by normal batches.
+
+use std::cell::RefCell;
+use std::collections::HashMap;
+use std::rc::Rc;
+
+use revm::{
+    inspector_handle_register,
+    interpreter::{opcode, Interpreter, OpCode},
+    primitives::{Bytes, ExecutionResult, TxKind, U256},
+    Database, Evm, EvmContext, Inspector,
+};
+
+use crate::evm::db::{transact_strategy, StrategyDB};
+use crate::evm::stats::CallStats;
+use crate::evm::strategy::{
+    call_output, record_after_swap, DeployedStrategy, EVMError, CALLER_ADDRESS, GAS_LIMIT_INIT,
+    GAS_LIMIT_TRADE, STRATEGY_ADDRESS,
+};
+use crate::types::result::StrategyProfile;
+use crate::types::trade_info::{decode_fee_pair, encode_after_initialize, TradeInfo};
+use crate::types::wad::Wad;
+
+/// Counters accumulated over all profiled `afterSwap` calls.
+#[derive(Debug, Clone)]
+pub struct ProfileData {
+    /// Only afterSwap is profiled; afterInitialize runs with this off
+    recording: bool,
+    /// Executions per opcode byte
+    opcode_counts: [u64; 256],
+    /// Gas charged per opcode byte
+    opcode_gas: [u64; 256],
+    /// Executions per program counter
+    pc_counts: Vec<u64>,
+    /// Gas charged per program counter
+    pc_gas: Vec<u64>,
+    /// Profiled afterSwap calls
+    calls: u64,
+    /// Transaction gas of all profiled calls (includes intrinsic gas)
+    gas_total: u64,
+    /// SLOADs in the current call
+    call_sloads: u64,
+    /// SSTOREs in the current call
+    call_sstores: u64,
+    sload_total: u64,
+    sstore_total: u64,
+    sload_max: u64,
+    sstore_max: u64,
+}
+
+impl ProfileData {
+    /// Create empty counters sized for `code_len` bytes of runtime code.
+    pub fn new(code_len: usize) -> Self {
+        Self {
+            recording: false,
+            opcode_counts: [0; 256],
+            opcode_gas: [0; 256],
+            pc_counts: vec![0; code_len],
+            pc_gas: vec![0; code_len],
+            calls: 0,
+            gas_total: 0,
+            call_sloads: 0,
+            call_sstores: 0,
+            sload_total: 0,
+            sstore_total: 0,
+            sload_max: 0,
+            sstore_max: 0,
+        }
+    }
+
+    /// Record one executed instruction.
+    fn record_step(&mut self, pc: usize, op: u8, gas: u64) {
+        self.opcode_counts[op as usize] += 1;
+        self.opcode_gas[op as usize] += gas;
+
+        // Analysis pads the code, so execution can run past the original end
+        if pc >= self.pc_counts.len() {
+            self.pc_counts.resize(pc + 1, 0);
+            self.pc_gas.resize(pc + 1, 0);
+        }
+        self.pc_counts[pc] += 1;
+        self.pc_gas[pc] += gas;
+
+        match op {
+            opcode::SLOAD => self.call_sloads += 1,
+            opcode::SSTORE => self.call_sstores += 1,
+            _ => {}
+        }
+    }
+
+    /// Fold the storage counters of the call that just finished into the totals.
+    fn finish_call(&mut self, gas_used: u64) {
+        self.calls += 1;
+        self.gas_total += gas_used;
+        self.sload_total += self.call_sloads;
+        self.sstore_total += self.call_sstores;
+        self.sload_max = self.sload_max.max(self.call_sloads);
+        self.sstore_max = self.sstore_max.max(self.call_sstores);
+        self.call_sloads = 0;
+        self.call_sstores = 0;
+    }
+
+    /// Drop the storage counters of a call that failed before producing a result.
+    fn abandon_call(&mut self) {
+        self.call_sloads = 0;
+        self.call_sstores = 0;
+    }
+
+    /// Build the Python-facing report.
+    pub fn report(&self, name: String) -> StrategyProfile {
+        let mut opcode_counts = HashMap::new();
+        let mut opcode_gas = HashMap::new();
+        for op in 0..256usize {
+            if self.opcode_counts[op] == 0 {
+                continue;
+            }
+            let mnemonic = opcode_name(op as u8);
+            *opcode_counts.entry(mnemonic.clone()).or_insert(0) += self.opcode_counts[op];
+            *opcode_gas.entry(mnemonic).or_insert(0) += self.opcode_gas[op];
+        }
+
+        let pc_counts = self
+            .pc_counts
+            .iter()
+            .zip(self.pc_gas.iter())
+            .enumerate()
+            .filter(|(_, (&count, _))| count > 0)
+            .map(|(pc, (&count, &gas))| (pc, count, gas))
+            .collect();
+
+        StrategyProfile {
+            name,
+            calls: self.calls,
+            gas_total: self.gas_total,
+            opcode_counts,
+            opcode_gas,
+            pc_counts,
+            sload_total: self.sload_total,
+            sstore_total: self.sstore_total,
+            sload_max: self.sload_max,
+            sstore_max: self.sstore_max,
+        }
+    }
+}
+
+/// Mnemonic for an opcode byte, or its hex value if undefined.
+fn opcode_name(op: u8) -> String {
+    match OpCode::new(op) {
+        Some(code) => code.as_str().to_string(),
+        None => format!("0x{:02x}", op),
+    }
+}
+
+/// revm inspector feeding a shared `ProfileData`.
+pub struct OpcodeProfiler {
+    data: Rc<RefCell<ProfileData>>,
+    /// (pc, opcode, gas remaining) captured in `step`, consumed in `step_end`
+    pending: Option<(usize, u8, u64)>,
+}
+
+impl OpcodeProfiler {
+    fn new(data: Rc<RefCell<ProfileData>>) -> Self {
+        Self { data, pending: None }
+    }
+}
+
+impl<DB: Database> Inspector<DB> for OpcodeProfiler {
+    fn step(&mut self, interp: &mut Interpreter, _context: &mut EvmContext<DB>) {
+        self.pending = Some((
+            interp.program_counter(),
+            interp.current_opcode(),
+            interp.gas.remaining(),
+        ));
+    }
+
+    fn step_end(&mut self, interp: &mut Interpreter, _context: &mut EvmContext<DB>) {
+        if let Some((pc, op, gas_before)) = self.pending.take() {
+            let mut data = self.data.borrow_mut();
+            if data.recording {
+                let gas = gas_before.saturating_sub(interp.gas.remaining());
+                data.record_step(pc, op, gas);
+            }
+        }
+    }
+}
+
+/// EVM strategy executed with the opcode profiler attached.
+///
+/// Mirrors `EVMStrategy`, but every instance created from the same
+/// `ProfileData` handle adds to the same counters, so one report can cover
+/// several simulations.
+pub struct ProfiledStrategy {
+    name: String,
+    evm: Evm<'static, OpcodeProfiler, StrategyDB>,
+    deployed: StrategyDB,
+    data: Rc<RefCell<ProfileData>>,
+    trade_calldata: [u8; 196],
+    stats: CallStats,
+}
+
+impl ProfiledStrategy {
+    /// Create a profiled instance from a deployed snapshot.
+    pub fn new(deployed: &DeployedStrategy, data: Rc<RefCell<ProfileData>>) -> Self {
+        let evm = Evm::builder()
+            .with_db(deployed.state().clone())
+            .with_external_context(OpcodeProfiler::new(Rc::clone(&data)))
+            .modify_tx_env(|tx| {
+                tx.caller = CALLER_ADDRESS;
+                tx.transact_to = TxKind::Call(STRATEGY_ADDRESS);
+                tx.value = U256::ZERO;
+            })
+            .append_handler_register(inspector_handle_register)
+            .build();
+
+        Self {
+            name: deployed.name().to_string(),
+            evm,
+            deployed: deployed.state().clone(),
+            data,
+            trade_calldata: [0u8; 196],
+            stats: CallStats::default(),
+        }
+    }
+
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        &self.name
+    }
+
+    /// Initialize the strategy with starting reserves (not profiled).
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    pub fn after_initialize(&mut self, initial_x: Wad, initial_y: Wad) -> Result<(Wad, Wad), EVMError> {
+        let calldata = encode_after_initialize(initial_x, initial_y);
+        let result = call_output(self.execute(&calldata, GAS_LIMIT_INIT)?)?;
+
+        decode_fee_pair(&result)
+            .ok_or_else(|| EVMError::InvalidReturnData("Failed to decode fee pair".into()))
+    }
+
+    /// Handle a trade event and return updated fees, recording the profile.
+    ///
+    /// Returns (bid_fee, ask_fee) in WAD.
+    pub fn after_swap(&mut self, trade: &TradeInfo) -> Result<(Wad, Wad), EVMError> {
+        trade.encode_calldata(&mut self.trade_calldata);
+        let calldata = self.trade_calldata;
+
+        self.data.borrow_mut().recording = true;
+        let result = self.execute(&calldata, GAS_LIMIT_TRADE);
+        let mut data = self.data.borrow_mut();
+        data.recording = false;
+        let result = match result {
+            Ok(result) => result,
+            Err(err) => {
+                data.abandon_call();
+                return Err(err);
+            }
+        };
+
+        let gas_used = result.gas_used();
+        data.finish_call(gas_used);
+        drop(data);
+
+        record_after_swap(&mut self.stats, result)
+    }
+
+    /// Get the afterSwap counters of this instance.
+    pub fn stats(&self) -> &CallStats {
+        &self.stats
+    }
+
+    /// Reset the strategy for a new simulation (the profile keeps accumulating).
+    pub fn reset(&mut self) -> Result<(), EVMError> {
+        self.evm.db_mut().restore(&self.deployed);
+        self.stats = CallStats::default();
+        Ok(())
+    }
+
+    /// Copy of the current strategy storage.
+    pub fn snapshot(&self) -> StrategyDB {
+        self.evm.db().clone()
+    }
+
+    /// Restore storage captured by `snapshot()`; the stats are kept.
+    pub fn restore(&mut self, snapshot: &StrategyDB) {
+        self.evm.db_mut().restore(snapshot);
+    }
+
+    fn execute(&mut self, calldata: &[u8], gas_limit: u64) -> Result<ExecutionResult, EVMError> {
+        let tx = self.evm.tx_mut();
+        tx.data = Bytes::copy_from_slice(calldata);
+        tx.gas_limit = gas_limit;
+
+        transact_strategy(&mut self.evm)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_record_step_tracks_storage_per_call() {
+        let mut data = ProfileData::new(4);
+        data.record_step(0, opcode::SLOAD, 2100);
+        data.record_step(1, opcode::SLOAD, 100);
+        data.record_step(2, opcode::SSTORE, 2900);
+        data.finish_call(30_000);
+        data.record_step(0, opcode::SLOAD, 2100);
+        data.finish_call(25_000);
+
+        let report = data.report("test".to_string());
+        assert_eq!(report.calls, 2);
+        assert_eq!(report.gas_total, 55_000);
+        assert_eq!(report.sload_total, 3);
+        assert_eq!(report.sload_max, 2);
+        assert_eq!(report.sstore_total, 1);
+        assert_eq!(report.sstore_max, 1);
+        assert_eq!(report.opcode_counts["SLOAD"], 3);
+        assert_eq!(report.opcode_gas["SLOAD"], 4300);
+        assert_eq!(report.pc_counts, vec![(0, 2, 4200), (1, 1, 100), (2, 1, 2900)]);
+    }
+
+    #[test]
+    fn test_abandoned_call_does_not_leak_into_next() {
+        let mut data = ProfileData::new(4);
+        data.record_step(0, opcode::SLOAD, 2100);
+        data.record_step(1, opcode::SSTORE, 2900);
+        data.abandon_call();
+        data.record_step(0, opcode::SLOAD, 2100);
+        data.finish_call(25_000);
+
+        let report = data.report("test".to_string());
+        assert_eq!(report.calls, 1);
+        assert_eq!(report.sload_total, 1);
+        assert_eq!(report.sload_max, 1);
+        assert_eq!(report.sstore_total, 0);
+        assert_eq!(report.sstore_max, 0);
+    }
+
+    #[test]
+    fn test_record_step_past_code_end() {
+        let mut data = ProfileData::new(1);
+        data.record_step(5, opcode::STOP, 0);
+        assert_eq!(data.report("test".to_string()).pc_counts, vec![(5, 1, 0)]);
+    }
+}
@@ -0,0 +1,184 @@
+//! Per-strategy execution counters.
+
+use crate::types::result::StrategyStats;
+
+/// Width of one gas histogram bucket.
+pub const GAS_BUCKET_WIDTH: u64 = 1_000;
+
+/// Number of histogram buckets; covers 0..=250k gas plus one overflow bucket.
+const GAS_BUCKETS: usize = 252;
+
+/// Outcome of a single `afterSwap` call.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum CallOutcome {
+    /// Returned a decodable fee pair
+    Success,
+    /// Reverted
+    Revert,
+    /// Ran out of gas
+    OutOfGas,
+    /// Halted for another reason (invalid opcode, stack overflow, ...)
+    Halt,
+    /// Succeeded but returned data that is not a fee pair
+    InvalidReturn,
+}
+
+/// Counters for the `afterSwap` calls of one strategy in one simulation.
+///
+/// Gas is what revm reports for the whole transaction (including the
+/// intrinsic 21k and calldata cost), so it is directly comparable to the
+/// 250k trade gas limit. Percentiles come from a fixed 1k-gas histogram,
+/// so recording is allocation-free.
+#[derive(Debug, Clone)]
+pub struct CallStats {
+    calls: u64,
+    reverts: u64,
+    out_of_gas: u64,
+    halts: u64,
+    invalid_returns: u64,
+    gas_total: u64,
+    gas_max: u64,
+    histogram: [u32; GAS_BUCKETS],
+}
+
+impl Default for CallStats {
+    fn default() -> Self {
+        Self {
+            calls: 0,
+            reverts: 0,
+            out_of_gas: 0,
+            halts: 0,
+            invalid_returns: 0,
+            gas_total: 0,
+            gas_max: 0,
+            histogram: [0; GAS_BUCKETS],
+        }
+    }
+}
+
+impl CallStats {
+    /// Record one call.
+    #[inline]
+    pub fn record(&mut self, gas_used: u64, outcome: CallOutcome) {
+        self.calls += 1;
+        self.gas_total += gas_used;
+        self.gas_max = self.gas_max.max(gas_used);
+        let bucket = ((gas_used / GAS_BUCKET_WIDTH) as usize).min(GAS_BUCKETS - 1);
+        self.histogram[bucket] += 1;
+
+        match outcome {
+            CallOutcome::Success => {}
+            CallOutcome::Revert => self.reverts += 1,
+            CallOutcome::OutOfGas => self.out_of_gas += 1,
+            CallOutcome::Halt => self.halts += 1,
+            CallOutcome::InvalidReturn => self.invalid_returns += 1,
+        }
+    }
+
+    /// Number of recorded calls.
+    pub fn calls(&self) -> u64 {
+        self.calls
+    }
+
+    /// Add the counters of another set of calls.
+    pub fn merge(&mut self, other: &CallStats) {
+        self.calls += other.calls;
+        self.reverts += other.reverts;
+        self.out_of_gas += other.out_of_gas;
+        self.halts += other.halts;
+        self.invalid_returns += other.invalid_returns;
+        self.gas_total += other.gas_total;
+        self.gas_max = self.gas_max.max(other.gas_max);
+        for (count, other) in self.histogram.iter_mut().zip(other.histogram.iter()) {
+            *count += other;
+        }
+    }
+
+    /// Gas used at quantile `q` (0..=1), rounded up to the bucket bound.
+    ///
+    /// Never exceeds the observed maximum.
+    pub fn gas_percentile(&self, q: f64) -> u64 {
+        if self.calls == 0 {
+            return 0;
+        }
+        let rank = ((q * self.calls as f64).ceil() as u64).clamp(1, self.calls);
+        let mut seen = 0u64;
+        for (i, &count) in self.histogram.iter().enumerate() {
+            seen += count as u64;
+            if seen >= rank {
+                let upper = (i as u64 + 1) * GAS_BUCKET_WIDTH - 1;
+                return upper.min(self.gas_max);
+            }
+        }
+        self.gas_max
+    }
+
+    /// Snapshot the counters for Python, adding the CFMM's clamp count.
+    pub fn summarize(&self, clamped_fees: u64) -> StrategyStats {
+        StrategyStats {
+            after_swap_calls: self.calls,
+            reverts: self.reverts,
+            out_of_gas: self.out_of_gas,
+            halts: self.halts,
+            invalid_returns: self.invalid_returns,
+            gas_total: self.gas_total,
+            gas_max: self.gas_max,
+            gas_p50: self.gas_percentile(0.50),
+            gas_p99: self.gas_percentile(0.99),
+            clamped_fees,
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_record_counts_outcomes() {
+        let mut stats = CallStats::default();
+        stats.record(30_000, CallOutcome::Success);
+        stats.record(25_000, CallOutcome::Revert);
+        stats.record(250_000, CallOutcome::OutOfGas);
+        stats.record(21_500, CallOutcome::InvalidReturn);
+
+        let summary = stats.summarize(3);
+        assert_eq!(summary.after_swap_calls, 4);
+        assert_eq!(summary.reverts, 1);
+        assert_eq!(summary.out_of_gas, 1);
+        assert_eq!(summary.invalid_returns, 1);
+        assert_eq!(summary.gas_total, 326_500);
+        assert_eq!(summary.gas_max, 250_000);
+        assert_eq!(summary.clamped_fees, 3);
+    }
+
+    #[test]
+    fn test_gas_percentiles() {
+        let mut stats = CallStats::default();
+        for _ in 0..99 {
+            stats.record(22_400, CallOutcome::Success);
+        }
+        stats.record(180_000, CallOutcome::Success);
+
+        // p50 lands in the 22k bucket, p99 is still there, the max is not
+        assert_eq!(stats.gas_percentile(0.50), 22_999);
+        assert_eq!(stats.gas_percentile(0.99), 22_999);
+        assert_eq!(stats.gas_percentile(1.0), 180_000);
+        assert_eq!(CallStats::default().gas_percentile(0.5), 0);
+    }
+
+    #[test]
+    fn test_merge_matches_recording_together() {
+        let mut together = CallStats::default();
+        let mut first = CallStats::default();
+        let mut second = CallStats::default();
+        for (i, gas) in [22_000, 48_000, 23_500, 31_000, 250_000].into_iter().enumerate() {
+            let outcome = if gas == 250_000 { CallOutcome::OutOfGas } else { CallOutcome::Success };
+            together.record(gas, outcome);
+            if i < 2 { first.record(gas, outcome) } else { second.record(gas, outcome) }
+        }
+
+        first.merge(&second);
+        assert_eq!(first.summarize(0), together.summarize(0));
+    }
+}
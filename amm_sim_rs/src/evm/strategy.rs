@@ -1,14 +1,20 @@
 //! EVM strategy wrapper using revm.
 
+use std::sync::Arc;
+
+use bytes::BytesMut;
 use revm::{
+    interpreter::analysis::to_analysed,
     primitives::{
-        Address, Bytes, ExecutionResult, Output, U256,
+        Address, Bytes, ExecutionResult, Output, B256, U256,
         AccountInfo, Bytecode, TxKind,
     },
     Evm, InMemoryDB,
 };
 use thiserror::Error;
 
+use crate::evm::db::{transact_strategy, StrategyDB};
+use crate::evm::stats::{CallOutcome, CallStats};
 use crate::types::trade_info::{encode_after_initialize, decode_fee_pair, TradeInfo, SELECTOR_GET_NAME};
 use crate::types::wad::Wad;
 
@@ -29,110 +35,166 @@ pub enum EVMError {
 }
 
 /// Gas limits for strategy execution.
-const GAS_LIMIT_INIT: u64 = 250_000;
-const GAS_LIMIT_TRADE: u64 = 250_000;
+const GAS_LIMIT_DEPLOY: u64 = 10_000_000;
+pub(crate) const GAS_LIMIT_INIT: u64 = 250_000;
+pub(crate) const GAS_LIMIT_TRADE: u64 = 250_000;
 const GAS_LIMIT_NAME: u64 = 50_000;
 
 /// Fixed addresses for simulation.
-const STRATEGY_ADDRESS: Address = Address::new([
+pub(crate) const STRATEGY_ADDRESS: Address = Address::new([
     0x10, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01,
 ]);
 
-const CALLER_ADDRESS: Address = Address::new([
+pub(crate) const CALLER_ADDRESS: Address = Address::new([
     0x20, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
     0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x02,
 ]);
 
+/// Runtime bytecode of a deployed strategy.
+///
+/// Jump-destination analysis and the code hash are computed once at deploy
+/// time. The analyzed bytecode is reference-counted, so every simulation of a
+/// batch executes against the same copy instead of re-analyzing raw code.
+#[derive(Debug)]
+pub struct StrategyCode {
+    /// Analyzed runtime bytecode
+    bytecode: Bytecode,
+    /// keccak256 of the runtime bytecode
+    code_hash: B256,
+}
+
+impl StrategyCode {
+    /// Analyze raw runtime bytecode returned by the creation transaction.
+    pub(crate) fn analyze(runtime: Bytes) -> Self {
+        let bytecode = to_analysed(Bytecode::new_raw(runtime));
+        let code_hash = bytecode.hash_slow();
+        Self { bytecode, code_hash }
+    }
+
+    /// Get the runtime bytecode hash.
+    pub fn code_hash(&self) -> B256 {
+        self.code_hash
+    }
+
+    /// Length of the runtime bytecode in bytes (without analysis padding).
+    pub fn len(&self) -> usize {
+        self.bytecode.len()
+    }
+
+    /// Get the analyzed bytecode.
+    pub(crate) fn bytecode(&self) -> &Bytecode {
+        &self.bytecode
+    }
+
+    /// Account info for the strategy address (shares the analyzed code).
+    pub(crate) fn account_info(&self) -> AccountInfo {
+        AccountInfo {
+            balance: U256::ZERO,
+            nonce: 1,
+            code_hash: self.code_hash,
+            code: Some(self.bytecode.clone()),
+        }
+    }
+}
+
+/// Post-deployment snapshot of a strategy.
+///
+/// Produced once per batch by running the creation transaction and
+/// `getName()`; every simulation then starts from a copy of this state
+/// instead of redeploying. Unlike `EVMStrategy` it is `Send + Sync`, so
+/// rayon workers can share one instance.
+#[derive(Clone)]
+pub struct DeployedStrategy {
+    /// Strategy name returned by getName()
+    name: String,
+    /// Strategy code and storage right after deployment
+    db: StrategyDB,
+}
+
+impl DeployedStrategy {
+    /// Deploy bytecode once and capture the resulting state.
+    pub fn deploy(bytecode: Vec<u8>, default_name: String) -> Result<Self, EVMError> {
+        let strategy = EVMStrategy::new(bytecode, default_name)?;
+        Ok(Self {
+            name: strategy.name,
+            db: strategy.deployed,
+        })
+    }
+
+    /// Get the strategy name.
+    pub fn name(&self) -> &str {
+        &self.name
+    }
+
+    /// Get the analyzed runtime code.
+    pub fn code(&self) -> &Arc<StrategyCode> {
+        self.db.code()
+    }
+
+    /// Get the post-deployment EVM state.
+    pub(crate) fn state(&self) -> &StrategyDB {
+        &self.db
+    }
+
+    /// Create a fresh strategy from the snapshot (no EVM execution).
+    pub fn instantiate(&self) -> EVMStrategy {
+        EVMStrategy::from_state(self.name.clone(), self.db.clone())
+    }
+}
+
 /// EVM strategy executor.
 ///
 /// Wraps a Solidity AMM strategy and executes it using revm.
+///
+/// The `Evm` (handler tables, env and journal) is built once and kept for the
+/// lifetime of the strategy; each call only swaps in calldata and gas limit.
+/// State lives in a `StrategyDB`, so a call writes back just the strategy's
+/// changed slots.
 pub struct EVMStrategy {
     /// Strategy name (cached after first call)
     name: String,
-    /// Compiled bytecode (for reset)
-    bytecode: Vec<u8>,
-    /// In-memory database for EVM state
-    db: InMemoryDB,
-    /// Pre-allocated calldata buffer for after_swap (196 bytes)
-    trade_calldata: [u8; 196],
+    /// Strategy state right after deployment (for reset and clone)
+    deployed: StrategyDB,
+    /// Persistent EVM, pre-configured with caller and strategy address
+    evm: Evm<'static, (), StrategyDB>,
+    /// afterSwap calldata, handed to revm and reclaimed after every call
+    trade_calldata: Bytes,
+    /// afterSwap gas and failure counters
+    stats: CallStats,
 }
 
 impl EVMStrategy {
     /// Create a new EVM strategy from compiled bytecode.
     pub fn new(bytecode: Vec<u8>, default_name: String) -> Result<Self, EVMError> {
-        let mut strategy = Self {
-            name: default_name,
-            bytecode: bytecode.clone(),
-            db: InMemoryDB::default(),
-            trade_calldata: [0u8; 196],
-        };
-
-        strategy.deploy()?;
+        let runtime = deploy_runtime_code(&bytecode)?;
+        let db = StrategyDB::new(Arc::new(StrategyCode::analyze(runtime)));
+        let mut strategy = Self::from_state(default_name, db);
+
         strategy.fetch_name()?;
+        strategy.deployed = strategy.evm.db().clone();
 
         Ok(strategy)
     }
 
-    /// Deploy the contract to the EVM.
-    fn deploy(&mut self) -> Result<(), EVMError> {
-        // Reset database
-        self.db = InMemoryDB::default();
-
-        // Give caller some balance
-        let caller_info = AccountInfo {
-            balance: U256::from(1_000_000_000_000_000_000_000u128),
-            nonce: 0,
-            code_hash: Default::default(),
-            code: None,
-        };
-        self.db.insert_account_info(CALLER_ADDRESS, caller_info);
-
-        // First, run the deployment transaction
-        let deployed_code = {
-            let mut evm = Evm::builder()
-                .with_db(&mut self.db)
-                .modify_tx_env(|tx| {
-                    tx.caller = CALLER_ADDRESS;
-                    tx.transact_to = TxKind::Create;
-                    tx.data = Bytes::copy_from_slice(&self.bytecode);
-                    tx.value = U256::ZERO;
-                    tx.gas_limit = 10_000_000;
-                })
-                .build();
-
-            let result = evm.transact_commit()
-                .map_err(|e| EVMError::DeploymentFailed(format!("{:?}", e)))?;
-
-            match result {
-                ExecutionResult::Success { output, .. } => {
-                    match output {
-                        Output::Create(code, _) => Ok(code),
-                        Output::Call(_) => {
-                            Err(EVMError::DeploymentFailed("Expected Create output".into()))
-                        }
-                    }
-                }
-                ExecutionResult::Revert { output, .. } => {
-                    Err(EVMError::DeploymentFailed(format!("Reverted: {:?}", output)))
-                }
-                ExecutionResult::Halt { reason, .. } => {
-                    Err(EVMError::DeploymentFailed(format!("Halted: {:?}", reason)))
-                }
-            }
-        }?;
-
-        // Now insert the code at our fixed address
-        let bytecode = Bytecode::new_raw(deployed_code);
-        let account_info = AccountInfo {
-            balance: U256::ZERO,
-            nonce: 1,
-            code_hash: bytecode.hash_slow(),
-            code: Some(bytecode),
-        };
-        self.db.insert_account_info(STRATEGY_ADDRESS, account_info);
+    /// Build a strategy around an existing strategy state.
+    fn from_state(name: String, db: StrategyDB) -> Self {
+        let evm = Evm::builder()
+            .with_db(db.clone())
+            .modify_tx_env(|tx| {
+                tx.caller = CALLER_ADDRESS;
+                tx.transact_to = TxKind::Call(STRATEGY_ADDRESS);
+                tx.value = U256::ZERO;
+            })
+            .build();
 
-        Ok(())
+        Self {
+            name,
+            deployed: db,
+            evm,
+            trade_calldata: Bytes::new(),
+            stats: CallStats::default(),
+        }
     }
 
     /// Fetch the strategy name from the contract.
@@ -161,6 +223,11 @@ impl EVMStrategy {
         &self.name
     }
 
+    /// Get the analyzed runtime code.
+    pub fn code(&self) -> &Arc<StrategyCode> {
+        self.deployed.code()
+    }
+
     /// Initialize the strategy with starting reserves.
     ///
     /// Returns (bid_fee, ask_fee) in WAD.
@@ -177,61 +244,203 @@ impl EVMStrategy {
     /// Returns (bid_fee, ask_fee) in WAD.
     #[inline]
     pub fn after_swap(&mut self, trade: &TradeInfo) -> Result<(Wad, Wad), EVMError> {
-        // Encode trade info into pre-allocated buffer
-        trade.encode_calldata(&mut self.trade_calldata);
+        self.load_trade_calldata(trade);
+        let result = transact_strategy(&mut self.evm);
+        self.reclaim_trade_calldata();
 
-        // Copy calldata to avoid borrow conflict
-        let calldata = self.trade_calldata;
-        let result = self.call(&calldata, GAS_LIMIT_TRADE)?;
+        self.finish_after_swap(result?)
+    }
 
-        decode_fee_pair(&result)
-            .ok_or_else(|| EVMError::InvalidReturnData("Failed to decode fee pair".into()))
+    /// Encode `trade` into the reused calldata buffer and hand it to the EVM.
+    ///
+    /// The first step of `after_swap`, public (with the other two) so the
+    /// benchmarks can count allocations on the calldata path alone.
+    #[inline]
+    pub fn load_trade_calldata(&mut self, trade: &TradeInfo) {
+        // Take back the buffer revm released after the previous call. Once
+        // nothing else references it this is the same allocation every time.
+        let mut buffer = BytesMut::from(std::mem::take(&mut self.trade_calldata).0);
+        buffer.resize(196, 0);
+        let calldata: &mut [u8; 196] = (&mut buffer[..]).try_into()
+            .expect("calldata buffer is 196 bytes");
+        trade.encode_calldata(calldata);
+
+        let tx = self.evm.tx_mut();
+        tx.data = Bytes(buffer.freeze());
+        tx.gas_limit = GAS_LIMIT_TRADE;
+    }
+
+    /// Take the calldata buffer back from the EVM after an afterSwap call.
+    #[inline]
+    pub fn reclaim_trade_calldata(&mut self) {
+        self.trade_calldata = std::mem::take(&mut self.evm.tx_mut().data);
+    }
+
+    /// Record an afterSwap result and decode its fees.
+    ///
+    /// Decodes straight from revm's output buffer, without copying it.
+    #[inline]
+    pub fn finish_after_swap(&mut self, result: ExecutionResult) -> Result<(Wad, Wad), EVMError> {
+        record_after_swap(&mut self.stats, result)
+    }
+
+    /// Get the afterSwap counters since the last reset.
+    pub fn stats(&self) -> &CallStats {
+        &self.stats
     }
 
     /// Reset the strategy for a new simulation.
+    ///
+    /// Restores the post-deployment state; no EVM execution is needed.
     pub fn reset(&mut self) -> Result<(), EVMError> {
-        self.deploy()
+        self.evm.db_mut().restore(&self.deployed);
+        self.stats = CallStats::default();
+        Ok(())
     }
 
-    /// Make a call to the contract.
-    fn call(&mut self, calldata: &[u8], gas_limit: u64) -> Result<Vec<u8>, EVMError> {
-        let mut evm = Evm::builder()
-            .with_db(&mut self.db)
-            .modify_tx_env(|tx| {
-                tx.caller = CALLER_ADDRESS;
-                tx.transact_to = TxKind::Call(STRATEGY_ADDRESS);
-                tx.data = Bytes::copy_from_slice(calldata);
-                tx.value = U256::ZERO;
-                tx.gas_limit = gas_limit;
-            })
-            .build();
+    /// Copy of the current strategy storage.
+    pub fn snapshot(&self) -> StrategyDB {
+        self.evm.db().clone()
+    }
 
-        let result = evm.transact_commit()
-            .map_err(|e| EVMError::ExecutionFailed(format!("{:?}", e)))?;
+    /// Restore storage captured by `snapshot()`; the stats are kept.
+    pub fn restore(&mut self, snapshot: &StrategyDB) {
+        self.evm.db_mut().restore(snapshot);
+    }
 
-        match result {
-            ExecutionResult::Success { output, .. } => {
-                match output {
-                    Output::Call(data) => Ok(data.to_vec()),
-                    Output::Create(_, _) => {
-                        Err(EVMError::ExecutionFailed("Unexpected Create output".into()))
-                    }
+    /// Make a call to the contract and return its output.
+    fn call(&mut self, calldata: &[u8], gas_limit: u64) -> Result<Bytes, EVMError> {
+        let result = self.execute(calldata, gas_limit)?;
+        call_output(result)
+    }
+
+    /// Execute a call to the contract and apply its storage writes.
+    ///
+    /// Only calldata and gas limit change between calls; caller, target and
+    /// value were set once when the EVM was built.
+    pub(crate) fn execute(
+        &mut self,
+        calldata: &[u8],
+        gas_limit: u64,
+    ) -> Result<ExecutionResult, EVMError> {
+        let tx = self.evm.tx_mut();
+        tx.data = Bytes::copy_from_slice(calldata);
+        tx.gas_limit = gas_limit;
+
+        transact_strategy(&mut self.evm)
+    }
+}
+
+/// Run the creation transaction and return the runtime code it produced.
+///
+/// Deployment is the one place that needs a general database (the creation
+/// transaction runs against a funded caller), so it uses a throwaway
+/// `InMemoryDB`. The runtime code is then placed at `STRATEGY_ADDRESS`.
+fn deploy_runtime_code(bytecode: &[u8]) -> Result<Bytes, EVMError> {
+    let mut db = InMemoryDB::default();
+
+    // Give caller some balance
+    let caller_info = AccountInfo {
+        balance: U256::from(1_000_000_000_000_000_000_000u128),
+        nonce: 0,
+        code_hash: Default::default(),
+        code: None,
+    };
+    db.insert_account_info(CALLER_ADDRESS, caller_info);
+
+    let mut evm = Evm::builder()
+        .with_db(db)
+        .modify_tx_env(|tx| {
+            tx.caller = CALLER_ADDRESS;
+            tx.transact_to = TxKind::Create;
+            tx.value = U256::ZERO;
+            tx.data = Bytes::copy_from_slice(bytecode);
+            tx.gas_limit = GAS_LIMIT_DEPLOY;
+        })
+        .build();
+
+    let result = evm.transact_commit()
+        .map_err(|e| EVMError::DeploymentFailed(format!("{:?}", e)))?;
+
+    match result {
+        ExecutionResult::Success { output, .. } => {
+            match output {
+                Output::Create(code, _) => Ok(code),
+                Output::Call(_) => {
+                    Err(EVMError::DeploymentFailed("Expected Create output".into()))
                 }
             }
-            ExecutionResult::Revert { output, .. } => {
-                Err(EVMError::ExecutionFailed(format!("Reverted: {:?}", output)))
-            }
-            ExecutionResult::Halt { reason, .. } => {
-                if matches!(reason, revm::primitives::HaltReason::OutOfGas(_)) {
-                    Err(EVMError::OutOfGas)
-                } else {
-                    Err(EVMError::ExecutionFailed(format!("Halted: {:?}", reason)))
+        }
+        ExecutionResult::Revert { output, .. } => {
+            Err(EVMError::DeploymentFailed(format!("Reverted: {:?}", output)))
+        }
+        ExecutionResult::Halt { reason, .. } => {
+            Err(EVMError::DeploymentFailed(format!("Halted: {:?}", reason)))
+        }
+    }
+}
+
+/// Extract the return data of a call, turning reverts and halts into errors.
+///
+/// The output `Bytes` is returned as-is, without copying.
+pub(crate) fn call_output(result: ExecutionResult) -> Result<Bytes, EVMError> {
+    match result {
+        ExecutionResult::Success { output, .. } => {
+            match output {
+                Output::Call(data) => Ok(data),
+                Output::Create(_, _) => {
+                    Err(EVMError::ExecutionFailed("Unexpected Create output".into()))
                 }
             }
         }
+        ExecutionResult::Revert { output, .. } => {
+            Err(EVMError::ExecutionFailed(format!("Reverted: {:?}", output)))
+        }
+        ExecutionResult::Halt { reason, .. } => {
+            if matches!(reason, revm::primitives::HaltReason::OutOfGas(_)) {
+                Err(EVMError::OutOfGas)
+            } else {
+                Err(EVMError::ExecutionFailed(format!("Halted: {:?}", reason)))
+            }
+        }
     }
 }
 
+/// Record an afterSwap call in `stats` and decode the fees it returned.
+///
+/// Shared by every EVM-backed strategy so that outcomes are classified the
+/// same way whichever executor ran the call.
+pub(crate) fn record_after_swap(
+    stats: &mut CallStats,
+    result: ExecutionResult,
+) -> Result<(Wad, Wad), EVMError> {
+    let gas_used = result.gas_used();
+    let outcome = match &result {
+        ExecutionResult::Success { .. } => CallOutcome::Success,
+        ExecutionResult::Revert { .. } => CallOutcome::Revert,
+        ExecutionResult::Halt { reason, .. } => {
+            if matches!(reason, revm::primitives::HaltReason::OutOfGas(_)) {
+                CallOutcome::OutOfGas
+            } else {
+                CallOutcome::Halt
+            }
+        }
+    };
+
+    let fees = call_output(result).and_then(|data| {
+        decode_fee_pair(&data)
+            .ok_or_else(|| EVMError::InvalidReturnData("Failed to decode fee pair".into()))
+    });
+
+    let outcome = match (&fees, outcome) {
+        (Err(_), CallOutcome::Success) => CallOutcome::InvalidReturn,
+        (_, outcome) => outcome,
+    };
+    stats.record(gas_used, outcome);
+
+    fees
+}
+
 /// Convert 32-byte big-endian slice to usize.
 fn u256_to_usize(data: &[u8]) -> Option<usize> {
     if data.len() != 32 {
@@ -248,14 +457,72 @@ fn u256_to_usize(data: &[u8]) -> Option<usize> {
 
 impl Clone for EVMStrategy {
     fn clone(&self) -> Self {
-        // Create a fresh strategy from bytecode
-        Self::new(self.bytecode.clone(), self.name.clone())
-            .expect("Failed to clone EVMStrategy")
+        // Create a fresh strategy from the post-deployment state
+        Self::from_state(self.name.clone(), self.deployed.clone())
     }
 }
 
 #[cfg(test)]
 mod tests {
-    // Note: Full tests require EVM bytecode, which is complex to embed.
-    // The Python integration tests will verify correctness.
+    use super::*;
+    use crate::evm::test_contracts::{CONSTANT_FEE_STRATEGY, COUNTER_STRATEGY};
+
+    fn trade() -> TradeInfo {
+        TradeInfo::new(
+            true,
+            Wad::from_f64(1.0),
+            Wad::from_f64(100.0),
+            1,
+            Wad::from_f64(101.0),
+            Wad::from_f64(9900.0),
+        )
+    }
+
+    #[test]
+    fn test_after_swap_decodes_fees() {
+        let mut strategy =
+            EVMStrategy::new(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string()).unwrap();
+
+        let fees = strategy.after_swap(&trade()).unwrap();
+        assert_eq!(fees, (Wad::from_bps(30), Wad::from_bps(30)));
+        assert_eq!(strategy.stats().calls(), 1);
+    }
+
+    #[test]
+    fn test_storage_persists_and_resets() {
+        let deployed =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        let mut strategy = deployed.instantiate();
+
+        // getName() ran once during deployment and is part of the snapshot
+        let base = deployed.state().slots()[0].to::<i128>();
+        for i in 1..=3 {
+            let (bid, _) = strategy.after_swap(&trade()).unwrap();
+            assert_eq!(bid, Wad::new(base + i));
+        }
+
+        strategy.reset().unwrap();
+        let (bid, _) = strategy.after_swap(&trade()).unwrap();
+        assert_eq!(bid, Wad::new(base + 1));
+
+        // Instances do not share storage
+        let (bid, _) = deployed.instantiate().after_swap(&trade()).unwrap();
+        assert_eq!(bid, Wad::new(base + 1));
+    }
+
+    #[test]
+    fn test_after_swap_reuses_calldata_buffer() {
+        let mut strategy =
+            EVMStrategy::new(CONSTANT_FEE_STRATEGY.to_vec(), "ConstantFee".to_string()).unwrap();
+
+        // The first calls allocate the buffer and share it with revm
+        strategy.after_swap(&trade()).unwrap();
+        strategy.after_swap(&trade()).unwrap();
+        let buffer = strategy.trade_calldata.as_ptr();
+
+        for _ in 0..10 {
+            strategy.after_swap(&trade()).unwrap();
+            assert_eq!(strategy.trade_calldata.as_ptr(), buffer);
+        }
+    }
 }
@@ -0,0 +1,91 @@
+//! Hand-assembled strategies for unit tests.
+//!
+//! Compiled Solidity strategies are complex to embed; the Python integration
+//! tests cover those. Each constant is init code followed by the runtime.
+
+/// Returns (30 bps, 30 bps) for any call:
+///   init:    PUSH1 20 DUP1 PUSH1 11 PUSH1 0 CODECOPY PUSH1 0 RETURN
+///   runtime: PUSH7 3e15 DUP1 PUSH1 0 MSTORE PUSH1 32 MSTORE PUSH1 64 PUSH1 0 RETURN
+pub const CONSTANT_FEE_STRATEGY: [u8; 31] = [
+    0x60, 0x14, 0x80, 0x60, 0x0b, 0x60, 0x00, 0x39, 0x60, 0x00, 0xf3,
+    0x66, 0x0a, 0xa8, 0x7b, 0xee, 0x53, 0x80, 0x00, 0x80, 0x60, 0x00,
+    0x52, 0x60, 0x20, 0x52, 0x60, 0x40, 0x60, 0x00, 0xf3,
+];
+
+/// Increments slot 0 on every call and returns (slot0, slot0):
+///   runtime: PUSH1 0 SLOAD PUSH1 1 ADD DUP1 PUSH1 0 SSTORE
+///            DUP1 PUSH1 0 MSTORE PUSH1 32 MSTORE PUSH1 64 PUSH1 0 RETURN
+pub const COUNTER_STRATEGY: [u8; 33] = [
+    0x60, 0x16, 0x80, 0x60, 0x0b, 0x60, 0x00, 0x39, 0x60, 0x00, 0xf3,
+    0x60, 0x00, 0x54, 0x60, 0x01, 0x01, 0x80, 0x60, 0x00, 0x55, 0x80,
+    0x60, 0x00, 0x52, 0x60, 0x20, 0x52, 0x60, 0x40, 0x60, 0x00, 0xf3,
+];
+
+/// Stores CALLDATASIZE in slot 0, then returns 64 zero bytes for getName()
+/// and reverts for anything longer, so the afterSwap write must be undone:
+///   runtime: CALLDATASIZE PUSH1 0 SSTORE PUSH1 4 CALLDATASIZE GT PUSH1 16 JUMPI
+///            PUSH1 64 PUSH1 0 RETURN JUMPDEST PUSH1 0 DUP1 REVERT
+pub const REVERTING_STRATEGY: [u8; 32] = [
+    0x60, 0x15, 0x80, 0x60, 0x0b, 0x60, 0x00, 0x39, 0x60, 0x00, 0xf3,
+    0x36, 0x60, 0x00, 0x55, 0x60, 0x04, 0x36, 0x11, 0x60, 0x10, 0x57,
+    0x60, 0x40, 0x60, 0x00, 0xf3, 0x5b, 0x60, 0x00, 0x80, 0xfd,
+];
+
+/// Sets slots 0..n to 1 if slot 0 is zero, else clears them, where n is the
+/// first calldata word; returns 64 zero bytes. Clearing earns SSTORE
+/// refunds, and a large n runs out of gas:
+///   runtime: PUSH1 0 SLOAD ISZERO PUSH1 0 CALLDATALOAD
+///            JUMPDEST DUP1 ISZERO PUSH1 23 JUMPI PUSH1 1 SWAP1 SUB
+///            DUP2 DUP2 SSTORE PUSH1 7 JUMP
+///            JUMPDEST PUSH1 64 PUSH1 0 RETURN
+pub const TOGGLE_STRATEGY: [u8; 40] = [
+    0x60, 0x1d, 0x80, 0x60, 0x0b, 0x60, 0x00, 0x39, 0x60, 0x00, 0xf3,
+    0x60, 0x00, 0x54, 0x15, 0x60, 0x00, 0x35, 0x5b, 0x80, 0x15, 0x60,
+    0x17, 0x57, 0x60, 0x01, 0x90, 0x03, 0x81, 0x81, 0x55, 0x60, 0x07,
+    0x56, 0x5b, 0x60, 0x40, 0x60, 0x00, 0xf3,
+];
+
+/// Exercises most opcodes `jit` compiles and returns 1376 bytes of memory.
+/// With x the sum of the first three argument words, the words at
+/// 0x40..0x260 hold: -x%5, x**3, ADDMOD^MULMOD, SIGNEXTEND, SAR^SHR^SHL,
+/// BYTE and signed compares, DIV/MOD/bitwise, KECCAK256 of memory and of
+/// nothing, sizes^PC, addresses and value, block values, MLOAD after
+/// MSTORE8, 2x from an internal call (dynamic JUMP), 5x from a loop, TLOAD
+/// after TSTORE, slot 5 and GAS. It also copies calldata, code and memory
+/// (CALLDATACOPY, CODECOPY, MCOPY), toggles slot 6 (every other call earns
+/// a refund) and emits LOG1. The first two words are the fees:
+/// x and -x/3 (SDIV), each mod 1e16.
+pub const OPCODE_MIX_STRATEGY: [u8; 348] = [
+    0x61, 0x01, 0x50, 0x80, 0x60, 0x0c, 0x60, 0x00, 0x39, 0x60, 0x00,
+    0xf3, 0x60, 0x04, 0x35, 0x60, 0x24, 0x35, 0x01, 0x60, 0x44, 0x35,
+    0x01, 0x80, 0x60, 0x00, 0x52, 0x80, 0x5f, 0x03, 0x60, 0x03, 0x90,
+    0x05, 0x60, 0x20, 0x52, 0x80, 0x5f, 0x03, 0x60, 0x05, 0x90, 0x07,
+    0x60, 0x40, 0x52, 0x60, 0x03, 0x81, 0x0a, 0x60, 0x60, 0x52, 0x60,
+    0x07, 0x81, 0x80, 0x08, 0x60, 0x0b, 0x82, 0x80, 0x09, 0x18, 0x60,
+    0x80, 0x52, 0x80, 0x5f, 0x0b, 0x60, 0xa0, 0x52, 0x80, 0x5f, 0x03,
+    0x60, 0x04, 0x1d, 0x81, 0x60, 0x09, 0x1c, 0x18, 0x81, 0x60, 0xc8,
+    0x1b, 0x18, 0x60, 0xc0, 0x52, 0x80, 0x60, 0x1f, 0x1a, 0x81, 0x5f,
+    0x03, 0x82, 0x12, 0x82, 0x5f, 0x03, 0x83, 0x13, 0x1b, 0x17, 0x81,
+    0x82, 0x10, 0x82, 0x83, 0x11, 0x14, 0x01, 0x60, 0xe0, 0x52, 0x80,
+    0x60, 0x06, 0x04, 0x81, 0x60, 0x0a, 0x06, 0x02, 0x19, 0x15, 0x81,
+    0x15, 0x17, 0x81, 0x82, 0x16, 0x01, 0x81, 0x82, 0x17, 0x02, 0x61,
+    0x01, 0x00, 0x52, 0x60, 0x40, 0x5f, 0x20, 0x61, 0x01, 0x20, 0x52,
+    0x5f, 0x5f, 0x20, 0x61, 0x01, 0x40, 0x52, 0x36, 0x38, 0x1b, 0x59,
+    0x18, 0x58, 0x18, 0x61, 0x01, 0x60, 0x52, 0x30, 0x33, 0x18, 0x34,
+    0x18, 0x47, 0x18, 0x3d, 0x18, 0x61, 0x01, 0x80, 0x52, 0x42, 0x43,
+    0x46, 0x18, 0x18, 0x61, 0x01, 0xa0, 0x52, 0x36, 0x5f, 0x61, 0x03,
+    0x00, 0x37, 0x60, 0x28, 0x60, 0x03, 0x61, 0x04, 0x00, 0x39, 0x60,
+    0x40, 0x61, 0x03, 0x00, 0x61, 0x05, 0x00, 0x5e, 0x60, 0xab, 0x61,
+    0x05, 0x41, 0x53, 0x61, 0x05, 0x41, 0x51, 0x61, 0x01, 0xc0, 0x52,
+    0x60, 0xe2, 0x81, 0x61, 0x01, 0x4a, 0x56, 0x5b, 0x61, 0x01, 0xe0,
+    0x52, 0x60, 0x05, 0x5f, 0x5b, 0x81, 0x15, 0x60, 0xfb, 0x57, 0x90,
+    0x60, 0x01, 0x90, 0x03, 0x90, 0x82, 0x01, 0x60, 0xea, 0x56, 0x5b,
+    0x90, 0x50, 0x61, 0x02, 0x00, 0x52, 0x80, 0x60, 0x09, 0x5d, 0x60,
+    0x09, 0x5c, 0x60, 0x08, 0x5c, 0x01, 0x61, 0x02, 0x20, 0x52, 0x60,
+    0x05, 0x54, 0x60, 0x01, 0x01, 0x80, 0x60, 0x05, 0x55, 0x61, 0x02,
+    0x40, 0x52, 0x60, 0x06, 0x54, 0x15, 0x60, 0x06, 0x55, 0x80, 0x60,
+    0x20, 0x5f, 0xa1, 0x5a, 0x61, 0x02, 0x60, 0x52, 0x66, 0x23, 0x86,
+    0xf2, 0x6f, 0xc1, 0x00, 0x00, 0x80, 0x5f, 0x51, 0x06, 0x5f, 0x52,
+    0x60, 0x20, 0x51, 0x06, 0x60, 0x20, 0x52, 0x61, 0x05, 0x60, 0x5f,
+    0xf3, 0x5b, 0x80, 0x01, 0x90, 0x56, 0xfe,
+];
@@ -3,6 +3,11 @@
 //! High-performance simulation engine for AMM fee algorithm competition.
 //! Eliminates Python interpreter overhead in the hot path by implementing
 //! the simulation loop, AMM math, and market actors in Rust.
+//!
+//! Every entry point releases the GIL while it simulates, so other Python
+//! threads keep running and several batches can run at once. Concurrent
+//! batches with the same `n_workers` share one process-wide worker pool
+//! (`simulation::pool`).
 
 pub mod types;
 pub mod evm;
@@ -12,9 +17,22 @@ pub mod simulation;
 
 use pyo3::prelude::*;
 
-use crate::simulation::runner::{run_simulations_parallel, SimulationBatchConfig};
+use crate::evm::ExecutionBackend;
+use crate::simulation::pool::trace_memory_warning;
+use crate::simulation::runner::{
+    run_forks_parallel, run_market_parallel, run_probe, run_profile, run_replay,
+    run_simulations_parallel, run_submissions_parallel, stream_simulations_parallel,
+    ForkBatchConfig, MarketBatchConfig, SimulationBatchConfig, SubmissionsBatchConfig,
+};
 use crate::types::config::SimulationConfig;
-use crate::types::result::{BatchSimulationResult, LightweightSimResult};
+use crate::types::result::{
+    BatchSimulationResult, BatchSummary, EdgeBreakdown, LightweightSimResult, PhaseTimings,
+    ProbeResult, StrategyProfile, StrategyStats,
+};
+use crate::types::stream::BatchStream;
+use crate::types::trace::{StepTrace, TraceArray};
+use crate::types::trade_info::TradeInfo;
+use crate::types::wad::{Wad, BPS, MAX_FEE};
 
 /// Run multiple simulations in parallel using Rust engine.
 ///
@@ -22,56 +40,426 @@ use crate::types::result::{BatchSimulationResult, LightweightSimResult};
 /// * `submission_bytecode` - Compiled bytecode for the submission strategy
 /// * `baseline_bytecode` - Compiled bytecode for the baseline strategy
 /// * `configs` - List of simulation configurations (one per simulation)
-/// * `n_workers` - Number of parallel workers (0 = auto-detect)
+/// * `n_workers` - Number of parallel workers (0 = every available CPU).
+///   Every result is kept until the batch returns; a batch whose traces
+///   may not fit in memory raises a RuntimeWarning and then runs.
+/// * `baseline_fee_bps` - If set, answer baseline calls natively with this
+///   fixed fee instead of executing `baseline_bytecode` in the EVM. Only
+///   valid when the baseline is a constant-fee strategy such as VanillaStrategy.
+/// * `backend` - "revm" (default), "direct" or "compiled". "direct" runs
+///   strategies on revm's interpreter without the transaction pipeline;
+///   "compiled" also compiles their runtime code to native code once per
+///   batch and re-runs calls that halt on the interpreter. Results are
+///   identical. Code that uses unsupported opcodes falls back to "revm".
+/// * `summary_only` - Return only `summary`, `edge_breakdown` and `timings`:
+///   `results` is empty and no traces are recorded.
 ///
 /// # Returns
-/// BatchSimulationResult containing all simulation results
+/// BatchSimulationResult containing all simulation results and their
+/// BatchSummary
 #[pyfunction]
-#[pyo3(signature = (submission_bytecode, baseline_bytecode, configs, n_workers = 0))]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, configs, n_workers = 0, baseline_fee_bps = None, backend = "revm", summary_only = false))]
 fn run_batch(
+    py: Python<'_>,
     submission_bytecode: Vec<u8>,
     baseline_bytecode: Vec<u8>,
     configs: Vec<SimulationConfig>,
     n_workers: usize,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+    summary_only: bool,
 ) -> PyResult<BatchSimulationResult> {
+    if !summary_only {
+        warn_trace_memory(py, &configs, 2, 1)?;
+    }
     let batch_config = SimulationBatchConfig {
         submission_bytecode,
         baseline_bytecode,
+        baseline_fixed_fee: fixed_fee_from_bps(baseline_fee_bps)?,
         configs,
         n_workers: if n_workers == 0 { None } else { Some(n_workers) },
+        backend: backend_from_name(backend)?,
+        summary_only,
     };
 
-    run_simulations_parallel(batch_config)
+    py.allow_threads(|| run_simulations_parallel(batch_config))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Run several submissions against the baseline on the same simulations.
+///
+/// Each config's market (fair prices and retail orders) is drawn once and
+/// every submission is run against the baseline on it, so comparisons
+/// between submissions are paired by seed. The baseline is deployed once.
+/// Returns one BatchSimulationResult per submission, in the order of
+/// `submission_bytecodes`, each the same as `run_batch` would give for that
+/// submission. Other arguments are as in `run_batch`.
+#[pyfunction]
+#[pyo3(signature = (submission_bytecodes, baseline_bytecode, configs, n_workers = 0, baseline_fee_bps = None, backend = "revm", summary_only = false))]
+fn run_batches(
+    py: Python<'_>,
+    submission_bytecodes: Vec<Vec<u8>>,
+    baseline_bytecode: Vec<u8>,
+    configs: Vec<SimulationConfig>,
+    n_workers: usize,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+    summary_only: bool,
+) -> PyResult<Vec<BatchSimulationResult>> {
+    // Every config is run, and its result kept, once per submission
+    if !summary_only {
+        warn_trace_memory(py, &configs, 2, submission_bytecodes.len())?;
+    }
+    let batch_config = SubmissionsBatchConfig {
+        submission_bytecodes,
+        baseline_bytecode,
+        baseline_fixed_fee: fixed_fee_from_bps(baseline_fee_bps)?,
+        configs,
+        n_workers: if n_workers == 0 { None } else { Some(n_workers) },
+        backend: backend_from_name(backend)?,
+        summary_only,
+    };
+
+    py.allow_threads(|| run_submissions_parallel(batch_config))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Start a batch and iterate over its results as they finish.
+///
+/// Takes the same arguments as `run_batch` and returns a BatchStream at
+/// once. Iterating yields (index, LightweightSimResult) in completion order,
+/// where index is the position of the config in `configs`; the stream keeps
+/// only running totals, so memory does not grow with the batch. Stopping
+/// early (dropping the stream) stops the batch.
+#[pyfunction]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, configs, n_workers = 0, baseline_fee_bps = None, backend = "revm"))]
+fn stream_batch(
+    py: Python<'_>,
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    configs: Vec<SimulationConfig>,
+    n_workers: usize,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+) -> PyResult<BatchStream> {
+    let total = configs.len();
+    let batch_config = SimulationBatchConfig {
+        submission_bytecode,
+        baseline_bytecode,
+        baseline_fixed_fee: fixed_fee_from_bps(baseline_fee_bps)?,
+        configs,
+        n_workers: if n_workers == 0 { None } else { Some(n_workers) },
+        backend: backend_from_name(backend)?,
+        summary_only: false,
+    };
+
+    py.allow_threads(|| stream_simulations_parallel(batch_config))
+        .map(|receiver| BatchStream::new(receiver, total))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Run one simulation to `fork_step`, then continue it once per seed.
+///
+/// The first `fork_step` steps are simulated once. Each continuation starts
+/// from a snapshot of that state (reserves, accumulated fees, strategy
+/// storage, price) with the price and retail RNGs reseeded from its seed,
+/// and the continuations run in parallel. Results are in `seeds` order and
+/// cover the whole run; `result.seed` is the continuation's seed, so seeds
+/// must be distinct (a repeated seed raises RuntimeError).
+#[pyfunction]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, config, fork_step, seeds, n_workers = 0, baseline_fee_bps = None, backend = "revm"))]
+fn run_forks(
+    py: Python<'_>,
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    config: SimulationConfig,
+    fork_step: u32,
+    seeds: Vec<u64>,
+    n_workers: usize,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+) -> PyResult<BatchSimulationResult> {
+    warn_trace_memory(py, std::slice::from_ref(&config), 2, seeds.len())?;
+    let fork_config = ForkBatchConfig {
+        submission_bytecode,
+        baseline_bytecode,
+        baseline_fixed_fee: fixed_fee_from_bps(baseline_fee_bps)?,
+        config,
+        fork_step,
+        seeds,
+        n_workers: if n_workers == 0 { None } else { Some(n_workers) },
+        backend: backend_from_name(backend)?,
+    };
+
+    py.allow_threads(|| run_forks_parallel(fork_config))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Run simulations where several submissions share one market.
+///
+/// `submissions` is a list of (name, bytecode). Each simulation has one AMM
+/// per submission plus the baseline's AMM, named "normalizer", all routed
+/// the same retail flow. Results are keyed by the given names, which must
+/// be unique and not "normalizer". Other arguments are as in `run_batch`.
+#[pyfunction]
+#[pyo3(signature = (submissions, baseline_bytecode, configs, n_workers = 0, baseline_fee_bps = None, backend = "revm", summary_only = false))]
+fn run_market(
+    py: Python<'_>,
+    submissions: Vec<(String, Vec<u8>)>,
+    baseline_bytecode: Vec<u8>,
+    configs: Vec<SimulationConfig>,
+    n_workers: usize,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+    summary_only: bool,
+) -> PyResult<BatchSimulationResult> {
+    if submissions.iter().any(|(name, _)| name == "normalizer") {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+            "\"normalizer\" is reserved for the baseline",
+        ));
+    }
+
+    if !summary_only {
+        warn_trace_memory(py, &configs, submissions.len() + 1, 1)?;
+    }
+    let batch_config = MarketBatchConfig {
+        submissions,
+        baseline_bytecode,
+        baseline_fixed_fee: fixed_fee_from_bps(baseline_fee_bps)?,
+        configs,
+        n_workers: if n_workers == 0 { None } else { Some(n_workers) },
+        backend: backend_from_name(backend)?,
+        summary_only,
+    };
+
+    py.allow_threads(|| run_market_parallel(batch_config))
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
 }
 
 /// Run a single simulation and return lightweight result.
 #[pyfunction]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, config, baseline_fee_bps = None))]
 fn run_single(
+    py: Python<'_>,
     submission_bytecode: Vec<u8>,
     baseline_bytecode: Vec<u8>,
     config: SimulationConfig,
+    baseline_fee_bps: Option<u32>,
 ) -> PyResult<LightweightSimResult> {
     use crate::simulation::engine::SimulationEngine;
-    use crate::evm::strategy::EVMStrategy;
+    use crate::evm::{EVMStrategy, FixedFeeStrategy, Strategy};
 
-    let submission = EVMStrategy::new(submission_bytecode, "Submission".to_string())
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
-    let baseline = EVMStrategy::new(baseline_bytecode, "Baseline".to_string())
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+    let baseline_fixed_fee = fixed_fee_from_bps(baseline_fee_bps)?;
 
-    let mut engine = SimulationEngine::new(config);
-    engine.run(submission, baseline)
-        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+    // The strategies are built without the GIL too, on the thread that runs them
+    py.allow_threads(|| {
+        let submission = EVMStrategy::new(submission_bytecode, "Submission".to_string())
+            .map_err(|e| e.to_string())?;
+        let baseline: Strategy = match baseline_fixed_fee {
+            Some(fee) => FixedFeeStrategy::symmetric("Baseline".to_string(), fee).into(),
+            None => EVMStrategy::new(baseline_bytecode, "Baseline".to_string())
+                .map_err(|e| e.to_string())?
+                .into(),
+        };
+
+        let mut engine = SimulationEngine::new(config);
+        engine.run(submission.into(), baseline).map_err(|e| e.to_string())
+    })
+    .map_err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>)
+}
+
+/// Re-run one simulation of a batch with full tracing.
+///
+/// Pass the config (seed included) and the strategy arguments the batch
+/// was run with. Every step is captured, and with `trace_level="trades"`
+/// every trade as well (`result.trace.trades()`); "steps" captures steps
+/// only. Tracing does not change the simulation, so everything else in the
+/// result is bit-identical to the batch's result for that config.
+#[pyfunction]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, config, trace_level = "trades", baseline_fee_bps = None, backend = "revm"))]
+fn replay(
+    py: Python<'_>,
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    config: SimulationConfig,
+    trace_level: &str,
+    baseline_fee_bps: Option<u32>,
+    backend: &str,
+) -> PyResult<LightweightSimResult> {
+    let trace_trades = match trace_level {
+        "steps" => false,
+        "trades" => true,
+        other => {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "unknown trace level {:?} (expected \"steps\" or \"trades\")",
+                other
+            )))
+        }
+    };
+
+    let baseline_fixed_fee = fixed_fee_from_bps(baseline_fee_bps)?;
+    let backend = backend_from_name(backend)?;
+
+    py.allow_threads(|| {
+        run_replay(
+            submission_bytecode,
+            baseline_bytecode,
+            baseline_fixed_fee,
+            config,
+            trace_trades,
+            backend,
+        )
+    })
+    .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Profile the submission's afterSwap calls over a few simulations.
+///
+/// Runs the configs sequentially with a revm inspector attached to the
+/// submission and returns one StrategyProfile covering all of them: opcode
+/// histogram, per-pc execution counts and gas, and SLOAD/SSTORE counts.
+/// Much slower than run_batch; meant for a handful of simulations.
+#[pyfunction]
+#[pyo3(signature = (submission_bytecode, baseline_bytecode, configs, baseline_fee_bps = None))]
+fn profile(
+    py: Python<'_>,
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    configs: Vec<SimulationConfig>,
+    baseline_fee_bps: Option<u32>,
+) -> PyResult<StrategyProfile> {
+    let baseline_fixed_fee = fixed_fee_from_bps(baseline_fee_bps)?;
+
+    py.allow_threads(|| {
+        run_profile(submission_bytecode, baseline_bytecode, baseline_fixed_fee, configs)
+    })
+    .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// A hypothetical trade for `probe`:
+/// (is_buy, amount_x, amount_y, timestamp, reserve_x, reserve_y).
+type ProbeTrade = (bool, f64, f64, u64, f64, f64);
+
+/// Evaluate a strategy's fees for a grid of hypothetical trades.
+///
+/// Deploys the strategy once, calls afterInitialize(initial_x, initial_y),
+/// and replays the optional `warmup` trades. Each of `trades` is then
+/// answered from a copy of that state, so probes are independent of each
+/// other and of their order. Returns the (bid, ask) fee of every probe in
+/// a ProbeResult; failed probes have NaN fees. Probes run on the shared
+/// worker pool with `n_workers` threads (0 = every available CPU).
+#[pyfunction]
+#[pyo3(signature = (bytecode, initial_x, initial_y, trades, warmup = None, n_workers = 0, backend = "revm"))]
+fn probe(
+    py: Python<'_>,
+    bytecode: Vec<u8>,
+    initial_x: f64,
+    initial_y: f64,
+    trades: Vec<ProbeTrade>,
+    warmup: Option<Vec<ProbeTrade>>,
+    n_workers: usize,
+    backend: &str,
+) -> PyResult<ProbeResult> {
+    let backend = backend_from_name(backend)?;
+    let trades = trades.into_iter().map(trade_from_tuple).collect();
+    let warmup = warmup.unwrap_or_default().into_iter().map(trade_from_tuple).collect();
+
+    py.allow_threads(|| {
+        run_probe(
+            bytecode,
+            Wad::from_f64(initial_x),
+            Wad::from_f64(initial_y),
+            warmup,
+            trades,
+            if n_workers == 0 { None } else { Some(n_workers) },
+            backend,
+        )
+    })
+    .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))
+}
+
+/// Convert a probe tuple to a TradeInfo.
+fn trade_from_tuple(trade: ProbeTrade) -> TradeInfo {
+    let (is_buy, amount_x, amount_y, timestamp, reserve_x, reserve_y) = trade;
+    TradeInfo::new(
+        is_buy,
+        Wad::from_f64(amount_x),
+        Wad::from_f64(amount_y),
+        timestamp,
+        Wad::from_f64(reserve_x),
+        Wad::from_f64(reserve_y),
+    )
+}
+
+/// Convert an optional fee in basis points to WAD, rejecting fees above MAX_FEE.
+fn fixed_fee_from_bps(fee_bps: Option<u32>) -> PyResult<Option<Wad>> {
+    match fee_bps {
+        None => Ok(None),
+        Some(bps) => {
+            let fee = Wad::from_bps(bps as i128);
+            if fee.raw() > MAX_FEE {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                    "baseline_fee_bps must be at most {} (got {})",
+                    MAX_FEE / BPS,
+                    bps
+                )));
+            }
+            Ok(Some(fee))
+        }
+    }
+}
+
+/// Issue a RuntimeWarning if the traces of a batch may not fit in memory.
+///
+/// Fails only when the warnings filter turns the warning into an error.
+fn warn_trace_memory(
+    py: Python<'_>,
+    configs: &[SimulationConfig],
+    n_amms: usize,
+    runs_per_config: usize,
+) -> PyResult<()> {
+    match trace_memory_warning(configs, n_amms, runs_per_config) {
+        Some(message) => {
+            let category = py.get_type_bound::<pyo3::exceptions::PyRuntimeWarning>();
+            PyErr::warn_bound(py, category.as_any(), &message, 1)
+        }
+        None => Ok(()),
+    }
+}
+
+/// Parse an execution backend name.
+fn backend_from_name(name: &str) -> PyResult<ExecutionBackend> {
+    ExecutionBackend::from_name(name).ok_or_else(|| {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+            "backend must be 'revm', 'direct' or 'compiled' (got '{}')",
+            name
+        ))
+    })
 }
 
 /// Python module definition
 #[pymodule]
 fn amm_sim_rs(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(run_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(run_batches, m)?)?;
+    m.add_function(wrap_pyfunction!(stream_batch, m)?)?;
+    m.add_function(wrap_pyfunction!(run_forks, m)?)?;
+    m.add_function(wrap_pyfunction!(run_market, m)?)?;
     m.add_function(wrap_pyfunction!(run_single, m)?)?;
+    m.add_function(wrap_pyfunction!(replay, m)?)?;
+    m.add_function(wrap_pyfunction!(profile, m)?)?;
+    m.add_function(wrap_pyfunction!(probe, m)?)?;
     m.add_class::<SimulationConfig>()?;
     m.add_class::<LightweightSimResult>()?;
     m.add_class::<BatchSimulationResult>()?;
+    m.add_class::<BatchStream>()?;
+    m.add_class::<BatchSummary>()?;
+    m.add_class::<StrategyStats>()?;
+    m.add_class::<StrategyProfile>()?;
+    m.add_class::<ProbeResult>()?;
+    m.add_class::<PhaseTimings>()?;
+    m.add_class::<EdgeBreakdown>()?;
+    m.add_class::<StepTrace>()?;
+    m.add_class::<TraceArray>()?;
     Ok(())
 }
@@ -5,8 +5,8 @@ use crate::amm::CFMM;
 /// Result of an arbitrage attempt.
 #[derive(Debug, Clone)]
 pub struct ArbResult {
-    /// AMM name
-    pub amm_name: String,
+    /// Index of the AMM in the simulation's AMM list
+    pub amm_index: usize,
     /// Profit from the arbitrage
     pub profit: f64,
     /// Side: "buy" or "sell" from AMM perspective
@@ -15,6 +15,8 @@ pub struct ArbResult {
     pub amount_x: f64,
     /// Amount of Y traded
     pub amount_y: f64,
+    /// Fee charged on the trade (ask fee if the AMM sells X, bid fee otherwise)
+    pub fee: f64,
 }
 
 /// Arbitrageur that extracts profit from mispriced AMMs.
@@ -31,17 +33,23 @@ impl Arbitrageur {
         Self
     }
 
-    /// Find and execute the optimal arbitrage trade.
-    pub fn execute_arb(&self, amm: &mut CFMM, fair_price: f64, timestamp: u64) -> Option<ArbResult> {
+    /// Find and execute the optimal arbitrage trade on the AMM at `amm_index`.
+    pub fn execute_arb(
+        &self,
+        amm_index: usize,
+        amm: &mut CFMM,
+        fair_price: f64,
+        timestamp: u64,
+    ) -> Option<ArbResult> {
         let (rx, ry) = amm.reserves();
         let spot_price = ry / rx;
 
         if spot_price < fair_price {
             // AMM underprices X - buy X from AMM (AMM sells X)
-            self.compute_buy_arb(amm, fair_price, timestamp)
+            self.compute_buy_arb(amm_index, amm, fair_price, timestamp)
         } else if spot_price > fair_price {
             // AMM overprices X - sell X to AMM (AMM buys X)
-            self.compute_sell_arb(amm, fair_price, timestamp)
+            self.compute_sell_arb(amm_index, amm, fair_price, timestamp)
         } else {
             None
         }
@@ -51,7 +59,13 @@ impl Arbitrageur {
     ///
     /// Maximize profit = Δx * p - Y_paid
     /// Closed-form (fee-on-input): Δx_out = x - sqrt(k / (γ·p))
-    fn compute_buy_arb(&self, amm: &mut CFMM, fair_price: f64, timestamp: u64) -> Option<ArbResult> {
+    fn compute_buy_arb(
+        &self,
+        amm_index: usize,
+        amm: &mut CFMM,
+        fair_price: f64,
+        timestamp: u64,
+    ) -> Option<ArbResult> {
         let (rx, ry) = amm.reserves();
         let k = rx * ry;
         let fee = amm.fees().ask_fee.to_f64();
@@ -89,11 +103,12 @@ impl Arbitrageur {
         let _trade = amm.execute_sell_x(amount_x, timestamp)?;
 
         Some(ArbResult {
-            amm_name: amm.name.clone(),
+            amm_index,
             profit,
             side: "sell", // AMM sells X
             amount_x,
             amount_y: total_y,
+            fee,
         })
     }
 
@@ -101,7 +116,13 @@ impl Arbitrageur {
     ///
     /// Maximize profit = Y_received - Δx * p
     /// Closed-form (fee-on-input): Δx_in = (sqrt(k·γ / p) - x) / γ
-    fn compute_sell_arb(&self, amm: &mut CFMM, fair_price: f64, timestamp: u64) -> Option<ArbResult> {
+    fn compute_sell_arb(
+        &self,
+        amm_index: usize,
+        amm: &mut CFMM,
+        fair_price: f64,
+        timestamp: u64,
+    ) -> Option<ArbResult> {
         let (rx, ry) = amm.reserves();
         let k = rx * ry;
         let fee = amm.fees().bid_fee.to_f64();
@@ -138,18 +159,20 @@ impl Arbitrageur {
         let _trade = amm.execute_buy_x(amount_x, timestamp)?;
 
         Some(ArbResult {
-            amm_name: amm.name.clone(),
+            amm_index,
             profit,
             side: "buy", // AMM buys X
             amount_x,
             amount_y: y_out,
+            fee,
         })
     }
 
     /// Execute arbitrage on multiple AMMs.
     pub fn arbitrage_all(&self, amms: &mut [CFMM], fair_price: f64, timestamp: u64) -> Vec<ArbResult> {
         amms.iter_mut()
-            .filter_map(|amm| self.execute_arb(amm, fair_price, timestamp))
+            .enumerate()
+            .filter_map(|(i, amm)| self.execute_arb(i, amm, fair_price, timestamp))
             .collect()
     }
 }
@@ -12,6 +12,7 @@ use rand_pcg::Pcg64;
 /// - mu is the drift
 /// - sigma is the per-step volatility
 /// - dW is a Wiener process increment
+#[derive(Debug, Clone)]
 pub struct GBMPriceProcess {
     /// Current price
     current_price: f64,
@@ -66,6 +67,11 @@ impl GBMPriceProcess {
         self.current_price
     }
 
+    /// Restart the random stream from `seed`, keeping the current price.
+    pub fn reseed(&mut self, seed: u64) {
+        self.rng = Pcg64::seed_from_u64(seed);
+    }
+
     /// Reset the price process.
     pub fn reset(&mut self, initial_price: f64, seed: Option<u64>) {
         self.current_price = initial_price;
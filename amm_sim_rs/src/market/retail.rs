@@ -18,6 +18,7 @@ pub struct RetailOrder {
 /// Retail traders arrive according to a Poisson process and
 /// submit orders of random size. They are uninformed and
 /// trade randomly (buy or sell with equal probability by default).
+#[derive(Debug, Clone)]
 pub struct RetailTrader {
     /// Expected number of trades per time step (lambda)
     #[allow(dead_code)]
@@ -73,14 +74,22 @@ impl RetailTrader {
     /// Generate retail orders for one time step.
     #[inline]
     pub fn generate_orders(&mut self) -> Vec<RetailOrder> {
-        // Number of arrivals follows Poisson distribution
-        let n_arrivals = self.poisson.sample(&mut self.rng) as usize;
+        let mut orders = Vec::new();
+        self.generate_orders_into(&mut orders);
+        orders
+    }
 
-        if n_arrivals == 0 {
-            return Vec::new();
-        }
+    /// Generate retail orders for one time step into `orders`, replacing its contents.
+    ///
+    /// Draws the same random numbers as `generate_orders`, so both give the
+    /// same flow for the same seed.
+    #[inline]
+    pub fn generate_orders_into(&mut self, orders: &mut Vec<RetailOrder>) {
+        orders.clear();
 
-        let mut orders = Vec::with_capacity(n_arrivals);
+        // Number of arrivals follows Poisson distribution
+        let n_arrivals = self.poisson.sample(&mut self.rng) as usize;
+        orders.reserve(n_arrivals);
 
         for _ in 0..n_arrivals {
             // Lognormally distributed sizes
@@ -95,8 +104,6 @@ impl RetailTrader {
 
             orders.push(RetailOrder { side, size });
         }
-
-        orders
     }
 
     /// Reset the random state.
@@ -6,14 +6,16 @@ use crate::market::retail::RetailOrder;
 /// Result of routing a trade to an AMM.
 #[derive(Debug, Clone)]
 pub struct RoutedTrade {
-    /// AMM name
-    pub amm_name: String,
+    /// Index of the AMM in the slice passed to the router
+    pub amm_index: usize,
     /// Amount of Y spent (buy) or received (sell)
     pub amount_y: f64,
     /// Amount of X traded
     pub amount_x: f64,
     /// True if AMM buys X (trader sells X)
     pub amm_buys_x: bool,
+    /// Fee charged on the trade (bid fee if the AMM buys X, ask fee otherwise)
+    pub fee: f64,
 }
 
 /// Routes retail orders optimally across AMMs.
@@ -23,7 +25,8 @@ pub struct RoutedTrade {
 /// the trader and creates fair competition between AMMs based on their fees.
 ///
 /// For constant product AMMs (xy=k), the optimal split can be computed
-/// analytically rather than using numerical methods.
+/// analytically rather than using numerical methods: in closed form for two
+/// AMMs and by water-filling for more.
 pub struct OrderRouter;
 
 impl OrderRouter {
@@ -116,6 +119,53 @@ impl OrderRouter {
         (x1_amount, x2_amount)
     }
 
+    /// Split an order across any number of AMMs so post-trade marginal prices
+    /// are equal (water-filling).
+    ///
+    /// Each AMM is given as (A_i, r_i, γ_i): r_i is its reserve of the input
+    /// token and A_i = sqrt(x_i * γ_i * y_i). Putting Δ_i into AMM i leaves a
+    /// marginal output of A_i² / (r_i + γ_i * Δ_i)², so equal marginals mean
+    /// r_i + γ_i * Δ_i = A_i * s for a common level s, i.e.
+    /// Δ_i = max(0, (A_i * s - r_i) / γ_i). AMMs join in increasing order of
+    /// r_i / A_i while the level stays above the next one's threshold, which
+    /// takes O(N log N). The result is in input order and sums to `total`.
+    fn water_fill(pools: &[(f64, f64, f64)], total: f64) -> Vec<f64> {
+        let mut amounts = vec![0.0; pools.len()];
+        let mut order: Vec<usize> = (0..pools.len())
+            .filter(|&i| pools[i].0 > 0.0 && pools[i].2 > 0.0)
+            .collect();
+        order.sort_by(|&i, &j| {
+            let (a_i, r_i, _) = pools[i];
+            let (a_j, r_j, _) = pools[j];
+            (r_i / a_i).total_cmp(&(r_j / a_j))
+        });
+
+        // Water level s over the active prefix: Σ (A_i s - r_i) / γ_i = total
+        let mut sum_r = 0.0;
+        let mut sum_a = 0.0;
+        let mut level = 0.0;
+        let mut active = 0;
+        for &i in &order {
+            let (a, r, gamma) = pools[i];
+            let next_r = sum_r + r / gamma;
+            let next_a = sum_a + a / gamma;
+            let next_level = (total + next_r) / next_a;
+            if next_level <= r / a {
+                break;
+            }
+            sum_r = next_r;
+            sum_a = next_a;
+            level = next_level;
+            active += 1;
+        }
+
+        for &i in &order[..active] {
+            let (a, r, gamma) = pools[i];
+            amounts[i] = ((a * level - r) / gamma).max(0.0);
+        }
+        amounts
+    }
+
     /// Route a single retail order across AMMs.
     pub fn route_order(
         &self,
@@ -124,57 +174,65 @@ impl OrderRouter {
         fair_price: f64,
         timestamp: u64,
     ) -> Vec<RoutedTrade> {
-        if amms.is_empty() {
-            return Vec::new();
-        }
-
-        if amms.len() == 1 {
-            return self.route_to_single_amm(order, &mut amms[0], fair_price, timestamp);
-        }
+        let mut trades = Vec::new();
+        self.route_order_into(order, amms, fair_price, timestamp, &mut trades);
+        trades
+    }
 
-        // For 2 AMMs, use optimal splitting
-        if amms.len() == 2 {
-            return self.route_to_two_amms(order, amms, fair_price, timestamp);
+    /// Route a single retail order across AMMs, appending its trades to `trades`.
+    pub fn route_order_into(
+        &self,
+        order: &RetailOrder,
+        amms: &mut [CFMM],
+        fair_price: f64,
+        timestamp: u64,
+        trades: &mut Vec<RoutedTrade>,
+    ) {
+        match amms.len() {
+            0 => {}
+            1 => self.route_to_single_amm(order, 0, &mut amms[0], fair_price, timestamp, trades),
+            // For 2 AMMs, use optimal splitting
+            2 => self.route_to_two_amms(order, amms, fair_price, timestamp, trades),
+            // For >2 AMMs, solve the split for all of them at once
+            _ => self.route_to_many_amms(order, amms, fair_price, timestamp, trades),
         }
-
-        // For >2 AMMs, use iterative pairwise splitting
-        // (Simplified - true optimal would require solving simultaneously)
-        self.route_to_many_amms(order, amms, fair_price, timestamp)
     }
 
     fn route_to_single_amm(
         &self,
         order: &RetailOrder,
+        amm_index: usize,
         amm: &mut CFMM,
         fair_price: f64,
         timestamp: u64,
-    ) -> Vec<RoutedTrade> {
-        let mut trades = Vec::new();
-
+        trades: &mut Vec<RoutedTrade>,
+    ) {
         if order.side == "buy" {
             // Trader wants to buy X, spending Y
+            let fee = amm.fees().ask_fee.to_f64();
             if let Some(result) = amm.execute_buy_x_with_y(order.size, timestamp) {
                 trades.push(RoutedTrade {
-                    amm_name: amm.name.clone(),
+                    amm_index,
                     amount_y: order.size,
                     amount_x: result.trade_info.amount_x.to_f64(),
                     amm_buys_x: false,
+                    fee,
                 });
             }
         } else {
             // Trader wants to sell X, receiving Y
             let total_x = order.size / fair_price;
+            let fee = amm.fees().bid_fee.to_f64();
             if let Some(result) = amm.execute_buy_x(total_x, timestamp) {
                 trades.push(RoutedTrade {
-                    amm_name: amm.name.clone(),
+                    amm_index,
                     amount_y: result.trade_info.amount_y.to_f64(),
                     amount_x: total_x,
                     amm_buys_x: true,
+                    fee,
                 });
             }
         }
-
-        trades
     }
 
     fn route_to_two_amms(
@@ -183,8 +241,8 @@ impl OrderRouter {
         amms: &mut [CFMM],
         fair_price: f64,
         timestamp: u64,
-    ) -> Vec<RoutedTrade> {
-        let mut trades = Vec::new();
+        trades: &mut Vec<RoutedTrade>,
+    ) {
         const MIN_AMOUNT: f64 = 0.0001;
 
         // Split amms mutably
@@ -196,23 +254,27 @@ impl OrderRouter {
             let (y1, y2) = self.split_buy_two_amms(amm1, amm2, order.size);
 
             if y1 > MIN_AMOUNT {
+                let fee = amm1.fees().ask_fee.to_f64();
                 if let Some(result) = amm1.execute_buy_x_with_y(y1, timestamp) {
                     trades.push(RoutedTrade {
-                        amm_name: amm1.name.clone(),
+                        amm_index: 0,
                         amount_y: y1,
                         amount_x: result.trade_info.amount_x.to_f64(),
                         amm_buys_x: false,
+                        fee,
                     });
                 }
             }
 
             if y2 > MIN_AMOUNT {
+                let fee = amm2.fees().ask_fee.to_f64();
                 if let Some(result) = amm2.execute_buy_x_with_y(y2, timestamp) {
                     trades.push(RoutedTrade {
-                        amm_name: amm2.name.clone(),
+                        amm_index: 1,
                         amount_y: y2,
                         amount_x: result.trade_info.amount_x.to_f64(),
                         amm_buys_x: false,
+                        fee,
                     });
                 }
             }
@@ -222,29 +284,31 @@ impl OrderRouter {
             let (x1, x2) = self.split_sell_two_amms(amm1, amm2, total_x);
 
             if x1 > MIN_AMOUNT {
+                let fee = amm1.fees().bid_fee.to_f64();
                 if let Some(result) = amm1.execute_buy_x(x1, timestamp) {
                     trades.push(RoutedTrade {
-                        amm_name: amm1.name.clone(),
+                        amm_index: 0,
                         amount_y: result.trade_info.amount_y.to_f64(),
                         amount_x: x1,
                         amm_buys_x: true,
+                        fee,
                     });
                 }
             }
 
             if x2 > MIN_AMOUNT {
+                let fee = amm2.fees().bid_fee.to_f64();
                 if let Some(result) = amm2.execute_buy_x(x2, timestamp) {
                     trades.push(RoutedTrade {
-                        amm_name: amm2.name.clone(),
+                        amm_index: 1,
                         amount_y: result.trade_info.amount_y.to_f64(),
                         amount_x: x2,
                         amm_buys_x: true,
+                        fee,
                     });
                 }
             }
         }
-
-        trades
     }
 
     fn route_to_many_amms(
@@ -253,13 +317,65 @@ impl OrderRouter {
         amms: &mut [CFMM],
         fair_price: f64,
         timestamp: u64,
-    ) -> Vec<RoutedTrade> {
-        // Simplified: just use first two AMMs
-        // Full implementation would need recursive splitting
-        if amms.len() >= 2 {
-            self.route_to_two_amms(order, &mut amms[0..2], fair_price, timestamp)
+        trades: &mut Vec<RoutedTrade>,
+    ) {
+        const MIN_AMOUNT: f64 = 0.0001;
+
+        if order.side == "buy" {
+            // Trader wants to buy X, spending Y: Y is the input token
+            let pools: Vec<(f64, f64, f64)> = amms
+                .iter()
+                .map(|amm| {
+                    let (x, y) = amm.reserves();
+                    let gamma = 1.0 - amm.fees().ask_fee.to_f64();
+                    ((x * gamma * y).sqrt(), y, gamma)
+                })
+                .collect();
+            let splits = Self::water_fill(&pools, order.size);
+
+            for (amm_index, (amm, &amount_y)) in amms.iter_mut().zip(splits.iter()).enumerate() {
+                if amount_y <= MIN_AMOUNT {
+                    continue;
+                }
+                let fee = amm.fees().ask_fee.to_f64();
+                if let Some(result) = amm.execute_buy_x_with_y(amount_y, timestamp) {
+                    trades.push(RoutedTrade {
+                        amm_index,
+                        amount_y,
+                        amount_x: result.trade_info.amount_x.to_f64(),
+                        amm_buys_x: false,
+                        fee,
+                    });
+                }
+            }
         } else {
-            self.route_to_single_amm(order, &mut amms[0], fair_price, timestamp)
+            // Trader wants to sell X, receiving Y: X is the input token
+            let total_x = order.size / fair_price;
+            let pools: Vec<(f64, f64, f64)> = amms
+                .iter()
+                .map(|amm| {
+                    let (x, y) = amm.reserves();
+                    let gamma = 1.0 - amm.fees().bid_fee.to_f64();
+                    ((y * gamma * x).sqrt(), x, gamma)
+                })
+                .collect();
+            let splits = Self::water_fill(&pools, total_x);
+
+            for (amm_index, (amm, &amount_x)) in amms.iter_mut().zip(splits.iter()).enumerate() {
+                if amount_x <= MIN_AMOUNT {
+                    continue;
+                }
+                let fee = amm.fees().bid_fee.to_f64();
+                if let Some(result) = amm.execute_buy_x(amount_x, timestamp) {
+                    trades.push(RoutedTrade {
+                        amm_index,
+                        amount_y: result.trade_info.amount_y.to_f64(),
+                        amount_x,
+                        amm_buys_x: true,
+                        fee,
+                    });
+                }
+            }
         }
     }
 
@@ -272,13 +388,25 @@ impl OrderRouter {
         timestamp: u64,
     ) -> Vec<RoutedTrade> {
         let mut all_trades = Vec::new();
+        self.route_orders_into(orders, amms, fair_price, timestamp, &mut all_trades);
+        all_trades
+    }
 
+    /// Route multiple orders, appending their trades to `trades`.
+    ///
+    /// The engine passes the same buffer every step so routing does not
+    /// allocate once it has grown to the busiest step.
+    pub fn route_orders_into(
+        &self,
+        orders: &[RetailOrder],
+        amms: &mut [CFMM],
+        fair_price: f64,
+        timestamp: u64,
+        trades: &mut Vec<RoutedTrade>,
+    ) {
         for order in orders {
-            let trades = self.route_order(order, amms, fair_price, timestamp);
-            all_trades.extend(trades);
+            self.route_order_into(order, amms, fair_price, timestamp, trades);
         }
-
-        all_trades
     }
 }
 
@@ -291,6 +419,15 @@ impl Default for OrderRouter {
 #[cfg(test)]
 mod tests {
     use super::*;
+    use crate::evm::native::FixedFeeStrategy;
+    use crate::types::wad::Wad;
+
+    fn fixed_fee_amm(bps: i128) -> CFMM {
+        let strategy = FixedFeeStrategy::symmetric(format!("fixed_{}", bps), Wad::from_bps(bps));
+        let mut amm = CFMM::new(strategy.into(), 1000.0, 1000.0);
+        amm.initialize().unwrap();
+        amm
+    }
 
     #[test]
     fn test_split_formulas() {
@@ -315,4 +452,85 @@ mod tests {
         // Should be approximately equal split
         assert!((y1_amount - 50.0).abs() < 1.0);
     }
+
+    #[test]
+    fn test_routed_trades_carry_amm_index() {
+        let router = OrderRouter::new();
+        let mut amms = vec![fixed_fee_amm(30), fixed_fee_amm(30)];
+        let order = RetailOrder { side: "buy", size: 10.0 };
+
+        let trades = router.route_order(&order, &mut amms, 1.0, 0);
+        let indices: Vec<usize> = trades.iter().map(|trade| trade.amm_index).collect();
+        assert_eq!(indices, vec![0, 1]);
+
+        let trades = router.route_order(&order, &mut amms[1..], 1.0, 1);
+        assert_eq!(trades.len(), 1);
+        assert_eq!(trades[0].amm_index, 0);
+    }
+
+    #[test]
+    fn test_water_fill_matches_two_amm_split() {
+        let router = OrderRouter::new();
+        let amms = [fixed_fee_amm(30), fixed_fee_amm(80)];
+        let (y1, y2) = router.split_buy_two_amms(&amms[0], &amms[1], 50.0);
+
+        let pools: Vec<(f64, f64, f64)> = amms
+            .iter()
+            .map(|amm| {
+                let (x, y) = amm.reserves();
+                let gamma = 1.0 - amm.fees().ask_fee.to_f64();
+                ((x * gamma * y).sqrt(), y, gamma)
+            })
+            .collect();
+        let split = OrderRouter::water_fill(&pools, 50.0);
+        assert!((split[0] - y1).abs() < 1e-9);
+        assert!((split[1] - y2).abs() < 1e-9);
+    }
+
+    #[test]
+    fn test_water_fill_equalizes_marginal_prices() {
+        // (A, r, gamma) for pools with different depths and fees
+        let pool = |x: f64, y: f64, fee: f64| {
+            let gamma = 1.0 - fee;
+            ((x * gamma * y).sqrt(), y, gamma)
+        };
+        let pools = [
+            pool(100.0, 10_000.0, 0.003),
+            pool(50.0, 5_000.0, 0.001),
+            pool(200.0, 20_000.0, 0.005),
+            // Far worse price: stays out of a small order
+            pool(100.0, 20_000.0, 0.003),
+        ];
+        let total = 40.0;
+        let split = OrderRouter::water_fill(&pools, total);
+
+        assert!((split.iter().sum::<f64>() - total).abs() < 1e-9);
+        assert_eq!(split[3], 0.0);
+
+        // Marginal output A² / (r + γΔ)² is the same for every active pool
+        let marginal = |i: usize| {
+            let (a, r, gamma) = pools[i];
+            (a / (r + gamma * split[i])).powi(2)
+        };
+        for i in 1..3 {
+            assert!(split[i] > 0.0);
+            assert!((marginal(i) - marginal(0)).abs() < 1e-12);
+        }
+        // The idle pool's marginal at zero is below the common level
+        assert!(marginal(3) < marginal(0));
+    }
+
+    #[test]
+    fn test_routes_across_all_amms() {
+        let router = OrderRouter::new();
+        let mut amms = vec![fixed_fee_amm(30), fixed_fee_amm(30), fixed_fee_amm(30)];
+        let order = RetailOrder { side: "sell", size: 30.0 };
+
+        let trades = router.route_order(&order, &mut amms, 1.0, 0);
+        let indices: Vec<usize> = trades.iter().map(|trade| trade.amm_index).collect();
+        assert_eq!(indices, vec![0, 1, 2]);
+        for trade in &trades {
+            assert!((trade.amount_x - 10.0).abs() < 1e-9);
+        }
+    }
 }
@@ -1,15 +1,18 @@
 //! Main simulation engine.
 
 use std::collections::HashMap;
+use std::time::Instant;
 
-use crate::amm::CFMM;
-use crate::evm::EVMStrategy;
-use crate::market::{Arbitrageur, GBMPriceProcess, OrderRouter, RetailTrader};
-use crate::types::config::SimulationConfig;
-use crate::types::result::{LightweightSimResult, LightweightStepResult};
+use crate::amm::{AmmCheckpoint, CFMM};
+use crate::evm::Strategy;
+use crate::market::router::RoutedTrade;
+use crate::market::{Arbitrageur, GBMPriceProcess, OrderRouter, RetailOrder, RetailTrader};
+use crate::types::config::{FeeUpdates, SimulationConfig};
+use crate::types::result::{EdgeBreakdown, LightweightSimResult, PhaseTimings};
+use crate::types::trace::{StepTrace, TraceData, TradeRow};
 
 /// Error type for simulation.
-#[derive(Debug)]
+#[derive(Debug, Clone)]
 pub enum SimulationError {
     EVMError(String),
     InvalidConfig(String),
@@ -31,7 +34,11 @@ impl std::error::Error for SimulationError {}
 /// Runs a simulation with the following loop per step:
 /// 1. Generate new fair price via GBM
 /// 2. Arbitrageur extracts profit from each AMM
-/// 3. Retail orders arrive and are routed to best AMM
+/// 3. Retail orders arrive and are split across the AMMs
+///
+/// Per-step results are recorded according to `SimulationConfig.capture`,
+/// every trade when `SimulationConfig.trace_trades` is set, and per-phase
+/// wall time when `SimulationConfig.timings` is set.
 pub struct SimulationEngine {
     config: SimulationConfig,
 }
@@ -45,13 +52,224 @@ impl SimulationEngine {
     /// Run a complete simulation.
     pub fn run(
         &mut self,
-        submission: EVMStrategy,
-        baseline: EVMStrategy,
+        submission: Strategy,
+        baseline: Strategy,
+    ) -> Result<LightweightSimResult, SimulationError> {
+        self.run_market(vec![
+            ("submission".to_string(), submission),
+            ("normalizer".to_string(), baseline),
+        ])
+    }
+
+    /// Run a complete simulation with any number of AMMs in one market.
+    ///
+    /// Each strategy gets its own AMM with the configured initial reserves.
+    /// Retail flow is split across all of them by the router and each is
+    /// arbitraged against the fair price. Results are keyed by the given
+    /// names, which must be unique.
+    pub fn run_market(
+        &mut self,
+        strategies: Vec<(String, Strategy)>,
+    ) -> Result<LightweightSimResult, SimulationError> {
+        let mut worker = SimulationWorker::new(strategies)?;
+        self.run_on(&mut worker)
+    }
+
+    /// Run a complete simulation on a worker's AMMs.
+    ///
+    /// The AMMs are reset to this config's reserves first, so a worker can
+    /// run one config after another. They are handed back to the worker
+    /// when the run ends.
+    pub fn run_on(
+        &mut self,
+        worker: &mut SimulationWorker,
+    ) -> Result<LightweightSimResult, SimulationError> {
+        let mut state = self.start(worker)?;
+        self.advance(&mut state, self.config.n_steps, None);
+        Ok(self.finish(state, worker))
+    }
+
+    /// Draw this config's market: the fair price and retail orders of every step.
+    ///
+    /// The draws are exactly those `run_on` makes for the same config.
+    pub fn scenario(&self) -> Scenario {
+        let (mut price_process, mut retail_trader) = self.market_actors();
+        let n_steps = self.config.n_steps as usize;
+        let mut prices = Vec::with_capacity(n_steps);
+        let mut orders = Vec::new();
+        let mut order_ends = Vec::with_capacity(n_steps);
+        let mut step_orders = Vec::new();
+
+        for _ in 0..n_steps {
+            prices.push(price_process.step());
+            retail_trader.generate_orders_into(&mut step_orders);
+            orders.extend_from_slice(&step_orders);
+            order_ends.push(orders.len());
+        }
+
+        Scenario { prices, orders, order_ends }
+    }
+
+    /// Run a complete simulation on a worker's AMMs in a pre-drawn market.
+    ///
+    /// `scenario` must come from `scenario` on an engine with the same
+    /// config. The result is identical to `run_on`'s; only the price and
+    /// retail draws are skipped, so one scenario can be run against any
+    /// number of workers.
+    pub fn run_scenario(
+        &mut self,
+        scenario: &Scenario,
+        worker: &mut SimulationWorker,
     ) -> Result<LightweightSimResult, SimulationError> {
+        if scenario.prices.len() != self.config.n_steps as usize {
+            return Err(SimulationError::InvalidConfig(format!(
+                "scenario has {} steps, config has {}",
+                scenario.prices.len(),
+                self.config.n_steps
+            )));
+        }
+        let mut state = self.start(worker)?;
+        self.advance(&mut state, self.config.n_steps, Some(scenario));
+        Ok(self.finish(state, worker))
+    }
+
+    /// Run the first `step` steps of a simulation and snapshot it.
+    ///
+    /// Continue the snapshot with `resume`, once or many times.
+    pub fn run_to_checkpoint(
+        &mut self,
+        submission: Strategy,
+        baseline: Strategy,
+        step: u32,
+    ) -> Result<SimulationCheckpoint, SimulationError> {
+        if step > self.config.n_steps {
+            return Err(SimulationError::InvalidConfig(format!(
+                "checkpoint step {} is past n_steps {}",
+                step, self.config.n_steps
+            )));
+        }
+        let mut worker = SimulationWorker::new(vec![
+            ("submission".to_string(), submission),
+            ("normalizer".to_string(), baseline),
+        ])?;
+        let mut state = self.start(&mut worker)?;
+        self.advance(&mut state, step, None);
+        Ok(state.checkpoint())
+    }
+
+    /// Continue a checkpointed simulation to `n_steps`.
+    ///
+    /// `submission` and `baseline` must be fresh instances of the strategies
+    /// the checkpoint was taken with; their storage is restored from it.
+    /// With `seed` set, the price and retail RNGs are reseeded (with `seed`
+    /// and `seed + 1`, as in `run`), so the continuation is a different
+    /// future; without it the run continues exactly as it would have. The
+    /// result covers the whole run, prefix included.
+    pub fn resume(
+        &mut self,
+        checkpoint: &SimulationCheckpoint,
+        submission: Strategy,
+        baseline: Strategy,
+        seed: Option<u64>,
+    ) -> Result<LightweightSimResult, SimulationError> {
+        let mut state = SimulationState::from_checkpoint(
+            checkpoint,
+            vec![submission, baseline],
+            self.config.timings,
+        );
+        if let Some(seed) = seed {
+            state.seed = seed;
+            state.price_process.reseed(seed);
+            state.retail_trader.reset(Some(seed + 1));
+        }
+        state.timings.setup_ns = state.clock.lap();
+
+        self.advance(&mut state, self.config.n_steps, None);
+        Ok(self.finish(state, &mut SimulationWorker::default()))
+    }
+
+    /// Reset and initialize the worker's AMMs and create the market actors.
+    ///
+    /// The AMMs and buffers move into the state only once every AMM has
+    /// initialized, so a failed start leaves the worker usable.
+    fn start(&self, worker: &mut SimulationWorker) -> Result<SimulationState, SimulationError> {
+        if worker.amms.is_empty() {
+            return Err(SimulationError::InvalidConfig(
+                "a market needs at least one strategy".to_string(),
+            ));
+        }
+
+        let seed = self.config.seed.unwrap_or(0);
+        let start = Instant::now();
+        let mut clock = PhaseClock::new(self.config.timings);
+        let mut timings = PhaseTimings::default();
+        let (price_process, retail_trader) = self.market_actors();
+
+        for amm in worker.amms.iter_mut() {
+            amm.reset(self.config.initial_x, self.config.initial_y)
+                .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+            amm.set_fee_updates(self.config.fee_updates);
+            if self.config.timings {
+                amm.enable_strategy_timing();
+            }
+            amm.initialize()
+                .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+        }
+        let amms = std::mem::take(&mut worker.amms);
+        let names: Vec<String> = amms.iter().map(|amm| amm.name.clone()).collect();
+
+        // Record initial state
+        let initial_fair_price = price_process.current_price();
+        let initial_reserves: HashMap<String, (f64, f64)> = names
+            .iter()
+            .cloned()
+            .zip(amms.iter().map(CFMM::reserves))
+            .collect();
+
+        // Only the steps selected by `capture` are kept
+        let trace = TraceData::with_capacity(
+            names.clone(),
+            self.config.capture.count(self.config.n_steps),
+        );
+        let initial_values: Vec<f64> = names
+            .iter()
+            .map(|name| {
+                let (init_x, init_y) = initial_reserves[name];
+                init_x * initial_fair_price + init_y
+            })
+            .collect();
+
+        // Track edge, volumes and cumulative fees per AMM
+        let totals = vec![AmmTotals::default(); amms.len()];
+        timings.setup_ns = clock.lap();
+
+        Ok(SimulationState {
+            seed,
+            step: 0,
+            fair_price: initial_fair_price,
+            price_process,
+            retail_trader,
+            amms,
+            names,
+            initial_fair_price,
+            initial_reserves,
+            initial_values,
+            totals,
+            trace,
+            orders: std::mem::take(&mut worker.orders),
+            routed: std::mem::take(&mut worker.routed),
+            start,
+            clock,
+            timings,
+        })
+    }
+
+    /// Seeded price process and retail trader for this config.
+    fn market_actors(&self) -> (GBMPriceProcess, RetailTrader) {
         let seed = self.config.seed.unwrap_or(0);
 
         // Initialize price process
-        let mut price_process = GBMPriceProcess::new(
+        let price_process = GBMPriceProcess::new(
             self.config.initial_price,
             self.config.gbm_mu,
             self.config.gbm_sigma,
@@ -60,7 +278,7 @@ impl SimulationEngine {
         );
 
         // Initialize retail trader with different seed
-        let mut retail_trader = RetailTrader::new(
+        let retail_trader = RetailTrader::new(
             self.config.retail_arrival_rate,
             self.config.retail_mean_size,
             self.config.retail_size_sigma,
@@ -68,199 +286,811 @@ impl SimulationEngine {
             Some(seed + 1),
         );
 
+        (price_process, retail_trader)
+    }
+
+    /// Run steps until `state.step` reaches `until`.
+    ///
+    /// Prices and retail orders are drawn as the steps run, or read from
+    /// `scenario` when given.
+    fn advance(&self, state: &mut SimulationState, until: u32, scenario: Option<&Scenario>) {
         let arbitrageur = Arbitrageur::new();
         let router = OrderRouter::new();
+        let capture = self.config.capture;
+        let trace_trades = self.config.trace_trades;
+        let flush_each_step = self.config.fee_updates == FeeUpdates::PerStep;
+        let first = state.step;
 
-        // Create AMMs with fixed positional names to avoid HashMap collision
-        // when both contracts return the same getName()
-        let submission_name = "submission".to_string();
-        let baseline_name = "normalizer".to_string();
-
-        let mut amm_submission = CFMM::new(
-            submission,
-            self.config.initial_x,
-            self.config.initial_y,
-        );
-        amm_submission.name = submission_name.clone();
-
-        let mut amm_baseline = CFMM::new(
-            baseline,
-            self.config.initial_x,
-            self.config.initial_y,
-        );
-        amm_baseline.name = baseline_name.clone();
-
-        // Initialize AMMs
-        amm_submission.initialize()
-            .map_err(|e| SimulationError::EVMError(e.to_string()))?;
-        amm_baseline.initialize()
-            .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+        let SimulationState {
+            fair_price: last_fair_price,
+            price_process,
+            retail_trader,
+            amms,
+            initial_values,
+            totals,
+            trace,
+            orders,
+            routed,
+            clock,
+            timings,
+            ..
+        } = &mut *state;
 
-        // Record initial state
-        let initial_fair_price = price_process.current_price();
-        let mut initial_reserves = HashMap::new();
-        initial_reserves.insert(
-            submission_name.clone(),
-            (amm_submission.reserves().0, amm_submission.reserves().1),
-        );
-        initial_reserves.insert(
-            baseline_name.clone(),
-            (amm_baseline.reserves().0, amm_baseline.reserves().1),
-        );
-
-        // Track edge per strategy
-        let mut edges: HashMap<String, f64> = HashMap::new();
-        edges.insert(submission_name.clone(), 0.0);
-        edges.insert(baseline_name.clone(), 0.0);
-
-        // Run simulation steps
-        let mut steps = Vec::with_capacity(self.config.n_steps as usize);
-
-        // Store AMMs in a Vec for easier mutable access
-        let mut amms = vec![amm_submission, amm_baseline];
-        let names = vec![submission_name.clone(), baseline_name.clone()];
-
-        // Track cumulative volumes
-        let mut arb_volume_y: HashMap<String, f64> = HashMap::new();
-        let mut retail_volume_y: HashMap<String, f64> = HashMap::new();
-        // Track cumulative fees for averaging
-        let mut cumulative_bid_fees: HashMap<String, f64> = HashMap::new();
-        let mut cumulative_ask_fees: HashMap<String, f64> = HashMap::new();
-        for name in &names {
-            arb_volume_y.insert(name.clone(), 0.0);
-            retail_volume_y.insert(name.clone(), 0.0);
-            cumulative_bid_fees.insert(name.clone(), 0.0);
-            cumulative_ask_fees.insert(name.clone(), 0.0);
-        }
-
-        for t in 0..self.config.n_steps {
+        for t in first..until {
             // 1. Generate new fair price
-            let fair_price = price_process.step();
+            let fair_price = match scenario {
+                Some(scenario) => scenario.prices[t as usize],
+                None => price_process.step(),
+            };
+            *last_fair_price = fair_price;
+            timings.price_ns += clock.lap();
 
             // 2. Arbitrageur extracts profit from each AMM
-            for amm in amms.iter_mut() {
-                if let Some(arb_result) = arbitrageur.execute_arb(amm, fair_price, t as u64) {
-                    *arb_volume_y.get_mut(&arb_result.amm_name).unwrap() += arb_result.amount_y;
-                    let entry = edges.entry(arb_result.amm_name).or_insert(0.0);
+            for (i, amm) in amms.iter_mut().enumerate() {
+                if let Some(arb_result) = arbitrageur.execute_arb(i, amm, fair_price, t as u64) {
+                    let totals = &mut totals[arb_result.amm_index];
                     // AMM edge is the negative of arbitrageur profit at true price
-                    *entry += -arb_result.profit;
+                    totals.edge += -arb_result.profit;
+                    let breakdown = &mut totals.breakdown;
+                    breakdown.arb_edge += -arb_result.profit;
+                    breakdown.arb_trades += 1;
+                    breakdown.arb_volume_y += arb_result.amount_y;
+                    breakdown.arb_fee_volume_y += arb_result.fee * arb_result.amount_y;
+                    if trace_trades {
+                        trace.trades.push(TradeRow {
+                            step: t,
+                            amm: arb_result.amm_index,
+                            arbitrage: true,
+                            amm_buys_x: arb_result.side == "buy",
+                            amount_x: arb_result.amount_x,
+                            amount_y: arb_result.amount_y,
+                            fee: arb_result.fee,
+                            edge: -arb_result.profit,
+                        });
+                    }
+                    timings.arbitrages += 1;
                 }
             }
+            timings.arbitrage_ns += clock.lap_excluding_strategy(amms);
 
             // 3. Retail orders arrive and get routed
-            let orders = retail_trader.generate_orders();
-            let routed_trades = router.route_orders(&orders, &mut amms, fair_price, t as u64);
-            for trade in routed_trades {
-                *retail_volume_y.get_mut(&trade.amm_name).unwrap() += trade.amount_y;
+            let step_orders = match scenario {
+                Some(scenario) => scenario.orders(t),
+                None => {
+                    retail_trader.generate_orders_into(orders);
+                    &orders[..]
+                }
+            };
+            routed.clear();
+            router.route_orders_into(step_orders, amms, fair_price, t as u64, routed);
+            timings.retail_orders += step_orders.len() as u64;
+            // Screening: strategies see only the step's last trade
+            if flush_each_step {
+                for amm in amms.iter_mut() {
+                    amm.flush();
+                }
+            }
+            for trade in routed.iter() {
+                let totals = &mut totals[trade.amm_index];
                 let trade_edge = if trade.amm_buys_x {
                     trade.amount_x * fair_price - trade.amount_y
                 } else {
                     trade.amount_y - trade.amount_x * fair_price
                 };
-                let entry = edges.entry(trade.amm_name).or_insert(0.0);
-                *entry += trade_edge;
+                totals.edge += trade_edge;
+                let breakdown = &mut totals.breakdown;
+                breakdown.retail_edge += trade_edge;
+                breakdown.retail_trades += 1;
+                breakdown.retail_volume_y += trade.amount_y;
+                breakdown.retail_fee_volume_y += trade.fee * trade.amount_y;
+                if trace_trades {
+                    trace.trades.push(TradeRow {
+                        step: t,
+                        amm: trade.amm_index,
+                        arbitrage: false,
+                        amm_buys_x: trade.amm_buys_x,
+                        amount_x: trade.amount_x,
+                        amount_y: trade.amount_y,
+                        fee: trade.fee,
+                        edge: trade_edge,
+                    });
+                }
             }
+            timings.routing_ns += clock.lap_excluding_strategy(amms);
 
-            // 4. Capture step result and accumulate fees
-            let step = capture_step(
-                t,
-                fair_price,
-                &amms,
-                &names,
-                &initial_reserves,
-                initial_fair_price,
-            );
-            // Accumulate fees for averaging
-            for name in &names {
-                if let Some((bid_fee, ask_fee)) = step.fees.get(name) {
-                    *cumulative_bid_fees.get_mut(name).unwrap() += bid_fee;
-                    *cumulative_ask_fees.get_mut(name).unwrap() += ask_fee;
-                }
+            // 4. Accumulate fees for averaging
+            for (amm, totals) in amms.iter().zip(totals.iter_mut()) {
+                let fee_quote = amm.fees();
+                totals.bid_fee_sum += fee_quote.bid_fee.to_f64();
+                totals.ask_fee_sum += fee_quote.ask_fee.to_f64();
+            }
+
+            // 5. Capture step result
+            if capture.captures(t, self.config.n_steps) {
+                record_step(trace, t, fair_price, amms, initial_values);
             }
-            steps.push(step);
+            timings.bookkeeping_ns += clock.lap();
         }
 
+        timings.price_steps += until.saturating_sub(first) as u64;
+        state.step = first.max(until);
+    }
+
+    /// Build the result of a finished simulation and hand the AMMs and
+    /// buffers back to `worker`.
+    fn finish(&self, state: SimulationState, worker: &mut SimulationWorker) -> LightweightSimResult {
+        let SimulationState {
+            seed,
+            fair_price: final_fair_price,
+            amms,
+            names,
+            initial_fair_price,
+            initial_reserves,
+            initial_values,
+            totals,
+            trace,
+            orders,
+            routed,
+            start,
+            mut timings,
+            ..
+        } = state;
+
         // Calculate final PnL (reserves + accumulated fees)
-        let final_fair_price = price_process.current_price();
         let mut pnl = HashMap::new();
+        let mut edges = HashMap::new();
+        let mut arb_volume_y = HashMap::new();
+        let mut retail_volume_y = HashMap::new();
+        let mut average_fees = HashMap::new();
 
-        // Calculate average fees
         let n_steps = self.config.n_steps as f64;
-        let mut average_fees: HashMap<String, (f64, f64)> = HashMap::new();
-        for name in &names {
-            let avg_bid = cumulative_bid_fees.get(name).unwrap() / n_steps;
-            let avg_ask = cumulative_ask_fees.get(name).unwrap() / n_steps;
-            average_fees.insert(name.clone(), (avg_bid, avg_ask));
-        }
-
-        for (amm, name) in amms.iter().zip(names.iter()) {
-            let (init_x, init_y) = initial_reserves.get(name).unwrap();
-            let init_value = init_x * initial_fair_price + init_y;
+        for (((amm, name), totals), init_value) in amms
+            .iter()
+            .zip(names.iter())
+            .zip(totals.iter())
+            .zip(initial_values.iter())
+        {
             let (final_x, final_y) = amm.reserves();
             let (fees_x, fees_y) = amm.accumulated_fees();
             let reserves_value = final_x * final_fair_price + final_y;
             let fees_value = fees_x * final_fair_price + fees_y;
             let final_value = reserves_value + fees_value;
             pnl.insert(name.clone(), final_value - init_value);
+
+            edges.insert(name.clone(), totals.edge);
+            arb_volume_y.insert(name.clone(), totals.breakdown.arb_volume_y);
+            retail_volume_y.insert(name.clone(), totals.breakdown.retail_volume_y);
+            // Calculate average fees
+            average_fees.insert(
+                name.clone(),
+                (totals.bid_fee_sum / n_steps, totals.ask_fee_sum / n_steps),
+            );
         }
 
-        Ok(LightweightSimResult {
+        let market_retail_volume_y: f64 =
+            totals.iter().map(|totals| totals.breakdown.retail_volume_y).sum();
+        let edge_breakdown = names
+            .iter()
+            .zip(totals.iter())
+            .map(|(name, totals)| {
+                let mut breakdown = totals.breakdown;
+                breakdown.market_retail_volume_y = market_retail_volume_y;
+                (name.clone(), breakdown)
+            })
+            .collect();
+
+        let strategy_stats = amms
+            .iter()
+            .zip(names.iter())
+            .map(|(amm, name)| (name.clone(), amm.strategy_stats()))
+            .collect();
+
+        let timings = self.config.timings.then(|| {
+            for amm in &amms {
+                let (strategy_ns, strategy_calls) = amm.strategy_time();
+                timings.strategy_ns += strategy_ns;
+                timings.strategy_calls += strategy_calls;
+            }
+            timings.simulations = 1;
+            timings.total_ns = start.elapsed().as_nanos() as u64;
+            timings
+        });
+
+        worker.amms = amms;
+        worker.orders = orders;
+        worker.routed = routed;
+
+        LightweightSimResult {
             seed,
-            strategies: vec![submission_name, baseline_name],
+            strategies: names,
             pnl,
             edges,
             initial_fair_price,
             initial_reserves,
-            steps,
+            trace: StepTrace::new(trace),
             arb_volume_y,
             retail_volume_y,
             average_fees,
-        })
+            strategy_stats,
+            edge_breakdown,
+            fee_updates: self.config.fee_updates.to_string(),
+            timings,
+        }
+    }
+}
+
+/// AMMs and per-step buffers that outlive a single simulation.
+///
+/// `SimulationEngine::run_on` resets the AMMs to its config before running
+/// and hands them back afterwards, so one worker can run any number of
+/// configs without rebuilding the strategy EVMs or regrowing the buffers.
+#[derive(Default)]
+pub struct SimulationWorker {
+    amms: Vec<CFMM>,
+    orders: Vec<RetailOrder>,
+    routed: Vec<RoutedTrade>,
+}
+
+impl SimulationWorker {
+    /// Wrap strategy instances in AMMs, one per (name, strategy) pair.
+    ///
+    /// Names key the result maps and must be unique.
+    pub fn new(strategies: Vec<(String, Strategy)>) -> Result<Self, SimulationError> {
+        for (i, (name, _)) in strategies.iter().enumerate() {
+            if strategies[..i].iter().any(|(other, _)| other == name) {
+                return Err(SimulationError::InvalidConfig(format!(
+                    "duplicate strategy name {:?}",
+                    name
+                )));
+            }
+        }
+
+        // AMMs carry the caller's positional names rather than getName(),
+        // so two contracts returning the same name don't collide in the
+        // result maps. Reserves are set by each run.
+        let amms = strategies
+            .into_iter()
+            .map(|(name, strategy)| {
+                let mut amm = CFMM::new(strategy, 0.0, 0.0);
+                amm.name = name;
+                amm
+            })
+            .collect();
+
+        Ok(Self { amms, ..Self::default() })
     }
 }
 
-fn capture_step(
+/// Market randomness of one simulation: the fair price and retail orders
+/// of every step, drawn once by `SimulationEngine::scenario`.
+///
+/// Running several strategy pairs on one scenario puts them in exactly the
+/// same market, without drawing it again for each.
+#[derive(Debug, Clone)]
+pub struct Scenario {
+    /// Fair price at each step
+    prices: Vec<f64>,
+    /// Retail orders of every step, in step order
+    orders: Vec<RetailOrder>,
+    /// End of each step's orders in `orders`
+    order_ends: Vec<usize>,
+}
+
+impl Scenario {
+    /// Retail orders of step `t`.
+    fn orders(&self, t: u32) -> &[RetailOrder] {
+        let t = t as usize;
+        let begin = if t == 0 { 0 } else { self.order_ends[t - 1] };
+        &self.orders[begin..self.order_ends[t]]
+    }
+}
+
+/// Mutable state of a simulation between steps.
+struct SimulationState {
+    /// Seed reported in the result
+    seed: u64,
+    /// Next step to run
+    step: u32,
+    /// Fair price after the last step run
+    fair_price: f64,
+    price_process: GBMPriceProcess,
+    retail_trader: RetailTrader,
+    amms: Vec<CFMM>,
+    names: Vec<String>,
+    initial_fair_price: f64,
+    initial_reserves: HashMap<String, (f64, f64)>,
+    /// Value of each AMM's initial reserves at the initial fair price
+    initial_values: Vec<f64>,
+    totals: Vec<AmmTotals>,
+    trace: TraceData,
+    /// Retail orders of the current step (reused across steps)
+    orders: Vec<RetailOrder>,
+    /// Routed retail trades of the current step (reused across steps)
+    routed: Vec<RoutedTrade>,
+    start: Instant,
+    clock: PhaseClock,
+    timings: PhaseTimings,
+}
+
+impl SimulationState {
+    /// Snapshot everything but the strategy instances.
+    fn checkpoint(&self) -> SimulationCheckpoint {
+        SimulationCheckpoint {
+            seed: self.seed,
+            step: self.step,
+            price_process: self.price_process.clone(),
+            retail_trader: self.retail_trader.clone(),
+            amms: self.amms.iter().map(CFMM::checkpoint).collect(),
+            names: self.names.clone(),
+            initial_fair_price: self.initial_fair_price,
+            initial_reserves: self.initial_reserves.clone(),
+            initial_values: self.initial_values.clone(),
+            totals: self.totals.clone(),
+            trace: self.trace.clone(),
+        }
+    }
+
+    /// Rebuild the state from a checkpoint, with fresh strategy instances.
+    fn from_checkpoint(
+        checkpoint: &SimulationCheckpoint,
+        strategies: Vec<Strategy>,
+        timed: bool,
+    ) -> Self {
+        let start = Instant::now();
+        let amms = strategies
+            .into_iter()
+            .zip(checkpoint.amms.iter())
+            .map(|(strategy, amm)| {
+                let mut amm = CFMM::from_checkpoint(strategy, amm);
+                if timed {
+                    amm.enable_strategy_timing();
+                }
+                amm
+            })
+            .collect();
+
+        Self {
+            seed: checkpoint.seed,
+            step: checkpoint.step,
+            fair_price: checkpoint.price_process.current_price(),
+            price_process: checkpoint.price_process.clone(),
+            retail_trader: checkpoint.retail_trader.clone(),
+            amms,
+            names: checkpoint.names.clone(),
+            initial_fair_price: checkpoint.initial_fair_price,
+            initial_reserves: checkpoint.initial_reserves.clone(),
+            initial_values: checkpoint.initial_values.clone(),
+            totals: checkpoint.totals.clone(),
+            trace: checkpoint.trace.clone(),
+            orders: Vec::new(),
+            routed: Vec::new(),
+            start,
+            clock: PhaseClock::new(timed),
+            timings: PhaseTimings::default(),
+        }
+    }
+}
+
+/// Snapshot of a running simulation, taken between steps.
+///
+/// Holds what is needed to continue the run: AMM reserves, fees and
+/// strategy storage, the price process and retail trader with their RNG
+/// states, the running totals and the trace so far. It does not hold the
+/// strategy instances, so one checkpoint can be resumed from many threads.
+#[derive(Debug, Clone)]
+pub struct SimulationCheckpoint {
+    seed: u64,
+    step: u32,
+    price_process: GBMPriceProcess,
+    retail_trader: RetailTrader,
+    amms: Vec<AmmCheckpoint>,
+    names: Vec<String>,
+    initial_fair_price: f64,
+    initial_reserves: HashMap<String, (f64, f64)>,
+    initial_values: Vec<f64>,
+    totals: Vec<AmmTotals>,
+    trace: TraceData,
+}
+
+impl SimulationCheckpoint {
+    /// Number of steps run before the checkpoint.
+    pub fn step(&self) -> u32 {
+        self.step
+    }
+
+    /// Fair price at the checkpoint.
+    pub fn fair_price(&self) -> f64 {
+        self.price_process.current_price()
+    }
+}
+
+/// Lap timer for the opt-in phase timings; every lap is 0 when disabled.
+struct PhaseClock {
+    /// End of the previous lap (None when timing is off)
+    last: Option<Instant>,
+    /// afterSwap time of all AMMs at the end of the previous lap
+    strategy_ns: u64,
+}
+
+impl PhaseClock {
+    fn new(enabled: bool) -> Self {
+        Self { last: enabled.then(Instant::now), strategy_ns: 0 }
+    }
+
+    /// Nanoseconds since the previous lap.
+    #[inline]
+    fn lap(&mut self) -> u64 {
+        match self.last.as_mut() {
+            Some(last) => {
+                let now = Instant::now();
+                let ns = now.duration_since(*last).as_nanos() as u64;
+                *last = now;
+                ns
+            }
+            None => 0,
+        }
+    }
+
+    /// Nanoseconds since the previous lap, minus the afterSwap time the
+    /// AMMs accumulated in it.
+    #[inline]
+    fn lap_excluding_strategy(&mut self, amms: &[CFMM]) -> u64 {
+        if self.last.is_none() {
+            return 0;
+        }
+        let lap = self.lap();
+        let strategy_ns: u64 = amms.iter().map(|amm| amm.strategy_time().0).sum();
+        let in_lap = strategy_ns - self.strategy_ns;
+        self.strategy_ns = strategy_ns;
+        lap.saturating_sub(in_lap)
+    }
+}
+
+/// Running totals of one AMM over a simulation.
+#[derive(Debug, Clone, Copy, Default)]
+struct AmmTotals {
+    edge: f64,
+    /// Edge, trade counts, volumes and fees split by flow
+    breakdown: EdgeBreakdown,
+    bid_fee_sum: f64,
+    ask_fee_sum: f64,
+}
+
+/// Append one step to the trace.
+fn record_step(
+    trace: &mut TraceData,
     timestamp: u32,
     fair_price: f64,
     amms: &[CFMM],
-    names: &[String],
-    initial_reserves: &HashMap<String, (f64, f64)>,
-    initial_fair_price: f64,
-) -> LightweightStepResult {
-    let mut spot_prices = HashMap::new();
-    let mut pnls = HashMap::new();
-    let mut fees = HashMap::new();
+    initial_values: &[f64],
+) {
+    trace.timestamps.push(timestamp);
+    trace.fair_prices.push(fair_price);
 
-    for (amm, name) in amms.iter().zip(names.iter()) {
-        spot_prices.insert(name.clone(), amm.spot_price());
+    for ((amm, columns), init_value) in amms.iter().zip(trace.amms.iter_mut()).zip(initial_values) {
+        columns.spot_price.push(amm.spot_price());
 
         let fee_quote = amm.fees();
-        fees.insert(
-            name.clone(),
-            (fee_quote.bid_fee.to_f64(), fee_quote.ask_fee.to_f64()),
-        );
+        columns.bid_fee.push(fee_quote.bid_fee.to_f64());
+        columns.ask_fee.push(fee_quote.ask_fee.to_f64());
 
-        // Calculate running PnL (reserves + accumulated fees)
-        let (init_x, init_y) = initial_reserves.get(name).unwrap();
-        let init_value = init_x * initial_fair_price + init_y;
+        // Running PnL (reserves + accumulated fees)
         let (curr_x, curr_y) = amm.reserves();
         let (fees_x, fees_y) = amm.accumulated_fees();
         let reserves_value = curr_x * fair_price + curr_y;
         let fees_value = fees_x * fair_price + fees_y;
-        let curr_value = reserves_value + fees_value;
-        pnls.insert(name.clone(), curr_value - init_value);
-    }
-
-    LightweightStepResult {
-        timestamp,
-        fair_price,
-        spot_prices,
-        pnls,
-        fees,
+        columns.pnl.push(reserves_value + fees_value - init_value);
     }
 }
 
 #[cfg(test)]
 mod tests {
-    // Full tests require EVM bytecode - see integration tests
+    use super::*;
+    use crate::evm::test_contracts::{CONSTANT_FEE_STRATEGY, COUNTER_STRATEGY};
+    use crate::evm::DeployedStrategy;
+    use crate::types::config::StepCapture;
+
+    fn config(capture: StepCapture) -> SimulationConfig {
+        SimulationConfig { capture, ..SimulationConfig::small(3) }
+    }
+
+    fn run_config(config: SimulationConfig) -> LightweightSimResult {
+        let strategy =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        SimulationEngine::new(config)
+            .run(strategy.instantiate().into(), strategy.instantiate().into())
+            .unwrap()
+    }
+
+    fn run(capture: StepCapture) -> LightweightSimResult {
+        run_config(config(capture))
+    }
+
+    #[test]
+    fn test_capture_modes_select_steps() {
+        let full = run(StepCapture::Full);
+        assert_eq!(full.trace.data().len(), 100);
+        assert_eq!(full.trace.data().amms[0].pnl.len(), 100);
+
+        let timestamps = |result: &LightweightSimResult| -> Vec<u32> {
+            result.trace.data().timestamps.clone()
+        };
+        assert!(run(StepCapture::None).trace.data().is_empty());
+        assert_eq!(timestamps(&run(StepCapture::Every(25))), vec![0, 25, 50, 75]);
+        assert_eq!(timestamps(&run(StepCapture::Last(3))), vec![97, 98, 99]);
+
+        // Aggregates do not depend on what was captured
+        let none = run(StepCapture::None);
+        assert_eq!(none.edges, full.edges);
+        assert_eq!(none.pnl, full.pnl);
+        assert_eq!(none.average_fees, full.average_fees);
+    }
+
+    #[test]
+    fn test_phase_timings_are_opt_in() {
+        let plain = run(StepCapture::None);
+        assert!(plain.timings.is_none());
+
+        let mut timed_config = config(StepCapture::None);
+        timed_config.timings = true;
+        let timed = run_config(timed_config);
+        let timings = timed.timings.as_ref().unwrap();
+
+        assert_eq!(timed.edges, plain.edges);
+        assert_eq!(timings.simulations, 1);
+        assert_eq!(timings.price_steps, 100);
+        let after_swap_calls: u64 =
+            timed.strategy_stats.values().map(|stats| stats.after_swap_calls).sum();
+        assert_eq!(timings.strategy_calls, after_swap_calls);
+        assert!(timings.arbitrages > 0);
+        assert!(timings.total_ns >= timings.price_ns + timings.strategy_ns);
+    }
+
+    #[test]
+    fn test_edge_breakdown_adds_up() {
+        let mut timed_config = config(StepCapture::None);
+        timed_config.timings = true;
+        let result = run_config(timed_config);
+
+        let mut arb_trades = 0;
+        let mut retail_share = 0.0;
+        for name in &result.strategies {
+            let breakdown = &result.edge_breakdown[name];
+            let edge = breakdown.arb_edge + breakdown.retail_edge;
+            assert!((edge - result.edges[name]).abs() < 1e-9);
+            assert!(breakdown.arb_edge <= 0.0);
+            assert_eq!(breakdown.arb_volume_y, result.arb_volume_y[name]);
+            assert_eq!(breakdown.retail_volume_y, result.retail_volume_y[name]);
+            assert!(breakdown.retail_trades > 0);
+
+            // Every trade paid the constant 30 bps
+            let volume = breakdown.arb_volume_y + breakdown.retail_volume_y;
+            let fee_volume = breakdown.arb_fee_volume_y + breakdown.retail_fee_volume_y;
+            assert!((fee_volume / volume - 0.003).abs() < 1e-12);
+
+            arb_trades += breakdown.arb_trades;
+            retail_share += breakdown.retail_volume_y / breakdown.market_retail_volume_y;
+        }
+        assert_eq!(arb_trades, result.timings.as_ref().unwrap().arbitrages);
+        assert!((retail_share - 1.0).abs() < 1e-12);
+    }
+
+    #[test]
+    fn test_screening_throttles_after_swap() {
+        let strategy =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        let run_with = |fee_updates: FeeUpdates| {
+            let mut screening = config(StepCapture::None);
+            screening.fee_updates = fee_updates;
+            SimulationEngine::new(screening)
+                .run(strategy.instantiate().into(), strategy.instantiate().into())
+                .unwrap()
+        };
+        let exact = run_with(FeeUpdates::Exact);
+        let every = run_with(FeeUpdates::Every(3));
+        let per_step = run_with(FeeUpdates::PerStep);
+        assert_eq!(exact.fee_updates, "exact");
+        assert_eq!(per_step.fee_updates, "per_step");
+
+        for name in &exact.strategies {
+            let breakdown = &exact.edge_breakdown[name];
+            let trades = breakdown.arb_trades + breakdown.retail_trades;
+            assert_eq!(exact.strategy_stats[name].after_swap_calls, trades);
+
+            // Every third trade of the AMM calls the strategy
+            let breakdown = &every.edge_breakdown[name];
+            let trades = breakdown.arb_trades + breakdown.retail_trades;
+            assert_eq!(every.strategy_stats[name].after_swap_calls, trades / 3);
+
+            // At most one call per step
+            let calls = per_step.strategy_stats[name].after_swap_calls;
+            assert!(calls > 0 && calls <= 100);
+        }
+        // The counter's fees depend on how often it was called
+        assert_ne!(per_step.average_fees, exact.average_fees);
+    }
+
+    #[test]
+    fn test_resume_without_reseed_matches_full_run() {
+        // The counter's fees depend on its storage, so a lost write shows up
+        // in the average fees
+        let strategy =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        let full = SimulationEngine::new(config(StepCapture::Full))
+            .run(strategy.instantiate().into(), strategy.instantiate().into())
+            .unwrap();
+
+        let mut engine = SimulationEngine::new(config(StepCapture::Full));
+        let checkpoint = engine
+            .run_to_checkpoint(strategy.instantiate().into(), strategy.instantiate().into(), 40)
+            .unwrap();
+        assert_eq!(checkpoint.step(), 40);
+
+        for _ in 0..2 {
+            let resumed = engine
+                .resume(&checkpoint, strategy.instantiate().into(), strategy.instantiate().into(), None)
+                .unwrap();
+            assert_eq!(resumed.seed, full.seed);
+            assert_eq!(resumed.edges, full.edges);
+            assert_eq!(resumed.pnl, full.pnl);
+            assert_eq!(resumed.average_fees, full.average_fees);
+            assert_eq!(resumed.strategy_stats, full.strategy_stats);
+            assert_eq!(resumed.trace.data().timestamps, full.trace.data().timestamps);
+            assert_eq!(resumed.trace.data().amms[0].pnl, full.trace.data().amms[0].pnl);
+        }
+    }
+
+    #[test]
+    fn test_reseeded_forks_share_the_prefix() {
+        let strategy =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let mut engine = SimulationEngine::new(config(StepCapture::Full));
+        let checkpoint = engine
+            .run_to_checkpoint(strategy.instantiate().into(), strategy.instantiate().into(), 50)
+            .unwrap();
+        let mut fork = |seed: u64| {
+            engine
+                .resume(&checkpoint, strategy.instantiate().into(), strategy.instantiate().into(), Some(seed))
+                .unwrap()
+        };
+
+        let a = fork(10);
+        let b = fork(11);
+        assert_eq!(a.seed, 10);
+        assert_eq!(a.edges, fork(10).edges);
+
+        let prices = |result: &LightweightSimResult| result.trace.data().fair_prices.clone();
+        let full = run(StepCapture::Full);
+        assert_eq!(prices(&a)[..50], prices(&full)[..50]);
+        assert_eq!(prices(&a)[..50], prices(&b)[..50]);
+        assert_ne!(prices(&a)[50..], prices(&b)[50..]);
+    }
+
+    #[test]
+    fn test_checkpoint_past_end_is_rejected() {
+        let strategy =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let result = SimulationEngine::new(config(StepCapture::None)).run_to_checkpoint(
+            strategy.instantiate().into(),
+            strategy.instantiate().into(),
+            101,
+        );
+        assert!(matches!(result, Err(SimulationError::InvalidConfig(_))));
+    }
+
+    #[test]
+    fn test_market_of_identical_strategies() {
+        let strategy =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let names = ["a", "b", "c"];
+        let result = SimulationEngine::new(config(StepCapture::Last(1)))
+            .run_market(
+                names
+                    .iter()
+                    .map(|name| (name.to_string(), strategy.instantiate().into()))
+                    .collect(),
+            )
+            .unwrap();
+
+        assert_eq!(result.strategies, names);
+        assert_eq!(result.trace.data().amms.len(), 3);
+        // Identical AMMs split every order evenly and see the same arbitrage
+        for name in &names[1..] {
+            assert!((result.edges[*name] - result.edges["a"]).abs() < 1e-6);
+            assert!(result.retail_volume_y[*name] > 0.0);
+            assert!((result.retail_volume_y[*name] - result.retail_volume_y["a"]).abs() < 1e-6);
+        }
+    }
+
+    #[test]
+    fn test_market_rejects_duplicate_names() {
+        let strategy =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let mut engine = SimulationEngine::new(config(StepCapture::None));
+        let duplicate = engine.run_market(vec![
+            ("a".to_string(), strategy.instantiate().into()),
+            ("a".to_string(), strategy.instantiate().into()),
+        ]);
+        assert!(matches!(duplicate, Err(SimulationError::InvalidConfig(_))));
+        assert!(matches!(engine.run_market(Vec::new()), Err(SimulationError::InvalidConfig(_))));
+    }
+
+    #[test]
+    fn test_reused_worker_matches_fresh_runs() {
+        let counter =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        let constant =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let mut worker = SimulationWorker::new(vec![
+            ("submission".to_string(), counter.instantiate().into()),
+            ("normalizer".to_string(), constant.instantiate().into()),
+        ])
+        .unwrap();
+
+        for (seed, timings) in [(3, true), (4, false), (5, false)] {
+            let mut config = config(StepCapture::Last(1));
+            config.seed = Some(seed);
+            config.timings = timings;
+            let fresh = SimulationEngine::new(config.clone())
+                .run(counter.instantiate().into(), constant.instantiate().into())
+                .unwrap();
+            let reused = SimulationEngine::new(config).run_on(&mut worker).unwrap();
+
+            // The counter's storage and the AMMs' reserves start over every run
+            assert_eq!(reused.edges, fresh.edges);
+            assert_eq!(reused.pnl, fresh.pnl);
+            assert_eq!(reused.average_fees, fresh.average_fees);
+            assert_eq!(reused.strategy_stats, fresh.strategy_stats);
+            assert_eq!(reused.trace.data().fair_prices, fresh.trace.data().fair_prices);
+            assert_eq!(reused.timings.is_some(), timings);
+        }
+    }
+
+    #[test]
+    fn test_scenario_matches_run() {
+        let counter =
+            DeployedStrategy::deploy(COUNTER_STRATEGY.to_vec(), "Counter".to_string()).unwrap();
+        let constant =
+            DeployedStrategy::deploy(CONSTANT_FEE_STRATEGY.to_vec(), "Constant".to_string())
+                .unwrap();
+        let mut config = config(StepCapture::Full);
+        config.trace_trades = true;
+        let engine = SimulationEngine::new(config.clone());
+        let scenario = engine.scenario();
+
+        // Both submissions see the same market as their own full runs
+        for submission in [&counter, &constant] {
+            let fresh = SimulationEngine::new(config.clone())
+                .run(submission.instantiate().into(), constant.instantiate().into())
+                .unwrap();
+            let mut worker = SimulationWorker::new(vec![
+                ("submission".to_string(), submission.instantiate().into()),
+                ("normalizer".to_string(), constant.instantiate().into()),
+            ])
+            .unwrap();
+            let shared = SimulationEngine::new(config.clone())
+                .run_scenario(&scenario, &mut worker)
+                .unwrap();
+
+            assert_eq!(shared.edges, fresh.edges);
+            assert_eq!(shared.pnl, fresh.pnl);
+            assert_eq!(shared.edge_breakdown, fresh.edge_breakdown);
+            assert_eq!(shared.trace.data().fair_prices, fresh.trace.data().fair_prices);
+            assert_eq!(shared.trace.data().trades.len(), fresh.trace.data().trades.len());
+        }
+
+        config.n_steps = 50;
+        let mut worker = SimulationWorker::new(vec![(
+            "submission".to_string(),
+            counter.instantiate().into(),
+        )])
+        .unwrap();
+        assert!(SimulationEngine::new(config).run_scenario(&scenario, &mut worker).is_err());
+    }
 }
@@ -1,7 +1,12 @@
 //! Simulation engine and parallel runner.
 
 pub mod engine;
+pub mod pool;
 pub mod runner;
 
-pub use engine::SimulationEngine;
-pub use runner::{run_simulations_parallel, SimulationBatchConfig};
+pub use engine::{Scenario, SimulationCheckpoint, SimulationEngine, SimulationWorker};
+pub use runner::{
+    run_forks_parallel, run_market_parallel, run_simulations_parallel,
+    run_submissions_parallel, stream_simulations_parallel, ForkBatchConfig, MarketBatchConfig,
+    SimulationBatchConfig, StreamedResult, SubmissionsBatchConfig,
+};
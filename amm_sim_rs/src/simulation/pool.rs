@@ -0,0 +1,216 @@
+//! Process-wide worker pools for the parallel runners.
+//!
+//! Building a rayon pool spawns its threads, and tuning loops call the
+//! runners hundreds of times. There is one pool per worker count, created
+//! the first time a batch asks for that count and kept for the life of the
+//! process, so callers alternating between counts (or running concurrently
+//! with different counts) never rebuild one. Idle pools cost only their
+//! sleeping threads; the default count comes from `auto_workers`, which
+//! never changes, so a process that leaves `n_workers` unset has one pool.
+//!
+//! Batches keep every result until they return, so the memory their traces
+//! need depends on the batch size, not on the number of workers.
+//! `trace_memory_warning` flags batches whose traces may not fit; the
+//! Python entry points turn it into a RuntimeWarning and run the batch.
+
+use std::num::NonZeroUsize;
+use std::sync::{Arc, Mutex, OnceLock, PoisonError};
+
+use rayon::{ThreadPool, ThreadPoolBuilder};
+
+use crate::simulation::engine::SimulationError;
+use crate::types::config::SimulationConfig;
+
+/// Share of available memory the traces of a batch may use.
+const TRACE_MEMORY_SHARE: f64 = 0.5;
+
+/// Bytes per traced trade: step and AMM (u32), two flags, four f64 columns.
+const TRADE_ROW_BYTES: usize = 4 + 4 + 1 + 1 + 4 * 8;
+
+/// The shared pools, by number of threads.
+static POOLS: Mutex<Vec<(usize, Arc<ThreadPool>)>> = Mutex::new(Vec::new());
+
+/// `auto_workers`, computed on first use.
+static AUTO_WORKERS: OnceLock<usize> = OnceLock::new();
+
+/// Get the shared pool with `n_workers` threads (None = `auto_workers`).
+pub fn worker_pool(n_workers: Option<usize>) -> Result<Arc<ThreadPool>, SimulationError> {
+    let n_workers = n_workers.unwrap_or_else(auto_workers);
+
+    let mut pools = POOLS.lock().unwrap_or_else(PoisonError::into_inner);
+    if let Some((_, pool)) = pools.iter().find(|(size, _)| *size == n_workers) {
+        return Ok(Arc::clone(pool));
+    }
+
+    let pool = ThreadPoolBuilder::new()
+        .num_threads(n_workers)
+        .thread_name(|i| format!("amm-sim-{}", i))
+        .build()
+        .map(Arc::new)
+        .map_err(|e| SimulationError::InvalidConfig(format!("Failed to create thread pool: {}", e)))?;
+    pools.push((n_workers, Arc::clone(&pool)));
+    Ok(pool)
+}
+
+/// Default number of workers: every CPU this process may use.
+///
+/// `available_parallelism` honours the affinity mask and, on Linux, cgroup
+/// CPU quotas, so a container gets its quota rather than the host's core
+/// count. It is read once per process, so the shared pool keeps its size.
+pub fn auto_workers() -> usize {
+    *AUTO_WORKERS.get_or_init(|| {
+        std::thread::available_parallelism()
+            .map(NonZeroUsize::get)
+            .unwrap_or(1)
+    })
+}
+
+/// Warning for a batch whose traces may not fit in memory, if any.
+///
+/// Each config is run `runs_per_config` times with `n_amms` AMMs, and every
+/// result is held until the batch returns. Returns a message when their
+/// traces would need more than `TRACE_MEMORY_SHARE` of the available
+/// memory; None when they fit or the available memory is unknown. The
+/// estimate is rough, so the batch is still run.
+pub fn trace_memory_warning(
+    configs: &[SimulationConfig],
+    n_amms: usize,
+    runs_per_config: usize,
+) -> Option<String> {
+    let needed = batch_trace_bytes(configs, n_amms, runs_per_config);
+    if needed == 0 {
+        return None;
+    }
+    let budget = (available_memory()? as f64 * TRACE_MEMORY_SHARE) as u64;
+    if needed as u64 <= budget {
+        return None;
+    }
+    Some(format!(
+        "the batch's traces need about {} MiB but only {} MiB are available for them; \
+         capture fewer steps (e.g. capture=\"none\" or \"last:K\"), turn off trade \
+         tracing, use summary_only or stream_batch, or split the batch",
+        needed >> 20,
+        budget >> 20
+    ))
+}
+
+/// Rough size in bytes of the traces of a whole batch.
+fn batch_trace_bytes(configs: &[SimulationConfig], n_amms: usize, runs_per_config: usize) -> usize {
+    configs
+        .iter()
+        .map(|config| trace_bytes(config, n_amms))
+        .fold(0usize, usize::saturating_add)
+        .saturating_mul(runs_per_config)
+}
+
+/// Rough size in bytes of the trace one simulation records.
+fn trace_bytes(config: &SimulationConfig, n_amms: usize) -> usize {
+    // Timestamp and fair price, then spot price, PnL and both fees per AMM
+    let step_bytes = 4 + 8 + n_amms * 4 * 8;
+    let mut bytes = config.capture.count(config.n_steps) * step_bytes;
+    if config.trace_trades {
+        // An arbitrage and the retail fills per AMM and step, at most
+        let trades_per_step = n_amms as f64 * (1.0 + config.retail_arrival_rate.max(0.0));
+        bytes += (config.n_steps as f64 * trades_per_step) as usize * TRADE_ROW_BYTES;
+    }
+    bytes
+}
+
+/// Memory available to this process in bytes, if it can be determined.
+///
+/// The smaller of the system's MemAvailable and the headroom under a cgroup
+/// v2 memory limit. Linux only; None elsewhere.
+fn available_memory() -> Option<u64> {
+    let system = std::fs::read_to_string("/proc/meminfo")
+        .ok()
+        .and_then(|info| parse_meminfo(&info));
+    match (system, cgroup_headroom()) {
+        (Some(system), Some(cgroup)) => Some(system.min(cgroup)),
+        (system, cgroup) => system.or(cgroup),
+    }
+}
+
+/// MemAvailable from the contents of /proc/meminfo, in bytes.
+fn parse_meminfo(info: &str) -> Option<u64> {
+    let kb = info
+        .lines()
+        .find_map(|line| line.strip_prefix("MemAvailable:"))?
+        .trim()
+        .strip_suffix("kB")?
+        .trim()
+        .parse::<u64>()
+        .ok()?;
+    Some(kb * 1024)
+}
+
+/// Bytes left under the cgroup v2 memory limit, if there is one.
+fn cgroup_headroom() -> Option<u64> {
+    let read = |name: &str| -> Option<u64> {
+        std::fs::read_to_string(format!("/sys/fs/cgroup/{}", name))
+            .ok()?
+            .trim()
+            .parse()
+            .ok()
+    };
+    // An unlimited group reads "max", which does not parse
+    let limit = read("memory.max")?;
+    let used = read("memory.current").unwrap_or(0);
+    Some(limit.saturating_sub(used))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::types::config::StepCapture;
+
+    fn config(capture: StepCapture, trace_trades: bool) -> SimulationConfig {
+        SimulationConfig { n_steps: 1000, capture, trace_trades, ..SimulationConfig::small(3) }
+    }
+
+    #[test]
+    fn test_pools_are_kept_per_size() {
+        let two = worker_pool(Some(2)).unwrap();
+        let three = worker_pool(Some(3)).unwrap();
+        assert_eq!(two.current_num_threads(), 2);
+        assert_eq!(three.current_num_threads(), 3);
+
+        // Alternating sizes reuses both pools instead of rebuilding either
+        assert!(Arc::ptr_eq(&two, &worker_pool(Some(2)).unwrap()));
+        assert!(Arc::ptr_eq(&three, &worker_pool(Some(3)).unwrap()));
+        assert!(Arc::ptr_eq(&worker_pool(None).unwrap(), &worker_pool(None).unwrap()));
+    }
+
+    #[test]
+    fn test_parse_meminfo() {
+        let info = "MemTotal:       16318480 kB\nMemFree:         1021268 kB\nMemAvailable:    8159240 kB\n";
+        assert_eq!(parse_meminfo(info), Some(8159240 * 1024));
+        assert_eq!(parse_meminfo("MemTotal: 1 kB\n"), None);
+    }
+
+    #[test]
+    fn test_trace_bytes_follow_capture() {
+        assert_eq!(trace_bytes(&config(StepCapture::None, false), 2), 0);
+        assert_eq!(trace_bytes(&config(StepCapture::Full, false), 2), 1000 * (12 + 64));
+        assert_eq!(trace_bytes(&config(StepCapture::Last(10), false), 2), 10 * (12 + 64));
+        assert_eq!(trace_bytes(&config(StepCapture::None, true), 2), 12_000 * TRADE_ROW_BYTES);
+    }
+
+    #[test]
+    fn test_trace_memory_covers_the_whole_batch() {
+        let configs = vec![config(StepCapture::Full, false); 4];
+        assert_eq!(batch_trace_bytes(&configs, 2, 3), 12 * 1000 * (12 + 64));
+        assert_eq!(batch_trace_bytes(&[config(StepCapture::None, false)], 2, 100), 0);
+
+        // Batches without traces never warn; absurd ones do wherever memory is known
+        assert!(trace_memory_warning(&[config(StepCapture::None, false)], 2, 1_000_000).is_none());
+        let mut huge = config(StepCapture::Full, true);
+        huge.n_steps = u32::MAX;
+        if available_memory().is_some() {
+            assert!(trace_memory_warning(&[huge], 2, 1000).is_some());
+        }
+
+        // The default worker count does not depend on the batch
+        let cpus = std::thread::available_parallelism().unwrap().get();
+        assert_eq!(auto_workers(), cpus);
+    }
+}
@@ -1,11 +1,28 @@
 //! Parallel simulation runner using rayon.
 
+use std::cell::RefCell;
+use std::collections::HashSet;
+use std::rc::Rc;
+use std::sync::mpsc::{self, Receiver};
+
 use rayon::prelude::*;
 
-use crate::evm::EVMStrategy;
-use crate::simulation::engine::{SimulationEngine, SimulationError};
-use crate::types::config::SimulationConfig;
-use crate::types::result::{BatchSimulationResult, LightweightSimResult};
+use crate::evm::{
+    DeployedStrategy, EVMStrategy, ExecutionBackend, FixedFeeStrategy, ProfileData,
+    ProfiledStrategy, Strategy, StrategyTemplate,
+};
+use crate::simulation::engine::{SimulationEngine, SimulationError, SimulationWorker};
+use crate::simulation::pool::worker_pool;
+use crate::types::config::{SimulationConfig, StepCapture};
+use crate::types::result::{
+    BatchSimulationResult, BatchSummary, EdgeBreakdown, LightweightSimResult, PhaseTimings,
+    ProbeResult, StrategyProfile,
+};
+use crate::types::trade_info::TradeInfo;
+use crate::types::wad::Wad;
+
+/// Probe trades handled by one worker per strategy instance.
+const PROBE_CHUNK: usize = 256;
 
 /// Configuration for a batch of simulations.
 pub struct SimulationBatchConfig {
@@ -13,63 +30,431 @@ pub struct SimulationBatchConfig {
     pub submission_bytecode: Vec<u8>,
     /// Bytecode for the baseline strategy
     pub baseline_bytecode: Vec<u8>,
+    /// Answer baseline calls natively with this fixed fee instead of running
+    /// `baseline_bytecode` (only valid for a constant-fee baseline)
+    pub baseline_fixed_fee: Option<Wad>,
+    /// List of simulation configs (one per simulation)
+    pub configs: Vec<SimulationConfig>,
+    /// Number of parallel workers (None = `pool::auto_workers`)
+    pub n_workers: Option<usize>,
+    /// How EVM strategies are executed
+    pub backend: ExecutionBackend,
+    /// Return only the summary: no per-simulation results, and no traces
+    /// recorded whatever the configs' capture
+    pub summary_only: bool,
+}
+
+/// Configuration for forking one simulation into many continuations.
+pub struct ForkBatchConfig {
+    /// Bytecode for the submission strategy
+    pub submission_bytecode: Vec<u8>,
+    /// Bytecode for the baseline strategy
+    pub baseline_bytecode: Vec<u8>,
+    /// Answer baseline calls natively with this fixed fee (see
+    /// `SimulationBatchConfig`)
+    pub baseline_fixed_fee: Option<Wad>,
+    /// Simulation to fork; its seed drives the shared prefix
+    pub config: SimulationConfig,
+    /// Steps run once, before forking
+    pub fork_step: u32,
+    /// One continuation per seed; seeds must be distinct
+    pub seeds: Vec<u64>,
+    /// Number of parallel workers (None = `pool::auto_workers`)
+    pub n_workers: Option<usize>,
+    /// How EVM strategies are executed
+    pub backend: ExecutionBackend,
+}
+
+/// Configuration for a batch of markets with several submissions.
+pub struct MarketBatchConfig {
+    /// (name, bytecode) of each submission; names key the results
+    pub submissions: Vec<(String, Vec<u8>)>,
+    /// Bytecode for the baseline strategy, which joins every market as
+    /// "normalizer"
+    pub baseline_bytecode: Vec<u8>,
+    /// Answer baseline calls natively with this fixed fee (see
+    /// `SimulationBatchConfig`)
+    pub baseline_fixed_fee: Option<Wad>,
     /// List of simulation configs (one per simulation)
     pub configs: Vec<SimulationConfig>,
-    /// Number of parallel workers (None = auto-detect)
+    /// Number of parallel workers (None = `pool::auto_workers`)
     pub n_workers: Option<usize>,
+    /// How EVM strategies are executed
+    pub backend: ExecutionBackend,
+    /// Return only the summary (see `SimulationBatchConfig`)
+    pub summary_only: bool,
+}
+
+/// Configuration for running several submissions against the baseline on
+/// the same simulations.
+pub struct SubmissionsBatchConfig {
+    /// Bytecode for each submission strategy
+    pub submission_bytecodes: Vec<Vec<u8>>,
+    /// Bytecode for the baseline strategy
+    pub baseline_bytecode: Vec<u8>,
+    /// Answer baseline calls natively with this fixed fee (see
+    /// `SimulationBatchConfig`)
+    pub baseline_fixed_fee: Option<Wad>,
+    /// List of simulation configs, each run once per submission
+    pub configs: Vec<SimulationConfig>,
+    /// Number of parallel workers (None = `pool::auto_workers`)
+    pub n_workers: Option<usize>,
+    /// How EVM strategies are executed
+    pub backend: ExecutionBackend,
+    /// Return only the summaries (see `SimulationBatchConfig`)
+    pub summary_only: bool,
 }
 
 /// Run multiple simulations in parallel.
 pub fn run_simulations_parallel(
+    mut batch_config: SimulationBatchConfig,
+) -> Result<BatchSimulationResult, SimulationError> {
+    if batch_config.summary_only {
+        skip_traces(&mut batch_config.configs);
+    }
+    let pool = worker_pool(batch_config.n_workers)?;
+
+    // Deploy each strategy once; workers start from copies of the post-deploy state
+    let (submission, baseline) = deploy_templates(
+        batch_config.submission_bytecode,
+        batch_config.baseline_bytecode,
+        batch_config.baseline_fixed_fee,
+        batch_config.backend,
+    )?;
+
+    // Run simulations in parallel. map_init builds one pair of AMMs per rayon
+    // job, not per thread: a thread can build several as the batch is split,
+    // but each pair is reset between the configs of its job instead of
+    // instantiating new strategies
+    let results: Result<Vec<LightweightSimResult>, SimulationError> = pool.install(|| {
+        batch_config.configs
+            .into_par_iter()
+            .map_init(|| pair_worker(&submission, &baseline), run_on_worker)
+            .collect()
+    });
+
+    Ok(batch_result(results?, batch_config.summary_only))
+}
+
+/// A finished simulation of a streamed batch: its config's index and result.
+pub type StreamedResult = (usize, Result<LightweightSimResult, SimulationError>);
+
+/// Start a batch in the background and stream its results as they finish.
+///
+/// Strategies are deployed before this returns, so bytecode errors surface
+/// here. Results arrive in completion order, tagged with their config's
+/// index, and nothing is kept once received. Dropping the receiver stops
+/// the batch: workers finish the simulations in hand and start no more.
+pub fn stream_simulations_parallel(
     batch_config: SimulationBatchConfig,
+) -> Result<Receiver<StreamedResult>, SimulationError> {
+    let pool = worker_pool(batch_config.n_workers)?;
+
+    let (submission, baseline) = deploy_templates(
+        batch_config.submission_bytecode,
+        batch_config.baseline_bytecode,
+        batch_config.baseline_fixed_fee,
+        batch_config.backend,
+    )?;
+
+    let configs = batch_config.configs;
+    let (sender, receiver) = mpsc::channel();
+    std::thread::Builder::new()
+        .name("amm-sim-stream".to_string())
+        .spawn(move || {
+            pool.install(|| {
+                // Sending only fails once the receiver is gone, which ends the batch
+                let _ = configs
+                    .into_par_iter()
+                    .enumerate()
+                    .map_init(
+                        || pair_worker(&submission, &baseline),
+                        |worker, (index, config)| (index, run_on_worker(worker, config)),
+                    )
+                    .try_for_each_with(sender, |sender, streamed| sender.send(streamed));
+            });
+        })
+        .map_err(|e| {
+            SimulationError::InvalidConfig(format!("Failed to start batch thread: {}", e))
+        })?;
+
+    Ok(receiver)
+}
+
+/// Re-run one simulation of a batch with its steps and trades traced.
+///
+/// Strategies are set up exactly as in `run_simulations_parallel`, and
+/// tracing does not change the simulation, so the result matches the
+/// batch's result for the same config, with the full trace added.
+pub fn run_replay(
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    baseline_fixed_fee: Option<Wad>,
+    mut config: SimulationConfig,
+    trace_trades: bool,
+    backend: ExecutionBackend,
+) -> Result<LightweightSimResult, SimulationError> {
+    let (submission, baseline) = deploy_templates(
+        submission_bytecode,
+        baseline_bytecode,
+        baseline_fixed_fee,
+        backend,
+    )?;
+
+    config.capture = StepCapture::Full;
+    config.trace_trades = trace_trades;
+    SimulationEngine::new(config).run(submission.instantiate(), baseline.instantiate())
+}
+
+/// Run one simulation to `fork_step`, then continue it once per seed in parallel.
+///
+/// The prefix is simulated once. Every continuation starts from the same
+/// checkpoint with the price and retail RNGs reseeded, and its result
+/// covers the whole run (prefix included) with `seed` set to its own seed.
+pub fn run_forks_parallel(
+    fork_config: ForkBatchConfig,
 ) -> Result<BatchSimulationResult, SimulationError> {
-    // Configure thread pool
-    let n_workers = batch_config.n_workers.unwrap_or_else(|| {
-        rayon::current_num_threads().min(8)
+    // Results are summarized by seed, so a repeated seed would merge two
+    // continuations in edge_by_seed while still counting both
+    let mut seen = HashSet::with_capacity(fork_config.seeds.len());
+    if let Some(seed) = fork_config.seeds.iter().find(|&&seed| !seen.insert(seed)) {
+        return Err(SimulationError::InvalidConfig(format!(
+            "duplicate continuation seed {}",
+            seed
+        )));
+    }
+    let pool = worker_pool(fork_config.n_workers)?;
+
+    let (submission, baseline) = deploy_templates(
+        fork_config.submission_bytecode,
+        fork_config.baseline_bytecode,
+        fork_config.baseline_fixed_fee,
+        fork_config.backend,
+    )?;
+
+    let config = fork_config.config;
+    let checkpoint = SimulationEngine::new(config.clone()).run_to_checkpoint(
+        submission.instantiate(),
+        baseline.instantiate(),
+        fork_config.fork_step,
+    )?;
+
+    let results: Result<Vec<LightweightSimResult>, SimulationError> = pool.install(|| {
+        fork_config.seeds
+            .into_par_iter()
+            .map(|seed| {
+                let mut engine = SimulationEngine::new(config.clone());
+                engine.resume(
+                    &checkpoint,
+                    submission.instantiate(),
+                    baseline.instantiate(),
+                    Some(seed),
+                )
+            })
+            .collect()
     });
 
-    // Build custom thread pool if needed
-    let pool = rayon::ThreadPoolBuilder::new()
-        .num_threads(n_workers)
-        .build()
-        .map_err(|e| SimulationError::InvalidConfig(format!("Failed to create thread pool: {}", e)))?;
+    Ok(batch_result(results?, false))
+}
+
+/// Run simulations in parallel where all submissions and the baseline share
+/// one market.
+///
+/// Every simulation has one AMM per submission plus the baseline's AMM
+/// (named "normalizer", last), all competing for the same retail flow.
+pub fn run_market_parallel(
+    mut batch_config: MarketBatchConfig,
+) -> Result<BatchSimulationResult, SimulationError> {
+    if batch_config.summary_only {
+        skip_traces(&mut batch_config.configs);
+    }
+    let pool = worker_pool(batch_config.n_workers)?;
+    let backend = batch_config.backend;
 
-    // Clone bytecodes for each worker (they need their own EVM instances)
-    let submission_bytecode = batch_config.submission_bytecode;
-    let baseline_bytecode = batch_config.baseline_bytecode;
+    let mut templates = batch_config.submissions
+        .into_iter()
+        .map(|(name, bytecode)| {
+            let deployed = DeployedStrategy::deploy(bytecode, name.clone())
+                .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+            Ok((name, StrategyTemplate::deployed(deployed, backend)))
+        })
+        .collect::<Result<Vec<_>, SimulationError>>()?;
+    templates.push((
+        "normalizer".to_string(),
+        deploy_baseline(batch_config.baseline_bytecode, batch_config.baseline_fixed_fee, backend)?,
+    ));
 
-    // Run simulations in parallel
     let results: Result<Vec<LightweightSimResult>, SimulationError> = pool.install(|| {
         batch_config.configs
             .into_par_iter()
-            .map(|config| {
-                // Create fresh EVM strategies for this worker
-                let submission = EVMStrategy::new(
-                    submission_bytecode.clone(),
-                    "Submission".to_string(),
-                ).map_err(|e| SimulationError::EVMError(e.to_string()))?;
-
-                let baseline = EVMStrategy::new(
-                    baseline_bytecode.clone(),
-                    "Baseline".to_string(),
-                ).map_err(|e| SimulationError::EVMError(e.to_string()))?;
-
-                let mut engine = SimulationEngine::new(config);
-                engine.run(submission, baseline)
-            })
+            .map_init(
+                || {
+                    SimulationWorker::new(
+                        templates
+                            .iter()
+                            .map(|(name, template)| (name.clone(), template.instantiate()))
+                            .collect(),
+                    )
+                },
+                run_on_worker,
+            )
             .collect()
     });
 
-    let results = results?;
+    Ok(batch_result(results?, batch_config.summary_only))
+}
+
+/// Run each submission against the baseline on every config, in parallel.
+///
+/// Each config's market (prices and retail orders) is drawn once and every
+/// submission's pair runs on it, so result i of every batch is the same
+/// market for all submissions. Returns one batch per submission, in order;
+/// each matches what `run_simulations_parallel` gives for that submission.
+pub fn run_submissions_parallel(
+    mut batch_config: SubmissionsBatchConfig,
+) -> Result<Vec<BatchSimulationResult>, SimulationError> {
+    if batch_config.summary_only {
+        skip_traces(&mut batch_config.configs);
+    }
+    let n_submissions = batch_config.submission_bytecodes.len();
+    let pool = worker_pool(batch_config.n_workers)?;
+    let backend = batch_config.backend;
 
-    // Extract strategy names from first result
-    let strategies = if let Some(first) = results.first() {
-        first.strategies.clone()
-    } else {
-        Vec::new()
-    };
+    let submissions = batch_config.submission_bytecodes
+        .into_iter()
+        .map(|bytecode| deploy_submission(bytecode, backend))
+        .collect::<Result<Vec<_>, SimulationError>>()?;
+    let baseline = deploy_baseline(
+        batch_config.baseline_bytecode,
+        batch_config.baseline_fixed_fee,
+        backend,
+    )?;
 
-    Ok(BatchSimulationResult { results, strategies })
+    // One pair of AMMs per submission for each rayon job (see run_simulations_parallel)
+    let by_config: Result<Vec<Vec<LightweightSimResult>>, SimulationError> = pool.install(|| {
+        batch_config.configs
+            .into_par_iter()
+            .map_init(
+                || {
+                    submissions
+                        .iter()
+                        .map(|submission| pair_worker(submission, &baseline))
+                        .collect::<Vec<_>>()
+                },
+                |workers, config| {
+                    let mut engine = SimulationEngine::new(config);
+                    let scenario = engine.scenario();
+                    workers
+                        .iter_mut()
+                        .map(|worker| {
+                            let worker = worker.as_mut().map_err(|e| e.clone())?;
+                            engine.run_scenario(&scenario, worker)
+                        })
+                        .collect::<Result<Vec<_>, SimulationError>>()
+                },
+            )
+            .collect()
+    });
+
+    let mut by_submission: Vec<Vec<LightweightSimResult>> = vec![Vec::new(); n_submissions];
+    for results in by_config? {
+        for (batch, result) in by_submission.iter_mut().zip(results) {
+            batch.push(result);
+        }
+    }
+    Ok(by_submission
+        .into_iter()
+        .map(|results| batch_result(results, batch_config.summary_only))
+        .collect())
+}
+
+/// Worker with a "submission" and a "normalizer" AMM.
+fn pair_worker(
+    submission: &StrategyTemplate,
+    baseline: &StrategyTemplate,
+) -> Result<SimulationWorker, SimulationError> {
+    SimulationWorker::new(vec![
+        ("submission".to_string(), submission.instantiate()),
+        ("normalizer".to_string(), baseline.instantiate()),
+    ])
+}
+
+/// Run `config` on a worker made by `map_init`, or pass on why it could not be made.
+///
+/// `map_init` makes a worker per rayon job rather than per thread, so a
+/// thread may build a few over a batch; each is reused within its job.
+fn run_on_worker(
+    worker: &mut Result<SimulationWorker, SimulationError>,
+    config: SimulationConfig,
+) -> Result<LightweightSimResult, SimulationError> {
+    let worker = worker.as_mut().map_err(|e| e.clone())?;
+    SimulationEngine::new(config).run_on(worker)
+}
+
+/// Deploy the submission and baseline once, as templates for the workers.
+fn deploy_templates(
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    baseline_fixed_fee: Option<Wad>,
+    backend: ExecutionBackend,
+) -> Result<(StrategyTemplate, StrategyTemplate), SimulationError> {
+    let submission = deploy_submission(submission_bytecode, backend)?;
+    let baseline = deploy_baseline(baseline_bytecode, baseline_fixed_fee, backend)?;
+
+    Ok((submission, baseline))
+}
+
+/// Deploy a submission as a template for the workers.
+fn deploy_submission(
+    bytecode: Vec<u8>,
+    backend: ExecutionBackend,
+) -> Result<StrategyTemplate, SimulationError> {
+    Ok(StrategyTemplate::deployed(
+        DeployedStrategy::deploy(
+            bytecode,
+            "Submission".to_string(),
+        ).map_err(|e| SimulationError::EVMError(e.to_string()))?,
+        backend,
+    ))
+}
+
+/// Deploy the baseline, or answer it natively when it has a fixed fee.
+fn deploy_baseline(
+    baseline_bytecode: Vec<u8>,
+    baseline_fixed_fee: Option<Wad>,
+    backend: ExecutionBackend,
+) -> Result<StrategyTemplate, SimulationError> {
+    Ok(match baseline_fixed_fee {
+        Some(fee) => StrategyTemplate::FixedFee(
+            FixedFeeStrategy::symmetric("Baseline".to_string(), fee),
+        ),
+        None => StrategyTemplate::deployed(
+            DeployedStrategy::deploy(
+                baseline_bytecode,
+                "Baseline".to_string(),
+            ).map_err(|e| SimulationError::EVMError(e.to_string()))?,
+            backend,
+        ),
+    })
+}
+
+/// Collect simulation results into a batch result.
+fn batch_result(results: Vec<LightweightSimResult>, summary_only: bool) -> BatchSimulationResult {
+    let summary = BatchSummary::from_results(&results);
+    let strategies = summary.strategies.clone();
+    let edge_breakdown = EdgeBreakdown::total(results.iter().map(|r| &r.edge_breakdown));
+    let timings = PhaseTimings::total(results.iter().filter_map(|r| r.timings.as_ref()));
+    let results = if summary_only { Vec::new() } else { results };
+
+    BatchSimulationResult { results, strategies, edge_breakdown, timings, summary }
+}
+
+/// Turn off step and trade capture for a batch that returns only its summary.
+fn skip_traces(configs: &mut [SimulationConfig]) {
+    for config in configs {
+        config.capture = StepCapture::None;
+        config.trace_trades = false;
+    }
 }
 
 /// Run a single simulation (non-parallel).
@@ -85,12 +470,276 @@ pub fn run_simulation(
         .map_err(|e| SimulationError::EVMError(e.to_string()))?;
 
     let mut engine = SimulationEngine::new(config);
-    engine.run(submission, baseline)
+    engine.run(Strategy::from(submission), Strategy::from(baseline))
+}
+
+/// Run simulations sequentially with the submission profiled.
+///
+/// Every `afterSwap` call of the submission across all configs adds to one
+/// opcode profile. The baseline runs unprofiled.
+pub fn run_profile(
+    submission_bytecode: Vec<u8>,
+    baseline_bytecode: Vec<u8>,
+    baseline_fixed_fee: Option<Wad>,
+    configs: Vec<SimulationConfig>,
+) -> Result<StrategyProfile, SimulationError> {
+    let submission = DeployedStrategy::deploy(submission_bytecode, "Submission".to_string())
+        .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+
+    let baseline = match baseline_fixed_fee {
+        Some(fee) => StrategyTemplate::FixedFee(
+            FixedFeeStrategy::symmetric("Baseline".to_string(), fee),
+        ),
+        None => StrategyTemplate::Evm(
+            DeployedStrategy::deploy(baseline_bytecode, "Baseline".to_string())
+                .map_err(|e| SimulationError::EVMError(e.to_string()))?,
+        ),
+    };
+
+    let data = Rc::new(RefCell::new(ProfileData::new(submission.code().len())));
+    for config in configs {
+        let profiled = ProfiledStrategy::new(&submission, Rc::clone(&data));
+        let mut engine = SimulationEngine::new(config);
+        engine.run(profiled.into(), baseline.instantiate())?;
+    }
+
+    let report = data.borrow().report(submission.name().to_string());
+    Ok(report)
+}
+
+/// Evaluate a strategy's fees for a grid of hypothetical trades.
+///
+/// Deploys once, calls `afterInitialize`, and replays `warmup` as ordinary
+/// `afterSwap` calls. Every probe trade is then answered from a copy of
+/// that warmed-up storage, so probes do not influence each other and can
+/// run in parallel.
+pub fn run_probe(
+    bytecode: Vec<u8>,
+    initial_x: Wad,
+    initial_y: Wad,
+    warmup: Vec<TradeInfo>,
+    trades: Vec<TradeInfo>,
+    n_workers: Option<usize>,
+    backend: ExecutionBackend,
+) -> Result<ProbeResult, SimulationError> {
+    let pool = worker_pool(n_workers)?;
+    let deployed = DeployedStrategy::deploy(bytecode, "Submission".to_string())
+        .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+    let template = StrategyTemplate::deployed(deployed, backend);
+
+    let mut strategy = template.instantiate();
+    strategy
+        .after_initialize(initial_x, initial_y)
+        .map_err(|e| SimulationError::EVMError(e.to_string()))?;
+    for trade in &warmup {
+        strategy
+            .after_swap(trade)
+            .map_err(|e| SimulationError::EVMError(format!("warm-up trade failed: {}", e)))?;
+    }
+    let warmed = strategy
+        .snapshot()
+        .expect("deployed strategies have storage");
+
+    let chunks: Vec<Vec<Option<(Wad, Wad)>>> = pool.install(|| {
+        trades
+            .par_chunks(PROBE_CHUNK)
+            .map(|chunk| {
+                let mut strategy = template.instantiate();
+                chunk
+                    .iter()
+                    .map(|trade| {
+                        strategy.restore(&warmed);
+                        strategy.after_swap(trade).ok()
+                    })
+                    .collect()
+            })
+            .collect()
+    });
+
+    let mut result = ProbeResult {
+        name: template.name().to_string(),
+        bid_fees: Vec::with_capacity(trades.len()),
+        ask_fees: Vec::with_capacity(trades.len()),
+        failures: 0,
+    };
+    for fees in chunks.into_iter().flatten() {
+        match fees {
+            Some((bid, ask)) => {
+                result.bid_fees.push(bid.to_f64());
+                result.ask_fees.push(ask.to_f64());
+            }
+            None => {
+                result.bid_fees.push(f64::NAN);
+                result.ask_fees.push(f64::NAN);
+                result.failures += 1;
+            }
+        }
+    }
+
+    Ok(result)
 }
 
 #[cfg(test)]
 mod tests {
     use super::*;
+    use crate::evm::test_contracts::{CONSTANT_FEE_STRATEGY, COUNTER_STRATEGY};
+
+    // Full simulation tests require compiled strategies - see integration tests
+
+    fn trade(timestamp: u64) -> TradeInfo {
+        TradeInfo::new(
+            timestamp % 2 == 0,
+            Wad::from_f64(1.0),
+            Wad::from_f64(100.0),
+            timestamp,
+            Wad::from_f64(101.0),
+            Wad::from_f64(9900.0),
+        )
+    }
+
+    #[test]
+    fn test_probes_start_from_warmed_state() {
+        let backends =
+            [ExecutionBackend::Revm, ExecutionBackend::Direct, ExecutionBackend::Compiled];
+        for backend in backends {
+            let result = run_probe(
+                COUNTER_STRATEGY.to_vec(),
+                Wad::from_f64(100.0),
+                Wad::from_f64(10000.0),
+                (0..3).map(trade).collect(),
+                (0..1000).map(trade).collect(),
+                Some(2),
+                backend,
+            )
+            .unwrap();
+
+            // getName, afterInitialize and 3 warm-up calls ran before the
+            // probes, and each probe sees exactly that state
+            assert_eq!(result.bid_fees.len(), 1000);
+            assert_eq!(result.failures, 0);
+            let expected = Wad::new(6).to_f64();
+            assert!(result.bid_fees.iter().all(|&fee| fee == expected));
+            assert!(result.ask_fees.iter().all(|&fee| fee == expected));
+        }
+    }
+
+    fn config(seed: u64) -> SimulationConfig {
+        SimulationConfig { n_steps: 80, ..SimulationConfig::small(seed) }
+    }
+
+    fn counter_batch(n_simulations: u64) -> SimulationBatchConfig {
+        SimulationBatchConfig {
+            submission_bytecode: COUNTER_STRATEGY.to_vec(),
+            baseline_bytecode: CONSTANT_FEE_STRATEGY.to_vec(),
+            baseline_fixed_fee: None,
+            configs: (0..n_simulations).map(config).collect(),
+            n_workers: Some(2),
+            backend: ExecutionBackend::Revm,
+            summary_only: false,
+        }
+    }
+
+    #[test]
+    fn test_replay_matches_batch() {
+        let batch = run_simulations_parallel(counter_batch(4)).unwrap();
+
+        let original = &batch.results[2];
+        let replayed = run_replay(
+            COUNTER_STRATEGY.to_vec(),
+            CONSTANT_FEE_STRATEGY.to_vec(),
+            None,
+            config(2),
+            true,
+            ExecutionBackend::Revm,
+        )
+        .unwrap();
+
+        assert_eq!(replayed.edges, original.edges);
+        assert_eq!(replayed.pnl, original.pnl);
+        assert_eq!(replayed.average_fees, original.average_fees);
+        assert_eq!(replayed.strategy_stats, original.strategy_stats);
+        assert!(original.trace.data().is_empty());
+
+        let trace = replayed.trace.data();
+        assert_eq!(trace.len(), 80);
+        let trades = &trace.trades;
+        let breakdown = &replayed.edge_breakdown["submission"];
+        let submission_trades = trades.amm.iter().filter(|&&amm| amm == 0).count() as u64;
+        assert_eq!(submission_trades, breakdown.arb_trades + breakdown.retail_trades);
+        let submission_edge: f64 = trades
+            .amm
+            .iter()
+            .zip(trades.edge.iter())
+            .filter(|(&amm, _)| amm == 0)
+            .map(|(_, edge)| edge)
+            .sum();
+        assert!((submission_edge - replayed.edges["submission"]).abs() < 1e-9);
+    }
+
+    #[test]
+    fn test_stream_matches_batch() {
+        let batch = run_simulations_parallel(counter_batch(6)).unwrap();
+        let receiver = stream_simulations_parallel(counter_batch(6)).unwrap();
+        let mut streamed: Vec<(usize, LightweightSimResult)> = receiver
+            .into_iter()
+            .map(|(index, result)| (index, result.unwrap()))
+            .collect();
+        streamed.sort_by_key(|(index, _)| *index);
+
+        assert_eq!(streamed.len(), 6);
+        for ((index, result), original) in streamed.iter().zip(&batch.results) {
+            assert_eq!(result.seed, *index as u64);
+            assert_eq!(result.edges, original.edges);
+            assert_eq!(result.strategy_stats, original.strategy_stats);
+        }
+    }
+
+    #[test]
+    fn test_forks_reject_duplicate_seeds() {
+        let forks = |seeds: Vec<u64>| {
+            run_forks_parallel(ForkBatchConfig {
+                submission_bytecode: COUNTER_STRATEGY.to_vec(),
+                baseline_bytecode: CONSTANT_FEE_STRATEGY.to_vec(),
+                baseline_fixed_fee: None,
+                config: config(3),
+                fork_step: 40,
+                seeds,
+                n_workers: Some(2),
+                backend: ExecutionBackend::Revm,
+            })
+        };
+
+        assert!(matches!(forks(vec![100, 101, 100]), Err(SimulationError::InvalidConfig(_))));
+        assert_eq!(forks(vec![100, 101]).unwrap().results.len(), 2);
+    }
+
+    #[test]
+    fn test_submissions_match_separate_batches() {
+        let batches = run_submissions_parallel(SubmissionsBatchConfig {
+            submission_bytecodes: vec![COUNTER_STRATEGY.to_vec(), CONSTANT_FEE_STRATEGY.to_vec()],
+            baseline_bytecode: CONSTANT_FEE_STRATEGY.to_vec(),
+            baseline_fixed_fee: None,
+            configs: (0..5).map(config).collect(),
+            n_workers: Some(2),
+            backend: ExecutionBackend::Revm,
+            summary_only: false,
+        })
+        .unwrap();
+        assert_eq!(batches.len(), 2);
 
-    // Full tests require EVM bytecode - see integration tests
+        let mut constant_batch = counter_batch(5);
+        constant_batch.submission_bytecode = CONSTANT_FEE_STRATEGY.to_vec();
+        let separate = [
+            run_simulations_parallel(counter_batch(5)).unwrap(),
+            run_simulations_parallel(constant_batch).unwrap(),
+        ];
+        for (batch, original) in batches.iter().zip(&separate) {
+            assert_eq!(batch.results.len(), 5);
+            for (result, original) in batch.results.iter().zip(&original.results) {
+                assert_eq!(result.seed, original.seed);
+                assert_eq!(result.edges, original.edges);
+                assert_eq!(result.pnl, original.pnl);
+            }
+        }
+    }
 }
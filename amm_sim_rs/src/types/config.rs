@@ -1,7 +1,131 @@
 //! Simulation configuration.
 
+use std::fmt;
+
 use pyo3::prelude::*;
 
+/// Which steps a simulation records in `LightweightSimResult.trace`.
+///
+/// Parsed from "full", "none", "every:N" or "last:K".
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub enum StepCapture {
+    /// Every step
+    #[default]
+    Full,
+    /// No steps (results carry only the aggregates)
+    None,
+    /// Steps 0, N, 2N, ...
+    Every(u32),
+    /// The final K steps
+    Last(u32),
+}
+
+impl StepCapture {
+    /// Parse a capture spec.
+    pub fn parse(spec: &str) -> Result<Self, String> {
+        let invalid = || {
+            format!(
+                "invalid capture '{}': expected 'full', 'none', 'every:N' or 'last:K'",
+                spec
+            )
+        };
+        match spec {
+            "full" => return Ok(StepCapture::Full),
+            "none" => return Ok(StepCapture::None),
+            _ => {}
+        }
+        let (mode, count) = spec.split_once(':').ok_or_else(invalid)?;
+        let count: u32 = count.parse().map_err(|_| invalid())?;
+        match mode {
+            "every" if count > 0 => Ok(StepCapture::Every(count)),
+            "last" => Ok(StepCapture::Last(count)),
+            _ => Err(invalid()),
+        }
+    }
+
+    /// Whether step `t` of an `n_steps` simulation is recorded.
+    #[inline]
+    pub fn captures(self, t: u32, n_steps: u32) -> bool {
+        match self {
+            StepCapture::Full => true,
+            StepCapture::None => false,
+            StepCapture::Every(n) => t % n == 0,
+            StepCapture::Last(k) => t >= n_steps.saturating_sub(k),
+        }
+    }
+
+    /// Number of steps recorded in an `n_steps` simulation.
+    pub fn count(self, n_steps: u32) -> usize {
+        let count = match self {
+            StepCapture::Full => n_steps,
+            StepCapture::None => 0,
+            StepCapture::Every(n) => n_steps.div_ceil(n),
+            StepCapture::Last(k) => k.min(n_steps),
+        };
+        count as usize
+    }
+}
+
+impl fmt::Display for StepCapture {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            StepCapture::Full => write!(f, "full"),
+            StepCapture::None => write!(f, "none"),
+            StepCapture::Every(n) => write!(f, "every:{}", n),
+            StepCapture::Last(k) => write!(f, "last:{}", k),
+        }
+    }
+}
+
+/// How often AMMs call their strategy's `afterSwap`.
+///
+/// Parsed from "exact", "every:N" or "per_step". Anything but `Exact` is a
+/// screening mode: fewer EVM calls, but fees react late, so edges are only
+/// approximate and must not be used for scoring.
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub enum FeeUpdates {
+    /// After every trade (the real competition rules)
+    #[default]
+    Exact,
+    /// After every Nth trade of an AMM, with that trade
+    Every(u32),
+    /// Once at the end of each step with an AMM's last trade of the step
+    PerStep,
+}
+
+impl FeeUpdates {
+    /// Parse a fee update spec.
+    pub fn parse(spec: &str) -> Result<Self, String> {
+        let invalid = || {
+            format!(
+                "invalid fee_updates '{}': expected 'exact', 'every:N' or 'per_step'",
+                spec
+            )
+        };
+        match spec {
+            "exact" => return Ok(FeeUpdates::Exact),
+            "per_step" => return Ok(FeeUpdates::PerStep),
+            _ => {}
+        }
+        let (mode, count) = spec.split_once(':').ok_or_else(invalid)?;
+        let count: u32 = count.parse().map_err(|_| invalid())?;
+        match mode {
+            "every" if count > 0 => Ok(FeeUpdates::Every(count)),
+            _ => Err(invalid()),
+        }
+    }
+}
+
+impl fmt::Display for FeeUpdates {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        match self {
+            FeeUpdates::Exact => write!(f, "exact"),
+            FeeUpdates::Every(n) => write!(f, "every:{}", n),
+            FeeUpdates::PerStep => write!(f, "per_step"),
+        }
+    }
+}
+
 /// Configuration for a simulation run.
 #[pyclass]
 #[derive(Debug, Clone)]
@@ -53,6 +177,20 @@ pub struct SimulationConfig {
     /// Random seed for reproducibility (None = random)
     #[pyo3(get, set)]
     pub seed: Option<u64>,
+
+    /// Which steps to record (exposed to Python as a spec string)
+    pub capture: StepCapture,
+
+    /// Record per-phase wall time in `LightweightSimResult.timings`
+    #[pyo3(get, set)]
+    pub timings: bool,
+
+    /// Record every trade in the step trace (`StepTrace.trades()`)
+    #[pyo3(get, set)]
+    pub trace_trades: bool,
+
+    /// How often strategies are called (exposed to Python as a spec string)
+    pub fee_updates: FeeUpdates,
 }
 
 #[pymethods]
@@ -70,7 +208,11 @@ impl SimulationConfig {
         retail_mean_size,
         retail_size_sigma,
         retail_buy_prob,
-        seed
+        seed,
+        capture = "full",
+        timings = false,
+        trace_trades = false,
+        fee_updates = "exact"
     ))]
     pub fn new(
         n_steps: u32,
@@ -85,8 +227,12 @@ impl SimulationConfig {
         retail_size_sigma: f64,
         retail_buy_prob: f64,
         seed: Option<u64>,
-    ) -> Self {
-        Self {
+        capture: &str,
+        timings: bool,
+        trace_trades: bool,
+        fee_updates: &str,
+    ) -> PyResult<Self> {
+        Ok(Self {
             n_steps,
             initial_price,
             initial_x,
@@ -99,17 +245,55 @@ impl SimulationConfig {
             retail_size_sigma,
             retail_buy_prob,
             seed,
-        }
+            capture: parse_capture(capture)?,
+            timings,
+            trace_trades,
+            fee_updates: parse_fee_updates(fee_updates)?,
+        })
+    }
+
+    /// Step capture spec: "full", "none", "every:N" or "last:K".
+    #[getter]
+    fn get_capture(&self) -> String {
+        self.capture.to_string()
+    }
+
+    #[setter]
+    fn set_capture(&mut self, capture: &str) -> PyResult<()> {
+        self.capture = parse_capture(capture)?;
+        Ok(())
+    }
+
+    /// afterSwap schedule: "exact", "every:N" or "per_step" (screening).
+    #[getter]
+    fn get_fee_updates(&self) -> String {
+        self.fee_updates.to_string()
+    }
+
+    #[setter]
+    fn set_fee_updates(&mut self, fee_updates: &str) -> PyResult<()> {
+        self.fee_updates = parse_fee_updates(fee_updates)?;
+        Ok(())
     }
 
     fn __repr__(&self) -> String {
         format!(
-            "SimulationConfig(n_steps={}, seed={:?})",
-            self.n_steps, self.seed
+            "SimulationConfig(n_steps={}, seed={:?}, capture={:?}, fee_updates={:?})",
+            self.n_steps, self.seed, self.capture.to_string(), self.fee_updates.to_string()
         )
     }
 }
 
+/// Parse a fee update spec, raising ValueError if it is invalid.
+fn parse_fee_updates(spec: &str) -> PyResult<FeeUpdates> {
+    FeeUpdates::parse(spec).map_err(PyErr::new::<pyo3::exceptions::PyValueError, _>)
+}
+
+/// Parse a capture spec, raising ValueError if it is invalid.
+fn parse_capture(spec: &str) -> PyResult<StepCapture> {
+    StepCapture::parse(spec).map_err(PyErr::new::<pyo3::exceptions::PyValueError, _>)
+}
+
 /// Configuration for hyperparameter variance across simulations.
 #[derive(Debug, Clone)]
 pub struct HyperparameterVariance {
@@ -166,6 +350,78 @@ impl HyperparameterVariance {
             retail_size_sigma: base.retail_size_sigma,
             retail_buy_prob: base.retail_buy_prob,
             seed: Some(seed),
+            capture: base.capture,
+            timings: base.timings,
+            trace_trades: base.trace_trades,
+            fee_updates: base.fee_updates,
+        }
+    }
+}
+
+/// Short config shared by the crate's tests: 100 steps, nothing captured.
+///
+/// Tests override what they need with struct update syntax.
+#[cfg(test)]
+impl SimulationConfig {
+    pub(crate) fn small(seed: u64) -> Self {
+        Self {
+            n_steps: 100,
+            initial_price: 100.0,
+            initial_x: 100.0,
+            initial_y: 10000.0,
+            gbm_mu: 0.0,
+            gbm_sigma: 0.001,
+            gbm_dt: 1.0,
+            retail_arrival_rate: 5.0,
+            retail_mean_size: 2.0,
+            retail_size_sigma: 0.7,
+            retail_buy_prob: 0.5,
+            seed: Some(seed),
+            capture: StepCapture::None,
+            timings: false,
+            trace_trades: false,
+            fee_updates: FeeUpdates::Exact,
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_fee_updates_parse_round_trips() {
+        for spec in ["exact", "every:4", "per_step"] {
+            assert_eq!(FeeUpdates::parse(spec).unwrap().to_string(), spec);
+        }
+        for spec in ["", "every:0", "every", "per-step", "last:3"] {
+            assert!(FeeUpdates::parse(spec).is_err(), "{}", spec);
+        }
+    }
+
+    #[test]
+    fn test_step_capture_parse_round_trips() {
+        for spec in ["full", "none", "every:10", "last:500"] {
+            assert_eq!(StepCapture::parse(spec).unwrap().to_string(), spec);
+        }
+        for spec in ["", "all", "every:0", "every:x", "last", "first:3"] {
+            assert!(StepCapture::parse(spec).is_err(), "{}", spec);
+        }
+    }
+
+    #[test]
+    fn test_step_capture_count_matches_captures() {
+        for capture in [
+            StepCapture::Full,
+            StepCapture::None,
+            StepCapture::Every(3),
+            StepCapture::Last(4),
+            StepCapture::Last(50),
+        ] {
+            let captured = (0..10).filter(|&t| capture.captures(t, 10)).count();
+            assert_eq!(captured, capture.count(10), "{}", capture);
         }
+        assert!(StepCapture::Last(2).captures(9, 10));
+        assert!(!StepCapture::Last(2).captures(7, 10));
     }
 }
@@ -4,8 +4,15 @@ pub mod wad;
 pub mod trade_info;
 pub mod config;
 pub mod result;
+pub mod trace;
+pub mod stream;
 
 pub use wad::Wad;
 pub use trade_info::TradeInfo;
-pub use config::SimulationConfig;
-pub use result::{LightweightSimResult, LightweightStepResult, BatchSimulationResult};
+pub use config::{FeeUpdates, SimulationConfig, StepCapture};
+pub use result::{
+    LightweightSimResult, BatchSimulationResult, BatchSummary, EdgeBreakdown, PhaseTimings,
+    ProbeResult, StrategyProfile, StrategyStats,
+};
+pub use trace::{StepTrace, TraceArray};
+pub use stream::BatchStream;
@@ -3,41 +3,416 @@
 use pyo3::prelude::*;
 use std::collections::HashMap;
 
-/// Lightweight step result for charting (minimal memory footprint).
+use crate::types::trace::StepTrace;
+
+/// Strategy execution counters for one simulation.
+///
+/// Covers the `afterSwap` calls made during the simulation. Gas figures are
+/// whole-transaction gas as reported by revm, comparable to the 250k trade
+/// gas limit; p50/p99 have 1k-gas resolution.
+#[pyclass]
+#[derive(Debug, Clone, Default, PartialEq, Eq)]
+pub struct StrategyStats {
+    /// Number of afterSwap calls
+    #[pyo3(get)]
+    pub after_swap_calls: u64,
+
+    /// Calls that reverted
+    #[pyo3(get)]
+    pub reverts: u64,
+
+    /// Calls that ran out of gas
+    #[pyo3(get)]
+    pub out_of_gas: u64,
+
+    /// Calls that halted for another reason
+    #[pyo3(get)]
+    pub halts: u64,
+
+    /// Successful calls whose return data was not a fee pair
+    #[pyo3(get)]
+    pub invalid_returns: u64,
+
+    /// Total gas used
+    #[pyo3(get)]
+    pub gas_total: u64,
+
+    /// Largest gas used by a single call
+    #[pyo3(get)]
+    pub gas_max: u64,
+
+    /// Median gas per call
+    #[pyo3(get)]
+    pub gas_p50: u64,
+
+    /// 99th percentile gas per call
+    #[pyo3(get)]
+    pub gas_p99: u64,
+
+    /// Fees (bid or ask) that `clamp_fee` had to bring into range
+    #[pyo3(get)]
+    pub clamped_fees: u64,
+}
+
+#[pymethods]
+impl StrategyStats {
+    /// Mean gas per call.
+    #[getter]
+    fn gas_mean(&self) -> f64 {
+        if self.after_swap_calls == 0 {
+            0.0
+        } else {
+            self.gas_total as f64 / self.after_swap_calls as f64
+        }
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "StrategyStats(calls={}, gas_p50={}, gas_p99={}, gas_max={}, reverts={}, clamped_fees={})",
+            self.after_swap_calls, self.gas_p50, self.gas_p99, self.gas_max,
+            self.reverts, self.clamped_fees
+        )
+    }
+}
+
+/// Opcode-level profile of a strategy's `afterSwap` calls.
+///
+/// Produced by `amm_sim_rs.profile`. Program counters refer to the deployed
+/// runtime bytecode, so they can be mapped to source lines with the solc
+/// `deployedBytecode.sourceMap`.
+#[pyclass]
+#[derive(Debug, Clone)]
+pub struct StrategyProfile {
+    /// Strategy name returned by getName()
+    #[pyo3(get)]
+    pub name: String,
+
+    /// Number of profiled afterSwap calls
+    #[pyo3(get)]
+    pub calls: u64,
+
+    /// Transaction gas of all profiled calls (includes intrinsic gas)
+    #[pyo3(get)]
+    pub gas_total: u64,
+
+    /// Executions by opcode mnemonic
+    #[pyo3(get)]
+    pub opcode_counts: HashMap<String, u64>,
+
+    /// Gas charged by opcode mnemonic
+    #[pyo3(get)]
+    pub opcode_gas: HashMap<String, u64>,
+
+    /// Executed program counters: (pc, executions, gas), sorted by pc
+    #[pyo3(get)]
+    pub pc_counts: Vec<(usize, u64, u64)>,
+
+    /// Total SLOADs over all calls
+    #[pyo3(get)]
+    pub sload_total: u64,
+
+    /// Total SSTOREs over all calls
+    #[pyo3(get)]
+    pub sstore_total: u64,
+
+    /// Most SLOADs in a single call
+    #[pyo3(get)]
+    pub sload_max: u64,
+
+    /// Most SSTOREs in a single call
+    #[pyo3(get)]
+    pub sstore_max: u64,
+}
+
+#[pymethods]
+impl StrategyProfile {
+    /// Mean SLOADs per call.
+    #[getter]
+    fn sloads_per_call(&self) -> f64 {
+        if self.calls == 0 { 0.0 } else { self.sload_total as f64 / self.calls as f64 }
+    }
+
+    /// Mean SSTOREs per call.
+    #[getter]
+    fn sstores_per_call(&self) -> f64 {
+        if self.calls == 0 { 0.0 } else { self.sstore_total as f64 / self.calls as f64 }
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "StrategyProfile(name={:?}, calls={}, gas_total={}, pcs={})",
+            self.name, self.calls, self.gas_total, self.pc_counts.len()
+        )
+    }
+}
+
+/// Fees a strategy returned for a grid of hypothetical trades.
+///
+/// Produced by `amm_sim_rs.probe`. Entry i answers trade i; failed probes
+/// (revert, halt, bad return data) have NaN fees.
 #[pyclass]
 #[derive(Debug, Clone)]
-pub struct LightweightStepResult {
-    /// Simulation step number
+pub struct ProbeResult {
+    /// Strategy name returned by getName()
+    #[pyo3(get)]
+    pub name: String,
+
+    /// Bid fee per probe trade
+    #[pyo3(get)]
+    pub bid_fees: Vec<f64>,
+
+    /// Ask fee per probe trade
+    #[pyo3(get)]
+    pub ask_fees: Vec<f64>,
+
+    /// Number of probes whose afterSwap call failed
+    #[pyo3(get)]
+    pub failures: u64,
+}
+
+#[pymethods]
+impl ProbeResult {
+    fn __len__(&self) -> usize {
+        self.bid_fees.len()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "ProbeResult(name={:?}, probes={}, failures={})",
+            self.name, self.bid_fees.len(), self.failures
+        )
+    }
+}
+
+/// Wall time and call counts per simulation phase.
+///
+/// Recorded when `SimulationConfig.timings` is set. Arbitrage and routing
+/// times exclude the strategy `afterSwap` calls their trades trigger; those
+/// are counted under `strategy`. Times are in nanoseconds.
+#[pyclass]
+#[derive(Debug, Clone, Default, PartialEq, Eq)]
+pub struct PhaseTimings {
+    /// Simulations covered
+    #[pyo3(get)]
+    pub simulations: u64,
+
+    /// AMM setup, including the afterInitialize calls
+    #[pyo3(get)]
+    pub setup_ns: u64,
+
+    /// GBM price steps
+    #[pyo3(get)]
+    pub price_ns: u64,
+
+    /// Number of price steps
+    #[pyo3(get)]
+    pub price_steps: u64,
+
+    /// Arbitrage sizing and execution
+    #[pyo3(get)]
+    pub arbitrage_ns: u64,
+
+    /// Number of executed arbitrage trades
+    #[pyo3(get)]
+    pub arbitrages: u64,
+
+    /// Retail order generation and routing
+    #[pyo3(get)]
+    pub routing_ns: u64,
+
+    /// Number of routed retail orders
+    #[pyo3(get)]
+    pub retail_orders: u64,
+
+    /// Strategy afterSwap calls
+    #[pyo3(get)]
+    pub strategy_ns: u64,
+
+    /// Number of afterSwap calls
+    #[pyo3(get)]
+    pub strategy_calls: u64,
+
+    /// Fee averaging and step capture
+    #[pyo3(get)]
+    pub bookkeeping_ns: u64,
+
+    /// Whole simulation, including building the result
+    #[pyo3(get)]
+    pub total_ns: u64,
+}
+
+impl PhaseTimings {
+    /// Add another set of timings to this one.
+    pub fn add(&mut self, other: &PhaseTimings) {
+        self.simulations += other.simulations;
+        self.setup_ns += other.setup_ns;
+        self.price_ns += other.price_ns;
+        self.price_steps += other.price_steps;
+        self.arbitrage_ns += other.arbitrage_ns;
+        self.arbitrages += other.arbitrages;
+        self.routing_ns += other.routing_ns;
+        self.retail_orders += other.retail_orders;
+        self.strategy_ns += other.strategy_ns;
+        self.strategy_calls += other.strategy_calls;
+        self.bookkeeping_ns += other.bookkeeping_ns;
+        self.total_ns += other.total_ns;
+    }
+
+    /// Sum of the given timings, or None if there are none.
+    pub fn total<'a>(timings: impl IntoIterator<Item = &'a PhaseTimings>) -> Option<PhaseTimings> {
+        timings.into_iter().fold(None, |total, timings| {
+            let mut total = total.unwrap_or_default();
+            total.add(timings);
+            Some(total)
+        })
+    }
+}
+
+#[pymethods]
+impl PhaseTimings {
+    /// Breakdown as (phase, seconds, count) rows.
+    fn phases(&self) -> Vec<(&'static str, f64, u64)> {
+        let seconds = |ns: u64| ns as f64 * 1e-9;
+        vec![
+            ("setup", seconds(self.setup_ns), self.simulations),
+            ("price", seconds(self.price_ns), self.price_steps),
+            ("arbitrage", seconds(self.arbitrage_ns), self.arbitrages),
+            ("routing", seconds(self.routing_ns), self.retail_orders),
+            ("strategy", seconds(self.strategy_ns), self.strategy_calls),
+            ("bookkeeping", seconds(self.bookkeeping_ns), self.price_steps),
+        ]
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "PhaseTimings(simulations={}, total_ns={}, strategy_ns={}, strategy_calls={})",
+            self.simulations, self.total_ns, self.strategy_ns, self.strategy_calls
+        )
+    }
+}
+
+/// Where an AMM's edge came from, and the fees its trades paid.
+///
+/// Kept as running counters in every simulation, so the split between edge
+/// lost to arbitrageurs and edge earned from retail is available without
+/// step traces. Batch results sum these over simulations; the ratios are
+/// then volume-weighted across simulations. Volumes are in Y.
+#[pyclass]
+#[derive(Debug, Clone, Copy, Default, PartialEq)]
+pub struct EdgeBreakdown {
+    /// Edge from arbitrage trades (never positive)
+    #[pyo3(get)]
+    pub arb_edge: f64,
+
+    /// Edge from retail trades
+    #[pyo3(get)]
+    pub retail_edge: f64,
+
+    /// Number of arbitrage trades
+    #[pyo3(get)]
+    pub arb_trades: u64,
+
+    /// Number of retail trades (orders split across AMMs count per AMM)
     #[pyo3(get)]
-    pub timestamp: u32,
+    pub retail_trades: u64,
 
-    /// Fair price at this step
+    /// Arbitrage volume
     #[pyo3(get)]
-    pub fair_price: f64,
+    pub arb_volume_y: f64,
 
-    /// Spot prices by strategy name
+    /// Retail volume routed to this AMM
     #[pyo3(get)]
-    pub spot_prices: HashMap<String, f64>,
+    pub retail_volume_y: f64,
 
-    /// Running PnL by strategy name
+    /// Retail volume routed to all AMMs of the market
     #[pyo3(get)]
-    pub pnls: HashMap<String, f64>,
+    pub market_retail_volume_y: f64,
 
-    /// Fees (bid, ask) by strategy name
+    /// Sum of fee * volume over arbitrage trades
     #[pyo3(get)]
-    pub fees: HashMap<String, (f64, f64)>,
+    pub arb_fee_volume_y: f64,
+
+    /// Sum of fee * volume over retail trades
+    #[pyo3(get)]
+    pub retail_fee_volume_y: f64,
+}
+
+impl EdgeBreakdown {
+    /// Add another breakdown to this one.
+    pub fn add(&mut self, other: &EdgeBreakdown) {
+        self.arb_edge += other.arb_edge;
+        self.retail_edge += other.retail_edge;
+        self.arb_trades += other.arb_trades;
+        self.retail_trades += other.retail_trades;
+        self.arb_volume_y += other.arb_volume_y;
+        self.retail_volume_y += other.retail_volume_y;
+        self.market_retail_volume_y += other.market_retail_volume_y;
+        self.arb_fee_volume_y += other.arb_fee_volume_y;
+        self.retail_fee_volume_y += other.retail_fee_volume_y;
+    }
+
+    /// Sum the breakdowns of each strategy over many simulations.
+    pub fn total<'a>(
+        breakdowns: impl IntoIterator<Item = &'a HashMap<String, EdgeBreakdown>>,
+    ) -> HashMap<String, EdgeBreakdown> {
+        let mut total: HashMap<String, EdgeBreakdown> = HashMap::new();
+        for by_name in breakdowns {
+            for (name, breakdown) in by_name {
+                total.entry(name.clone()).or_default().add(breakdown);
+            }
+        }
+        total
+    }
 }
 
 #[pymethods]
-impl LightweightStepResult {
+impl EdgeBreakdown {
+    /// Total edge (arbitrage plus retail).
+    #[getter]
+    fn edge(&self) -> f64 {
+        self.arb_edge + self.retail_edge
+    }
+
+    /// Fraction of the market's retail volume routed to this AMM.
+    #[getter]
+    fn retail_share(&self) -> f64 {
+        ratio(self.retail_volume_y, self.market_retail_volume_y)
+    }
+
+    /// Volume-weighted fee charged on arbitrage trades.
+    #[getter]
+    fn arb_fee(&self) -> f64 {
+        ratio(self.arb_fee_volume_y, self.arb_volume_y)
+    }
+
+    /// Volume-weighted fee charged on retail trades.
+    #[getter]
+    fn retail_fee(&self) -> f64 {
+        ratio(self.retail_fee_volume_y, self.retail_volume_y)
+    }
+
+    /// Volume-weighted fee charged on all trades.
+    #[getter]
+    fn effective_fee(&self) -> f64 {
+        ratio(
+            self.arb_fee_volume_y + self.retail_fee_volume_y,
+            self.arb_volume_y + self.retail_volume_y,
+        )
+    }
+
     fn __repr__(&self) -> String {
         format!(
-            "LightweightStepResult(timestamp={}, fair_price={:.4})",
-            self.timestamp, self.fair_price
+            "EdgeBreakdown(arb_edge={:.4}, retail_edge={:.4}, retail_share={:.4}, effective_fee={:.6})",
+            self.arb_edge, self.retail_edge, self.retail_share(), self.effective_fee()
         )
     }
 }
 
+/// `numerator / denominator`, or 0 for an empty denominator.
+fn ratio(numerator: f64, denominator: f64) -> f64 {
+    if denominator == 0.0 { 0.0 } else { numerator / denominator }
+}
+
 /// Lightweight simulation result for charting.
 #[pyclass]
 #[derive(Debug, Clone)]
@@ -66,9 +441,9 @@ pub struct LightweightSimResult {
     #[pyo3(get)]
     pub initial_reserves: HashMap<String, (f64, f64)>,
 
-    /// Step results for charting
+    /// Captured steps for charting, as columns
     #[pyo3(get)]
-    pub steps: Vec<LightweightStepResult>,
+    pub trace: StepTrace,
 
     /// Total arb volume (in Y) by strategy name
     #[pyo3(get)]
@@ -81,6 +456,23 @@ pub struct LightweightSimResult {
     /// Average fees (bid, ask) by strategy name over the simulation
     #[pyo3(get)]
     pub average_fees: HashMap<String, (f64, f64)>,
+
+    /// Strategy execution counters by strategy name
+    #[pyo3(get)]
+    pub strategy_stats: HashMap<String, StrategyStats>,
+
+    /// Edge and flow counters by strategy name
+    #[pyo3(get)]
+    pub edge_breakdown: HashMap<String, EdgeBreakdown>,
+
+    /// afterSwap schedule the simulation ran with; anything but "exact" is
+    /// a screening run with approximate results
+    #[pyo3(get)]
+    pub fee_updates: String,
+
+    /// Per-phase timings (None unless `SimulationConfig.timings` is set)
+    #[pyo3(get)]
+    pub timings: Option<PhaseTimings>,
 }
 
 #[pymethods]
@@ -116,8 +508,8 @@ impl LightweightSimResult {
 
     fn __repr__(&self) -> String {
         format!(
-            "LightweightSimResult(seed={}, pnl={:?})",
-            self.seed, self.pnl
+            "LightweightSimResult(seed={}, pnl={:?}, fee_updates={:?})",
+            self.seed, self.pnl, self.fee_updates
         )
     }
 }
@@ -133,6 +525,18 @@ pub struct BatchSimulationResult {
     /// Strategy names
     #[pyo3(get)]
     pub strategies: Vec<String>,
+
+    /// Edge and flow counters by strategy name, summed over simulations
+    #[pyo3(get)]
+    pub edge_breakdown: HashMap<String, EdgeBreakdown>,
+
+    /// Per-phase timings summed over the simulations that recorded them
+    #[pyo3(get)]
+    pub timings: Option<PhaseTimings>,
+
+    /// Edge and PnL statistics over all simulations (kept with `summary_only`)
+    #[pyo3(get)]
+    pub summary: BatchSummary,
 }
 
 #[pymethods]
@@ -142,38 +546,8 @@ impl BatchSimulationResult {
         if self.strategies.len() != 2 {
             return (0, 0, 0);
         }
-
-        let name_a = &self.strategies[0];
-        let name_b = &self.strategies[1];
-
-        let mut wins_a = 0u32;
-        let mut wins_b = 0u32;
-        let mut draws = 0u32;
-
-        for result in &self.results {
-            let pnl_a = result.pnl.get(name_a).copied().unwrap_or(0.0);
-            let pnl_b = result.pnl.get(name_b).copied().unwrap_or(0.0);
-            let edge_a = result
-                .edges
-                .get(name_a)
-                .copied()
-                .unwrap_or(pnl_a);
-            let edge_b = result
-                .edges
-                .get(name_b)
-                .copied()
-                .unwrap_or(pnl_b);
-
-            if edge_a > edge_b {
-                wins_a += 1;
-            } else if edge_b > edge_a {
-                wins_b += 1;
-            } else {
-                draws += 1;
-            }
-        }
-
-        (wins_a, wins_b, draws)
+        let wins = &self.summary.wins;
+        (wins[0] as u32, wins[1] as u32, self.summary.draws as u32)
     }
 
     /// Get total PnL: (total_pnl_a, total_pnl_b)
@@ -181,19 +555,8 @@ impl BatchSimulationResult {
         if self.strategies.len() != 2 {
             return (0.0, 0.0);
         }
-
-        let name_a = &self.strategies[0];
-        let name_b = &self.strategies[1];
-
-        let mut total_a = 0.0f64;
-        let mut total_b = 0.0f64;
-
-        for result in &self.results {
-            total_a += result.pnl.get(name_a).copied().unwrap_or(0.0);
-            total_b += result.pnl.get(name_b).copied().unwrap_or(0.0);
-        }
-
-        (total_a, total_b)
+        let pnl = &self.summary.pnl_stats;
+        (pnl[0].total(), pnl[1].total())
     }
 
     /// Get the overall winner based on win count.
@@ -212,11 +575,352 @@ impl BatchSimulationResult {
         let (wins_a, wins_b, draws) = self.win_counts();
         format!(
             "BatchSimulationResult(n={}, wins=({}, {}, {}))",
-            self.results.len(), wins_a, wins_b, draws
+            self.summary.n_simulations, wins_a, wins_b, draws
         )
     }
 
+    /// Number of simulations run (`results` is empty with `summary_only`).
     fn __len__(&self) -> usize {
-        self.results.len()
+        self.summary.n_simulations
+    }
+}
+
+/// Running total, mean and variance of one series.
+#[derive(Debug, Clone, Copy, Default)]
+struct RunningStats {
+    n: u64,
+    /// Neumaier-compensated sum. It is a float, within about one rounding
+    /// of the exact sum of the values, not an exact decimal sum
+    sum: f64,
+    compensation: f64,
+    /// Welford mean and sum of squared deviations
+    mean: f64,
+    m2: f64,
+}
+
+impl RunningStats {
+    fn push(&mut self, x: f64) {
+        let sum = self.sum + x;
+        if self.sum.abs() >= x.abs() {
+            self.compensation += (self.sum - sum) + x;
+        } else {
+            self.compensation += (x - sum) + self.sum;
+        }
+        self.sum = sum;
+
+        self.n += 1;
+        let delta = x - self.mean;
+        self.mean += delta / self.n as f64;
+        self.m2 += delta * (x - self.mean);
+    }
+
+    fn total(&self) -> f64 {
+        self.sum + self.compensation
+    }
+
+    fn mean(&self) -> f64 {
+        if self.n == 0 { f64::NAN } else { self.mean }
+    }
+
+    /// Sample standard deviation.
+    fn std(&self) -> f64 {
+        if self.n < 2 { f64::NAN } else { (self.m2 / (self.n - 1) as f64).sqrt() }
+    }
+
+    /// Standard error of the mean.
+    fn stderr(&self) -> f64 {
+        self.std() / (self.n as f64).sqrt()
+    }
+}
+
+/// Edge and PnL statistics of a batch, per strategy.
+///
+/// Built in Rust as results come in, so reading a summary costs the same
+/// for ten simulations or ten thousand. Strategies are in result order;
+/// the last one is the baseline ("normalizer") in every batch, and
+/// `edge_diff_*` pair each other strategy's edge with it, simulation by
+/// simulation. A simulation is won by the strategy with the strictly
+/// highest edge and is a draw otherwise.
+#[pyclass]
+#[derive(Debug, Clone, Default)]
+pub struct BatchSummary {
+    /// Strategy names
+    #[pyo3(get)]
+    pub strategies: Vec<String>,
+
+    /// Number of simulations summarized
+    #[pyo3(get)]
+    pub n_simulations: usize,
+
+    /// Simulations without a single best edge
+    #[pyo3(get)]
+    pub draws: u64,
+
+    /// Simulations won, per strategy
+    wins: Vec<u64>,
+    /// Seed of each simulation, in the order added
+    seeds: Vec<u64>,
+    /// Edge of each simulation, per strategy
+    edges: Vec<Vec<f64>>,
+    edge_stats: Vec<RunningStats>,
+    pnl_stats: Vec<RunningStats>,
+    /// Edge minus the baseline's edge, per strategy but the baseline
+    diff_stats: Vec<RunningStats>,
+}
+
+impl BatchSummary {
+    /// Summarize `results`.
+    pub fn from_results<'a>(results: impl IntoIterator<Item = &'a LightweightSimResult>) -> Self {
+        let mut summary = Self::default();
+        for result in results {
+            summary.add(result);
+        }
+        summary
+    }
+
+    /// Add one simulation. The first one fixes the strategies.
+    pub fn add(&mut self, result: &LightweightSimResult) {
+        if self.n_simulations == 0 {
+            let n = result.strategies.len();
+            self.strategies = result.strategies.clone();
+            self.wins = vec![0; n];
+            self.edges = vec![Vec::new(); n];
+            self.edge_stats = vec![RunningStats::default(); n];
+            self.pnl_stats = vec![RunningStats::default(); n];
+            self.diff_stats = vec![RunningStats::default(); n.saturating_sub(1)];
+        }
+
+        let pnl = |name: &String| result.pnl.get(name).copied().unwrap_or(0.0);
+        // A missing edge falls back to the strategy's PnL, as win_counts always did
+        let edge_of =
+            |name: &String| result.edges.get(name).copied().unwrap_or_else(|| pnl(name));
+        let baseline_edge = self.strategies.last().map_or(0.0, |name| edge_of(name));
+        let mut best: Option<(usize, f64)> = None;
+        let mut tied = false;
+        for (i, name) in self.strategies.iter().enumerate() {
+            let edge = edge_of(name);
+            self.edges[i].push(edge);
+            self.edge_stats[i].push(edge);
+            self.pnl_stats[i].push(pnl(name));
+            if let Some(diff) = self.diff_stats.get_mut(i) {
+                diff.push(edge - baseline_edge);
+            }
+            match best {
+                Some((_, best_edge)) if edge < best_edge => {}
+                Some((_, best_edge)) if edge == best_edge => tied = true,
+                _ => {
+                    best = Some((i, edge));
+                    tied = false;
+                }
+            }
+        }
+        match best {
+            Some((i, _)) if !tied => self.wins[i] += 1,
+            _ => self.draws += 1,
+        }
+
+        self.seeds.push(result.seed);
+        self.n_simulations += 1;
+    }
+
+    /// Mean edge of one strategy, without building the per-name maps.
+    pub fn mean_edge_of(&self, name: &str) -> Option<f64> {
+        let i = self.strategies.iter().position(|strategy| strategy == name)?;
+        Some(self.edge_stats[i].mean())
+    }
+
+    fn index(&self, name: &str) -> PyResult<usize> {
+        self.strategies
+            .iter()
+            .position(|strategy| strategy == name)
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(name.to_string()))
+    }
+
+    /// Map each strategy (or each but the baseline) to a statistic.
+    fn by_name(
+        &self,
+        stats: &[RunningStats],
+        statistic: fn(&RunningStats) -> f64,
+    ) -> HashMap<String, f64> {
+        self.strategies.iter().cloned().zip(stats.iter().map(statistic)).collect()
+    }
+}
+
+#[pymethods]
+impl BatchSummary {
+    /// Total edge per strategy.
+    #[getter]
+    fn total_edge(&self) -> HashMap<String, f64> {
+        self.by_name(&self.edge_stats, RunningStats::total)
+    }
+
+    /// Mean edge per simulation, per strategy.
+    #[getter]
+    fn mean_edge(&self) -> HashMap<String, f64> {
+        self.by_name(&self.edge_stats, RunningStats::mean)
+    }
+
+    /// Sample standard deviation of the edge, per strategy.
+    #[getter]
+    fn edge_std(&self) -> HashMap<String, f64> {
+        self.by_name(&self.edge_stats, RunningStats::std)
+    }
+
+    /// Standard error of the mean edge, per strategy.
+    #[getter]
+    fn edge_stderr(&self) -> HashMap<String, f64> {
+        self.by_name(&self.edge_stats, RunningStats::stderr)
+    }
+
+    /// Total PnL per strategy.
+    #[getter]
+    fn total_pnl(&self) -> HashMap<String, f64> {
+        self.by_name(&self.pnl_stats, RunningStats::total)
+    }
+
+    /// Mean PnL per simulation, per strategy.
+    #[getter]
+    fn mean_pnl(&self) -> HashMap<String, f64> {
+        self.by_name(&self.pnl_stats, RunningStats::mean)
+    }
+
+    /// Mean per-simulation edge over the baseline, per other strategy.
+    #[getter]
+    fn edge_diff_mean(&self) -> HashMap<String, f64> {
+        self.by_name(&self.diff_stats, RunningStats::mean)
+    }
+
+    /// Standard error of `edge_diff_mean` (paired, so shared price paths cancel).
+    #[getter]
+    fn edge_diff_stderr(&self) -> HashMap<String, f64> {
+        self.by_name(&self.diff_stats, RunningStats::stderr)
+    }
+
+    /// Simulations won, per strategy.
+    #[getter]
+    fn wins(&self) -> HashMap<String, u64> {
+        self.strategies.iter().cloned().zip(self.wins.iter().copied()).collect()
+    }
+
+    /// Quantiles of a strategy's edge, interpolated linearly as numpy does.
+    fn edge_quantiles(&self, name: &str, quantiles: Vec<f64>) -> PyResult<Vec<f64>> {
+        let mut edges = self.edges[self.index(name)?].clone();
+        edges.sort_by(f64::total_cmp);
+        quantiles
+            .into_iter()
+            .map(|q| {
+                if !(0.0..=1.0).contains(&q) {
+                    return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                        "quantiles must be in [0, 1] (got {})",
+                        q
+                    )));
+                }
+                Ok(quantile(&edges, q))
+            })
+            .collect()
+    }
+
+    /// A strategy's edge in each simulation, by seed.
+    fn edge_by_seed(&self, name: &str) -> PyResult<HashMap<u64, f64>> {
+        let edges = &self.edges[self.index(name)?];
+        Ok(self.seeds.iter().copied().zip(edges.iter().copied()).collect())
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "BatchSummary(n={}, strategies={:?}, draws={})",
+            self.n_simulations, self.strategies, self.draws
+        )
+    }
+}
+
+/// Quantile `q` of sorted values (NaN if there are none).
+fn quantile(sorted: &[f64], q: f64) -> f64 {
+    if sorted.is_empty() {
+        return f64::NAN;
+    }
+    let position = q * (sorted.len() - 1) as f64;
+    let lower = position.floor() as usize;
+    let upper = position.ceil() as usize;
+    sorted[lower] + (sorted[upper] - sorted[lower]) * (position - lower as f64)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn result(seed: u64, edges: &[(&str, f64)]) -> LightweightSimResult {
+        let values: HashMap<String, f64> =
+            edges.iter().map(|(name, edge)| (name.to_string(), *edge)).collect();
+        LightweightSimResult {
+            seed,
+            strategies: edges.iter().map(|(name, _)| name.to_string()).collect(),
+            pnl: values.iter().map(|(name, edge)| (name.clone(), 2.0 * edge)).collect(),
+            edges: values,
+            initial_fair_price: 100.0,
+            initial_reserves: HashMap::new(),
+            trace: StepTrace::default(),
+            arb_volume_y: HashMap::new(),
+            retail_volume_y: HashMap::new(),
+            average_fees: HashMap::new(),
+            strategy_stats: HashMap::new(),
+            edge_breakdown: HashMap::new(),
+            fee_updates: "exact".to_string(),
+            timings: None,
+        }
+    }
+
+    #[test]
+    fn test_batch_summary_statistics() {
+        let results = [
+            result(0, &[("submission", 1.0), ("normalizer", 0.5)]),
+            result(1, &[("submission", 3.0), ("normalizer", 3.0)]),
+            result(2, &[("submission", 2.0), ("normalizer", 4.0)]),
+            result(3, &[("submission", 6.0), ("normalizer", 1.5)]),
+        ];
+        let summary = BatchSummary::from_results(&results);
+
+        assert_eq!(summary.n_simulations, 4);
+        let wins = summary.wins();
+        assert_eq!((wins["submission"], wins["normalizer"]), (2, 1));
+        assert_eq!(summary.draws, 1);
+        assert_eq!(summary.total_edge()["submission"], 12.0);
+        assert_eq!(summary.mean_edge()["submission"], 3.0);
+        assert_eq!(summary.total_pnl()["normalizer"], 18.0);
+        // Sample variance of 1, 3, 2, 6 is 14 / 3
+        assert!((summary.edge_std()["submission"] - (14.0f64 / 3.0).sqrt()).abs() < 1e-12);
+        assert!((summary.edge_stderr()["submission"] - (14.0f64 / 12.0).sqrt()).abs() < 1e-12);
+
+        // Paired differences 0.5, 0, -2, 4.5, against the last strategy only
+        let diff = summary.edge_diff_mean();
+        assert_eq!(diff.len(), 1);
+        assert_eq!(diff["submission"], 0.75);
+
+        let quantiles = summary.edge_quantiles("submission", vec![0.0, 0.5, 1.0]).unwrap();
+        assert_eq!(quantiles, vec![1.0, 2.5, 6.0]);
+        assert!(summary.edge_quantiles("submission", vec![1.5]).is_err());
+        assert_eq!(summary.edge_by_seed("normalizer").unwrap()[&2], 4.0);
+    }
+
+    #[test]
+    fn test_missing_edge_falls_back_to_pnl() {
+        // PnL is twice the edge, so without its edge the normalizer wins on PnL
+        let mut without_edge = result(0, &[("submission", 1.0), ("normalizer", 0.8)]);
+        without_edge.edges.remove("normalizer");
+        let summary = BatchSummary::from_results(&[without_edge]);
+
+        assert_eq!(summary.wins()["normalizer"], 1);
+        assert_eq!(summary.total_edge()["normalizer"], 1.6);
+    }
+
+    #[test]
+    fn test_compensated_total() {
+        let mut stats = RunningStats::default();
+        stats.push(1e16);
+        for _ in 0..10 {
+            stats.push(1.0);
+        }
+        stats.push(-1e16);
+        assert_eq!(stats.total(), 10.0);
     }
 }
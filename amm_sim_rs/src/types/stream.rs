@@ -0,0 +1,144 @@
+//! Results of a running batch, as they finish.
+
+use std::collections::HashMap;
+use std::sync::mpsc::{Receiver, RecvTimeoutError};
+use std::time::Duration;
+
+use pyo3::exceptions::PyRuntimeError;
+use pyo3::prelude::*;
+
+use crate::simulation::runner::StreamedResult;
+use crate::types::result::{BatchSummary, EdgeBreakdown, LightweightSimResult, PhaseTimings};
+
+/// How long `__next__` waits without the GIL before checking for signals.
+const SIGNAL_CHECK_INTERVAL: Duration = Duration::from_millis(100);
+
+/// Iterator over a batch that is still running.
+///
+/// Yields (index, LightweightSimResult) in completion order, where index is
+/// the position of the simulation's config. Waiting releases the GIL, and
+/// Ctrl-C interrupts it. Results are not kept once yielded; only the
+/// `summary`, `edge_breakdown` and `timings` of those yielded so far are.
+/// A failed simulation raises RuntimeError. Dropping the stream, or an
+/// error, stops the batch.
+#[pyclass]
+pub struct BatchStream {
+    /// None once the batch has ended
+    receiver: Option<Receiver<StreamedResult>>,
+    total: usize,
+    completed: usize,
+    summary: BatchSummary,
+    edge_breakdown: HashMap<String, EdgeBreakdown>,
+    timings: Option<PhaseTimings>,
+}
+
+impl BatchStream {
+    /// Wrap the receiver of a batch of `total` simulations.
+    pub fn new(receiver: Receiver<StreamedResult>, total: usize) -> Self {
+        Self {
+            receiver: Some(receiver),
+            total,
+            completed: 0,
+            summary: BatchSummary::default(),
+            edge_breakdown: HashMap::new(),
+            timings: None,
+        }
+    }
+
+    /// Add a yielded result to the totals.
+    fn record(&mut self, result: &LightweightSimResult) {
+        self.completed += 1;
+        self.summary.add(result);
+        for (name, breakdown) in &result.edge_breakdown {
+            self.edge_breakdown.entry(name.clone()).or_default().add(breakdown);
+        }
+        if let Some(timings) = &result.timings {
+            self.timings.get_or_insert_with(PhaseTimings::default).add(timings);
+        }
+    }
+}
+
+#[pymethods]
+impl BatchStream {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<(usize, LightweightSimResult)>> {
+        let Some(mut receiver) = self.receiver.take() else {
+            return Ok(None);
+        };
+
+        loop {
+            let (returned, received) = py.allow_threads(move || {
+                let received = receiver.recv_timeout(SIGNAL_CHECK_INTERVAL);
+                (receiver, received)
+            });
+            receiver = returned;
+
+            match received {
+                Ok((index, Ok(result))) => {
+                    self.record(&result);
+                    self.receiver = Some(receiver);
+                    return Ok(Some((index, result)));
+                }
+                Ok((index, Err(e))) => {
+                    return Err(PyRuntimeError::new_err(format!("simulation {}: {}", index, e)));
+                }
+                // Raising drops the receiver, which stops the batch
+                Err(RecvTimeoutError::Timeout) => py.check_signals()?,
+                Err(RecvTimeoutError::Disconnected) if self.completed < self.total => {
+                    return Err(PyRuntimeError::new_err(format!(
+                        "batch stopped after {} of {} simulations",
+                        self.completed, self.total
+                    )));
+                }
+                Err(RecvTimeoutError::Disconnected) => return Ok(None),
+            }
+        }
+    }
+
+    fn __len__(&self) -> usize {
+        self.total
+    }
+
+    /// Number of simulations in the batch.
+    #[getter]
+    fn total(&self) -> usize {
+        self.total
+    }
+
+    /// Number of results yielded so far.
+    #[getter]
+    fn completed(&self) -> usize {
+        self.completed
+    }
+
+    /// Mean edge of strategy `name` over the results yielded so far.
+    ///
+    /// NaN before the first result or for an unknown name. Unlike
+    /// `summary`, this copies nothing, so it is cheap to call per result.
+    fn mean_edge(&self, name: &str) -> f64 {
+        self.summary.mean_edge_of(name).unwrap_or(f64::NAN)
+    }
+
+    /// Edge and PnL statistics of the results yielded so far.
+    ///
+    /// A copy, per-seed edges included; use `mean_edge` to poll progress.
+    #[getter]
+    fn summary(&self) -> BatchSummary {
+        self.summary.clone()
+    }
+
+    /// Edge and flow counters by strategy name, summed over the results yielded so far.
+    #[getter]
+    fn edge_breakdown(&self) -> HashMap<String, EdgeBreakdown> {
+        self.edge_breakdown.clone()
+    }
+
+    /// Per-phase timings summed over the results yielded so far that recorded them.
+    #[getter]
+    fn timings(&self) -> Option<PhaseTimings> {
+        self.timings.clone()
+    }
+}
@@ -0,0 +1,439 @@
+//! Columnar per-step simulation traces.
+//!
+//! Captured steps are stored as struct-of-arrays: one contiguous vector per
+//! quantity instead of one object with String-keyed maps per step. Python
+//! sees each column as a read-only buffer (`TraceArray`), so
+//! `numpy.asarray(trace.fair_price)` is a zero-copy view of the Rust vector.
+//! When `SimulationConfig.trace_trades` is set, every trade is also recorded
+//! as one row of per-trade columns.
+
+use std::os::raw::{c_char, c_int, c_void};
+use std::ptr;
+use std::sync::Arc;
+
+use pyo3::exceptions::{PyBufferError, PyKeyError};
+use pyo3::ffi;
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+
+/// Per-strategy columns of a trace.
+#[derive(Debug, Clone, Default)]
+pub struct AmmColumns {
+    /// Spot price (Y per X)
+    pub spot_price: Vec<f64>,
+    /// Running PnL (reserves + accumulated fees) at the step's fair price
+    pub pnl: Vec<f64>,
+    /// Bid fee (WAD fraction as f64)
+    pub bid_fee: Vec<f64>,
+    /// Ask fee (WAD fraction as f64)
+    pub ask_fee: Vec<f64>,
+}
+
+/// Trades of one simulation, one row per trade in execution order.
+#[derive(Debug, Clone, Default)]
+pub struct TradeColumns {
+    /// Step of the trade
+    pub step: Vec<u32>,
+    /// Index of the AMM in `TraceData.strategies`
+    pub amm: Vec<u32>,
+    /// True for arbitrage trades, false for retail trades
+    pub arbitrage: Vec<bool>,
+    /// True if the AMM bought X (trader sold X)
+    pub amm_buys_x: Vec<bool>,
+    /// Amount of X traded
+    pub amount_x: Vec<f64>,
+    /// Amount of Y traded
+    pub amount_y: Vec<f64>,
+    /// Fee charged (WAD fraction as f64)
+    pub fee: Vec<f64>,
+    /// Edge of the trade for the AMM at the step's fair price
+    pub edge: Vec<f64>,
+}
+
+/// One trade, as recorded in `TradeColumns`.
+#[derive(Debug, Clone, Copy)]
+pub struct TradeRow {
+    pub step: u32,
+    pub amm: usize,
+    pub arbitrage: bool,
+    pub amm_buys_x: bool,
+    pub amount_x: f64,
+    pub amount_y: f64,
+    pub fee: f64,
+    pub edge: f64,
+}
+
+impl TradeColumns {
+    /// Append one trade.
+    pub fn push(&mut self, row: TradeRow) {
+        self.step.push(row.step);
+        self.amm.push(row.amm as u32);
+        self.arbitrage.push(row.arbitrage);
+        self.amm_buys_x.push(row.amm_buys_x);
+        self.amount_x.push(row.amount_x);
+        self.amount_y.push(row.amount_y);
+        self.fee.push(row.fee);
+        self.edge.push(row.edge);
+    }
+
+    /// Number of recorded trades.
+    pub fn len(&self) -> usize {
+        self.step.len()
+    }
+
+    /// Whether no trades were recorded.
+    pub fn is_empty(&self) -> bool {
+        self.step.is_empty()
+    }
+}
+
+/// Captured steps of one simulation.
+#[derive(Debug, Clone, Default)]
+pub struct TraceData {
+    /// Strategy names, in the order of `amms`
+    pub strategies: Vec<String>,
+    /// Step number of each captured step
+    pub timestamps: Vec<u32>,
+    /// Fair price at each captured step
+    pub fair_prices: Vec<f64>,
+    /// Columns per strategy
+    pub amms: Vec<AmmColumns>,
+    /// Every trade, when trades are traced
+    pub trades: TradeColumns,
+}
+
+impl TraceData {
+    /// Create an empty trace with room for `n_steps` captured steps.
+    pub fn with_capacity(strategies: Vec<String>, n_steps: usize) -> Self {
+        let amms = strategies
+            .iter()
+            .map(|_| AmmColumns {
+                spot_price: Vec::with_capacity(n_steps),
+                pnl: Vec::with_capacity(n_steps),
+                bid_fee: Vec::with_capacity(n_steps),
+                ask_fee: Vec::with_capacity(n_steps),
+            })
+            .collect();
+
+        Self {
+            strategies,
+            timestamps: Vec::with_capacity(n_steps),
+            fair_prices: Vec::with_capacity(n_steps),
+            amms,
+            trades: TradeColumns::default(),
+        }
+    }
+
+    /// Number of captured steps.
+    pub fn len(&self) -> usize {
+        self.timestamps.len()
+    }
+
+    /// Whether no steps were captured.
+    pub fn is_empty(&self) -> bool {
+        self.timestamps.is_empty()
+    }
+}
+
+/// Step trace of a simulation, with columns readable as NumPy arrays.
+///
+/// Per-strategy columns are looked up by the names in `strategies`
+/// ("submission" and "normalizer" in a match).
+#[pyclass(frozen)]
+#[derive(Debug, Clone, Default)]
+pub struct StepTrace {
+    data: Arc<TraceData>,
+}
+
+impl StepTrace {
+    /// Wrap captured trace data.
+    pub fn new(data: TraceData) -> Self {
+        Self { data: Arc::new(data) }
+    }
+
+    /// Get the trace data.
+    pub fn data(&self) -> &TraceData {
+        &self.data
+    }
+
+    fn column(&self, column: Column) -> TraceArray {
+        TraceArray::new(Arc::clone(&self.data), column)
+    }
+
+    fn amm_index(&self, strategy: &str) -> PyResult<usize> {
+        self.data
+            .strategies
+            .iter()
+            .position(|name| name == strategy)
+            .ok_or_else(|| PyKeyError::new_err(strategy.to_string()))
+    }
+}
+
+#[pymethods]
+impl StepTrace {
+    /// Strategy names with per-strategy columns.
+    #[getter]
+    fn strategies(&self) -> Vec<String> {
+        self.data.strategies.clone()
+    }
+
+    /// Step number of each captured step (uint32).
+    #[getter]
+    fn timestamps(&self) -> TraceArray {
+        self.column(Column::Timestamps)
+    }
+
+    /// Fair price at each captured step.
+    #[getter]
+    fn fair_price(&self) -> TraceArray {
+        self.column(Column::FairPrice)
+    }
+
+    /// Spot price of a strategy's AMM at each captured step.
+    fn spot_price(&self, strategy: &str) -> PyResult<TraceArray> {
+        Ok(self.column(Column::SpotPrice(self.amm_index(strategy)?)))
+    }
+
+    /// Running PnL of a strategy at each captured step.
+    fn pnl(&self, strategy: &str) -> PyResult<TraceArray> {
+        Ok(self.column(Column::Pnl(self.amm_index(strategy)?)))
+    }
+
+    /// Bid fee of a strategy at each captured step.
+    fn bid_fee(&self, strategy: &str) -> PyResult<TraceArray> {
+        Ok(self.column(Column::BidFee(self.amm_index(strategy)?)))
+    }
+
+    /// Ask fee of a strategy at each captured step.
+    fn ask_fee(&self, strategy: &str) -> PyResult<TraceArray> {
+        Ok(self.column(Column::AskFee(self.amm_index(strategy)?)))
+    }
+
+    /// Per-trade columns by name, empty unless trades were traced.
+    ///
+    /// Columns: step, amm (index into `strategies`), arbitrage, amm_buys_x,
+    /// amount_x, amount_y, fee, edge. `pandas.DataFrame(trace.trades())`
+    /// gives one row per trade.
+    fn trades<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let columns = PyDict::new_bound(py);
+        for (name, column) in TRADE_COLUMNS {
+            columns.set_item(name, Py::new(py, self.column(column))?)?;
+        }
+        Ok(columns)
+    }
+
+    fn __len__(&self) -> usize {
+        self.data.len()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "StepTrace(steps={}, trades={}, strategies={:?})",
+            self.data.len(),
+            self.data.trades.len(),
+            self.data.strategies
+        )
+    }
+}
+
+/// One column of a trace.
+#[derive(Debug, Clone, Copy)]
+enum Column {
+    Timestamps,
+    FairPrice,
+    SpotPrice(usize),
+    Pnl(usize),
+    BidFee(usize),
+    AskFee(usize),
+    TradeStep,
+    TradeAmm,
+    TradeArbitrage,
+    TradeAmmBuysX,
+    TradeAmountX,
+    TradeAmountY,
+    TradeFee,
+    TradeEdge,
+}
+
+/// Per-trade columns in the order `StepTrace.trades()` lists them.
+const TRADE_COLUMNS: [(&str, Column); 8] = [
+    ("step", Column::TradeStep),
+    ("amm", Column::TradeAmm),
+    ("arbitrage", Column::TradeArbitrage),
+    ("amm_buys_x", Column::TradeAmmBuysX),
+    ("amount_x", Column::TradeAmountX),
+    ("amount_y", Column::TradeAmountY),
+    ("fee", Column::TradeFee),
+    ("edge", Column::TradeEdge),
+];
+
+/// Read-only view of one trace column, exported through the buffer protocol.
+///
+/// Shares the trace's storage; `numpy.asarray` and `memoryview` read it in
+/// place without copying.
+#[pyclass(frozen)]
+pub struct TraceArray {
+    /// Keeps the column storage alive
+    _owner: Arc<TraceData>,
+    /// Start of the column
+    buf: *const u8,
+    /// Buffer shape and strides (one dimension), referenced by exported views
+    shape: [ffi::Py_ssize_t; 1],
+    strides: [ffi::Py_ssize_t; 1],
+    /// struct-module format string of the items
+    format: &'static [u8],
+}
+
+// The raw pointer points into `_owner`, which is immutable and owned by the Arc.
+unsafe impl Send for TraceArray {}
+unsafe impl Sync for TraceArray {}
+
+impl TraceArray {
+    fn new(data: Arc<TraceData>, column: Column) -> Self {
+        let (buf, len, itemsize, format): (*const u8, usize, usize, &'static [u8]) = {
+            let f64s = |values: &Vec<f64>| {
+                (values.as_ptr() as *const u8, values.len(), 8, &b"d\0"[..])
+            };
+            let u32s = |values: &Vec<u32>| {
+                (values.as_ptr() as *const u8, values.len(), 4, &b"I\0"[..])
+            };
+            // bool is one byte holding 0 or 1, as the struct module's "?"
+            let bools = |values: &Vec<bool>| {
+                (values.as_ptr() as *const u8, values.len(), 1, &b"?\0"[..])
+            };
+            match column {
+                Column::Timestamps => u32s(&data.timestamps),
+                Column::FairPrice => f64s(&data.fair_prices),
+                Column::SpotPrice(i) => f64s(&data.amms[i].spot_price),
+                Column::Pnl(i) => f64s(&data.amms[i].pnl),
+                Column::BidFee(i) => f64s(&data.amms[i].bid_fee),
+                Column::AskFee(i) => f64s(&data.amms[i].ask_fee),
+                Column::TradeStep => u32s(&data.trades.step),
+                Column::TradeAmm => u32s(&data.trades.amm),
+                Column::TradeArbitrage => bools(&data.trades.arbitrage),
+                Column::TradeAmmBuysX => bools(&data.trades.amm_buys_x),
+                Column::TradeAmountX => f64s(&data.trades.amount_x),
+                Column::TradeAmountY => f64s(&data.trades.amount_y),
+                Column::TradeFee => f64s(&data.trades.fee),
+                Column::TradeEdge => f64s(&data.trades.edge),
+            }
+        };
+
+        Self {
+            _owner: data,
+            buf,
+            shape: [len as ffi::Py_ssize_t],
+            strides: [itemsize as ffi::Py_ssize_t],
+            format,
+        }
+    }
+
+    fn len(&self) -> usize {
+        self.shape[0] as usize
+    }
+}
+
+#[pymethods]
+impl TraceArray {
+    fn __len__(&self) -> usize {
+        self.len()
+    }
+
+    unsafe fn __getbuffer__(
+        slf: Bound<'_, Self>,
+        view: *mut ffi::Py_buffer,
+        flags: c_int,
+    ) -> PyResult<()> {
+        if view.is_null() {
+            return Err(PyBufferError::new_err("View is null"));
+        }
+        if (flags & ffi::PyBUF_WRITABLE) == ffi::PyBUF_WRITABLE {
+            return Err(PyBufferError::new_err("TraceArray is read-only"));
+        }
+
+        let array = slf.get();
+        (*view).buf = array.buf as *mut c_void;
+        (*view).len = array.shape[0] * array.strides[0];
+        (*view).readonly = 1;
+        (*view).itemsize = array.strides[0];
+        (*view).format = if (flags & ffi::PyBUF_FORMAT) == ffi::PyBUF_FORMAT {
+            array.format.as_ptr() as *mut c_char
+        } else {
+            ptr::null_mut()
+        };
+        (*view).ndim = 1;
+        // Both arrays live inside the Python object, which the view keeps alive
+        (*view).shape = if (flags & ffi::PyBUF_ND) == ffi::PyBUF_ND {
+            array.shape.as_ptr() as *mut ffi::Py_ssize_t
+        } else {
+            ptr::null_mut()
+        };
+        (*view).strides = if (flags & ffi::PyBUF_STRIDES) == ffi::PyBUF_STRIDES {
+            array.strides.as_ptr() as *mut ffi::Py_ssize_t
+        } else {
+            ptr::null_mut()
+        };
+        (*view).suboffsets = ptr::null_mut();
+        (*view).internal = ptr::null_mut();
+        (*view).obj = slf.into_any().into_ptr();
+
+        Ok(())
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "TraceArray(len={}, format={:?})",
+            self.len(),
+            std::str::from_utf8(&self.format[..1]).unwrap_or("?")
+        )
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_columns_point_into_trace() {
+        let mut data = TraceData::with_capacity(vec!["a".to_string(), "b".to_string()], 2);
+        data.timestamps.extend([0, 1]);
+        data.fair_prices.extend([100.0, 101.0]);
+        data.amms[1].bid_fee.extend([0.003, 0.004]);
+        let trace = StepTrace::new(data);
+
+        let fair = trace.column(Column::FairPrice);
+        assert_eq!(fair.len(), 2);
+        assert_eq!(fair.buf, trace.data().fair_prices.as_ptr() as *const u8);
+        assert_eq!(fair.strides, [8]);
+
+        let timestamps = trace.column(Column::Timestamps);
+        assert_eq!(timestamps.strides, [4]);
+        assert_eq!(timestamps.format, b"I\0");
+
+        let bid = trace.column(Column::BidFee(trace.amm_index("b").unwrap()));
+        assert_eq!(bid.buf, trace.data().amms[1].bid_fee.as_ptr() as *const u8);
+    }
+
+    #[test]
+    fn test_trade_columns() {
+        let mut data = TraceData::with_capacity(vec!["a".to_string()], 0);
+        data.trades.push(TradeRow {
+            step: 3,
+            amm: 0,
+            arbitrage: true,
+            amm_buys_x: false,
+            amount_x: 1.0,
+            amount_y: 100.0,
+            fee: 0.003,
+            edge: -0.2,
+        });
+        let trace = StepTrace::new(data);
+
+        let arbitrage = trace.column(Column::TradeArbitrage);
+        assert_eq!(arbitrage.len(), 1);
+        assert_eq!(arbitrage.strides, [1]);
+        assert_eq!(arbitrage.format, b"?\0");
+        assert_eq!(trace.column(Column::TradeAmm).format, b"I\0");
+        assert_eq!(trace.column(Column::TradeEdge).len(), 1);
+    }
+}
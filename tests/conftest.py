@@ -17,3 +17,50 @@ def vanilla_strategy(vanilla_bytecode_and_abi):
     """Create a fresh VanillaStrategy instance (30 bps)."""
     bytecode, abi = vanilla_bytecode_and_abi
     return EVMStrategyAdapter(bytecode=bytecode, abi=abi)
+
+
+@pytest.fixture
+def small_config():
+    """Factory for a short SimulationConfig (50 steps, seed 42 by default).
+
+    Keyword arguments override any field, e.g. small_config(seed=3, capture="none").
+    """
+    import amm_sim_rs
+
+    def make(seed=42, **overrides):
+        fields = dict(
+            n_steps=50,
+            initial_price=100.0,
+            initial_x=100.0,
+            initial_y=10000.0,
+            gbm_mu=0.0,
+            gbm_sigma=0.001,
+            gbm_dt=1.0,
+            retail_arrival_rate=5.0,
+            retail_mean_size=2.0,
+            retail_size_sigma=0.7,
+            retail_buy_prob=0.5,
+            seed=seed,
+        )
+        fields.update(overrides)
+        return amm_sim_rs.SimulationConfig(**fields)
+
+    return make
+
+
+@pytest.fixture
+def fixed_variance():
+    """HyperparameterVariance that keeps small_config's retail and GBM parameters fixed."""
+    from amm_competition.competition.match import HyperparameterVariance
+
+    return HyperparameterVariance(
+        retail_mean_size_min=2.0,
+        retail_mean_size_max=2.0,
+        vary_retail_mean_size=False,
+        retail_arrival_rate_min=5.0,
+        retail_arrival_rate_max=5.0,
+        vary_retail_arrival_rate=False,
+        gbm_sigma_min=0.001,
+        gbm_sigma_max=0.001,
+        vary_gbm_sigma=False,
+    )
@@ -1,5 +1,6 @@
 """Tests for competition framework."""
 
+import numpy as np
 import pytest
 from decimal import Decimal
 
@@ -166,6 +167,31 @@ class TestMatchRunner:
 
         assert len(result.simulation_results) == 3
 
+    def test_step_capture(self, vanilla_bytecode_and_abi, small_config):
+        """Step results follow the capture mode; aggregates are unaffected."""
+        config = small_config(seed=1, n_steps=40)
+        assert config.capture == "full"
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        results = {}
+        for capture in ("full", "none", "every:10", "last:5"):
+            config.capture = capture
+            results[capture] = amm_sim_rs.run_batch(
+                list(bytecode), list(bytecode), [config], 1
+            ).results[0]
+
+        full = results["full"].trace
+        assert len(full) == 40
+        assert np.asarray(full.fair_price).dtype == np.float64
+        assert len(np.asarray(full.pnl("submission"))) == 40
+        assert len(results["none"].trace) == 0
+        assert list(np.asarray(results["every:10"].trace.timestamps)) == [0, 10, 20, 30]
+        assert list(np.asarray(results["last:5"].trace.timestamps)) == [35, 36, 37, 38, 39]
+        assert results["none"].edges == results["full"].edges
+
+        with pytest.raises(ValueError):
+            config.capture = "sometimes"
+
     def test_same_name_strategies_no_collision(self, vanilla_bytecode_and_abi):
         """Test that strategies with the same getName() don't cause HashMap collision."""
         from amm_competition.evm.adapter import EVMStrategyAdapter
@@ -216,3 +242,266 @@ class TestMatchRunner:
         # Check that simulation results contain data for both strategies
         first_sim = result.simulation_results[0]
         assert len(first_sim.pnl) == 2  # Should have PnL for both strategies
+
+    def test_native_normalizer_matches_evm(self, vanilla_bytecode_and_abi, small_config):
+        """The native 30bps normalizer must reproduce the EVM vanilla strategy exactly."""
+        from amm_competition.evm.baseline import VANILLA_FEE_BPS
+
+        configs = [small_config(seed=seed) for seed in range(3)]
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        evm = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, 1)
+        native = amm_sim_rs.run_batch(
+            list(bytecode), list(bytecode), configs, 1, baseline_fee_bps=VANILLA_FEE_BPS
+        )
+
+        for a, b in zip(evm.results, native.results):
+            assert a.edges == b.edges
+            assert a.pnl == b.pnl
+            assert a.average_fees == b.average_fees
+
+    @pytest.mark.parametrize("backend", ["direct", "compiled"])
+    def test_direct_backend_matches_revm(self, vanilla_bytecode_and_abi, small_config, backend):
+        """The direct and compiled backends must reproduce revm exactly, gas included."""
+        configs = [small_config(seed=seed) for seed in range(3)]
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        revm = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, 1)
+        direct = amm_sim_rs.run_batch(
+            list(bytecode), list(bytecode), configs, 1, backend=backend
+        )
+
+        for a, b in zip(revm.results, direct.results):
+            assert a.edges == b.edges
+            assert a.pnl == b.pnl
+            assert a.average_fees == b.average_fees
+            for name in ("submission", "normalizer"):
+                assert a.strategy_stats[name].gas_total == b.strategy_stats[name].gas_total
+                assert a.strategy_stats[name].gas_max == b.strategy_stats[name].gas_max
+
+    def test_forks_share_the_prefix(self, vanilla_bytecode_and_abi, small_config):
+        """Forked continuations keep the prefix and diverge after the fork step."""
+        config = small_config(seed=7, n_steps=60)
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        full = amm_sim_rs.run_batch(list(bytecode), list(bytecode), [config], 1).results[0]
+        forks = amm_sim_rs.run_forks(list(bytecode), list(bytecode), config, 40, [100, 101, 102])
+
+        assert [r.seed for r in forks.results] == [100, 101, 102]
+        full_prices = np.asarray(full.trace.fair_price)
+        for fork in forks.results:
+            prices = np.asarray(fork.trace.fair_price)
+            assert len(prices) == 60
+            assert (prices[:40] == full_prices[:40]).all()
+        assert not (
+            np.asarray(forks.results[0].trace.fair_price)[40:]
+            == np.asarray(forks.results[1].trace.fair_price)[40:]
+        ).all()
+
+        with pytest.raises(RuntimeError):
+            amm_sim_rs.run_forks(list(bytecode), list(bytecode), config, 61, [1])
+        with pytest.raises(RuntimeError):
+            amm_sim_rs.run_forks(list(bytecode), list(bytecode), config, 40, [100, 100])
+
+    def test_rerun_extremes_rejects_forks(
+        self, vanilla_bytecode_and_abi, small_config, fixed_variance
+    ):
+        """Fork results are keyed by continuation seed, so they cannot be replayed."""
+        from amm_competition.evm.adapter import EVMStrategyAdapter
+
+        runner = MatchRunner(
+            n_simulations=2, config=small_config(), n_workers=1, variance=fixed_variance
+        )
+        bytecode, abi = vanilla_bytecode_and_abi
+        strategy = EVMStrategyAdapter(bytecode=bytecode, abi=abi)
+
+        forks = runner.run_forks(strategy, strategy, 20, [100, 101])
+        assert forks.fork_step == 20
+        with pytest.raises(ValueError):
+            runner.rerun_extremes(strategy, strategy, forks, n=1)
+        assert runner.run_match(strategy, strategy).fork_step is None
+
+    def test_market_splits_flow_across_submissions(self, vanilla_bytecode_and_abi, small_config):
+        """Identical strategies in one market share the retail flow evenly."""
+        config = small_config(seed=7)
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        batch = amm_sim_rs.run_market(
+            [("a", list(bytecode)), ("b", list(bytecode))], list(bytecode), [config]
+        )
+        result = batch.results[0]
+        assert result.strategies == ["a", "b", "normalizer"]
+        for name in ("b", "normalizer"):
+            assert result.retail_volume_y[name] == pytest.approx(result.retail_volume_y["a"])
+            assert result.edges[name] == pytest.approx(result.edges["a"])
+
+        with pytest.raises(ValueError):
+            amm_sim_rs.run_market([("normalizer", list(bytecode))], list(bytecode), [config])
+
+    def test_edge_breakdown_sums_over_batch(self, vanilla_bytecode_and_abi, small_config):
+        """Arbitrage and retail edge add up to the edge, per simulation and per batch."""
+        configs = [small_config(seed=seed) for seed in range(3)]
+        bytecode, _ = vanilla_bytecode_and_abi
+        batch = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, 1)
+
+        for name in ("submission", "normalizer"):
+            for result in batch.results:
+                breakdown = result.edge_breakdown[name]
+                assert breakdown.edge == pytest.approx(result.edges[name])
+                assert breakdown.effective_fee == pytest.approx(0.003)
+            total = batch.edge_breakdown[name]
+            assert total.retail_trades == sum(
+                r.edge_breakdown[name].retail_trades for r in batch.results
+            )
+            assert total.edge == pytest.approx(sum(r.edges[name] for r in batch.results))
+            assert total.retail_share == pytest.approx(0.5)
+
+    def test_replay_matches_batch(self, vanilla_bytecode_and_abi, small_config):
+        """A replayed simulation matches the batch result and adds the trade log."""
+        config = small_config(seed=11, capture="none")
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        original = amm_sim_rs.run_batch(list(bytecode), list(bytecode), [config], 1).results[0]
+        replayed = amm_sim_rs.replay(list(bytecode), list(bytecode), config)
+
+        assert len(original.trace) == 0
+        assert len(replayed.trace) == 50
+        assert replayed.edges == original.edges
+        assert replayed.pnl == original.pnl
+
+        trades = {name: np.asarray(column) for name, column in replayed.trace.trades().items()}
+        submission = trades["amm"] == replayed.strategies.index("submission")
+        assert trades["edge"][submission].sum() == pytest.approx(original.edges["submission"])
+        assert trades["arbitrage"].dtype == np.bool_
+
+        with pytest.raises(ValueError):
+            amm_sim_rs.replay(list(bytecode), list(bytecode), config, trace_level="opcodes")
+
+    def test_run_match_reports_progress(
+        self, vanilla_bytecode_and_abi, small_config, fixed_variance
+    ):
+        """run_match streams its batch and reports progress after each simulation."""
+        from amm_competition.evm.adapter import EVMStrategyAdapter
+
+        runner = MatchRunner(
+            n_simulations=6, config=small_config(), n_workers=2, variance=fixed_variance
+        )
+
+        bytecode, abi = vanilla_bytecode_and_abi
+        strategy = EVMStrategyAdapter(bytecode=bytecode, abi=abi)
+        updates = []
+        result = runner.run_match(strategy, strategy, store_results=True, progress=updates.append)
+
+        assert [update.completed for update in updates] == list(range(1, 7))
+        assert all(update.total == 6 for update in updates)
+        assert updates[-1].mean_edge == pytest.approx(float(result.total_edge_a) / 6)
+        assert [r.seed for r in result.simulation_results] == list(range(6))
+
+        configs = runner._build_configs("none")
+        batch = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, 1)
+        assert result.edge_by_seed == {r.seed: r.edges["submission"] for r in batch.results}
+
+    def test_concurrent_batches_match_sequential(self, vanilla_bytecode_and_abi, small_config):
+        """Batches run from several Python threads at once give the same results."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        configs = [small_config(seed=seed, capture="none") for seed in range(4)]
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        def run(n_workers):
+            batch = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, n_workers)
+            return [r.edges for r in batch.results]
+
+        sequential = run(2)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            concurrent = list(executor.map(run, [2, 2, 3]))
+
+        assert all(edges == sequential for edges in concurrent)
+
+    def test_summary_only_batch(self, vanilla_bytecode_and_abi, small_config):
+        """A summary-only batch returns no results but the same statistics."""
+        configs = [small_config(seed=seed) for seed in range(5)]
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        full = amm_sim_rs.run_batch(list(bytecode), list(bytecode), configs, 2)
+        summary_only = amm_sim_rs.run_batch(
+            list(bytecode), list(bytecode), configs, 2, summary_only=True
+        )
+
+        assert len(summary_only.results) == 0
+        summary = summary_only.summary
+        assert summary.n_simulations == 5
+        assert summary.total_edge == full.summary.total_edge
+        assert summary.edge_by_seed("submission") == {
+            r.seed: r.edges["submission"] for r in full.results
+        }
+        # Identical strategies draw every simulation, with no edge difference
+        assert summary.draws == 5
+        assert summary.edge_diff_mean["submission"] == 0.0
+
+        edges = [r.edges["submission"] for r in full.results]
+        assert summary.mean_edge["submission"] == pytest.approx(np.mean(edges))
+        assert summary.edge_std["submission"] == pytest.approx(np.std(edges, ddof=1))
+        assert summary.edge_quantiles("submission", [0.0, 0.5, 1.0]) == pytest.approx(
+            list(np.quantile(edges, [0.0, 0.5, 1.0]))
+        )
+        with pytest.raises(ValueError):
+            summary.edge_quantiles("submission", [1.5])
+
+    def test_run_matches_share_scenarios(
+        self, vanilla_bytecode_and_abi, small_config, fixed_variance
+    ):
+        """run_matches gives each strategy the result run_match would, on shared markets."""
+        from amm_competition.evm.adapter import EVMStrategyAdapter
+
+        runner = MatchRunner(
+            n_simulations=4, config=small_config(), n_workers=2, variance=fixed_variance
+        )
+
+        bytecode, abi = vanilla_bytecode_and_abi
+        strategy = EVMStrategyAdapter(bytecode=bytecode, abi=abi)
+        results = runner.run_matches([strategy, strategy], strategy)
+        single = runner.run_match(strategy, strategy)
+
+        assert len(results) == 2
+        for result in results:
+            assert result.total_games == 4
+            assert result.total_edge_a == single.total_edge_a
+            assert result.edge_by_seed == single.edge_by_seed
+            assert result.simulation_results == []
+        assert results[0].paired_edge_diff(results[1]) == (0.0, 0.0)
+
+        stored = runner.run_matches([strategy], strategy, store_results=True)
+        assert [r.seed for r in stored[0].simulation_results] == list(range(4))
+
+    def test_screening_calls_strategy_once_per_step(self, vanilla_bytecode_and_abi, small_config):
+        """Per-step screening makes at most one afterSwap call per AMM and step."""
+        config = small_config(seed=3, capture="none", fee_updates="per_step")
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        result = amm_sim_rs.run_batch(list(bytecode), list(bytecode), [config], 1).results[0]
+        assert result.fee_updates == "per_step"
+        assert 0 < result.strategy_stats["submission"].after_swap_calls <= 50
+
+        with pytest.raises(ValueError):
+            config.fee_updates = "sometimes"
+
+    def test_strategy_stats_report_gas(self, vanilla_bytecode_and_abi, small_config):
+        """Each simulation reports afterSwap counters for both strategies."""
+        config = small_config(seed=7)
+        bytecode, _ = vanilla_bytecode_and_abi
+
+        result = amm_sim_rs.run_batch(
+            list(bytecode), list(bytecode), [config], 1, baseline_fee_bps=30
+        ).results[0]
+
+        submission = result.strategy_stats["submission"]
+        assert submission.after_swap_calls > 0
+        assert submission.reverts == 0
+        assert submission.clamped_fees == 0
+        assert 21_000 < submission.gas_p50 <= submission.gas_p99 <= submission.gas_max < 250_000
+
+        # The native normalizer is called just as often but never touches the EVM
+        normalizer = result.strategy_stats["normalizer"]
+        assert normalizer.after_swap_calls > 0
+        assert normalizer.gas_total == 0
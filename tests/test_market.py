@@ -255,3 +255,66 @@ class TestOrderRouter:
 
         # Both AMMs have same 30bps fee, so split should be roughly equal
         assert all(s[1] > 0 for s in splits)
+
+    def test_splits_across_many_amms_at_equal_marginal_price(self):
+        """With more than two AMMs, every AMM that gets flow ends at the same marginal price."""
+        router = OrderRouter()
+        pools = [
+            ("100", "10000", "0.003"),
+            ("50", "5000", "0.001"),
+            ("200", "20000", "0.005"),
+            # Far worse price: stays out of a small order
+            ("100", "20000", "0.003"),
+        ]
+        amms = []
+        for i, (x, y, fee) in enumerate(pools):
+            amm = AMM(
+                strategy=FixedFeeStrategy(bid_fee=Decimal(fee), ask_fee=Decimal(fee)),
+                reserve_x=Decimal(x),
+                reserve_y=Decimal(y),
+                name=f"amm_{i}",
+            )
+            amm.initialize()
+            amms.append(amm)
+
+        splits = router.compute_optimal_split_buy(amms, Decimal("40"))
+        assert [amm for amm, _ in splits] == amms
+        amounts = [float(amount) for _, amount in splits]
+        assert sum(amounts) == pytest.approx(40)
+        assert amounts[3] == 0
+
+        # Marginal output x * γ * y / (y + γ * Δy)²
+        def marginal(amm, amount):
+            gamma = 1 - float(amm.current_fees.ask_fee)
+            x, y = float(amm.reserve_x), float(amm.reserve_y)
+            return x * gamma * y / (y + gamma * amount) ** 2
+
+        levels = [marginal(amm, amount) for amm, amount in zip(amms, amounts)]
+        assert all(amount > 0 for amount in amounts[:3])
+        assert levels[1] == pytest.approx(levels[0], rel=1e-9)
+        assert levels[2] == pytest.approx(levels[0], rel=1e-9)
+        assert levels[3] < levels[0]
+
+    def test_water_fill_matches_two_amm_split(self):
+        """Water-filling reduces to the closed-form split for two AMMs."""
+        router = OrderRouter()
+        amms = []
+        for fee in ("0.003", "0.008"):
+            amm = AMM(
+                strategy=FixedFeeStrategy(bid_fee=Decimal(fee), ask_fee=Decimal(fee)),
+                reserve_x=Decimal("100"),
+                reserve_y=Decimal("10000"),
+            )
+            amm.initialize()
+            amms.append(amm)
+
+        closed_form = router._split_sell_two_amms(amms[0], amms[1], Decimal("5"))
+        pools = []
+        for amm in amms:
+            x, y = float(amm.reserve_x), float(amm.reserve_y)
+            gamma = 1 - float(amm.current_fees.bid_fee)
+            pools.append((math.sqrt(y * gamma * x), x, gamma))
+        water_fill = router._water_fill(pools, 5.0)
+
+        for (_, expected), amount in zip(closed_form, water_fill):
+            assert amount == pytest.approx(float(expected), rel=1e-9)
@@ -0,0 +1,31 @@
+"""Tests for building hypothetical probe trades."""
+
+import pytest
+
+from amm_competition.evm.probe import hypothetical_trade
+
+
+class TestHypotheticalTrade:
+    def test_amm_buys_x(self):
+        is_buy, amount_x, amount_y, timestamp, reserve_x, reserve_y = hypothetical_trade(
+            100.0, 10000.0, 100.0, is_buy=True, timestamp=5
+        )
+        assert is_buy is True
+        assert timestamp == 5
+        assert amount_y == 100.0
+        assert reserve_y == 9900.0
+        assert reserve_x == pytest.approx(100.0 + amount_x)
+        assert reserve_x * reserve_y == pytest.approx(100.0 * 10000.0)
+
+    def test_amm_sells_x(self):
+        is_buy, amount_x, amount_y, _, reserve_x, reserve_y = hypothetical_trade(
+            100.0, 10000.0, 100.0, is_buy=False
+        )
+        assert is_buy is False
+        assert reserve_y == 10100.0
+        assert reserve_x == pytest.approx(100.0 - amount_x)
+        assert reserve_x * reserve_y == pytest.approx(100.0 * 10000.0)
+
+    def test_buy_larger_than_reserve_is_rejected(self):
+        with pytest.raises(ValueError):
+            hypothetical_trade(100.0, 10000.0, 10000.0, is_buy=True)
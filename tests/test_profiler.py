@@ -0,0 +1,85 @@
+"""Tests for mapping opcode profiles to Solidity source lines."""
+
+from types import SimpleNamespace
+
+from amm_competition.evm.compiler import CompilationResult
+from amm_competition.evm.profiler import (
+    SourceMapper,
+    build_report,
+    decode_source_map,
+    instruction_offsets,
+)
+
+
+SOURCE = "contract Strategy {\n    uint256 x;\n    function f() external { x = 1; }\n}\n"
+
+# PUSH1 0x01, PUSH1 0x00, SSTORE, STOP
+BYTECODE = bytes.fromhex("6001600055" + "00")
+
+
+class TestDecodeSourceMap:
+    def test_empty_fields_repeat_previous(self):
+        entries = decode_source_map("10:5:0:-;;:3;20::1:i;-1:0:-1")
+        assert [(e.start, e.length, e.file_index, e.jump) for e in entries] == [
+            (10, 5, 0, "-"),
+            (10, 5, 0, "-"),
+            (10, 3, 0, "-"),
+            (20, 3, 1, "i"),
+            (-1, 0, -1, "i"),
+        ]
+
+
+class TestInstructionOffsets:
+    def test_push_immediates_are_skipped(self):
+        assert instruction_offsets(BYTECODE) == {0: 0, 2: 1, 4: 2, 5: 3}
+
+
+class TestSourceMapper:
+    def test_maps_pc_to_line(self):
+        start = SOURCE.index("x = 1")
+        source_map = f"{start}:5:0:-;;;-1:0:-1"
+        mapper = SourceMapper(BYTECODE, source_map, {0: ("Strategy.sol", SOURCE)})
+
+        assert mapper.location(4) == (
+            "Strategy.sol",
+            3,
+            "function f() external { x = 1; }",
+        )
+        # STOP is compiler-generated, pc 1 is inside a PUSH immediate
+        assert mapper.location(5) is None
+        assert mapper.location(1) is None
+
+
+class TestBuildReport:
+    def test_attributes_gas_to_lines_and_folds_stacks(self):
+        start = SOURCE.index("x = 1")
+        compilation = CompilationResult(
+            success=True,
+            deployed_bytecode=BYTECODE,
+            deployed_source_map=f"{start}:5:0:-;;;-1:0:-1",
+            source_files={0: ("Strategy.sol", SOURCE)},
+        )
+        profile = SimpleNamespace(
+            name="Test",
+            calls=2,
+            gas_total=50_000,
+            opcode_counts={"PUSH1": 4, "SSTORE": 2, "STOP": 2},
+            opcode_gas={"PUSH1": 12, "SSTORE": 22_200, "STOP": 0},
+            pc_counts=[(0, 2, 6), (2, 2, 6), (4, 2, 22_200), (5, 2, 0)],
+            sloads_per_call=0.0,
+            sstores_per_call=1.0,
+            sload_max=0,
+            sstore_max=1,
+        )
+
+        report = build_report(profile, compilation)
+
+        assert report.opcodes[0] == ("SSTORE", 2, 22_200)
+        assert len(report.lines) == 1
+        assert report.lines[0].label == "Strategy.sol:3"
+        assert report.lines[0].executions == 6
+        assert report.lines[0].gas == 22_212
+        assert report.gas_per_call == 25_000
+        assert report.to_folded() == (
+            "Test;Strategy.sol;Strategy.sol:3 function f() external { x = 1, } 22212\n"
+        )
@@ -48,6 +48,66 @@ def test_after_swap_fast_surfaces_evm_errors(vanilla_bytecode_and_abi) -> None:
         executor.after_swap_fast(_sample_trade())
 
 
+class _Result:
+    def __init__(self, gas_used: int) -> None:
+        self.gas_used = gas_used
+
+
+def test_after_swap_reports_gas_of_reverted_call(vanilla_bytecode_and_abi) -> None:
+    bytecode, abi = vanilla_bytecode_and_abi
+    executor = EVMStrategyExecutor(bytecode=bytecode, abi=abi)
+
+    class RevertingEVM:
+        result = _Result(30_000)
+
+        def message_call(self, **kwargs):
+            self.result = _Result(21_500)
+            raise RuntimeError("Revert { gas_used: 21500, output: 0x }")
+
+    executor.evm = RevertingEVM()
+
+    result = executor.after_swap(_sample_trade())
+    assert not result.success
+    assert result.gas_used == 21_500
+
+
+def test_after_initialize_ignores_stale_result_when_call_never_ran(
+    vanilla_bytecode_and_abi,
+) -> None:
+    bytecode, abi = vanilla_bytecode_and_abi
+    executor = EVMStrategyExecutor(bytecode=bytecode, abi=abi)
+
+    class RejectingEVM:
+        result = _Result(30_000)
+
+        def message_call(self, **kwargs):
+            raise RuntimeError("Transaction(LackOfFundForMaxFee { fee: 1, balance: 0 })")
+
+    executor.evm = RejectingEVM()
+
+    result = executor.after_initialize(Decimal("100"), Decimal("10000"))
+    assert not result.success
+    assert result.gas_used == 0
+
+
+def test_after_initialize_reports_gas_of_short_return(vanilla_bytecode_and_abi) -> None:
+    bytecode, abi = vanilla_bytecode_and_abi
+    executor = EVMStrategyExecutor(bytecode=bytecode, abi=abi)
+
+    class ShortReturnEVM:
+        result = None
+
+        def message_call(self, **kwargs):
+            self.result = _Result(22_000)
+            return b"\x00" * 32
+
+    executor.evm = ShortReturnEVM()
+
+    result = executor.after_initialize(Decimal("100"), Decimal("10000"))
+    assert not result.success
+    assert result.gas_used == 22_000
+
+
 def test_adapter_clamps_out_of_range_initialize_fees(vanilla_bytecode_and_abi) -> None:
     bytecode, abi = vanilla_bytecode_and_abi
     adapter = EVMStrategyAdapter(bytecode=bytecode, abi=abi)